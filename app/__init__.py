@@ -11,23 +11,41 @@ def create_app():
     
     cors = CORS(app)
     
-    from .config.database import create_tables
+    from .config.database import create_tables, SessionLocal
     create_tables()
     
     configure_routes(app)
     
+    from .config.settings import get_config
+    from .utils.compression import configure_compression
+    from .services.outbox_relay import start_outbox_relay
+    configure_compression(app, get_config())
+    start_outbox_relay(get_config(), SessionLocal)
+    
     return app
 
 
 def configure_routes(app):
     from .controllers.health_controller import HealthCheckView
-    from .controllers.route_controller import RouteCreateController, RouteListController, RouteDetailController, RouteDeleteAllController
+    from .controllers.metrics_controller import MetricsController
+    from .controllers.route_controller import RouteCreateController, RouteCreateJobController, RouteBulkCreateController, RouteListController, RouteDetailController, RouteDeleteAllController, RouteExportController, RoutePurgeJobController, RoutePlanController, RoutePlanJobController, RouteReoptimizeController, RouteRefreshController, ClientRoutesController, OrderRouteController
     
     api = Api(app)
     
     api.add_resource(HealthCheckView, '/logistics/ping')
+    api.add_resource(MetricsController, '/logistics/metrics')
     api.add_resource(RouteCreateController, '/logistics/routes')
     api.add_resource(RouteListController, '/logistics/routes')
+    api.add_resource(RouteBulkCreateController, '/logistics/routes/bulk')
+    api.add_resource(RouteCreateJobController, '/logistics/routes/jobs/<string:job_id>')
+    api.add_resource(RouteExportController, '/logistics/routes/export')
+    api.add_resource(RoutePlanController, '/logistics/routes/plan')
+    api.add_resource(RoutePlanJobController, '/logistics/routes/plan-jobs/<string:job_id>')
     api.add_resource(RouteDetailController, '/logistics/routes/<int:route_id>')
+    api.add_resource(RouteReoptimizeController, '/logistics/routes/<int:route_id>/reoptimize')
+    api.add_resource(RouteRefreshController, '/logistics/routes/<int:route_id>/refresh')
+    api.add_resource(ClientRoutesController, '/logistics/clients/<string:client_id>/routes')
+    api.add_resource(OrderRouteController, '/logistics/orders/<string:order_id>/route')
     api.add_resource(RouteDeleteAllController, '/logistics/routes/delete-all')
+    api.add_resource(RoutePurgeJobController, '/logistics/routes/purge-jobs/<string:job_id>')
 
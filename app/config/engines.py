@@ -0,0 +1,53 @@
+from sqlalchemy import StaticPool, create_engine, event, make_url
+
+SQLITE_PRAGMAS = (
+    ('journal_mode', 'WAL'),
+    ('synchronous', 'NORMAL'),
+    ('foreign_keys', 'ON'),
+    ('busy_timeout', '5000'),
+    ('temp_store', 'MEMORY'),
+    ('cache_size', '-65536'),
+)
+
+
+def is_sqlite_url(url: str) -> bool:
+    return make_url(url).get_backend_name() == 'sqlite'
+
+
+def is_memory_sqlite_url(url: str) -> bool:
+    parsed = make_url(url)
+    database = parsed.database or ''
+    return database in ('', ':memory:') or parsed.query.get('mode') == 'memory'
+
+
+def create_database_engine(
+    url: str,
+    echo: bool = False,
+    pool_size: int = 20,
+    max_overflow: int = 30,
+    pool_timeout: float = 30
+):
+    pool_options = {'pool_size': pool_size, 'max_overflow': max_overflow, 'pool_timeout': pool_timeout}
+    if not is_sqlite_url(url):
+        options = {}
+        if make_url(url).get_backend_name() == 'postgresql':
+            options['connect_args'] = {'options': '-c timezone=utc'}
+        return create_engine(url, echo=echo, **pool_options, **options)
+
+    options = {'connect_args': {'check_same_thread': False}}
+    if is_memory_sqlite_url(url):
+        options['poolclass'] = StaticPool
+    else:
+        options.update(pool_options)
+    engine = create_engine(url, echo=echo, **options)
+    event.listen(engine, 'connect', apply_sqlite_pragmas)
+    return engine
+
+
+def apply_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in SQLITE_PRAGMAS:
+            cursor.execute(f"PRAGMA {name}={value}")
+    finally:
+        cursor.close()
@@ -0,0 +1,68 @@
+import itertools
+import logging
+import threading
+import time
+from typing import Callable, List, Optional
+from sqlalchemy import text
+
+logger = logging.getLogger(__name__)
+
+POSTGRES_LAG_QUERY = text(
+    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
+
+
+class Replica:
+    def __init__(self, engine):
+        self.engine = engine
+        self.lag_seconds: Optional[float] = None
+        self.checked_at = 0.0
+
+
+class ReplicaRouter:
+    def __init__(
+        self,
+        engines: List,
+        max_lag_seconds: float = 5.0,
+        check_interval_seconds: float = 2.0,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.replicas = [Replica(engine) for engine in engines]
+        self.max_lag_seconds = max_lag_seconds
+        self.check_interval_seconds = check_interval_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._cycle = itertools.cycle(self.replicas) if self.replicas else None
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.replicas)
+
+    def pick(self):
+        if not self.replicas:
+            return None
+        for _ in range(len(self.replicas)):
+            with self._lock:
+                replica = next(self._cycle)
+            if self._is_fresh(replica):
+                return replica.engine
+        logger.warning("Ninguna réplica dentro del retraso permitido, leyendo del primario")
+        return None
+
+    def _is_fresh(self, replica: Replica) -> bool:
+        now = self._clock()
+        if replica.lag_seconds is None or now - replica.checked_at >= self.check_interval_seconds:
+            replica.lag_seconds = self.measure_lag(replica.engine)
+            replica.checked_at = now
+        return replica.lag_seconds <= self.max_lag_seconds
+
+    def measure_lag(self, engine) -> float:
+        if engine.dialect.name != 'postgresql':
+            return 0.0
+        try:
+            with engine.connect() as connection:
+                return float(connection.execute(POSTGRES_LAG_QUERY).scalar() or 0)
+        except Exception as e:
+            logger.warning(f"Error al medir el retraso de la réplica: {str(e)}")
+            return float('inf')
@@ -0,0 +1,16 @@
+from sqlalchemy import event
+from ..utils.metrics import MetricsRegistry
+
+STATEMENT_CACHE_PREFIX = 'sql_statement_cache'
+
+
+def track_statement_cache(engine, registry: MetricsRegistry, name: str = 'primary') -> None:
+    @event.listens_for(engine, 'after_cursor_execute')
+    def count_cache_usage(connection, cursor, statement, parameters, context, executemany):
+        outcome = getattr(context, 'cache_hit', None)
+        if outcome is not None:
+            registry.increment(f"{STATEMENT_CACHE_PREFIX}.{name}.{outcome.name.lower()}")
+    
+    compiled_cache = getattr(engine, '_compiled_cache', None)
+    if compiled_cache is not None:
+        registry.register_gauge(f"{STATEMENT_CACHE_PREFIX}.{name}.size", lambda: len(compiled_cache))
@@ -1,17 +1,22 @@
-from typing import Any, Dict, Tuple
+from typing import Any, Dict, Optional, Tuple
 from flask_restful import Resource
 
 
 class BaseController(Resource):
-    def success_response(self, data: Any = None, message: str = "Operación exitosa") -> Tuple[Dict[str, Any], int]:
+    def success_response(self, data: Any = None, message: str = "Operación exitosa", headers: Optional[Dict[str, str]] = None) -> Tuple:
         response = {
             "success": True,
             "message": message
         }
         if data is not None:
             response["data"] = data
+        if headers:
+            return response, 200, headers
         return response, 200
     
+    def not_modified_response(self, etag: str) -> Tuple[str, int, Dict[str, str]]:
+        return "", 304, {"ETag": etag, "Cache-Control": "no-cache"}
+    
     def error_response(self, message: str, details: str = None, status_code: int = 400) -> Tuple[Dict[str, Any], int]:
         response = {
             "success": False,
@@ -21,13 +26,15 @@ class BaseController(Resource):
             response["details"] = details
         return response, status_code
     
-    def created_response(self, data: Any, message: str = "Recurso creado exitosamente") -> Tuple[Dict[str, Any], int]:
+    def created_response(self, data: Any, message: str = "Recurso creado exitosamente", headers: Optional[Dict[str, str]] = None) -> Tuple:
         response = {
             "success": True,
             "message": message
         }
         if data is not None:
             response["data"] = data
+        if headers:
+            return response, 201, headers
         return response, 201
 
 
@@ -0,0 +1,7 @@
+from .base_controller import BaseController
+from ..utils.metrics import metrics
+
+
+class MetricsController(BaseController):
+    def get(self):
+        return self.success_response(data=metrics.snapshot(), message="Métricas obtenidas exitosamente")
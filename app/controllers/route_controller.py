@@ -1,11 +1,140 @@
-from flask import request
+from flask import request, Response
 from flask_restful import Resource
-from typing import Dict, Any, Tuple
+from datetime import date
+from typing import Dict, Any, List, Optional, Tuple
 from ..services.route_service import RouteService
+from ..services.idempotency_service import (
+    IDEMPOTENCY_HEADER,
+    MAX_KEY_LENGTH,
+    IdempotencyInProgressError,
+    IdempotencyKeyReuseError,
+    IdempotencyService,
+    request_fingerprint
+)
 from ..repositories.route_repository import RouteRepository
-from ..exceptions.custom_exceptions import LogisticsValidationError, LogisticsBusinessLogicError
+from ..exceptions.custom_exceptions import LogisticsValidationError, LogisticsBusinessLogicError, LogisticsNotFoundError
 from .base_controller import BaseController
-from ..config.database import auto_close_session, SessionLocal
+from ..config.database import auto_close_session, SessionLocal, open_read_session, replica_router
+from ..config.settings import get_config
+from ..utils.route_export import EXPORT_FORMATS, export_chunks
+from ..utils.jobs import JOB_COMPLETED, Job, JobManager, JobQueueFullError
+from ..utils.etag import compute_etag, etag_matches, orders_fingerprint
+from ..utils.consistency import read_your_writes_active, read_your_writes_headers
+from ..optimization.fleet_planner import plan_fleet
+from ..optimization.planner_pool import PlannerPool
+from ..optimization.distance_cache import open_distance_cache
+
+DELETE_MODES = ('single', 'chunked')
+PLANNER_RESULT_GRACE_SECONDS = 30
+ROUTE_JOBS_RETRY_AFTER_SECONDS = 5
+
+purge_job_manager = JobManager(max_workers=1, session_factory=SessionLocal)
+plan_job_manager = JobManager(max_workers=get_config().PLANNER_MAX_WORKERS, session_factory=SessionLocal)
+create_job_manager = JobManager(
+    max_workers=get_config().ROUTE_JOBS_MAX_WORKERS,
+    max_queue_depth=get_config().ROUTE_JOBS_MAX_QUEUE_DEPTH,
+    backend=get_config().ROUTE_JOBS_BACKEND,
+    session_factory=SessionLocal
+)
+idempotency_service = IdempotencyService(
+    SessionLocal,
+    ttl_seconds=get_config().IDEMPOTENCY_TTL_SECONDS,
+    wait_seconds=get_config().IDEMPOTENCY_WAIT_SECONDS,
+    lock_seconds=get_config().IDEMPOTENCY_LOCK_SECONDS,
+    cache_size=get_config().IDEMPOTENCY_CACHE_SIZE
+)
+planner_pool = PlannerPool(max_workers=get_config().PLANNER_MAX_WORKERS, start_method=get_config().PLANNER_START_METHOD)
+
+
+def run_create_route_job(job: Job, route_data: Dict[str, Any]) -> Dict[str, Any]:
+    session = SessionLocal()
+    try:
+        route_service = RouteService(RouteRepository(session))
+        return route_service.create_route(route_data, **stop_sequence_options()).to_dict()
+    finally:
+        session.close()
+
+
+def run_purge_job(job: Job, before: Optional[date], batch_size: int, pause_seconds: float) -> Dict[str, Any]:
+    session = SessionLocal()
+    try:
+        route_service = RouteService(RouteRepository(session))
+        
+        def report(deleted: int, total: int):
+            job.update_progress(
+                deleted=deleted,
+                total=total,
+                percent=round(min(deleted, total) * 100.0 / total, 2) if total else 100.0
+            )
+        
+        deleted = route_service.purge_routes(batch_size, before, on_progress=report, pause_seconds=pause_seconds)
+        return {'deleted_count': deleted}
+    finally:
+        session.close()
+
+
+def run_plan_job(job: Job, delivery_date: date, trucks: List[str]) -> Dict[str, Any]:
+    config = get_config()
+    session = SessionLocal()
+    try:
+        route_service = RouteService(RouteRepository(session))
+        options = stop_sequence_options()
+        
+        def planner(stops: List[Dict[str, Any]], plan_trucks: List[str]) -> Dict[str, Any]:
+            return planner_pool.run(
+                plan_fleet,
+                stops,
+                plan_trucks,
+                depot=options['depot'],
+                return_to_depot=options['return_to_depot'],
+                time_limit_ms=config.PLANNER_TIME_LIMIT_MS,
+                balance_tolerance=config.PLANNER_BALANCE_TOLERANCE,
+                distance_cache=options['distance_cache'],
+                timeout=config.PLANNER_TIME_LIMIT_MS / 1000.0 + PLANNER_RESULT_GRACE_SECONDS
+            )
+        
+        return route_service.plan_delivery_date(
+            delivery_date,
+            trucks,
+            planner,
+            max_workers=config.BULK_ORDERS_MAX_WORKERS,
+            on_progress=lambda stage: job.update_progress(stage=stage)
+        )
+    finally:
+        session.close()
+
+
+def build_read_repository() -> RouteRepository:
+    read_session = None
+    if replica_router.enabled and not read_your_writes_active():
+        read_session = open_read_session()
+    return RouteRepository(SessionLocal(), read_session=read_session)
+
+
+def stop_sequence_options() -> Dict[str, Any]:
+    config = get_config()
+    depot = None
+    if config.ROUTE_DEPOT_LATITUDE is not None and config.ROUTE_DEPOT_LONGITUDE is not None:
+        depot = (config.ROUTE_DEPOT_LATITUDE, config.ROUTE_DEPOT_LONGITUDE)
+    return {
+        'depot': depot,
+        'return_to_depot': config.ROUTE_RETURN_TO_DEPOT,
+        'time_limit_ms': config.STOP_SEQUENCE_TIME_LIMIT_MS,
+        'distance_cache': open_distance_cache(
+            config.DISTANCE_CACHE_DIR,
+            block_size=config.DISTANCE_CACHE_BLOCK_SIZE,
+            max_idle_days=config.DISTANCE_CACHE_MAX_IDLE_DAYS
+        )
+    }
+
+
+def primary_read_headers() -> Dict[str, str]:
+    return read_your_writes_headers(replica_router.enabled, get_config().READ_YOUR_WRITES_SECONDS)
+
+
+def prefers_async() -> bool:
+    preferences = [value.strip().lower() for value in request.headers.get('Prefer', '').split(',')]
+    return get_config().ROUTE_CREATE_ASYNC or 'respond-async' in preferences
 
 
 class RouteCreateController(BaseController):
@@ -16,6 +145,30 @@ class RouteCreateController(BaseController):
     
     @auto_close_session
     def post(self):
+        idempotency_key = request.headers.get(IDEMPOTENCY_HEADER)
+        if idempotency_key is None:
+            return self._create()
+        
+        idempotency_key = idempotency_key.strip()
+        if not idempotency_key or len(idempotency_key) > MAX_KEY_LENGTH:
+            return self.error_response(
+                "Error de validación",
+                f"El encabezado {IDEMPOTENCY_HEADER} debe tener entre 1 y {MAX_KEY_LENGTH} caracteres",
+                400
+            )
+        
+        try:
+            fingerprint = request_fingerprint(request.get_json(silent=True))
+            return idempotency_service.execute(idempotency_key, fingerprint, self._create)
+        except IdempotencyKeyReuseError as e:
+            return self.error_response("Error de validación", str(e), 422)
+        except IdempotencyInProgressError as e:
+            response, status = self.error_response("Petición en curso", str(e), 409)
+            return response, status, {'Retry-After': '1'}
+        except Exception as e:
+            return self.error_response("Error interno del servidor", str(e), 500)
+    
+    def _create(self):
         try:
             json_data = request.get_json()
             if not json_data:
@@ -25,27 +178,137 @@ class RouteCreateController(BaseController):
                     400
                 )
             
-            route = self.route_service.create_route(json_data)
+            if prefers_async():
+                self.route_service.validate_route_request(json_data)
+                job = create_job_manager.submit('create_route', run_create_route_job, json_data)
+                response, _ = self.success_response(
+                    data=job.to_dict(),
+                    message="Creación de ruta iniciada"
+                )
+                return response, 202, {'Location': f"/logistics/routes/jobs/{job.id}", 'Preference-Applied': 'respond-async'}
+            
+            route = self.route_service.create_route(json_data, **stop_sequence_options())
             
             return self.created_response(
                 data=route.to_dict(),
-                message="Ruta creada exitosamente"
+                message="Ruta creada exitosamente",
+                headers=primary_read_headers()
             )
             
         except LogisticsValidationError as e:
             return self.error_response("Error de validación", str(e), 400)
         except LogisticsBusinessLogicError as e:
             return self.error_response("Error de lógica de negocio", str(e), 422)
+        except JobQueueFullError as e:
+            response, status = self.error_response("Servicio no disponible", str(e), 503)
+            return response, status, {'Retry-After': str(ROUTE_JOBS_RETRY_AFTER_SECONDS)}
         except Exception as e:
             return self.error_response("Error interno del servidor", str(e), 500)
 
 
-class RouteListController(BaseController):
+class RouteCreateJobController(BaseController):
+    def get(self, job_id: str):
+        job = create_job_manager.get(job_id)
+        if not job:
+            return self.error_response("Recurso no encontrado", f"No existe la tarea de creación {job_id}", 404)
+        
+        headers = primary_read_headers() if job.status == JOB_COMPLETED else None
+        return self.success_response(
+            data=job.to_dict(),
+            message="Estado de la creación obtenido exitosamente",
+            headers=headers
+        )
+
+
+class RouteBulkCreateController(BaseController):
+    def __init__(self):
+        session = SessionLocal()
+        self.route_repository = RouteRepository(session)
+        self.route_service = RouteService(self.route_repository)
+    
+    @auto_close_session
+    def post(self):
+        try:
+            json_data = request.get_json()
+            if not json_data:
+                return self.error_response(
+                    "Error de validación",
+                    "El cuerpo de la petición JSON está vacío",
+                    400
+                )
+            
+            results = self.route_service.create_routes_bulk(
+                json_data, max_workers=get_config().BULK_ORDERS_MAX_WORKERS, **stop_sequence_options()
+            )
+            created_count = sum(1 for result in results if result['success'])
+            data = {
+                'results': results,
+                'created_count': created_count,
+                'failed_count': len(results) - created_count
+            }
+            
+            if not created_count:
+                return self.success_response(data=data, message="No se crearon rutas")
+            
+            return self.created_response(
+                data=data,
+                message=f"Se crearon {created_count} rutas exitosamente",
+                headers=primary_read_headers()
+            )
+            
+        except LogisticsValidationError as e:
+            return self.error_response("Error de validación", str(e), 400)
+        except LogisticsBusinessLogicError as e:
+            return self.error_response("Error de lógica de negocio", str(e), 422)
+        except Exception as e:
+            return self.error_response("Error interno del servidor", str(e), 500)
+
+
+class RoutePlanController(BaseController):
     def __init__(self):
         session = SessionLocal()
         self.route_repository = RouteRepository(session)
         self.route_service = RouteService(self.route_repository)
     
+    @auto_close_session
+    def post(self):
+        try:
+            json_data = request.get_json()
+            if not json_data:
+                return self.error_response(
+                    "Error de validación",
+                    "El cuerpo de la petición JSON está vacío",
+                    400
+                )
+            
+            delivery_date, trucks = self.route_service.validate_plan_request(json_data)
+            job = plan_job_manager.submit('plan_routes', run_plan_job, delivery_date, trucks)
+            response, _ = self.success_response(
+                data=job.to_dict(),
+                message="Planificación de rutas iniciada"
+            )
+            return response, 202, {'Location': f"/logistics/routes/plan-jobs/{job.id}"}
+            
+        except LogisticsValidationError as e:
+            return self.error_response("Error de validación", str(e), 400)
+        except Exception as e:
+            return self.error_response("Error interno del servidor", str(e), 500)
+
+
+class RoutePlanJobController(BaseController):
+    def get(self, job_id: str):
+        job = plan_job_manager.get(job_id)
+        if not job:
+            return self.error_response("Recurso no encontrado", f"No existe la tarea de planificación {job_id}", 404)
+        
+        return self.success_response(data=job.to_dict(), message="Estado de la planificación obtenido exitosamente")
+
+
+class RouteListController(BaseController):
+    def __init__(self):
+        self.route_repository = build_read_repository()
+        self.route_service = RouteService(self.route_repository)
+    
     @auto_close_session
     def get(self):
         try:
@@ -69,15 +332,22 @@ class RouteListController(BaseController):
                     400
                 )
             
-            routes = self.route_service.get_routes_paginated(
-                page=page,
-                per_page=per_page,
+            total, last_updated = self.route_service.get_routes_version(
                 route_code=route_code,
                 assigned_truck=assigned_truck,
                 delivery_date=delivery_date
             )
             
-            total = self.route_service.count_routes(
+            etag = compute_etag(
+                'routes', page, per_page, route_code, assigned_truck, delivery_date,
+                total, last_updated.isoformat() if last_updated else None
+            )
+            if etag_matches(etag):
+                return self.not_modified_response(etag)
+            
+            routes = self.route_service.get_route_summaries_paginated(
+                page=page,
+                per_page=per_page,
                 route_code=route_code,
                 assigned_truck=assigned_truck,
                 delivery_date=delivery_date
@@ -89,7 +359,7 @@ class RouteListController(BaseController):
             
             return self.success_response(
                 data={
-                    'routes': [route.to_dict() for route in routes],
+                    'routes': routes,
                     'pagination': {
                         'page': page,
                         'per_page': per_page,
@@ -101,7 +371,8 @@ class RouteListController(BaseController):
                         'prev_page': page - 1 if has_prev else None
                     }
                 },
-                message="Rutas obtenidas exitosamente"
+                message="Rutas obtenidas exitosamente",
+                headers={'ETag': etag, 'Cache-Control': 'no-cache'}
             )
             
         except LogisticsValidationError as e:
@@ -112,6 +383,59 @@ class RouteListController(BaseController):
             return self.error_response("Error interno del servidor", str(e), 500)
 
 
+class RouteExportController(BaseController):
+    def __init__(self):
+        self.route_repository = build_read_repository()
+        self.route_service = RouteService(self.route_repository)
+    
+    def get(self):
+        streaming = False
+        try:
+            export_format = request.args.get('format', 'ndjson', type=str).lower()
+            chunk_size = request.args.get('chunk_size', 1000, type=int)
+            
+            if export_format not in EXPORT_FORMATS:
+                return self.error_response(
+                    "Error de validación",
+                    f"El parámetro 'format' debe ser uno de: {', '.join(EXPORT_FORMATS)}",
+                    400
+                )
+            
+            if chunk_size < 1 or chunk_size > 10000:
+                return self.error_response(
+                    "Error de validación",
+                    "El parámetro 'chunk_size' debe estar entre 1 y 10000",
+                    400
+                )
+            
+            partitions = self.route_service.export_routes(
+                route_code=request.args.get('route_code', type=str),
+                assigned_truck=request.args.get('assigned_truck', type=str),
+                delivery_date=request.args.get('delivery_date', type=str),
+                chunk_size=chunk_size
+            )
+            
+            response = Response(
+                export_chunks(partitions, export_format, on_close=self.close_sessions),
+                mimetype=EXPORT_FORMATS[export_format],
+                headers={'Content-Disposition': f'attachment; filename=routes.{export_format}'}
+            )
+            streaming = True
+            return response
+            
+        except LogisticsValidationError as e:
+            return self.error_response("Error de validación", str(e), 400)
+        except Exception as e:
+            return self.error_response("Error interno del servidor", str(e), 500)
+        finally:
+            if not streaming:
+                self.close_sessions()
+    
+    def close_sessions(self):
+        self.route_repository.close_read_session()
+        self.route_repository.session.close()
+
+
 class RouteDeleteAllController(BaseController):
     def __init__(self):
         session = SessionLocal()
@@ -121,31 +445,98 @@ class RouteDeleteAllController(BaseController):
     @auto_close_session
     def delete(self):
         try:
-            count = self.route_repository.delete_all()
+            config = get_config()
+            mode = request.args.get('mode', 'single', type=str).lower()
+            batch_size = request.args.get('batch_size', config.PURGE_BATCH_SIZE, type=int)
+            before_param = request.args.get('before', type=str)
+            
+            if mode not in DELETE_MODES:
+                return self.error_response(
+                    "Error de validación",
+                    f"El parámetro 'mode' debe ser uno de: {', '.join(DELETE_MODES)}",
+                    400
+                )
+            
+            if batch_size < 1 or batch_size > 100000:
+                return self.error_response(
+                    "Error de validación",
+                    "El parámetro 'batch_size' debe estar entre 1 y 100000",
+                    400
+                )
+            
+            before = None
+            if before_param:
+                try:
+                    before = date.fromisoformat(before_param)
+                except ValueError:
+                    return self.error_response(
+                        "Error de validación",
+                        "El formato de 'before' debe ser YYYY-MM-DD",
+                        400
+                    )
+            
+            if mode == 'chunked':
+                job = purge_job_manager.submit('purge_routes', run_purge_job, before, batch_size, config.PURGE_PAUSE_SECONDS)
+                response, _ = self.success_response(
+                    data=job.to_dict(),
+                    message="Eliminación de rutas por lotes iniciada"
+                )
+                return response, 202, {'Location': f"/logistics/routes/purge-jobs/{job.id}"}
+            
+            count = self.route_repository.delete_all(before=before)
             
             return self.success_response(
                 data={'deleted_count': count},
-                message=f"Se eliminaron {count} rutas exitosamente"
+                message=f"Se eliminaron {count} rutas exitosamente",
+                headers=primary_read_headers()
             )
             
         except Exception as e:
             return self.error_response("Error interno del servidor", str(e), 500)
 
 
+class RoutePurgeJobController(BaseController):
+    def get(self, job_id: str):
+        job = purge_job_manager.get(job_id)
+        if not job:
+            return self.error_response("Recurso no encontrado", f"No existe la tarea de eliminación {job_id}", 404)
+        
+        return self.success_response(data=job.to_dict(), message="Estado de la eliminación obtenido exitosamente")
+
+
 class RouteDetailController(BaseController):
     def __init__(self):
-        session = SessionLocal()
-        self.route_repository = RouteRepository(session)
+        self.route_repository = build_read_repository()
         self.route_service = RouteService(self.route_repository)
     
     @auto_close_session
     def get(self, route_id: int):
         try:
-            route_data = self.route_service.get_route_with_clients(route_id)
+            route, route_data = self.route_service.load_stored_route(route_id)
+            if route_data is not None:
+                etag = compute_etag('route', route.id, route.updated_at.isoformat() if route.updated_at else None, 'stops')
+                if etag_matches(etag):
+                    return self.not_modified_response(etag)
+                return self.success_response(
+                    data=route_data,
+                    message="Ruta obtenida exitosamente",
+                    headers={'ETag': etag, 'Cache-Control': 'no-cache'}
+                )
+            
+            orders = self.route_service.load_route_orders(route)
+            etag = compute_etag(
+                'route', route.id, route.updated_at.isoformat() if route.updated_at else None,
+                orders_fingerprint(orders)
+            )
+            if etag_matches(etag):
+                return self.not_modified_response(etag)
+            
+            route_data = self.route_service.build_route_with_clients(route, orders, **stop_sequence_options())
             
             return self.success_response(
                 data=route_data,
-                message="Ruta obtenida exitosamente"
+                message="Ruta obtenida exitosamente",
+                headers={'ETag': etag, 'Cache-Control': 'no-cache'}
             )
             
         except LogisticsBusinessLogicError as e:
@@ -153,3 +544,103 @@ class RouteDetailController(BaseController):
         except Exception as e:
             return self.error_response("Error interno del servidor", str(e), 500)
 
+
+class ClientRoutesController(BaseController):
+    def __init__(self):
+        self.route_repository = build_read_repository()
+        self.route_service = RouteService(self.route_repository)
+    
+    @auto_close_session
+    def get(self, client_id: str):
+        try:
+            limit = request.args.get('limit', 20, type=int)
+            if limit < 1 or limit > 100:
+                return self.error_response(
+                    "Error de validación",
+                    "El parámetro 'limit' debe estar entre 1 y 100",
+                    400
+                )
+            
+            routes = self.route_service.get_client_routes(
+                client_id,
+                delivery_date_from=request.args.get('delivery_date_from', type=str),
+                delivery_date_to=request.args.get('delivery_date_to', type=str),
+                limit=limit
+            )
+            
+            return self.success_response(
+                data={'client_id': client_id, 'routes': routes},
+                message="Rutas del cliente obtenidas exitosamente"
+            )
+            
+        except LogisticsValidationError as e:
+            return self.error_response("Error de validación", str(e), 400)
+        except LogisticsBusinessLogicError as e:
+            return self.error_response("Error de lógica de negocio", str(e), 500)
+        except Exception as e:
+            return self.error_response("Error interno del servidor", str(e), 500)
+
+
+class OrderRouteController(BaseController):
+    def __init__(self):
+        self.route_repository = build_read_repository()
+        self.route_service = RouteService(self.route_repository)
+    
+    @auto_close_session
+    def get(self, order_id: str):
+        try:
+            route = self.route_service.get_order_route(
+                order_id,
+                delivery_date_from=request.args.get('delivery_date_from', type=str),
+                delivery_date_to=request.args.get('delivery_date_to', type=str)
+            )
+            if route is None:
+                return self.error_response("Recurso no encontrado", f"El pedido {order_id} no está asignado a ninguna ruta", 404)
+            
+            return self.success_response(
+                data={'order_id': order_id, 'route': route},
+                message="Ruta del pedido obtenida exitosamente"
+            )
+            
+        except LogisticsValidationError as e:
+            return self.error_response("Error de validación", str(e), 400)
+        except LogisticsBusinessLogicError as e:
+            return self.error_response("Error de lógica de negocio", str(e), 500)
+        except Exception as e:
+            return self.error_response("Error interno del servidor", str(e), 500)
+
+
+class RouteReoptimizeController(BaseController):
+    refresh_clients = False
+    
+    def __init__(self):
+        session = SessionLocal()
+        self.route_repository = RouteRepository(session)
+        self.route_service = RouteService(self.route_repository)
+    
+    @auto_close_session
+    def post(self, route_id: int):
+        try:
+            result = self.route_service.reoptimize_route(
+                route_id,
+                max_degradation=get_config().REOPTIMIZE_MAX_DEGRADATION,
+                refresh_clients=self.refresh_clients,
+                **stop_sequence_options()
+            )
+            
+            return self.success_response(
+                data=result,
+                message="Ruta actualizada exitosamente" if self.refresh_clients else "Ruta reoptimizada exitosamente",
+                headers=primary_read_headers()
+            )
+            
+        except LogisticsNotFoundError as e:
+            return self.error_response("Recurso no encontrado", str(e), 404)
+        except LogisticsBusinessLogicError as e:
+            return self.error_response("Error de lógica de negocio", str(e), 422)
+        except Exception as e:
+            return self.error_response("Error interno del servidor", str(e), 500)
+
+
+class RouteRefreshController(RouteReoptimizeController):
+    refresh_clients = True
@@ -14,3 +14,7 @@ class LogisticsBusinessLogicError(LogisticsException):
     pass
 
 
+
+
+class LogisticsConflictError(LogisticsException):
+    pass
@@ -2,15 +2,21 @@ import os
 import requests
 import logging
 from typing import Dict, Any, List, Set
+from ..utils.singleflight import SingleFlight
 
 logger = logging.getLogger(__name__)
 
 
 class AuthIntegration:
+    _user_flight = SingleFlight('auth_user')
+    
     def __init__(self):
         self.auth_service_url = os.getenv('AUTH_SERVICE_URL', 'http://autenticador:8080')
     
     def get_user_by_id(self, user_id: str) -> Dict[str, Any]:
+        return self._user_flight.do((self.auth_service_url, str(user_id)), self._fetch_user_by_id, user_id)
+    
+    def _fetch_user_by_id(self, user_id: str) -> Dict[str, Any]:
         try:
             url = f"{self.auth_service_url}/auth/user/{user_id}"
             
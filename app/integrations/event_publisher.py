@@ -0,0 +1,192 @@
+import json
+import logging
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+import pika
+from pika.exceptions import AMQPConnectionError, AMQPError
+
+logger = logging.getLogger(__name__)
+
+MEMORY_BROKER_URL = 'memory://'
+
+
+def event_body(event: Dict[str, Any]) -> bytes:
+    created_at = event.get('created_at')
+    return json.dumps({
+        'id': event['id'],
+        'type': event['event_type'],
+        'route_id': event['route_id'],
+        'occurred_at': created_at.isoformat() if hasattr(created_at, 'isoformat') else created_at,
+        'data': json.loads(event['payload'])
+    }).encode('utf-8')
+
+
+class RabbitMQPublisher:
+    def __init__(
+        self,
+        url: str,
+        exchange: str,
+        confirm_timeout_seconds: float = 30.0,
+        connection_factory: Callable[..., Any] = pika.SelectConnection
+    ):
+        self.url = url
+        self.exchange = exchange
+        self.confirm_timeout_seconds = confirm_timeout_seconds
+        self._connection_factory = connection_factory
+        self._connection = None
+        self._channel = None
+        self._open_error: Optional[BaseException] = None
+        self._done: Callable[[], bool] = lambda: True
+        self._delivery_tag = 0
+        self._pending: Dict[int, int] = {}
+        self._confirmed: Set[int] = set()
+        self._rejected: Set[int] = set()
+    
+    def publish_batch(self, events: List[Dict[str, Any]]) -> Tuple[List[int], List[int]]:
+        channel = self._open_channel()
+        self._pending, self._confirmed, self._rejected = {}, set(), set()
+        for event in events:
+            channel.basic_publish(
+                exchange=self.exchange,
+                routing_key=event['event_type'],
+                body=event_body(event),
+                properties=pika.BasicProperties(
+                    content_type='application/json',
+                    delivery_mode=pika.DeliveryMode.Persistent,
+                    message_id=str(event['id']),
+                    type=event['event_type']
+                ),
+                mandatory=True
+            )
+            self._delivery_tag += 1
+            self._pending[self._delivery_tag] = event['id']
+        
+        if self._pending:
+            self._run_until(lambda: not self._pending or self._channel is None)
+        if self._pending:
+            logger.warning(f"{len(self._pending)} eventos sin confirmación del broker")
+            self.close()
+        
+        confirmed = [event['id'] for event in events if event['id'] in self._confirmed and event['id'] not in self._rejected]
+        rejected = [event['id'] for event in events if event['id'] in self._rejected]
+        return confirmed, rejected
+    
+    def close(self) -> None:
+        connection, self._connection, self._channel = self._connection, None, None
+        if connection is not None and connection.is_open:
+            try:
+                connection.close()
+                self._run_until(lambda: connection.is_closed, connection)
+            except AMQPError as e:
+                logger.warning(f"Error cerrando la conexión con RabbitMQ: {str(e)}")
+    
+    def _open_channel(self):
+        if self._channel is not None and self._channel.is_open:
+            return self._channel
+        
+        self.close()
+        self._open_error = None
+        self._connection = self._connection_factory(
+            pika.URLParameters(self.url),
+            on_open_callback=self._on_connection_open,
+            on_open_error_callback=self._on_connection_error,
+            on_close_callback=self._on_connection_error
+        )
+        self._run_until(lambda: self._channel is not None or self._open_error is not None)
+        if self._channel is None:
+            self.close()
+            raise AMQPConnectionError(f"No se pudo abrir el canal con RabbitMQ: {self._open_error!r}")
+        return self._channel
+    
+    def _run_until(self, done: Callable[[], bool], connection=None) -> None:
+        connection = connection or self._connection
+        if done():
+            return
+        self._done = done
+        timer = connection.ioloop.call_later(self.confirm_timeout_seconds, connection.ioloop.stop)
+        try:
+            connection.ioloop.start()
+        finally:
+            connection.ioloop.remove_timeout(timer)
+    
+    def _stop_if_done(self) -> None:
+        if self._done() and self._connection is not None:
+            self._connection.ioloop.stop()
+    
+    def _on_connection_open(self, connection) -> None:
+        connection.channel(on_open_callback=self._on_channel_open)
+    
+    def _on_connection_error(self, connection, error) -> None:
+        self._open_error = error
+        self._channel = None
+        connection.ioloop.stop()
+    
+    def _on_channel_open(self, channel) -> None:
+        channel.add_on_close_callback(self._on_channel_closed)
+        channel.add_on_return_callback(self._on_returned)
+        channel.exchange_declare(
+            exchange=self.exchange,
+            exchange_type='topic',
+            durable=True,
+            callback=lambda _: channel.confirm_delivery(self._on_confirmation, callback=lambda _: self._on_confirm_selected(channel))
+        )
+    
+    def _on_confirm_selected(self, channel) -> None:
+        self._delivery_tag = 0
+        self._channel = channel
+        self._stop_if_done()
+    
+    def _on_channel_closed(self, channel, reason) -> None:
+        logger.warning(f"RabbitMQ cerró el canal: {reason}")
+        self._open_error = reason
+        self._channel = None
+        if self._connection is not None:
+            self._connection.ioloop.stop()
+    
+    def _on_returned(self, channel, method, properties, body) -> None:
+        logger.error(f"RabbitMQ devolvió el evento {properties.message_id} sin cola destino ({method.routing_key})")
+        self._rejected.add(int(properties.message_id))
+    
+    def _on_confirmation(self, frame) -> None:
+        method = frame.method
+        tags = [tag for tag in self._pending if tag <= method.delivery_tag] if method.multiple else [method.delivery_tag]
+        for tag in tags:
+            event_id = self._pending.pop(tag, None)
+            if event_id is None:
+                continue
+            if isinstance(method, pika.spec.Basic.Ack):
+                self._confirmed.add(event_id)
+            else:
+                self._rejected.add(event_id)
+        self._stop_if_done()
+
+
+class InMemoryPublisher:
+    def __init__(self, fail_after: Optional[int] = None, unroutable: Tuple[str, ...] = ()):
+        self.fail_after = fail_after
+        self.unroutable = unroutable
+        self.messages: List[Dict[str, Any]] = []
+    
+    def publish_batch(self, events: List[Dict[str, Any]]) -> Tuple[List[int], List[int]]:
+        confirmed, rejected = [], []
+        for event in events:
+            if self.fail_after is not None and len(self.messages) >= self.fail_after:
+                break
+            if event['event_type'] in self.unroutable:
+                rejected.append(event['id'])
+                continue
+            self.messages.append({
+                'routing_key': event['event_type'],
+                'message_id': str(event['id']),
+                'body': json.loads(event_body(event))
+            })
+            confirmed.append(event['id'])
+        return confirmed, rejected
+    
+    def close(self) -> None:
+        pass
+
+
+def create_event_publisher(url: str, exchange: str):
+    if url.startswith(MEMORY_BROKER_URL):
+        return InMemoryPublisher()
+    return RabbitMQPublisher(url, exchange)
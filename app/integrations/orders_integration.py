@@ -1,17 +1,36 @@
 import os
+import time
+import threading
 import requests
 import logging
-from typing import List, Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Union
 from datetime import date
+from ..utils.singleflight import SingleFlight
 
 logger = logging.getLogger(__name__)
 
+BY_DATE_UNSUPPORTED_STATUSES = (405, 501)
+BY_DATE_RETRY_SECONDS = 300
+
 
 class OrdersIntegration:
+    _by_date_lock = threading.Lock()
+    _by_date_unsupported_until: Dict[str, float] = {}
+    _by_truck_flight = SingleFlight('orders_by_truck')
+    
     def __init__(self):
         self.orders_service_url = os.getenv('ORDERS_SERVICE_URL', 'http://pedidos:8080')
     
     def get_orders_by_truck_and_date(self, truck: str, delivery_date: date) -> List[Dict[str, Any]]:
+        return self._by_truck_flight.do(
+            (self.orders_service_url, truck, delivery_date),
+            self._fetch_orders_by_truck_and_date,
+            truck,
+            delivery_date
+        )
+    
+    def _fetch_orders_by_truck_and_date(self, truck: str, delivery_date: date) -> List[Dict[str, Any]]:
         try:
             url = f"{self.orders_service_url}/orders/by-truck"
             params = {
@@ -39,7 +58,101 @@ class OrdersIntegration:
             logger.error(f"Error inesperado al consultar pedidos: {str(e)}")
             raise Exception(f"Error al consultar servicio de pedidos: {str(e)}")
     
+    def get_orders_by_date(
+        self,
+        delivery_date: date,
+        trucks: List[str],
+        max_workers: int = 5,
+        return_exceptions: bool = False
+    ) -> Dict[str, Union[List[Dict[str, Any]], Exception]]:
+        if not trucks:
+            return {}
+        
+        if self._by_date_supported():
+            try:
+                orders = self._fetch_orders_by_date(delivery_date)
+            except Exception as e:
+                if not return_exceptions:
+                    raise
+                return {truck: e for truck in trucks}
+            if orders is not None:
+                return self._group_by_truck(orders, trucks)
+        
+        return self._fetch_orders_per_truck(delivery_date, trucks, max_workers, return_exceptions)
+    
     def has_orders_for_truck_and_date(self, truck: str, delivery_date: date) -> bool:
         orders = self.get_orders_by_truck_and_date(truck, delivery_date)
         return len(orders) > 0
-
+    
+    def _fetch_orders_by_date(self, delivery_date: date) -> Optional[List[Dict[str, Any]]]:
+        try:
+            url = f"{self.orders_service_url}/orders/by-date"
+            params = {'scheduled_delivery_date': delivery_date.isoformat()}
+            
+            response = requests.get(url, params=params, timeout=10)
+            
+            if response.status_code == 200:
+                data = response.json()
+                if data.get('success') and data.get('data'):
+                    return data['data']
+                return []
+            elif response.status_code in BY_DATE_UNSUPPORTED_STATUSES or self._is_missing_route(response):
+                logger.info(f"Servicio de pedidos sin consulta por fecha ({response.status_code}), consultando por camión")
+                self._mark_by_date_unsupported()
+                return None
+            elif response.status_code == 404:
+                return []
+            else:
+                logger.warning(f"Error al consultar pedidos por fecha: {response.status_code}")
+                return None
+                
+        except requests.exceptions.RequestException as e:
+            logger.error(f"Error de conexión con servicio de pedidos: {str(e)}")
+            raise Exception(f"Error al consultar servicio de pedidos: {str(e)}")
+        except Exception as e:
+            logger.error(f"Error inesperado al consultar pedidos: {str(e)}")
+            raise Exception(f"Error al consultar servicio de pedidos: {str(e)}")
+    
+    def _is_missing_route(self, response) -> bool:
+        if response.status_code != 404:
+            return False
+        try:
+            body = response.json()
+        except ValueError:
+            return True
+        return not isinstance(body, dict) or 'success' not in body
+    
+    def _fetch_orders_per_truck(
+        self,
+        delivery_date: date,
+        trucks: List[str],
+        max_workers: int,
+        return_exceptions: bool
+    ) -> Dict[str, Union[List[Dict[str, Any]], Exception]]:
+        def fetch(truck: str):
+            try:
+                return self.get_orders_by_truck_and_date(truck, delivery_date)
+            except Exception as e:
+                if not return_exceptions:
+                    raise
+                return e
+        
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(trucks)))) as executor:
+            return dict(zip(trucks, executor.map(fetch, trucks)))
+    
+    def _group_by_truck(self, orders: List[Dict[str, Any]], trucks: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+        grouped: Dict[str, List[Dict[str, Any]]] = {truck: [] for truck in trucks}
+        for order in orders:
+            truck = order.get('assigned_truck')
+            if truck in grouped:
+                grouped[truck].append(order)
+        return grouped
+    
+    def _by_date_supported(self) -> bool:
+        with self._by_date_lock:
+            retry_at = self._by_date_unsupported_until.get(self.orders_service_url, 0.0)
+        return time.monotonic() >= retry_at
+    
+    def _mark_by_date_unsupported(self) -> None:
+        with self._by_date_lock:
+            self._by_date_unsupported_until[self.orders_service_url] = time.monotonic() + BY_DATE_RETRY_SECONDS
@@ -3,6 +3,8 @@ from typing import Dict, Any
 
 
 class BaseModel(ABC):
+    __slots__ = ()
+    
     @abstractmethod
     def to_dict(self) -> Dict[str, Any]:
         pass
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Date
+from sqlalchemy import Column, Integer, String, Text, DateTime, Date, Float, ForeignKey, Index, func
 from sqlalchemy.ext.declarative import declarative_base
 from datetime import datetime
 
@@ -13,5 +13,103 @@ class RouteDB(Base):
     assigned_truck = Column(String(20), nullable=False)
     delivery_date = Column(Date, nullable=False)
     orders_count = Column(Integer, nullable=False, default=0)
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime, server_default=func.now())
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=datetime.utcnow)
+
+
+class RouteStopDB(Base):
+    __tablename__ = 'route_stops'
+    __table_args__ = (
+        Index('ix_route_stops_route_sequence', 'route_id', 'sequence'),
+        Index('ix_route_stops_client_route', 'client_id', 'route_id')
+    )
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    route_id = Column(Integer, ForeignKey('routes.id', ondelete='CASCADE'), nullable=False)
+    sequence = Column(Integer, nullable=True)
+    client_id = Column(String(64), nullable=False)
+    name = Column(String(255), nullable=True)
+    email = Column(String(255), nullable=True)
+    phone = Column(String(50), nullable=True)
+    address = Column(String(500), nullable=True)
+    latitude = Column(Float, nullable=True)
+    longitude = Column(Float, nullable=True)
+
+
+class RouteOrderDB(Base):
+    __tablename__ = 'route_orders'
+    __table_args__ = (
+        Index('ix_route_orders_route_id', 'route_id'),
+        Index('ix_route_orders_order_id', 'order_id')
+    )
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    route_id = Column(Integer, ForeignKey('routes.id', ondelete='CASCADE'), nullable=False)
+    order_id = Column(String(64), nullable=False)
+    client_id = Column(String(64), nullable=True)
+
+
+class RouteSequenceDB(Base):
+    __tablename__ = 'route_sequences'
+    
+    route_id = Column(Integer, ForeignKey('routes.id', ondelete='CASCADE'), primary_key=True)
+    distance_km = Column(Float, nullable=False, default=0.0)
+    baseline_distance_km = Column(Float, nullable=False, default=0.0)
+    baseline_stops = Column(Integer, nullable=False, default=0)
+    incremental_updates = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=datetime.utcnow)
+
+
+class RouteOutboxDB(Base):
+    __tablename__ = 'route_outbox'
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    event_type = Column(String(50), nullable=False)
+    route_id = Column(Integer, nullable=True)
+    payload = Column(Text, nullable=False)
+    created_at = Column(DateTime, nullable=False)
+    attempts = Column(Integer, nullable=False, default=0)
+
+
+class RouteOutboxDeadLetterDB(Base):
+    __tablename__ = 'route_outbox_dead_letters'
+    
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    event_type = Column(String(50), nullable=False)
+    route_id = Column(Integer, nullable=True)
+    payload = Column(Text, nullable=False)
+    created_at = Column(DateTime, nullable=False)
+    attempts = Column(Integer, nullable=False)
+    failed_at = Column(DateTime, nullable=False)
+
+
+class IdempotencyKeyDB(Base):
+    __tablename__ = 'idempotency_keys'
+    __table_args__ = (
+        Index('ix_idempotency_keys_expires_at', 'expires_at'),
+    )
+    
+    key = Column(String(255), primary_key=True)
+    request_hash = Column(String(64), nullable=False)
+    status_code = Column(Integer, nullable=True)
+    response_body = Column(Text, nullable=True)
+    response_headers = Column(Text, nullable=True)
+    created_at = Column(DateTime, nullable=False)
+    expires_at = Column(DateTime, nullable=False)
+
+
+class RouteJobDB(Base):
+    __tablename__ = 'route_jobs'
+    __table_args__ = (
+        Index('ix_route_jobs_kind_created_at', 'kind', 'created_at'),
+    )
+    
+    id = Column(String(32), primary_key=True)
+    kind = Column(String(50), nullable=False)
+    status = Column(String(20), nullable=False)
+    progress = Column(Text, nullable=False)
+    result = Column(Text, nullable=True)
+    error = Column(Text, nullable=True)
+    created_at = Column(DateTime, nullable=False)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
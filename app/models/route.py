@@ -1,9 +1,11 @@
 from datetime import datetime, date
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Sequence
 from .base_model import BaseModel
 
 
 class Route(BaseModel):
+    __slots__ = ('id', 'route_code', 'assigned_truck', 'delivery_date', 'orders_count', 'created_at', 'updated_at')
+    
     def __init__(
         self,
         route_code: str,
@@ -19,8 +21,26 @@ class Route(BaseModel):
         self.assigned_truck = assigned_truck
         self.delivery_date = delivery_date
         self.orders_count = orders_count
-        self.created_at = created_at or datetime.utcnow()
-        self.updated_at = updated_at or datetime.utcnow()
+        if created_at is None or updated_at is None:
+            now = datetime.utcnow()
+            created_at = created_at or now
+            updated_at = updated_at or now
+        self.created_at = created_at
+        self.updated_at = updated_at
+    
+    @classmethod
+    def from_row(cls, row: Sequence[Any]) -> 'Route':
+        route = cls.__new__(cls)
+        (
+            route.id,
+            route.route_code,
+            route.assigned_truck,
+            route.delivery_date,
+            route.orders_count,
+            route.created_at,
+            route.updated_at
+        ) = row
+        return route
     
     def to_dict(self) -> Dict[str, Any]:
         return {
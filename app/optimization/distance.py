@@ -0,0 +1,21 @@
+from typing import Optional, Sequence, Tuple
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+def coordinates_array(coordinates: Sequence[Tuple[float, float]]) -> np.ndarray:
+    return np.asarray(coordinates, dtype=np.float64).reshape(-1, 2)
+
+
+def haversine_matrix(origins: np.ndarray, destinations: Optional[np.ndarray] = None) -> np.ndarray:
+    origins = np.radians(coordinates_array(origins))
+    destinations = origins if destinations is None else np.radians(coordinates_array(destinations))
+    
+    lat1 = origins[:, 0][:, None]
+    lat2 = destinations[:, 0][None, :]
+    dlat = lat2 - lat1
+    dlon = destinations[:, 1][None, :] - origins[:, 1][:, None]
+    
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlon / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
@@ -0,0 +1,256 @@
+import fcntl
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from .distance import haversine_matrix
+from ..utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+INDEX_FILE = 'index.json'
+LOCK_FILE = 'index.lock'
+SECONDS_PER_DAY = 86400
+COORDINATE_TOLERANCE = 1e-6
+
+_caches: Dict[Tuple[str, int, int], 'DistanceCache'] = {}
+_caches_lock = threading.Lock()
+
+
+class DistanceCache:
+    def __init__(
+        self,
+        directory: str,
+        block_size: int = 512,
+        max_idle_days: int = 90,
+        clock: Callable[[], float] = time.time
+    ):
+        self.directory = directory
+        self.block_size = block_size
+        self.max_idle_days = max_idle_days
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._index: Dict = self._empty_index()
+        self._index_stamp: Optional[Tuple[int, int]] = None
+        self._tiles: Dict[Tuple[int, int, bool], np.memmap] = {}
+        os.makedirs(directory, exist_ok=True)
+    
+    def __reduce__(self):
+        return DistanceCache, (self.directory, self.block_size, self.max_idle_days)
+    
+    def matrix(self, clients: Sequence[Tuple[str, float, float]]) -> np.ndarray:
+        if not clients:
+            return np.zeros((0, 0))
+        
+        with self._lock:
+            self._refresh_index()
+            if self._pending(clients):
+                with self._write_lock():
+                    self._refresh_index()
+                    self._update(clients)
+            
+            entries = self._index['clients']
+            slots = np.array([entries[str(client_id)][0] for client_id, _, _ in clients], dtype=np.int64)
+            return self._gather(slots, slots).astype(np.float64)
+    
+    def evict(self) -> int:
+        with self._lock, self._write_lock():
+            self._refresh_index()
+            evicted = self._evict_idle()
+            if evicted:
+                self._publish_index()
+            return evicted
+    
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            self._refresh_index()
+            return {
+                'clients': len(self._index['clients']),
+                'capacity': self._index['blocks'] * self.block_size,
+                'free_slots': len(self._index['free'])
+            }
+    
+    def _pending(self, clients: Sequence[Tuple[str, float, float]]) -> bool:
+        today = self._today()
+        entries = self._index['clients']
+        missing, stale = 0, False
+        for client_id, latitude, longitude in clients:
+            entry = entries.get(str(client_id))
+            if entry is None or _moved(entry, latitude, longitude):
+                missing += 1
+            elif entry[3] < today:
+                stale = True
+        metrics.increment('distance_cache.hit', len(clients) - missing)
+        metrics.increment('distance_cache.miss', missing)
+        return missing > 0 or stale
+    
+    def _update(self, clients: Sequence[Tuple[str, float, float]]) -> None:
+        today = self._today()
+        entries = self._index['clients']
+        self._evict_idle(keep={str(client_id) for client_id, _, _ in clients})
+        
+        changed_slots, changed_points, seen = [], [], set()
+        for client_id, latitude, longitude in clients:
+            key = str(client_id)
+            entry = entries.get(key)
+            if entry is None:
+                entry = entries[key] = [self._allocate_slot(), latitude, longitude, today]
+            elif _moved(entry, latitude, longitude):
+                entry[1], entry[2] = latitude, longitude
+            else:
+                entry[3] = today
+                continue
+            entry[3] = today
+            if entry[0] not in seen:
+                seen.add(entry[0])
+                changed_slots.append(entry[0])
+                changed_points.append((latitude, longitude))
+        
+        if changed_slots:
+            live = list(entries.values())
+            live_slots = np.array([entry[0] for entry in live], dtype=np.int64)
+            live_points = [(entry[1], entry[2]) for entry in live]
+            distances = haversine_matrix(changed_points, live_points).astype(np.float32)
+            self._scatter(np.array(changed_slots, dtype=np.int64), live_slots, distances)
+            self._flush()
+        self._publish_index()
+    
+    def _evict_idle(self, keep: Optional[set] = None) -> int:
+        cutoff = self._today() - self.max_idle_days
+        entries = self._index['clients']
+        idle = [key for key, entry in entries.items() if entry[3] < cutoff and not (keep and key in keep)]
+        for key in idle:
+            self._index['free'].append(entries.pop(key)[0])
+        if idle:
+            logger.info(f"Caché de distancias: {len(idle)} clientes sin uso desalojados")
+            metrics.increment('distance_cache.evicted', len(idle))
+        return len(idle)
+    
+    def _allocate_slot(self) -> int:
+        if self._index['free']:
+            return self._index['free'].pop()
+        slot = self._index['next_slot']
+        self._index['next_slot'] = slot + 1
+        if slot >= self._index['blocks'] * self.block_size:
+            self._add_block()
+        return slot
+    
+    def _add_block(self) -> None:
+        block = self._index['blocks']
+        for row in range(block + 1):
+            path = self._tile_path(row, block)
+            with open(path, 'wb') as handle:
+                handle.truncate(self.block_size * self.block_size * 4)
+        self._index['blocks'] = block + 1
+    
+    def _gather(self, row_slots: np.ndarray, column_slots: np.ndarray) -> np.ndarray:
+        result = np.empty((len(row_slots), len(column_slots)), dtype=np.float32)
+        row_tiles, row_offsets = np.divmod(row_slots, self.block_size)
+        column_tiles, column_offsets = np.divmod(column_slots, self.block_size)
+        for row_tile in np.unique(row_tiles):
+            rows = np.flatnonzero(row_tiles == row_tile)
+            for column_tile in np.unique(column_tiles):
+                columns = np.flatnonzero(column_tiles == column_tile)
+                if row_tile <= column_tile:
+                    tile = self._tile(row_tile, column_tile)
+                    block = tile[np.ix_(row_offsets[rows], column_offsets[columns])]
+                else:
+                    tile = self._tile(column_tile, row_tile)
+                    block = tile[np.ix_(column_offsets[columns], row_offsets[rows])].T
+                result[np.ix_(rows, columns)] = block
+        return result
+    
+    def _scatter(self, row_slots: np.ndarray, column_slots: np.ndarray, values: np.ndarray) -> None:
+        row_tiles, row_offsets = np.divmod(row_slots, self.block_size)
+        column_tiles, column_offsets = np.divmod(column_slots, self.block_size)
+        for row_tile in np.unique(row_tiles):
+            rows = np.flatnonzero(row_tiles == row_tile)
+            for column_tile in np.unique(column_tiles):
+                columns = np.flatnonzero(column_tiles == column_tile)
+                block = values[np.ix_(rows, columns)]
+                if row_tile <= column_tile:
+                    self._tile(row_tile, column_tile, writable=True)[np.ix_(row_offsets[rows], column_offsets[columns])] = block
+                if column_tile <= row_tile:
+                    self._tile(column_tile, row_tile, writable=True)[np.ix_(column_offsets[columns], row_offsets[rows])] = block.T
+    
+    def _tile(self, row: int, column: int, writable: bool = False) -> np.memmap:
+        key = (int(row), int(column), writable)
+        tile = self._tiles.get(key)
+        if tile is None:
+            tile = np.memmap(
+                self._tile_path(row, column),
+                dtype=np.float32,
+                mode='r+' if writable else 'r',
+                shape=(self.block_size, self.block_size)
+            )
+            self._tiles[key] = tile
+        return tile
+    
+    def _flush(self) -> None:
+        for (_, _, writable), tile in self._tiles.items():
+            if writable:
+                tile.flush()
+    
+    def _tile_path(self, row: int, column: int) -> str:
+        return os.path.join(self.directory, f"tile-{int(row)}-{int(column)}.f32")
+    
+    def _refresh_index(self) -> None:
+        path = os.path.join(self.directory, INDEX_FILE)
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return
+        stamp = (stat.st_ino, stat.st_mtime_ns)
+        if stamp == self._index_stamp:
+            return
+        with open(path, 'r', encoding='utf-8') as handle:
+            index = json.load(handle)
+        if index.get('block_size') != self.block_size:
+            raise ValueError(
+                f"La caché de distancias en {self.directory} usa bloques de {index.get('block_size')}, no de {self.block_size}"
+            )
+        self._index = index
+        self._index_stamp = stamp
+    
+    def _publish_index(self) -> None:
+        path = os.path.join(self.directory, INDEX_FILE)
+        temporary = f"{path}.{os.getpid()}.tmp"
+        with open(temporary, 'w', encoding='utf-8') as handle:
+            json.dump(self._index, handle, separators=(',', ':'))
+        os.replace(temporary, path)
+        stat = os.stat(path)
+        self._index_stamp = (stat.st_ino, stat.st_mtime_ns)
+    
+    @contextmanager
+    def _write_lock(self):
+        with open(os.path.join(self.directory, LOCK_FILE), 'a') as handle:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+    
+    def _empty_index(self) -> Dict:
+        return {'block_size': self.block_size, 'blocks': 0, 'next_slot': 0, 'free': [], 'clients': {}}
+    
+    def _today(self) -> int:
+        return int(self._clock() // SECONDS_PER_DAY)
+
+
+def open_distance_cache(directory: Optional[str], block_size: int = 512, max_idle_days: int = 90) -> Optional[DistanceCache]:
+    if not directory:
+        return None
+    key = (os.path.abspath(directory), block_size, max_idle_days)
+    with _caches_lock:
+        cache = _caches.get(key)
+        if cache is None:
+            cache = _caches[key] = DistanceCache(directory, block_size, max_idle_days)
+        return cache
+
+
+def _moved(entry: List, latitude: float, longitude: float) -> bool:
+    return abs(entry[1] - latitude) > COORDINATE_TOLERANCE or abs(entry[2] - longitude) > COORDINATE_TOLERANCE
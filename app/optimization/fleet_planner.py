@@ -0,0 +1,201 @@
+import math
+import time
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+from .distance_cache import DistanceCache
+from .stop_sequence import (
+    IMPROVEMENT_EPSILON,
+    build_tour_matrix,
+    client_coordinates,
+    improve_tour,
+    nearest_neighbour_tour,
+    tour_length
+)
+
+SWEEP_STARTS = 12
+
+
+def plan_fleet(
+    stops: List[Dict[str, Any]],
+    trucks: List[str],
+    depot: Optional[Tuple[float, float]] = None,
+    return_to_depot: bool = True,
+    time_limit_ms: float = 2000.0,
+    balance_tolerance: float = 0.15,
+    distance_cache: Optional[DistanceCache] = None
+) -> Dict[str, Any]:
+    started = time.perf_counter()
+    deadline = started + time_limit_ms / 1000.0
+    
+    located, unassigned = [], []
+    for stop in stops:
+        if client_coordinates(stop) is None:
+            unassigned.append({**stop, 'reason': 'Cliente sin coordenadas válidas'})
+        else:
+            located.append(stop)
+    
+    if not trucks or not located:
+        routes = [[0] for _ in trucks]
+        if not trucks:
+            unassigned += [{**stop, 'reason': 'Sin camiones disponibles'} for stop in located]
+        return _build_plan([], routes, trucks, np.zeros((1, 1)), np.zeros(1), unassigned, 0.0, 0, started, False)
+    
+    coordinates = [client_coordinates(stop) for stop in located]
+    stop_distances = None
+    if distance_cache is not None:
+        stop_distances = distance_cache.matrix([
+            (str(stop.get('client_id')), *point) for stop, point in zip(located, coordinates)
+        ])
+    distances = build_tour_matrix(coordinates, depot, return_to_depot, stop_distances)
+    loads = np.ones(len(located) + 1, dtype=np.int64)
+    loads[0] = 0
+    loads[1:] = [max(1, len(stop.get('orders') or [])) for stop in located]
+    capacity = max(int(loads.max()), math.ceil(loads.sum() / len(trucks) * (1 + balance_tolerance)))
+    
+    clusters = sweep_clusters(coordinates, loads, len(trucks), distances, depot)
+    routes = [_sequence_cluster(cluster, distances, deadline) for cluster in clusters]
+    initial_distance = sum(tour_length(route, distances) for route in routes)
+    
+    routes, iterations = relocate_stops(routes, distances, loads, capacity, deadline)
+    time_limit_reached = time.perf_counter() >= deadline
+    
+    return _build_plan(
+        located, routes, trucks, distances, loads, unassigned,
+        initial_distance, iterations, started, time_limit_reached
+    )
+
+
+def sweep_clusters(
+    coordinates: List[Tuple[float, float]],
+    loads: np.ndarray,
+    truck_count: int,
+    distances: np.ndarray,
+    depot: Optional[Tuple[float, float]] = None
+) -> List[np.ndarray]:
+    points = np.asarray(coordinates, dtype=np.float64)
+    center_lat, center_lon = depot if depot is not None else points.mean(axis=0)
+    angles = np.arctan2(points[:, 0] - center_lat, (points[:, 1] - center_lon) * math.cos(math.radians(center_lat)))
+    order = np.argsort(angles, kind='stable') + 1
+    
+    best_cost, best_clusters = math.inf, None
+    for start in np.unique(np.linspace(0, len(order), SWEEP_STARTS, endpoint=False).astype(int)):
+        rotated = np.roll(order, -start)
+        cumulative = np.cumsum(loads[rotated])
+        targets = cumulative[-1] * np.arange(1, truck_count) / truck_count
+        clusters = np.split(rotated, np.searchsorted(cumulative, targets, side='right'))
+        
+        cost = 0.0
+        for cluster in clusters:
+            nodes = np.concatenate(([0], cluster))
+            submatrix = distances[np.ix_(nodes, nodes)]
+            cost += tour_length(nearest_neighbour_tour(submatrix), submatrix)
+        if cost < best_cost:
+            best_cost, best_clusters = cost, clusters
+    return best_clusters
+
+
+def relocate_stops(
+    routes: List[np.ndarray],
+    distances: np.ndarray,
+    loads: np.ndarray,
+    capacity: int,
+    deadline: float
+) -> Tuple[List[np.ndarray], int]:
+    size = distances.shape[0]
+    route_loads = np.array([int(loads[route].sum()) for route in routes])
+    iterations = 0
+    
+    while time.perf_counter() < deadline:
+        owner = np.full(size, -1)
+        gain = np.zeros(size)
+        for index, route in enumerate(routes):
+            if len(route) < 2:
+                continue
+            stops = route[1:]
+            before = route[:-1]
+            after = np.roll(route, -1)[1:]
+            owner[stops] = index
+            gain[stops] = distances[before, stops] + distances[stops, after] - distances[before, after]
+        
+        overloaded = route_loads > capacity
+        movable = overloaded[owner] & (owner >= 0) if overloaded.any() else owner >= 0
+        best_delta = np.inf if overloaded.any() else -IMPROVEMENT_EPSILON
+        best_move = None
+        for index, route in enumerate(routes):
+            following = np.roll(route, -1)
+            insertion = distances[route, :] + distances[:, following].T - distances[route, following][:, None]
+            positions = np.argmin(insertion, axis=0)
+            delta = insertion[positions, np.arange(size)] - gain
+            delta[(owner == index) | ~movable | (route_loads[index] + loads > capacity)] = np.inf
+            
+            stop = int(np.argmin(delta))
+            if delta[stop] < best_delta:
+                best_delta, best_move = delta[stop], (stop, index, int(positions[stop]))
+        
+        if best_move is None:
+            break
+        
+        stop, target, position = best_move
+        source = int(owner[stop])
+        routes[source] = routes[source][routes[source] != stop]
+        routes[target] = np.insert(routes[target], position + 1, stop)
+        route_loads[source] -= loads[stop]
+        route_loads[target] += loads[stop]
+        for index in (source, target):
+            routes[index] = improve_tour(routes[index], distances, deadline)
+        iterations += 1
+    
+    return routes, iterations
+
+
+def _sequence_cluster(cluster: np.ndarray, distances: np.ndarray, deadline: float) -> np.ndarray:
+    nodes = np.concatenate(([0], cluster)).astype(np.int64)
+    tour = nodes[nearest_neighbour_tour(distances[np.ix_(nodes, nodes)])]
+    return improve_tour(tour, distances, deadline)
+
+
+def _build_plan(
+    located: List[Dict[str, Any]],
+    routes: List[np.ndarray],
+    trucks: List[str],
+    distances: np.ndarray,
+    loads: np.ndarray,
+    unassigned: List[Dict[str, Any]],
+    initial_distance: float,
+    iterations: int,
+    started: float,
+    time_limit_reached: bool
+) -> Dict[str, Any]:
+    planned = []
+    for truck, route in zip(trucks, routes):
+        stops = [
+            {**located[int(node) - 1], 'sequence': sequence}
+            for sequence, node in enumerate(route[1:], start=1)
+        ]
+        planned.append({
+            'assigned_truck': truck,
+            'stops': stops,
+            'stops_count': len(stops),
+            'orders_count': int(loads[route].sum()),
+            'distance_km': round(tour_length(np.asarray(route), distances), 3)
+        })
+    
+    total_distance = sum(route['distance_km'] for route in planned)
+    route_loads = [route['orders_count'] for route in planned]
+    mean_load = sum(route_loads) / len(route_loads) if route_loads else 0
+    
+    return {
+        'routes': planned,
+        'unassigned': unassigned,
+        'metrics': {
+            'total_distance_km': round(total_distance, 3),
+            'initial_distance_km': round(initial_distance, 3),
+            'improvement_percent': round((1 - total_distance / initial_distance) * 100, 2) if initial_distance else 0.0,
+            'max_route_km': max((route['distance_km'] for route in planned), default=0.0),
+            'load_imbalance': round(max(route_loads) / mean_load, 3) if mean_load else 0.0,
+            'load_std': round(float(np.std(route_loads)), 3) if route_loads else 0.0,
+            'relocations': iterations,
+            'elapsed_ms': round((time.perf_counter() - started) * 1000, 1),
+            'time_limit_reached': time_limit_reached
+        }
+    }
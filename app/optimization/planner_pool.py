@@ -0,0 +1,42 @@
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class PlannerPool:
+    def __init__(self, max_workers: int = 2, start_method: str = 'spawn'):
+        self.max_workers = max_workers
+        self.start_method = start_method
+        self._lock = threading.Lock()
+        self._executor: Optional[ProcessPoolExecutor] = None
+    
+    def submit(self, func: Callable[..., Any], *args, **kwargs) -> Future:
+        with self._lock:
+            if self._executor is None:
+                self._executor = self._create_executor()
+            try:
+                return self._executor.submit(func, *args, **kwargs)
+            except BrokenProcessPool:
+                logger.warning("Pool de planificación roto, se crea uno nuevo")
+                self._executor = self._create_executor()
+                return self._executor.submit(func, *args, **kwargs)
+    
+    def run(self, func: Callable[..., Any], *args, timeout: Optional[float] = None, **kwargs) -> Any:
+        return self.submit(func, *args, **kwargs).result(timeout=timeout)
+    
+    def _create_executor(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=multiprocessing.get_context(self.start_method)
+        )
+    
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True, cancel_futures=True)
+                self._executor = None
@@ -0,0 +1,104 @@
+import math
+import time
+from typing import Any, Collection, Dict, List, Optional, Tuple
+import numpy as np
+from .distance_cache import DistanceCache
+from .stop_sequence import (
+    build_tour_matrix,
+    client_coordinates,
+    improve_tour,
+    nearest_neighbour_tour,
+    tour_length
+)
+
+MODE_INCREMENTAL = 'incremental'
+MODE_FULL = 'full'
+
+
+def update_stop_sequence(
+    stored_stops: List[Dict[str, Any]],
+    added_stops: List[Dict[str, Any]],
+    removed_ids: Collection[str],
+    baseline: Optional[Tuple[float, int]] = None,
+    depot: Optional[Tuple[float, float]] = None,
+    return_to_depot: bool = True,
+    time_limit_ms: float = 50.0,
+    max_degradation: float = 0.2,
+    distance_cache: Optional[DistanceCache] = None
+) -> Dict[str, Any]:
+    removed = {str(client_id) for client_id in removed_ids}
+    kept = [stop for stop in stored_stops if str(stop.get('client_id')) not in removed]
+    
+    located, unlocated = [], []
+    for stop in kept + added_stops:
+        (located if client_coordinates(stop) is not None else unlocated).append(stop)
+    inserted = len(located) - sum(1 for stop in kept if client_coordinates(stop) is not None)
+    
+    result = {
+        'mode': MODE_INCREMENTAL if baseline else MODE_FULL,
+        'inserted': inserted,
+        'removed': len(stored_stops) - len(kept),
+        'degradation': 0.0
+    }
+    if not located:
+        return {
+            **result,
+            'stops': [{**stop, 'sequence': None} for stop in unlocated],
+            'distance_km': 0.0,
+            'baseline_distance_km': 0.0,
+            'baseline_stops': 0
+        }
+    
+    coordinates = [client_coordinates(stop) for stop in located]
+    stop_distances = None
+    if distance_cache is not None:
+        stop_distances = distance_cache.matrix([
+            (str(stop.get('client_id')), *point) for stop, point in zip(located, coordinates)
+        ])
+    distances = build_tour_matrix(coordinates, depot, return_to_depot, stop_distances)
+    deadline = time.perf_counter() + time_limit_ms / 1000.0
+    
+    if baseline:
+        previous = len(located) - inserted
+        tour = np.arange(previous + 1, dtype=np.int64)
+        for node in range(previous + 1, len(located) + 1):
+            tour = cheapest_insertion(tour, node, distances)
+        tour = improve_tour(tour, distances, deadline)
+        length = tour_length(tour, distances)
+        
+        result['degradation'] = round(sequence_degradation(length, len(located), *baseline), 4)
+        if result['degradation'] > max_degradation:
+            resolved = improve_tour(nearest_neighbour_tour(distances), distances, time.perf_counter() + time_limit_ms / 1000.0)
+            resolved_length = tour_length(resolved, distances)
+            result['mode'] = MODE_FULL
+            if resolved_length < length:
+                tour, length = resolved, resolved_length
+            baseline = None
+    else:
+        tour = improve_tour(nearest_neighbour_tour(distances), distances, deadline)
+        length = tour_length(tour, distances)
+    
+    if not baseline:
+        baseline = (length, len(located))
+    
+    sequenced = [{**located[int(node) - 1], 'sequence': position} for position, node in enumerate(tour[1:], start=1)]
+    return {
+        **result,
+        'stops': sequenced + [{**stop, 'sequence': None} for stop in unlocated],
+        'distance_km': round(length, 3),
+        'baseline_distance_km': round(baseline[0], 3),
+        'baseline_stops': baseline[1]
+    }
+
+
+def cheapest_insertion(tour: np.ndarray, node: int, distances: np.ndarray) -> np.ndarray:
+    following = np.roll(tour, -1)
+    cost = distances[tour, node] + distances[node, following] - distances[tour, following]
+    return np.insert(tour, int(np.argmin(cost)) + 1, node)
+
+
+def sequence_degradation(length: float, stops: int, baseline_distance_km: float, baseline_stops: int) -> float:
+    if baseline_distance_km <= 0 or baseline_stops <= 0:
+        return 0.0
+    expected = baseline_distance_km * math.sqrt(stops / baseline_stops)
+    return length / expected - 1.0
@@ -0,0 +1,196 @@
+import time
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from .distance import haversine_matrix
+from .distance_cache import DistanceCache
+
+IMPROVEMENT_EPSILON = 1e-9
+TWO_OPT_CANDIDATES = 256
+OR_OPT_SEGMENT_LENGTHS = (1, 2, 3)
+
+
+def optimize_stop_sequence(
+    coordinates: Sequence[Tuple[float, float]],
+    depot: Optional[Tuple[float, float]] = None,
+    return_to_depot: bool = True,
+    time_limit_ms: float = 50.0,
+    stop_distances: Optional[np.ndarray] = None
+) -> Tuple[List[int], float]:
+    stops = len(coordinates)
+    if stops == 0:
+        return [], 0.0
+    
+    distances = build_tour_matrix(coordinates, depot, return_to_depot, stop_distances)
+    tour = nearest_neighbour_tour(distances)
+    tour = improve_tour(tour, distances, time.perf_counter() + time_limit_ms / 1000.0)
+    
+    return [int(node) - 1 for node in tour[1:]], tour_length(tour, distances)
+
+
+def sequence_clients(
+    clients: List[Dict[str, Any]],
+    depot: Optional[Tuple[float, float]] = None,
+    return_to_depot: bool = True,
+    time_limit_ms: float = 50.0,
+    distance_cache: Optional[DistanceCache] = None
+) -> Tuple[List[Dict[str, Any]], float]:
+    located, unlocated, coordinates = [], [], []
+    for client in sorted(clients, key=lambda client: str(client.get('id'))):
+        point = client_coordinates(client)
+        if point is None:
+            unlocated.append({**client, 'sequence': None})
+        else:
+            located.append(client)
+            coordinates.append(point)
+    
+    stop_distances = None
+    if distance_cache is not None and located:
+        stop_distances = distance_cache.matrix([
+            (str(client.get('id')), *point) for client, point in zip(located, coordinates)
+        ])
+    
+    order, total_distance = optimize_stop_sequence(coordinates, depot, return_to_depot, time_limit_ms, stop_distances)
+    sequenced = [{**located[index], 'sequence': position} for position, index in enumerate(order, start=1)]
+    return sequenced + unlocated, round(total_distance, 3)
+
+
+def client_coordinates(client: Dict[str, Any]) -> Optional[Tuple[float, float]]:
+    try:
+        latitude = float(client.get('latitude'))
+        longitude = float(client.get('longitude'))
+    except (TypeError, ValueError):
+        return None
+    if not (-90.0 <= latitude <= 90.0 and -180.0 <= longitude <= 180.0):
+        return None
+    return latitude, longitude
+
+
+def build_tour_matrix(
+    coordinates: Sequence[Tuple[float, float]],
+    depot: Optional[Tuple[float, float]] = None,
+    return_to_depot: bool = True,
+    stop_distances: Optional[np.ndarray] = None
+) -> np.ndarray:
+    if stop_distances is None:
+        stop_distances = haversine_matrix(coordinates)
+    
+    size = len(coordinates) + 1
+    distances = np.zeros((size, size))
+    distances[1:, 1:] = stop_distances
+    if depot is not None:
+        from_depot = haversine_matrix([depot], coordinates)[0]
+        distances[0, 1:] = from_depot
+        if return_to_depot:
+            distances[1:, 0] = from_depot
+    return distances
+
+
+def nearest_neighbour_tour(distances: np.ndarray) -> np.ndarray:
+    size = distances.shape[0]
+    tour = np.empty(size, dtype=np.int64)
+    visited = np.zeros(size, dtype=bool)
+    current = 0
+    tour[0] = 0
+    visited[0] = True
+    
+    for position in range(1, size):
+        candidates = np.where(visited, np.inf, distances[current])
+        current = int(np.argmin(candidates))
+        tour[position] = current
+        visited[current] = True
+    return tour
+
+
+def improve_tour(tour: np.ndarray, distances: np.ndarray, deadline: float) -> np.ndarray:
+    while time.perf_counter() < deadline:
+        ordered = tour_ordered_matrix(tour, distances)
+        moves = two_opt_moves(ordered)
+        if moves:
+            for first, last in moves:
+                tour[first:last + 1] = tour[first:last + 1][::-1]
+            continue
+        
+        move = best_or_opt_move(ordered)
+        if move is None:
+            break
+        tour = apply_or_opt_move(tour, *move)
+    return tour
+
+
+def tour_ordered_matrix(tour: np.ndarray, distances: np.ndarray) -> np.ndarray:
+    return distances[np.ix_(tour, tour)]
+
+
+def two_opt_moves(ordered: np.ndarray) -> List[Tuple[int, int]]:
+    size = len(ordered)
+    if size < 4:
+        return []
+    
+    to_next = np.roll(ordered, -1, axis=1)
+    edges = np.diagonal(to_next)
+    delta = ordered[:-1, 1:] + to_next[1:, 1:] - edges[:-1][:, None] - edges[1:][None, :]
+    delta[_lower_triangle(size - 1)] = np.inf
+    
+    flat = delta.ravel()
+    candidates = np.flatnonzero(flat < -IMPROVEMENT_EPSILON)
+    if len(candidates) > TWO_OPT_CANDIDATES:
+        candidates = candidates[np.argpartition(flat[candidates], TWO_OPT_CANDIDATES)[:TWO_OPT_CANDIDATES]]
+    candidates = candidates[np.argsort(flat[candidates])]
+    
+    used_edges = np.zeros(size, dtype=bool)
+    moves = []
+    for index in candidates:
+        i, j = divmod(int(index), size - 1)
+        if used_edges[i:j + 2].any():
+            continue
+        used_edges[i:j + 2] = True
+        moves.append((i + 1, j + 1))
+    return moves
+
+
+@lru_cache(maxsize=8)
+def _lower_triangle(size: int) -> np.ndarray:
+    return np.tril(np.ones((size, size), dtype=bool))
+
+
+def best_or_opt_move(ordered: np.ndarray) -> Optional[Tuple[int, int, int, bool]]:
+    size = len(ordered)
+    to_next = np.roll(ordered, -1, axis=1)
+    edges = np.diagonal(to_next)
+    positions = np.arange(size)
+    best = (-IMPROVEMENT_EPSILON, None)
+    
+    for length in OR_OPT_SEGMENT_LENGTHS:
+        if size - 1 <= length:
+            break
+        starts = positions[1:size - length + 1]
+        ends = starts + length - 1
+        following = (ends + 1) % size
+        removal_gain = edges[starts - 1] + edges[ends] - ordered[starts - 1, following]
+        blocked = (positions[None, :] >= (starts - 1)[:, None]) & (positions[None, :] <= ends[:, None])
+        
+        for reverse in (False, True):
+            head, tail = (ends, starts) if reverse else (starts, ends)
+            delta = ordered[:, head].T + to_next[tail, :] - edges[None, :] - removal_gain[:, None]
+            delta[blocked] = np.inf
+            
+            index = int(np.argmin(delta))
+            row, position = divmod(index, size)
+            if delta[row, position] < best[0]:
+                best = (delta[row, position], (int(starts[row]), length, position, reverse))
+    
+    return best[1]
+
+
+def apply_or_opt_move(tour: np.ndarray, start: int, length: int, position: int, reverse: bool) -> np.ndarray:
+    segment = tour[start:start + length]
+    if reverse:
+        segment = segment[::-1]
+    remaining = np.concatenate((tour[:start], tour[start + length:]))
+    insert_at = position + 1 if position < start else position + 1 - length
+    return np.concatenate((remaining[:insert_at], segment, remaining[insert_at:]))
+
+
+def tour_length(tour: np.ndarray, distances: np.ndarray) -> float:
+    return float(distances[tour, np.roll(tour, -1)].sum())
@@ -1,5 +1,5 @@
 from .route_repository import RouteRepository
+from .outbox_repository import OutboxRepository
+from .idempotency_repository import IdempotencyRepository
 
-__all__ = ['RouteRepository']
-
-
+__all__ = ['RouteRepository', 'OutboxRepository', 'IdempotencyRepository']
@@ -0,0 +1,80 @@
+from typing import Any, Dict, Optional
+from sqlalchemy.orm import Session
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from sqlalchemy import select, insert, update, delete
+from datetime import datetime
+from ..models.db_models import IdempotencyKeyDB
+
+IDEMPOTENCY_FIELDS = ('key', 'request_hash', 'status_code', 'response_body', 'response_headers', 'created_at', 'expires_at')
+
+
+class IdempotencyRepository:
+    def __init__(self, session: Session):
+        self.session = session
+    
+    def claim(self, key: str, request_hash: str, created_at: datetime, expires_at: datetime) -> bool:
+        try:
+            self.session.execute(insert(IdempotencyKeyDB).values(
+                key=key,
+                request_hash=request_hash,
+                created_at=created_at,
+                expires_at=expires_at
+            ))
+            self.session.commit()
+            return True
+        except IntegrityError:
+            self.session.rollback()
+            return False
+        except SQLAlchemyError as e:
+            self.session.rollback()
+            raise Exception(f"Error al registrar la clave de idempotencia: {str(e)}")
+    
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            statement = select(
+                IdempotencyKeyDB.key,
+                IdempotencyKeyDB.request_hash,
+                IdempotencyKeyDB.status_code,
+                IdempotencyKeyDB.response_body,
+                IdempotencyKeyDB.response_headers,
+                IdempotencyKeyDB.created_at,
+                IdempotencyKeyDB.expires_at
+            ).where(IdempotencyKeyDB.key == key)
+            row = self.session.execute(statement).first()
+            self.session.commit()
+            return dict(zip(IDEMPOTENCY_FIELDS, row)) if row else None
+        except SQLAlchemyError as e:
+            self.session.rollback()
+            raise Exception(f"Error al obtener la clave de idempotencia: {str(e)}")
+    
+    def complete(self, key: str, status_code: int, response_body: str, response_headers: Optional[str] = None) -> None:
+        try:
+            self.session.execute(
+                update(IdempotencyKeyDB)
+                .where(IdempotencyKeyDB.key == key)
+                .values(status_code=status_code, response_body=response_body, response_headers=response_headers)
+            )
+            self.session.commit()
+        except SQLAlchemyError as e:
+            self.session.rollback()
+            raise Exception(f"Error al guardar la respuesta idempotente: {str(e)}")
+    
+    def release(self, key: str, created_at: Optional[datetime] = None) -> None:
+        try:
+            statement = delete(IdempotencyKeyDB).where(IdempotencyKeyDB.key == key)
+            if created_at is not None:
+                statement = statement.where(IdempotencyKeyDB.created_at == created_at)
+            self.session.execute(statement)
+            self.session.commit()
+        except SQLAlchemyError as e:
+            self.session.rollback()
+            raise Exception(f"Error al liberar la clave de idempotencia: {str(e)}")
+    
+    def delete_expired(self, now: datetime) -> int:
+        try:
+            result = self.session.execute(delete(IdempotencyKeyDB).where(IdempotencyKeyDB.expires_at <= now))
+            self.session.commit()
+            return result.rowcount
+        except SQLAlchemyError as e:
+            self.session.rollback()
+            raise Exception(f"Error al eliminar claves de idempotencia vencidas: {str(e)}")
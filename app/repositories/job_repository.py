@@ -0,0 +1,80 @@
+import json
+from typing import Any, Dict, Optional, Tuple
+from sqlalchemy.orm import Session
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy import select, insert, update, delete
+from datetime import datetime
+from ..models.db_models import RouteJobDB
+
+JOB_FIELDS = ('id', 'kind', 'status', 'progress', 'result', 'error', 'created_at', 'started_at', 'finished_at')
+JSON_FIELDS = ('progress', 'result')
+
+
+class JobRepository:
+    def __init__(self, session: Session):
+        self.session = session
+    
+    def create(self, job_id: str, kind: str, status: str, created_at: datetime) -> None:
+        try:
+            self.session.execute(insert(RouteJobDB).values(
+                id=job_id,
+                kind=kind,
+                status=status,
+                progress=json.dumps({}),
+                created_at=created_at
+            ))
+            self.session.commit()
+        except SQLAlchemyError as e:
+            self.session.rollback()
+            raise Exception(f"Error al registrar la tarea: {str(e)}")
+    
+    def update(self, job_id: str, **fields) -> None:
+        values = {
+            field: json.dumps(value, default=str) if field in JSON_FIELDS else value
+            for field, value in fields.items()
+        }
+        try:
+            self.session.execute(update(RouteJobDB).where(RouteJobDB.id == job_id).values(**values))
+            self.session.commit()
+        except SQLAlchemyError as e:
+            self.session.rollback()
+            raise Exception(f"Error al actualizar la tarea: {str(e)}")
+    
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        try:
+            statement = select(
+                RouteJobDB.id,
+                RouteJobDB.kind,
+                RouteJobDB.status,
+                RouteJobDB.progress,
+                RouteJobDB.result,
+                RouteJobDB.error,
+                RouteJobDB.created_at,
+                RouteJobDB.started_at,
+                RouteJobDB.finished_at
+            ).where(RouteJobDB.id == job_id)
+            row = self.session.execute(statement).first()
+            self.session.commit()
+        except SQLAlchemyError as e:
+            self.session.rollback()
+            raise Exception(f"Error al obtener la tarea: {str(e)}")
+        if not row:
+            return None
+        
+        job = dict(zip(JOB_FIELDS, row))
+        for field in JSON_FIELDS:
+            job[field] = json.loads(job[field]) if job[field] is not None else None
+        return job
+    
+    def prune(self, kind: str, keep: int, finished_statuses: Tuple[str, ...]) -> None:
+        try:
+            newest = select(RouteJobDB.id).where(RouteJobDB.kind == kind).order_by(RouteJobDB.created_at.desc()).limit(keep)
+            self.session.execute(
+                delete(RouteJobDB)
+                .where(RouteJobDB.kind == kind, RouteJobDB.status.in_(finished_statuses), RouteJobDB.id.not_in(newest))
+                .execution_options(synchronize_session=False)
+            )
+            self.session.commit()
+        except SQLAlchemyError as e:
+            self.session.rollback()
+            raise Exception(f"Error al depurar tareas terminadas: {str(e)}")
@@ -0,0 +1,104 @@
+import json
+from typing import Any, Dict, List, Optional
+from sqlalchemy.orm import Session
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy import func, select, delete, insert, update
+from datetime import datetime
+from ..models.db_models import RouteOutboxDB, RouteOutboxDeadLetterDB
+
+ROUTE_CREATED = 'route.created'
+ROUTE_DELETED = 'route.deleted'
+ROUTES_PURGED = 'routes.purged'
+
+OUTBOX_FIELDS = ('id', 'event_type', 'route_id', 'payload', 'created_at')
+
+
+def outbox_rows(event_type: str, payloads: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    created_at = datetime.utcnow()
+    return [
+        {
+            'event_type': event_type,
+            'route_id': payload.get('id'),
+            'payload': json.dumps(payload, default=str),
+            'created_at': created_at
+        }
+        for payload in payloads
+    ]
+
+
+class OutboxRepository:
+    def __init__(self, session: Session):
+        self.session = session
+    
+    def lock_pending(self, limit: int) -> List[Dict[str, Any]]:
+        try:
+            statement = (
+                select(
+                    RouteOutboxDB.id,
+                    RouteOutboxDB.event_type,
+                    RouteOutboxDB.route_id,
+                    RouteOutboxDB.payload,
+                    RouteOutboxDB.created_at
+                )
+                .order_by(RouteOutboxDB.id)
+                .limit(limit)
+                .with_for_update(skip_locked=True)
+            )
+            return [dict(zip(OUTBOX_FIELDS, row)) for row in self.session.execute(statement)]
+        except SQLAlchemyError as e:
+            self.session.rollback()
+            raise Exception(f"Error al leer eventos pendientes: {str(e)}")
+    
+    def complete_batch(self, published_ids: List[int], rejected_ids: List[int], max_attempts: int) -> int:
+        try:
+            if published_ids:
+                self.session.execute(
+                    delete(RouteOutboxDB)
+                    .where(RouteOutboxDB.id.in_(published_ids))
+                    .execution_options(synchronize_session=False)
+                )
+            dead_lettered = self._record_rejections(rejected_ids, max_attempts) if rejected_ids else 0
+            self.session.commit()
+            return dead_lettered
+        except SQLAlchemyError as e:
+            self.session.rollback()
+            raise Exception(f"Error al confirmar eventos publicados: {str(e)}")
+    
+    def oldest_pending_created_at(self) -> Optional[datetime]:
+        try:
+            return self.session.execute(select(func.min(RouteOutboxDB.created_at))).scalar()
+        except SQLAlchemyError as e:
+            raise Exception(f"Error al medir el retraso de eventos: {str(e)}")
+    
+    def _record_rejections(self, event_ids: List[int], max_attempts: int) -> int:
+        self.session.execute(
+            update(RouteOutboxDB)
+            .where(RouteOutboxDB.id.in_(event_ids))
+            .values(attempts=RouteOutboxDB.attempts + 1)
+            .execution_options(synchronize_session=False)
+        )
+        exhausted = self.session.execute(
+            select(
+                RouteOutboxDB.id,
+                RouteOutboxDB.event_type,
+                RouteOutboxDB.route_id,
+                RouteOutboxDB.payload,
+                RouteOutboxDB.created_at,
+                RouteOutboxDB.attempts
+            )
+            .where(RouteOutboxDB.id.in_(event_ids), RouteOutboxDB.attempts >= max_attempts)
+        ).all()
+        if not exhausted:
+            return 0
+        
+        failed_at = datetime.utcnow()
+        self.session.execute(
+            insert(RouteOutboxDeadLetterDB),
+            [dict(zip(OUTBOX_FIELDS + ('attempts',), row), failed_at=failed_at) for row in exhausted]
+        )
+        self.session.execute(
+            delete(RouteOutboxDB)
+            .where(RouteOutboxDB.id.in_([row[0] for row in exhausted]))
+            .execution_options(synchronize_session=False)
+        )
+        return len(exhausted)
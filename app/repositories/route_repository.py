@@ -1,37 +1,124 @@
-from typing import List, Optional
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 from sqlalchemy.orm import Session
-from sqlalchemy.exc import SQLAlchemyError
-from sqlalchemy import and_, or_, func, desc
-from datetime import date
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from sqlalchemy import func, desc, select, insert, update, delete, lambda_stmt
+from datetime import date, datetime
 from ..models.route import Route
-from ..models.db_models import RouteDB
+from ..exceptions.custom_exceptions import LogisticsConflictError
+from ..models.db_models import RouteDB, RouteStopDB, RouteOrderDB, RouteSequenceDB, RouteOutboxDB
 from .base_repository import BaseRepository
+from .outbox_repository import ROUTE_CREATED, ROUTE_DELETED, ROUTES_PURGED, outbox_rows
+
+
+def _route_columns() -> Tuple:
+    return (
+        RouteDB.id,
+        RouteDB.route_code,
+        RouteDB.assigned_truck,
+        RouteDB.delivery_date,
+        RouteDB.orders_count,
+        RouteDB.created_at,
+        RouteDB.updated_at
+    )
+
+
+def _stop_columns() -> Tuple:
+    return (
+        RouteStopDB.client_id,
+        RouteStopDB.sequence,
+        RouteStopDB.name,
+        RouteStopDB.email,
+        RouteStopDB.phone,
+        RouteStopDB.address,
+        RouteStopDB.latitude,
+        RouteStopDB.longitude
+    )
+
+
+def _deleted_columns() -> Tuple:
+    return (RouteDB.id, RouteDB.route_code, RouteDB.assigned_truck, RouteDB.delivery_date)
+
+
+STOP_FIELDS = ('client_id', 'sequence', 'name', 'email', 'phone', 'address', 'latitude', 'longitude')
+DELETED_FIELDS = ('id', 'route_code', 'assigned_truck', 'delivery_date')
 
 
 class RouteRepository(BaseRepository):
-    def __init__(self, session: Session):
+    def __init__(self, session: Session, read_session: Optional[Session] = None):
         super().__init__(session)
+        self.read_session = read_session or session
+    
+    def close_read_session(self) -> None:
+        if self.read_session is not self.session:
+            self.read_session.close()
     
-    def create(self, route: Route) -> Route:
+    def create(
+        self,
+        route: Route,
+        stops: Optional[List[Dict[str, Any]]] = None,
+        sequence_stats: Optional[Dict[str, Any]] = None
+    ) -> Route:
         try:
-            db_route = RouteDB(
+            statement = insert(RouteDB).values(
                 route_code=route.route_code,
                 assigned_truck=route.assigned_truck,
                 delivery_date=route.delivery_date,
-                orders_count=route.orders_count
-            )
-            self.session.add(db_route)
+                orders_count=route.orders_count,
+                created_at=func.now(),
+                updated_at=func.now()
+            ).returning(*_route_columns())
+            row = self.session.execute(statement).one()
+            if stops is not None:
+                self._insert_route_stops(row[0], stops, sequence_stats)
+            created_route = Route.from_row(tuple(row))
+            self._add_events(ROUTE_CREATED, [created_route.to_dict()])
             self.session.commit()
-            self.session.refresh(db_route)
             
-            return self._db_to_model(db_route)
+            return created_route
+        except IntegrityError as e:
+            self.session.rollback()
+            raise LogisticsConflictError(f"Error al crear ruta: {str(e)}")
         except SQLAlchemyError as e:
             self.session.rollback()
             raise Exception(f"Error al crear ruta: {str(e)}")
     
+    def create_many(
+        self,
+        routes: List[Route],
+        snapshots: Optional[List[Tuple[List[Dict[str, Any]], Dict[str, Any]]]] = None
+    ) -> List[Route]:
+        if not routes:
+            return []
+        try:
+            statement = insert(RouteDB).values([
+                {
+                    'route_code': route.route_code,
+                    'assigned_truck': route.assigned_truck,
+                    'delivery_date': route.delivery_date,
+                    'orders_count': route.orders_count,
+                    'created_at': func.now(),
+                    'updated_at': func.now()
+                }
+                for route in routes
+            ]).returning(*_route_columns())
+            created = {row[1]: Route.from_row(tuple(row)) for row in self.session.execute(statement)}
+            for route, (stops, sequence_stats) in zip(routes, snapshots or []):
+                self._insert_route_stops(created[route.route_code].id, stops, sequence_stats)
+            self._add_events(ROUTE_CREATED, [created[route.route_code].to_dict() for route in routes])
+            self.session.commit()
+            
+            return [created[route.route_code] for route in routes]
+        except IntegrityError as e:
+            self.session.rollback()
+            raise LogisticsConflictError(f"Error al crear rutas: {str(e)}")
+        except SQLAlchemyError as e:
+            self.session.rollback()
+            raise Exception(f"Error al crear rutas: {str(e)}")
+    
     def get_by_id(self, route_id: int) -> Optional[Route]:
         try:
-            db_route = self.session.query(RouteDB).filter(RouteDB.id == route_id).first()
+            statement = lambda_stmt(lambda: select(RouteDB).where(RouteDB.id == route_id).limit(1))
+            db_route = self.read_session.execute(statement).scalars().first()
             if db_route:
                 return self._db_to_model(db_route)
             return None
@@ -40,7 +127,8 @@ class RouteRepository(BaseRepository):
     
     def get_all(self) -> List[Route]:
         try:
-            db_routes = self.session.query(RouteDB).order_by(desc(RouteDB.delivery_date)).all()
+            statement = lambda_stmt(lambda: select(RouteDB).order_by(desc(RouteDB.delivery_date)))
+            db_routes = self.read_session.execute(statement).scalars().all()
             return [self._db_to_model(db_route) for db_route in db_routes]
         except SQLAlchemyError as e:
             raise Exception(f"Error al obtener rutas: {str(e)}")
@@ -54,25 +142,29 @@ class RouteRepository(BaseRepository):
         delivery_date: Optional[date] = None
     ) -> List[Route]:
         try:
-            query = self.session.query(RouteDB)
-            
-            if route_code:
-                query = query.filter(RouteDB.route_code.ilike(f"%{route_code}%"))
-            
-            if assigned_truck:
-                query = query.filter(RouteDB.assigned_truck.ilike(f"%{assigned_truck}%"))
-            
-            if delivery_date:
-                query = query.filter(RouteDB.delivery_date == delivery_date)
-            
-            query = query.order_by(desc(RouteDB.delivery_date))
-            query = query.limit(limit).offset(offset)
+            statement = self._apply_filters(lambda_stmt(lambda: select(RouteDB)), route_code, assigned_truck, delivery_date)
+            statement += lambda s: s.order_by(desc(RouteDB.delivery_date)).limit(limit).offset(offset)
             
-            db_routes = query.all()
+            db_routes = self.read_session.execute(statement).scalars().all()
             return [self._db_to_model(db_route) for db_route in db_routes]
         except SQLAlchemyError as e:
             raise Exception(f"Error al obtener rutas paginadas: {str(e)}")
     
+    def get_route_rows_paginated(
+        self,
+        limit: int,
+        offset: int,
+        route_code: Optional[str] = None,
+        assigned_truck: Optional[str] = None,
+        delivery_date: Optional[date] = None
+    ) -> List[Tuple]:
+        try:
+            statement = self._apply_filters(lambda_stmt(lambda: select(*_route_columns())), route_code, assigned_truck, delivery_date)
+            statement += lambda s: s.order_by(desc(RouteDB.delivery_date)).limit(limit).offset(offset)
+            return self.read_session.execute(statement).all()
+        except SQLAlchemyError as e:
+            raise Exception(f"Error al obtener rutas paginadas: {str(e)}")
+    
     def count_routes(
         self,
         route_code: Optional[str] = None,
@@ -80,29 +172,53 @@ class RouteRepository(BaseRepository):
         delivery_date: Optional[date] = None
     ) -> int:
         try:
-            query = self.session.query(func.count(RouteDB.id))
-            
-            if route_code:
-                query = query.filter(RouteDB.route_code.ilike(f"%{route_code}%"))
-            
-            if assigned_truck:
-                query = query.filter(RouteDB.assigned_truck.ilike(f"%{assigned_truck}%"))
-            
-            if delivery_date:
-                query = query.filter(RouteDB.delivery_date == delivery_date)
-            
-            return query.scalar() or 0
+            statement = self._apply_filters(lambda_stmt(lambda: select(func.count(RouteDB.id))), route_code, assigned_truck, delivery_date)
+            return self.read_session.execute(statement).scalar() or 0
         except SQLAlchemyError as e:
             raise Exception(f"Error al contar rutas: {str(e)}")
     
+    def get_routes_version(
+        self,
+        route_code: Optional[str] = None,
+        assigned_truck: Optional[str] = None,
+        delivery_date: Optional[date] = None
+    ) -> Tuple[int, Optional[datetime]]:
+        try:
+            statement = self._apply_filters(
+                lambda_stmt(lambda: select(func.count(RouteDB.id), func.max(RouteDB.updated_at))),
+                route_code, assigned_truck, delivery_date
+            )
+            total, last_updated = self.read_session.execute(statement).one()
+            return total or 0, last_updated
+        except SQLAlchemyError as e:
+            raise Exception(f"Error al obtener versión de rutas: {str(e)}")
+    
+    def stream_routes(
+        self,
+        chunk_size: int = 1000,
+        route_code: Optional[str] = None,
+        assigned_truck: Optional[str] = None,
+        delivery_date: Optional[date] = None
+    ) -> Iterator[List[Tuple]]:
+        try:
+            statement = self._apply_filters(lambda_stmt(lambda: select(*_route_columns())), route_code, assigned_truck, delivery_date)
+            statement += lambda s: s.order_by(desc(RouteDB.delivery_date), desc(RouteDB.id))
+            result = self.read_session.execute(
+                statement,
+                execution_options={'stream_results': True, 'yield_per': chunk_size}
+            )
+            for partition in result.partitions():
+                yield partition
+        except SQLAlchemyError as e:
+            raise Exception(f"Error al exportar rutas: {str(e)}")
+    
     def get_route_by_truck_and_date(self, truck: str, delivery_date: date) -> Optional[Route]:
         try:
-            db_route = self.session.query(RouteDB).filter(
-                and_(
-                    RouteDB.assigned_truck == truck,
-                    RouteDB.delivery_date == delivery_date
-                )
-            ).first()
+            statement = lambda_stmt(lambda: select(RouteDB).where(
+                RouteDB.assigned_truck == truck,
+                RouteDB.delivery_date == delivery_date
+            ).limit(1))
+            db_route = self.session.execute(statement).scalars().first()
             
             if db_route:
                 return self._db_to_model(db_route)
@@ -110,18 +226,123 @@ class RouteRepository(BaseRepository):
         except SQLAlchemyError as e:
             raise Exception(f"Error al obtener ruta por camión y fecha: {str(e)}")
     
+    def get_trucks_with_routes(self, delivery_date: date, trucks: List[str]) -> List[str]:
+        if not trucks:
+            return []
+        try:
+            statement = select(RouteDB.assigned_truck).where(
+                RouteDB.delivery_date == delivery_date,
+                RouteDB.assigned_truck.in_(trucks)
+            )
+            return list(self.session.execute(statement).scalars())
+        except SQLAlchemyError as e:
+            raise Exception(f"Error al obtener rutas por camión y fecha: {str(e)}")
+    
+    def get_route_with_stops(self, route_id: int) -> Optional[Tuple[Route, List[Dict[str, Any]], Optional[float]]]:
+        try:
+            statement = lambda_stmt(lambda: select(*_route_columns(), RouteSequenceDB.distance_km, *_stop_columns())
+                .select_from(RouteDB)
+                .outerjoin(RouteSequenceDB, RouteSequenceDB.route_id == RouteDB.id)
+                .outerjoin(RouteStopDB, RouteStopDB.route_id == RouteDB.id)
+                .where(RouteDB.id == route_id)
+                .order_by(RouteStopDB.sequence.is_(None), RouteStopDB.sequence, RouteStopDB.client_id))
+            rows = self.read_session.execute(statement).all()
+            if not rows:
+                return None
+            
+            route_width = len(_route_columns())
+            route = Route.from_row(tuple(rows[0][:route_width]))
+            stops = [dict(zip(STOP_FIELDS, row[route_width + 1:])) for row in rows if row[route_width + 1] is not None]
+            return route, stops, rows[0][route_width]
+        except SQLAlchemyError as e:
+            raise Exception(f"Error al obtener ruta con paradas: {str(e)}")
+    
+    def get_routes_by_client(
+        self,
+        client_id: str,
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None,
+        limit: int = 20
+    ) -> List[Tuple]:
+        try:
+            statement = lambda_stmt(lambda: select(*_route_columns(), RouteStopDB.sequence)
+                .join(RouteStopDB, RouteStopDB.route_id == RouteDB.id)
+                .where(RouteStopDB.client_id == client_id))
+            statement = self._apply_date_range(statement, date_from, date_to)
+            statement += lambda s: s.order_by(desc(RouteDB.delivery_date), desc(RouteDB.id)).limit(limit)
+            return self.read_session.execute(statement).all()
+        except SQLAlchemyError as e:
+            raise Exception(f"Error al obtener rutas del cliente: {str(e)}")
+    
+    def get_route_by_order(
+        self,
+        order_id: str,
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None
+    ) -> Optional[Tuple]:
+        try:
+            statement = lambda_stmt(lambda: select(*_route_columns(), RouteOrderDB.client_id, RouteStopDB.sequence)
+                .join(RouteOrderDB, RouteOrderDB.route_id == RouteDB.id)
+                .outerjoin(RouteStopDB, (RouteStopDB.route_id == RouteOrderDB.route_id) & (RouteStopDB.client_id == RouteOrderDB.client_id))
+                .where(RouteOrderDB.order_id == order_id))
+            statement = self._apply_date_range(statement, date_from, date_to)
+            statement += lambda s: s.order_by(desc(RouteDB.delivery_date), desc(RouteDB.id)).limit(1)
+            return self.read_session.execute(statement).first()
+        except SQLAlchemyError as e:
+            raise Exception(f"Error al obtener ruta del pedido: {str(e)}")
+    
+    def get_route_stops(self, route_id: int) -> Tuple[List[Dict[str, Any]], Optional[Dict[str, Any]]]:
+        try:
+            statement = lambda_stmt(lambda: select(*_stop_columns())
+                .where(RouteStopDB.route_id == route_id)
+                .order_by(RouteStopDB.sequence.is_(None), RouteStopDB.sequence, RouteStopDB.client_id))
+            stops = [dict(zip(STOP_FIELDS, row)) for row in self.session.execute(statement)]
+            
+            db_sequence = self.session.get(RouteSequenceDB, route_id)
+            sequence_stats = None
+            if db_sequence:
+                sequence_stats = {
+                    'distance_km': db_sequence.distance_km,
+                    'baseline_distance_km': db_sequence.baseline_distance_km,
+                    'baseline_stops': db_sequence.baseline_stops,
+                    'incremental_updates': db_sequence.incremental_updates
+                }
+            return stops, sequence_stats
+        except SQLAlchemyError as e:
+            raise Exception(f"Error al obtener paradas de la ruta: {str(e)}")
+    
+    def replace_route_stops(
+        self,
+        route_id: int,
+        stops: List[Dict[str, Any]],
+        sequence_stats: Dict[str, Any],
+        orders_count: int
+    ) -> None:
+        try:
+            self.session.execute(delete(RouteStopDB).where(RouteStopDB.route_id == route_id))
+            self.session.execute(delete(RouteOrderDB).where(RouteOrderDB.route_id == route_id))
+            self._insert_route_stops(route_id, stops, sequence_stats)
+            self.session.execute(
+                update(RouteDB).where(RouteDB.id == route_id).values(orders_count=orders_count, updated_at=func.now())
+            )
+            self.session.commit()
+        except SQLAlchemyError as e:
+            self.session.rollback()
+            raise Exception(f"Error al guardar paradas de la ruta: {str(e)}")
+    
     def get_next_sequence_number(self) -> int:
         try:
-            last_route = self.session.query(RouteDB).order_by(desc(RouteDB.id)).first()
-            if last_route:
-                return last_route.id + 1
+            statement = lambda_stmt(lambda: select(RouteDB.id).order_by(desc(RouteDB.id)).limit(1))
+            last_id = self.session.execute(statement).scalar()
+            if last_id:
+                return last_id + 1
             return 1
         except SQLAlchemyError as e:
             raise Exception(f"Error al obtener siguiente número de secuencia: {str(e)}")
     
     def update(self, route: Route) -> Route:
         try:
-            db_route = self.session.query(RouteDB).filter(RouteDB.id == route.id).first()
+            db_route = self.session.get(RouteDB, route.id)
             if not db_route:
                 raise Exception("Ruta no encontrada")
             
@@ -138,35 +359,117 @@ class RouteRepository(BaseRepository):
     
     def delete(self, route_id: int) -> bool:
         try:
-            db_route = self.session.query(RouteDB).filter(RouteDB.id == route_id).first()
+            db_route = self.session.get(RouteDB, route_id)
             if not db_route:
                 return False
             
             self.session.delete(db_route)
+            self._add_events(ROUTE_DELETED, [{field: getattr(db_route, field) for field in DELETED_FIELDS}])
             self.session.commit()
             return True
         except SQLAlchemyError as e:
             self.session.rollback()
             raise Exception(f"Error al eliminar ruta: {str(e)}")
     
-    def delete_all(self) -> int:
+    def delete_all(self, before: Optional[date] = None) -> int:
         try:
-            count = self.session.query(RouteDB).count()
-            self.session.query(RouteDB).delete()
+            statement = self._apply_cutoff(delete(RouteDB), before)
+            result = self.session.execute(statement.execution_options(synchronize_session=False))
+            if result.rowcount:
+                self._add_events(ROUTES_PURGED, [{'deleted_count': result.rowcount, 'before': before}])
             self.session.commit()
-            return count
+            return result.rowcount
         except SQLAlchemyError as e:
             self.session.rollback()
             raise Exception(f"Error al eliminar todas las rutas: {str(e)}")
     
+    def count_routes_before(self, before: Optional[date] = None) -> int:
+        try:
+            statement = self._apply_cutoff(select(func.count(RouteDB.id)), before)
+            return self.session.execute(statement).scalar() or 0
+        except SQLAlchemyError as e:
+            raise Exception(f"Error al contar rutas a eliminar: {str(e)}")
+    
+    def delete_batch(self, batch_size: int, before: Optional[date] = None) -> int:
+        try:
+            batch_ids = self._apply_cutoff(select(RouteDB.id), before).order_by(RouteDB.id).limit(batch_size)
+            statement = delete(RouteDB).where(RouteDB.id.in_(batch_ids)).returning(*_deleted_columns())
+            return self._delete_with_events(statement)
+        except SQLAlchemyError as e:
+            self.session.rollback()
+            raise Exception(f"Error al eliminar lote de rutas: {str(e)}")
+    
+    def _delete_with_events(self, statement) -> int:
+        rows = self.session.execute(statement.execution_options(synchronize_session=False)).all()
+        self._add_events(ROUTE_DELETED, [dict(zip(DELETED_FIELDS, row)) for row in rows])
+        self.session.commit()
+        return len(rows)
+    
+    def _add_events(self, event_type: str, payloads: List[Dict[str, Any]]) -> None:
+        if payloads:
+            self.session.execute(insert(RouteOutboxDB), outbox_rows(event_type, payloads))
+    
+    def _insert_route_stops(self, route_id: int, stops: List[Dict[str, Any]], sequence_stats: Optional[Dict[str, Any]]) -> None:
+        if stops:
+            self.session.execute(insert(RouteStopDB), [
+                {
+                    'route_id': route_id,
+                    **{field: stop.get(field) for field in STOP_FIELDS},
+                    'client_id': str(stop.get('client_id'))
+                }
+                for stop in stops
+            ])
+            orders = [
+                {'route_id': route_id, 'order_id': str(order_id), 'client_id': str(stop.get('client_id'))}
+                for stop in stops
+                for order_id in stop.get('order_ids') or []
+            ]
+            if orders:
+                self.session.execute(insert(RouteOrderDB), orders)
+        if sequence_stats is not None:
+            self.session.merge(RouteSequenceDB(route_id=route_id, **sequence_stats))
+    
+    def _apply_filters(
+        self,
+        statement,
+        route_code: Optional[str] = None,
+        assigned_truck: Optional[str] = None,
+        delivery_date: Optional[date] = None
+    ):
+        if route_code:
+            route_code_pattern = f"%{route_code}%"
+            statement += lambda s: s.where(RouteDB.route_code.ilike(route_code_pattern))
+        
+        if assigned_truck:
+            assigned_truck_pattern = f"%{assigned_truck}%"
+            statement += lambda s: s.where(RouteDB.assigned_truck.ilike(assigned_truck_pattern))
+        
+        if delivery_date:
+            statement += lambda s: s.where(RouteDB.delivery_date == delivery_date)
+        
+        return statement
+    
+    def _apply_date_range(self, statement, date_from: Optional[date] = None, date_to: Optional[date] = None):
+        if date_from:
+            statement += lambda s: s.where(RouteDB.delivery_date >= date_from)
+        
+        if date_to:
+            statement += lambda s: s.where(RouteDB.delivery_date <= date_to)
+        
+        return statement
+    
+    def _apply_cutoff(self, statement, before: Optional[date] = None):
+        if before:
+            statement = statement.where(RouteDB.delivery_date < before)
+        return statement
+    
     def _db_to_model(self, db_route: RouteDB) -> Route:
-        return Route(
-            id=db_route.id,
-            route_code=db_route.route_code,
-            assigned_truck=db_route.assigned_truck,
-            delivery_date=db_route.delivery_date,
-            orders_count=db_route.orders_count,
-            created_at=db_route.created_at,
-            updated_at=db_route.updated_at
-        )
-
+        return Route.from_row((
+            db_route.id,
+            db_route.route_code,
+            db_route.assigned_truck,
+            db_route.delivery_date,
+            db_route.orders_count,
+            db_route.created_at,
+            db_route.updated_at
+        ))
@@ -0,0 +1,197 @@
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+from ..repositories.idempotency_repository import IdempotencyRepository
+from ..utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENCY_HEADER = 'Idempotency-Key'
+REPLAYED_HEADER = 'Idempotent-Replayed'
+REPLAYABLE_HEADERS = ('Location', 'Preference-Applied')
+MAX_KEY_LENGTH = 255
+
+
+class IdempotencyKeyReuseError(Exception):
+    pass
+
+
+class IdempotencyInProgressError(Exception):
+    pass
+
+
+def request_fingerprint(payload: Any) -> str:
+    canonical = json.dumps(payload, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+class IdempotencyService:
+    def __init__(
+        self,
+        session_factory: Callable[[], Any],
+        ttl_seconds: float = 86400,
+        wait_seconds: float = 10.0,
+        lock_seconds: float = 60.0,
+        cache_size: int = 1000,
+        poll_interval_seconds: float = 0.1,
+        purge_interval_seconds: float = 300.0,
+        clock: Callable[[], datetime] = datetime.utcnow
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.wait_seconds = wait_seconds
+        self.lock_seconds = lock_seconds
+        self.cache_size = cache_size
+        self.poll_interval_seconds = poll_interval_seconds
+        self.purge_interval_seconds = purge_interval_seconds
+        self._session_factory = session_factory
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._cache: 'OrderedDict[str, Dict[str, Any]]' = OrderedDict()
+        self._in_flight: Dict[str, threading.Event] = {}
+        self._next_purge: Optional[datetime] = None
+    
+    def execute(self, key: str, fingerprint: str, handler: Callable[[], Tuple]) -> Tuple:
+        stored = self._cached(key)
+        if stored is None:
+            with self._lock:
+                in_flight = self._in_flight.get(key)
+                owner = in_flight is None
+                if owner:
+                    in_flight = self._in_flight[key] = threading.Event()
+            
+            if owner:
+                try:
+                    return self._run(key, fingerprint, handler)
+                finally:
+                    with self._lock:
+                        self._in_flight.pop(key, None)
+                    in_flight.set()
+            
+            metrics.increment('idempotency.waited')
+            if not in_flight.wait(self.wait_seconds):
+                raise IdempotencyInProgressError(f"La petición con clave {key} sigue en curso")
+            stored = self._cached(key)
+            if stored is None:
+                return self._run(key, fingerprint, handler)
+        return self._replay(stored, fingerprint)
+    
+    def _run(self, key: str, fingerprint: str, handler: Callable[[], Tuple]) -> Tuple:
+        now = self._clock()
+        self._purge_expired(now)
+        with self._repository() as repository:
+            if not self._claim(repository, key, fingerprint, now):
+                stored = self._wait_stored(repository, key, fingerprint)
+                if stored is not None:
+                    self._remember(key, stored)
+                    return self._replay(stored, fingerprint)
+                if not self._claim(repository, key, fingerprint, now):
+                    raise IdempotencyInProgressError(f"La petición con clave {key} sigue en curso")
+            
+            try:
+                response = handler()
+            except Exception:
+                repository.release(key)
+                raise
+            
+            body, status_code = response[0], response[1]
+            if status_code >= 500:
+                repository.release(key)
+                return response
+            headers = response[2] if len(response) > 2 and response[2] else {}
+            replayable = {name: headers[name] for name in REPLAYABLE_HEADERS if name in headers}
+            stored = {
+                'request_hash': fingerprint,
+                'status_code': status_code,
+                'response_body': json.dumps(body, default=str),
+                'response_headers': json.dumps(replayable) if replayable else None,
+                'expires_at': now + timedelta(seconds=self.ttl_seconds)
+            }
+            repository.complete(key, status_code, stored['response_body'], stored['response_headers'])
+            self._remember(key, stored)
+            return response
+    
+    def _claim(self, repository: IdempotencyRepository, key: str, fingerprint: str, now: datetime) -> bool:
+        if repository.claim(key, fingerprint, now, now + timedelta(seconds=self.ttl_seconds)):
+            return True
+        
+        existing = repository.get(key)
+        abandoned = existing is not None and (
+            existing['expires_at'] <= now
+            or (existing['status_code'] is None and existing['created_at'] <= now - timedelta(seconds=self.lock_seconds))
+        )
+        if existing is None or abandoned:
+            if existing is not None:
+                repository.release(key, created_at=existing['created_at'])
+            return repository.claim(key, fingerprint, now, now + timedelta(seconds=self.ttl_seconds))
+        return False
+    
+    def _wait_stored(self, repository: IdempotencyRepository, key: str, fingerprint: str) -> Optional[Dict[str, Any]]:
+        deadline = time.monotonic() + self.wait_seconds
+        waited = False
+        while True:
+            stored = repository.get(key)
+            if stored is None:
+                return None
+            if stored['request_hash'] != fingerprint:
+                raise IdempotencyKeyReuseError(f"La clave {key} ya se usó con otro cuerpo de petición")
+            if stored['status_code'] is not None:
+                return stored
+            if time.monotonic() >= deadline:
+                raise IdempotencyInProgressError(f"La petición con clave {key} sigue en curso")
+            if not waited:
+                metrics.increment('idempotency.waited')
+                waited = True
+            time.sleep(self.poll_interval_seconds)
+    
+    def _replay(self, stored: Dict[str, Any], fingerprint: str) -> Tuple:
+        if stored['request_hash'] != fingerprint:
+            raise IdempotencyKeyReuseError("La clave de idempotencia ya se usó con otro cuerpo de petición")
+        metrics.increment('idempotency.replayed')
+        headers = json.loads(stored['response_headers']) if stored.get('response_headers') else {}
+        headers[REPLAYED_HEADER] = 'true'
+        return json.loads(stored['response_body']), stored['status_code'], headers
+    
+    def _cached(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            stored = self._cache.get(key)
+            if stored is None:
+                return None
+            if stored['expires_at'] <= self._clock():
+                del self._cache[key]
+                return None
+            self._cache.move_to_end(key)
+            return stored
+    
+    def _remember(self, key: str, stored: Dict[str, Any]) -> None:
+        with self._lock:
+            self._cache[key] = stored
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+    
+    def _purge_expired(self, now: datetime) -> None:
+        with self._lock:
+            if self._next_purge is not None and now < self._next_purge:
+                return
+            self._next_purge = now + timedelta(seconds=self.purge_interval_seconds)
+        try:
+            with self._repository() as repository:
+                deleted = repository.delete_expired(now)
+            if deleted:
+                logger.info(f"{deleted} claves de idempotencia vencidas eliminadas")
+        except Exception as e:
+            logger.warning(f"Error al eliminar claves de idempotencia vencidas: {str(e)}")
+    
+    @contextmanager
+    def _repository(self) -> Iterator[IdempotencyRepository]:
+        session = self._session_factory()
+        try:
+            yield IdempotencyRepository(session)
+        finally:
+            session.close()
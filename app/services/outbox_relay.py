@@ -0,0 +1,99 @@
+import logging
+import threading
+from datetime import datetime
+from typing import Any, Callable, Optional
+from ..integrations.event_publisher import create_event_publisher
+from ..repositories.outbox_repository import OutboxRepository
+from ..utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+_relay: Optional['OutboxRelay'] = None
+_relay_lock = threading.Lock()
+
+
+class OutboxRelay:
+    def __init__(
+        self,
+        session_factory: Callable[[], Any],
+        publisher,
+        batch_size: int = 100,
+        poll_interval_seconds: float = 1.0,
+        max_attempts: int = 5,
+        clock: Callable[[], datetime] = datetime.utcnow
+    ):
+        self.publisher = publisher
+        self.batch_size = batch_size
+        self.poll_interval_seconds = poll_interval_seconds
+        self.max_attempts = max_attempts
+        self.lag_seconds = 0.0
+        self._session_factory = session_factory
+        self._clock = clock
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+    
+    def relay_once(self) -> int:
+        session = self._session_factory()
+        try:
+            repository = OutboxRepository(session)
+            events = repository.lock_pending(self.batch_size)
+            published, rejected = [], []
+            if events:
+                try:
+                    published, rejected = self.publisher.publish_batch(events)
+                except Exception as e:
+                    logger.error(f"Error al publicar el lote de {len(events)} eventos: {str(e)}")
+                if len(published) < len(events):
+                    metrics.increment('outbox.publish_failed')
+            dead_lettered = repository.complete_batch(published, rejected, self.max_attempts)
+            if dead_lettered:
+                logger.error(f"{dead_lettered} eventos movidos a route_outbox_dead_letters tras {self.max_attempts} intentos")
+                metrics.increment('outbox.dead_lettered', dead_lettered)
+            
+            metrics.increment('outbox.batches')
+            metrics.increment('outbox.published', len(published))
+            oldest = repository.oldest_pending_created_at()
+            self.lag_seconds = max(0.0, (self._clock() - oldest).total_seconds()) if oldest else 0.0
+            return len(published)
+        finally:
+            session.close()
+    
+    def run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                published = self.relay_once()
+            except Exception as e:
+                logger.error(f"Error en el relay de eventos: {str(e)}")
+                published = 0
+            if published < self.batch_size:
+                self._stop.wait(self.poll_interval_seconds)
+    
+    def start(self) -> None:
+        self._stop.clear()
+        self._thread = threading.Thread(target=self.run, name='logistics-outbox-relay', daemon=True)
+        self._thread.start()
+    
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self.publisher.close()
+
+
+def start_outbox_relay(config, session_factory: Callable[[], Any]) -> Optional[OutboxRelay]:
+    global _relay
+    if not config.OUTBOX_RELAY_ENABLED:
+        return None
+    
+    with _relay_lock:
+        if _relay is None:
+            _relay = OutboxRelay(
+                session_factory,
+                create_event_publisher(config.OUTBOX_BROKER_URL, config.OUTBOX_EXCHANGE),
+                batch_size=config.OUTBOX_BATCH_SIZE,
+                poll_interval_seconds=config.OUTBOX_POLL_INTERVAL_SECONDS,
+                max_attempts=config.OUTBOX_MAX_ATTEMPTS
+            )
+            metrics.register_gauge('outbox.lag_seconds', lambda: _relay.lag_seconds)
+            _relay.start()
+        return _relay
@@ -1,15 +1,22 @@
 import logging
-from typing import List, Optional
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
 from datetime import datetime, date, timedelta
 from ..models.route import Route
 from ..repositories.route_repository import RouteRepository
-from ..exceptions.custom_exceptions import LogisticsValidationError, LogisticsBusinessLogicError
+from ..exceptions.custom_exceptions import LogisticsValidationError, LogisticsBusinessLogicError, LogisticsConflictError, LogisticsNotFoundError
 from ..integrations.orders_integration import OrdersIntegration
 from ..integrations.auth_integration import AuthIntegration
+from ..utils.route_serializer import row_to_dict, rows_to_dicts
+from ..optimization.stop_sequence import client_coordinates, sequence_clients
+from ..optimization.distance_cache import DistanceCache
+from ..optimization.reoptimization import MODE_INCREMENTAL, update_stop_sequence
+from ..utils.metrics import metrics
 
 logger = logging.getLogger(__name__)
 
 VALID_TRUCKS = ["CAM-001", "CAM-002", "CAM-003", "CAM-004", "CAM-005"]
+ROUTE_CODE_ATTEMPTS = 3
 
 
 class RouteService:
@@ -18,42 +25,32 @@ class RouteService:
         self.orders_integration = OrdersIntegration()
         self.auth_integration = AuthIntegration()
     
-    def create_route(self, route_data: dict) -> Route:
+    def validate_route_request(self, route_data: dict) -> Tuple[str, date]:
+        if not route_data.get('assigned_truck'):
+            raise LogisticsValidationError("El campo 'assigned_truck' es obligatorio")
+        
+        if not route_data.get('delivery_date'):
+            raise LogisticsValidationError("El campo 'delivery_date' es obligatorio")
+        
+        assigned_truck = route_data['assigned_truck'].strip()
+        
+        if assigned_truck not in VALID_TRUCKS:
+            raise LogisticsValidationError(
+                f"El camión '{assigned_truck}' no es válido. Camiones permitidos: {', '.join(VALID_TRUCKS)}"
+            )
+        
+        delivery_date = self._parse_delivery_date(route_data['delivery_date'])
+        
+        existing_route = self.route_repository.get_route_by_truck_and_date(assigned_truck, delivery_date)
+        if existing_route:
+            raise LogisticsBusinessLogicError(
+                f"El camión {assigned_truck} ya tiene una ruta asignada para la fecha {delivery_date.isoformat()}"
+            )
+        return assigned_truck, delivery_date
+    
+    def create_route(self, route_data: dict, **sequence_options) -> Route:
         try:
-            if not route_data.get('assigned_truck'):
-                raise LogisticsValidationError("El campo 'assigned_truck' es obligatorio")
-            
-            if not route_data.get('delivery_date'):
-                raise LogisticsValidationError("El campo 'delivery_date' es obligatorio")
-            
-            assigned_truck = route_data['assigned_truck'].strip()
-            
-            if assigned_truck not in VALID_TRUCKS:
-                raise LogisticsValidationError(
-                    f"El camión '{assigned_truck}' no es válido. Camiones permitidos: {', '.join(VALID_TRUCKS)}"
-                )
-            
-            try:
-                if isinstance(route_data['delivery_date'], str):
-                    delivery_date = datetime.fromisoformat(route_data['delivery_date'].replace('Z', '+00:00')).date()
-                else:
-                    delivery_date = route_data['delivery_date']
-            except (ValueError, AttributeError) as e:
-                raise LogisticsValidationError("El formato de 'delivery_date' debe ser ISO 8601 válido (YYYY-MM-DD)")
-            
-            today = date.today()
-            tomorrow = today + timedelta(days=1)
-            
-            if delivery_date < tomorrow:
-                raise LogisticsValidationError(
-                    "La fecha de entrega debe ser a partir del día siguiente. No se puede el mismo día o días anteriores."
-                )
-            
-            existing_route = self.route_repository.get_route_by_truck_and_date(assigned_truck, delivery_date)
-            if existing_route:
-                raise LogisticsBusinessLogicError(
-                    f"El camión {assigned_truck} ya tiene una ruta asignada para la fecha {delivery_date.isoformat()}"
-                )
+            assigned_truck, delivery_date = self.validate_route_request(route_data)
             
             logger.info(f"Verificando pedidos para camión {assigned_truck} en fecha {delivery_date.isoformat()}")
             
@@ -67,19 +64,19 @@ class RouteService:
             orders = self.orders_integration.get_orders_by_truck_and_date(assigned_truck, delivery_date)
             orders_count = len(orders)
             
-            sequence_number = self.route_repository.get_next_sequence_number()
-            route_code = Route.generate_route_code(sequence_number)
+            stops, sequence_stats = self.snapshot_route_stops(orders, **sequence_options)
             
-            route = Route(
-                route_code=route_code,
-                assigned_truck=assigned_truck,
-                delivery_date=delivery_date,
-                orders_count=orders_count
-            )
-            
-            route.validate()
+            def insert(sequence_number: int) -> Route:
+                route = Route(
+                    route_code=Route.generate_route_code(sequence_number),
+                    assigned_truck=assigned_truck,
+                    delivery_date=delivery_date,
+                    orders_count=orders_count
+                )
+                route.validate()
+                return self.route_repository.create(route, stops=stops, sequence_stats=sequence_stats)
             
-            created_route = self.route_repository.create(route)
+            created_route = self._insert_with_route_codes(insert)
             logger.info(f"Ruta {created_route.route_code} creada exitosamente")
             
             return created_route
@@ -92,6 +89,189 @@ class RouteService:
             logger.error(f"Error inesperado al crear ruta: {str(e)}")
             raise LogisticsBusinessLogicError(f"Error al crear ruta: {str(e)}")
     
+    def create_routes_bulk(self, bulk_data: dict, max_workers: int = 5, **sequence_options) -> List[Dict[str, Any]]:
+        try:
+            if not bulk_data.get('delivery_date'):
+                raise LogisticsValidationError("El campo 'delivery_date' es obligatorio")
+            
+            delivery_date = self._parse_delivery_date(bulk_data['delivery_date'])
+            
+            trucks = bulk_data.get('trucks') or VALID_TRUCKS
+            if not isinstance(trucks, list) or not all(isinstance(truck, str) for truck in trucks):
+                raise LogisticsValidationError("El campo 'trucks' debe ser una lista de camiones")
+            trucks = list(dict.fromkeys(truck.strip() for truck in trucks))
+            
+            results: Dict[str, Dict[str, Any]] = {}
+            
+            def fail(truck: str, error: str):
+                results[truck] = {'assigned_truck': truck, 'success': False, 'error': error}
+            
+            for truck in trucks:
+                if truck not in VALID_TRUCKS:
+                    fail(truck, f"El camión '{truck}' no es válido. Camiones permitidos: {', '.join(VALID_TRUCKS)}")
+            
+            candidates = [truck for truck in trucks if truck not in results]
+            for truck in self.route_repository.get_trucks_with_routes(delivery_date, candidates):
+                fail(truck, f"El camión {truck} ya tiene una ruta asignada para la fecha {delivery_date.isoformat()}")
+            
+            candidates = [truck for truck in candidates if truck not in results]
+            orders_by_truck = self.orders_integration.get_orders_by_date(
+                delivery_date, candidates, max_workers=max_workers, return_exceptions=True
+            )
+            
+            eligible = []
+            for truck in candidates:
+                orders = orders_by_truck[truck]
+                if isinstance(orders, Exception):
+                    fail(truck, str(orders))
+                elif not orders:
+                    fail(truck, f"El camión {truck} no tiene pedidos asignados para la fecha {delivery_date.isoformat()}")
+                else:
+                    eligible.append((truck, orders))
+            
+            if eligible:
+                client_ids = list({
+                    client_id for _, orders in eligible for client_id in self._order_ids_by_client(orders)
+                })
+                clients = self.auth_integration.get_users_by_ids(client_ids) if client_ids else {}
+                snapshots = [
+                    self.snapshot_route_stops(orders, clients=clients, **sequence_options)
+                    for _, orders in eligible
+                ]
+                
+                def insert(sequence_number: int) -> List[Route]:
+                    routes = [
+                        Route(
+                            route_code=Route.generate_route_code(sequence_number + offset),
+                            assigned_truck=truck,
+                            delivery_date=delivery_date,
+                            orders_count=len(orders)
+                        )
+                        for offset, (truck, orders) in enumerate(eligible)
+                    ]
+                    for route in routes:
+                        route.validate()
+                    return self.route_repository.create_many(routes, snapshots=snapshots)
+                
+                try:
+                    created_routes = self._insert_with_route_codes(insert)
+                except Exception as e:
+                    logger.error(f"Error al insertar rutas en bloque: {str(e)}")
+                    for truck, _ in eligible:
+                        fail(truck, f"Error al crear ruta: {str(e)}")
+                else:
+                    for route in created_routes:
+                        results[route.assigned_truck] = {
+                            'assigned_truck': route.assigned_truck,
+                            'success': True,
+                            'route': route.to_dict()
+                        }
+                    logger.info(f"{len(created_routes)} rutas creadas en bloque para la fecha {delivery_date.isoformat()}")
+            
+            return [results[truck] for truck in trucks]
+            
+        except LogisticsValidationError:
+            raise
+        except Exception as e:
+            logger.error(f"Error inesperado al crear rutas en bloque: {str(e)}")
+            raise LogisticsBusinessLogicError(f"Error al crear rutas: {str(e)}")
+    
+    def validate_plan_request(self, plan_data: dict) -> Tuple[date, List[str]]:
+        if not plan_data.get('delivery_date'):
+            raise LogisticsValidationError("El campo 'delivery_date' es obligatorio")
+        
+        delivery_date = self._parse_delivery_date(plan_data['delivery_date'])
+        
+        trucks = plan_data.get('trucks') or VALID_TRUCKS
+        if not isinstance(trucks, list) or not all(isinstance(truck, str) for truck in trucks):
+            raise LogisticsValidationError("El campo 'trucks' debe ser una lista de camiones")
+        trucks = list(dict.fromkeys(truck.strip() for truck in trucks))
+        
+        invalid = [truck for truck in trucks if truck not in VALID_TRUCKS]
+        if invalid:
+            raise LogisticsValidationError(
+                f"Camiones no válidos: {', '.join(invalid)}. Camiones permitidos: {', '.join(VALID_TRUCKS)}"
+            )
+        return delivery_date, trucks
+    
+    def build_plan_stops(self, delivery_date: date, max_workers: int = 5) -> List[Dict[str, Any]]:
+        orders_by_truck = self.orders_integration.get_orders_by_date(delivery_date, VALID_TRUCKS, max_workers=max_workers)
+        
+        orders_by_client: Dict[Any, List[Any]] = {}
+        for orders in orders_by_truck.values():
+            for order in orders:
+                orders_by_client.setdefault(order.get('client_id'), []).append(order.get('id'))
+        
+        client_ids = [client_id for client_id in orders_by_client if client_id]
+        clients = self.auth_integration.get_users_by_ids(client_ids)
+        
+        stops = []
+        for client_id, order_ids in orders_by_client.items():
+            client = clients.get(client_id, {}) if client_id else {}
+            stops.append({
+                'client_id': client_id,
+                'name': client.get('name'),
+                'address': client.get('address'),
+                'latitude': client.get('latitude'),
+                'longitude': client.get('longitude'),
+                'orders': order_ids
+            })
+        return stops
+    
+    def plan_delivery_date(
+        self,
+        delivery_date: date,
+        trucks: List[str],
+        planner: Callable[..., Dict[str, Any]],
+        max_workers: int = 5,
+        on_progress: Optional[Callable[[str], None]] = None
+    ) -> Dict[str, Any]:
+        try:
+            if on_progress:
+                on_progress('fetching_orders')
+            stops = self.build_plan_stops(delivery_date, max_workers=max_workers)
+            
+            if on_progress:
+                on_progress('planning')
+            plan = planner(stops, trucks)
+            
+            logger.info(
+                f"Plan para {delivery_date.isoformat()}: {len(stops)} paradas en {len(trucks)} camiones, "
+                f"{plan['metrics']['total_distance_km']} km"
+            )
+            return {'delivery_date': delivery_date.isoformat(), **plan}
+            
+        except Exception as e:
+            logger.error(f"Error al planificar rutas: {str(e)}")
+            raise LogisticsBusinessLogicError(f"Error al planificar rutas: {str(e)}")
+    
+    def _insert_with_route_codes(self, insert: Callable[[int], Any]) -> Any:
+        for attempt in range(1, ROUTE_CODE_ATTEMPTS + 1):
+            try:
+                return insert(self.route_repository.get_next_sequence_number())
+            except LogisticsConflictError as e:
+                if attempt == ROUTE_CODE_ATTEMPTS:
+                    raise
+                logger.warning(f"Código de ruta en uso, reintentando ({attempt}/{ROUTE_CODE_ATTEMPTS}): {str(e)}")
+    
+    def _parse_delivery_date(self, value) -> date:
+        try:
+            if isinstance(value, str):
+                delivery_date = datetime.fromisoformat(value.replace('Z', '+00:00')).date()
+            else:
+                delivery_date = value
+        except (ValueError, AttributeError):
+            raise LogisticsValidationError("El formato de 'delivery_date' debe ser ISO 8601 válido (YYYY-MM-DD)")
+        
+        tomorrow = date.today() + timedelta(days=1)
+        
+        if delivery_date < tomorrow:
+            raise LogisticsValidationError(
+                "La fecha de entrega debe ser a partir del día siguiente. No se puede el mismo día o días anteriores."
+            )
+        
+        return delivery_date
+    
     def get_routes_paginated(
         self,
         page: int,
@@ -103,12 +283,7 @@ class RouteService:
         try:
             offset = (page - 1) * per_page
             
-            parsed_date = None
-            if delivery_date:
-                try:
-                    parsed_date = datetime.fromisoformat(delivery_date.replace('Z', '+00:00')).date()
-                except (ValueError, AttributeError):
-                    raise LogisticsValidationError("El formato de 'delivery_date' debe ser YYYY-MM-DD")
+            parsed_date = self._parse_filter_date(delivery_date)
             
             routes = self.route_repository.get_routes_paginated(
                 limit=per_page,
@@ -126,6 +301,33 @@ class RouteService:
             logger.error(f"Error al obtener rutas paginadas: {str(e)}")
             raise LogisticsBusinessLogicError(f"Error al obtener rutas: {str(e)}")
     
+    def get_route_summaries_paginated(
+        self,
+        page: int,
+        per_page: int,
+        route_code: Optional[str] = None,
+        assigned_truck: Optional[str] = None,
+        delivery_date: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        try:
+            parsed_date = self._parse_filter_date(delivery_date)
+            
+            rows = self.route_repository.get_route_rows_paginated(
+                limit=per_page,
+                offset=(page - 1) * per_page,
+                route_code=route_code,
+                assigned_truck=assigned_truck,
+                delivery_date=parsed_date
+            )
+            
+            return rows_to_dicts(rows)
+            
+        except LogisticsValidationError:
+            raise
+        except Exception as e:
+            logger.error(f"Error al obtener rutas paginadas: {str(e)}")
+            raise LogisticsBusinessLogicError(f"Error al obtener rutas: {str(e)}")
+    
     def count_routes(
         self,
         route_code: Optional[str] = None,
@@ -133,12 +335,7 @@ class RouteService:
         delivery_date: Optional[str] = None
     ) -> int:
         try:
-            parsed_date = None
-            if delivery_date:
-                try:
-                    parsed_date = datetime.fromisoformat(delivery_date.replace('Z', '+00:00')).date()
-                except (ValueError, AttributeError):
-                    raise LogisticsValidationError("El formato de 'delivery_date' debe ser YYYY-MM-DD")
+            parsed_date = self._parse_filter_date(delivery_date)
             
             return self.route_repository.count_routes(
                 route_code=route_code,
@@ -152,17 +349,179 @@ class RouteService:
             logger.error(f"Error al contar rutas: {str(e)}")
             raise LogisticsBusinessLogicError(f"Error al contar rutas: {str(e)}")
     
-    def get_route_with_clients(self, route_id: int) -> dict:
+    def get_routes_version(
+        self,
+        route_code: Optional[str] = None,
+        assigned_truck: Optional[str] = None,
+        delivery_date: Optional[str] = None
+    ) -> Tuple[int, Optional[datetime]]:
+        try:
+            parsed_date = self._parse_filter_date(delivery_date)
+            
+            return self.route_repository.get_routes_version(
+                route_code=route_code,
+                assigned_truck=assigned_truck,
+                delivery_date=parsed_date
+            )
+            
+        except LogisticsValidationError:
+            raise
+        except Exception as e:
+            logger.error(f"Error al obtener versión de rutas: {str(e)}")
+            raise LogisticsBusinessLogicError(f"Error al obtener versión de rutas: {str(e)}")
+    
+    def export_routes(
+        self,
+        route_code: Optional[str] = None,
+        assigned_truck: Optional[str] = None,
+        delivery_date: Optional[str] = None,
+        chunk_size: int = 1000
+    ) -> Iterator[List[Tuple]]:
+        parsed_date = self._parse_filter_date(delivery_date)
+        
+        return self.route_repository.stream_routes(
+            chunk_size=chunk_size,
+            route_code=route_code,
+            assigned_truck=assigned_truck,
+            delivery_date=parsed_date
+        )
+    
+    def purge_routes(
+        self,
+        batch_size: int,
+        before: Optional[date] = None,
+        on_progress: Optional[Callable[[int, int], None]] = None,
+        pause_seconds: float = 0.0
+    ) -> int:
+        total = self.route_repository.count_routes_before(before)
+        deleted = 0
+        if on_progress:
+            on_progress(deleted, total)
+        
+        while True:
+            batch_deleted = self.route_repository.delete_batch(batch_size, before)
+            deleted += batch_deleted
+            if on_progress and batch_deleted:
+                on_progress(deleted, total)
+            if batch_deleted < batch_size:
+                break
+            if pause_seconds:
+                time.sleep(pause_seconds)
+        
+        logger.info(f"Purga de rutas finalizada: {deleted} rutas eliminadas")
+        return deleted
+    
+    def _parse_filter_date(self, delivery_date: Optional[str], field: str = 'delivery_date') -> Optional[date]:
+        if not delivery_date:
+            return None
         try:
-            route = self.route_repository.get_by_id(route_id)
-            if not route:
+            return datetime.fromisoformat(delivery_date.replace('Z', '+00:00')).date()
+        except (ValueError, AttributeError):
+            raise LogisticsValidationError(f"El formato de '{field}' debe ser YYYY-MM-DD")
+    
+    def _parse_date_range(self, date_from: Optional[str], date_to: Optional[str]) -> Tuple[Optional[date], Optional[date]]:
+        parsed_from = self._parse_filter_date(date_from, 'delivery_date_from')
+        parsed_to = self._parse_filter_date(date_to, 'delivery_date_to')
+        if parsed_from and parsed_to and parsed_from > parsed_to:
+            raise LogisticsValidationError("'delivery_date_from' no puede ser posterior a 'delivery_date_to'")
+        return parsed_from, parsed_to
+    
+    def get_client_routes(
+        self,
+        client_id: str,
+        delivery_date_from: Optional[str] = None,
+        delivery_date_to: Optional[str] = None,
+        limit: int = 20
+    ) -> List[Dict[str, Any]]:
+        try:
+            date_from, date_to = self._parse_date_range(delivery_date_from, delivery_date_to)
+            rows = self.route_repository.get_routes_by_client(client_id, date_from, date_to, limit)
+            return [{**row_to_dict(row[:-1]), 'sequence': row[-1]} for row in rows]
+            
+        except LogisticsValidationError:
+            raise
+        except Exception as e:
+            logger.error(f"Error al obtener rutas del cliente: {str(e)}")
+            raise LogisticsBusinessLogicError(f"Error al obtener rutas del cliente: {str(e)}")
+    
+    def get_order_route(
+        self,
+        order_id: str,
+        delivery_date_from: Optional[str] = None,
+        delivery_date_to: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        try:
+            date_from, date_to = self._parse_date_range(delivery_date_from, delivery_date_to)
+            row = self.route_repository.get_route_by_order(order_id, date_from, date_to)
+            if row is None:
+                return None
+            return {**row_to_dict(row[:-2]), 'client_id': row[-2], 'sequence': row[-1]}
+            
+        except LogisticsValidationError:
+            raise
+        except Exception as e:
+            logger.error(f"Error al obtener ruta del pedido: {str(e)}")
+            raise LogisticsBusinessLogicError(f"Error al obtener ruta del pedido: {str(e)}")
+    
+    def get_route_with_clients(self, route_id: int, **sequence_options) -> dict:
+        route, stored_data = self.load_stored_route(route_id)
+        if stored_data is not None:
+            return stored_data
+        orders = self.load_route_orders(route)
+        return self.build_route_with_clients(route, orders, **sequence_options)
+    
+    def load_stored_route(self, route_id: int) -> Tuple[Route, Optional[dict]]:
+        try:
+            stored = self.route_repository.get_route_with_stops(route_id)
+            if not stored:
                 raise LogisticsBusinessLogicError("Ruta no encontrada")
             
-            delivery_date = route.delivery_date
-            assigned_truck = route.assigned_truck
+            route, stops, total_distance_km = stored
+            if not stops:
+                return route, None
             
-            orders = self.orders_integration.get_orders_by_truck_and_date(assigned_truck, delivery_date)
+            clients_list = [
+                {
+                    'id': stop['client_id'],
+                    'name': stop['name'],
+                    'email': stop['email'],
+                    'address': stop['address'],
+                    'phone': stop['phone'],
+                    'latitude': stop['latitude'],
+                    'longitude': stop['longitude'],
+                    'sequence': stop['sequence']
+                }
+                for stop in stops
+            ]
+            return route, {
+                'route': route.to_dict(),
+                'clients': clients_list,
+                'total_distance_km': total_distance_km or 0.0
+            }
             
+        except LogisticsBusinessLogicError:
+            raise
+        except Exception as e:
+            logger.error(f"Error al obtener ruta con paradas: {str(e)}")
+            raise LogisticsBusinessLogicError(f"Error al obtener ruta con clientes: {str(e)}")
+    
+    def load_route_orders(self, route: Route) -> List[dict]:
+        try:
+            return self.orders_integration.get_orders_by_truck_and_date(route.assigned_truck, route.delivery_date)
+        except Exception as e:
+            logger.error(f"Error al obtener ruta con clientes: {str(e)}")
+            raise LogisticsBusinessLogicError(f"Error al obtener ruta con clientes: {str(e)}")
+    
+    def build_route_with_clients(
+        self,
+        route: Route,
+        orders: List[dict],
+        depot: Optional[Tuple[float, float]] = None,
+        return_to_depot: bool = True,
+        time_limit_ms: float = 50.0,
+        distance_cache: Optional[DistanceCache] = None
+    ) -> dict:
+        try:
             client_ids = set()
             for order in orders:
                 if order.get('client_id'):
@@ -182,14 +541,153 @@ class RouteService:
                     'longitude': user_data.get('longitude')
                 })
             
+            clients_list, total_distance_km = sequence_clients(
+                clients_list, depot, return_to_depot, time_limit_ms, distance_cache
+            )
+            
             return {
                 'route': route.to_dict(),
-                'clients': clients_list
+                'clients': clients_list,
+                'total_distance_km': total_distance_km
             }
             
-        except LogisticsBusinessLogicError:
-            raise
         except Exception as e:
             logger.error(f"Error al obtener ruta con clientes: {str(e)}")
             raise LogisticsBusinessLogicError(f"Error al obtener ruta con clientes: {str(e)}")
+    
+    def reoptimize_route(
+        self,
+        route_id: int,
+        depot: Optional[Tuple[float, float]] = None,
+        return_to_depot: bool = True,
+        time_limit_ms: float = 50.0,
+        distance_cache: Optional[DistanceCache] = None,
+        max_degradation: float = 0.2,
+        refresh_clients: bool = False
+    ) -> Dict[str, Any]:
+        try:
+            route = self.route_repository.get_by_id(route_id)
+            if not route:
+                raise LogisticsNotFoundError("Ruta no encontrada")
+            
+            orders = self.orders_integration.get_orders_by_truck_and_date(route.assigned_truck, route.delivery_date)
+            order_ids_by_client = self._order_ids_by_client(orders)
+            
+            stored_stops, sequence_stats = self.route_repository.get_route_stops(route_id)
+            stored_ids = {stop['client_id'] for stop in stored_stops if stop['sequence'] is not None}
+            fetch_ids = [
+                client_id for client_id in order_ids_by_client
+                if refresh_clients or client_id not in stored_ids
+            ]
+            clients = self.auth_integration.get_users_by_ids(fetch_ids) if fetch_ids else {}
+            
+            removed_ids = set()
+            current_stops = []
+            for stop in stored_stops:
+                client_id = stop['client_id']
+                client = clients.get(client_id)
+                if client_id not in stored_ids or client_id not in order_ids_by_client:
+                    removed_ids.add(client_id)
+                elif client and client_coordinates(client) != client_coordinates(stop):
+                    removed_ids.add(client_id)
+                elif client:
+                    current_stops.append(client_stop(client_id, client, order_ids_by_client[client_id]))
+                else:
+                    current_stops.append({**stop, 'order_ids': order_ids_by_client[client_id]})
+            
+            kept_ids = {stop['client_id'] for stop in current_stops}
+            added_stops = [
+                client_stop(client_id, clients.get(client_id), order_ids)
+                for client_id, order_ids in order_ids_by_client.items()
+                if client_id not in kept_ids
+            ]
+            
+            baseline = None
+            if sequence_stats and stored_stops:
+                baseline = (sequence_stats['baseline_distance_km'], sequence_stats['baseline_stops'])
+            
+            result = update_stop_sequence(
+                current_stops + [stop for stop in stored_stops if stop['client_id'] in removed_ids],
+                added_stops,
+                removed_ids,
+                baseline,
+                depot, return_to_depot, time_limit_ms, max_degradation, distance_cache
+            )
+            incremental = result['mode'] == MODE_INCREMENTAL
+            incremental_updates = (sequence_stats or {}).get('incremental_updates', 0) + 1 if incremental else 0
+            
+            self.route_repository.replace_route_stops(
+                route_id,
+                result['stops'],
+                sequence_stats_from(result, incremental_updates),
+                orders_count=len(orders)
+            )
+            metrics.increment(f"route_reoptimization.{result['mode']}")
+            
+            logger.info(
+                f"Ruta {route.route_code} reoptimizada ({result['mode']}): +{result['inserted']} -{result['removed']} paradas, "
+                f"{result['distance_km']} km, degradación {result['degradation']}"
+            )
+            route.orders_count = len(orders)
+            return {'route': route.to_dict(), **result, 'incremental_updates': incremental_updates}
+            
+        except (LogisticsNotFoundError, LogisticsBusinessLogicError):
+            raise
+        except Exception as e:
+            logger.error(f"Error al reoptimizar ruta: {str(e)}")
+            raise LogisticsBusinessLogicError(f"Error al reoptimizar ruta: {str(e)}")
+    
+    def refresh_route(self, route_id: int, **sequence_options) -> Dict[str, Any]:
+        return self.reoptimize_route(route_id, refresh_clients=True, **sequence_options)
+    
+    def snapshot_route_stops(
+        self,
+        orders: List[dict],
+        depot: Optional[Tuple[float, float]] = None,
+        return_to_depot: bool = True,
+        time_limit_ms: float = 50.0,
+        distance_cache: Optional[DistanceCache] = None,
+        clients: Optional[Dict[str, Dict[str, Any]]] = None
+    ) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+        order_ids_by_client = self._order_ids_by_client(orders)
+        if clients is None:
+            clients = self.auth_integration.get_users_by_ids(list(order_ids_by_client)) if order_ids_by_client else {}
+        
+        stops = [
+            client_stop(client_id, clients.get(client_id), order_ids)
+            for client_id, order_ids in order_ids_by_client.items()
+        ]
+        result = update_stop_sequence(
+            [], stops, [], None, depot, return_to_depot, time_limit_ms, distance_cache=distance_cache
+        )
+        return result['stops'], sequence_stats_from(result, 0)
+    
+    def _order_ids_by_client(self, orders: List[dict]) -> Dict[str, List[Any]]:
+        order_ids_by_client: Dict[str, List[Any]] = {}
+        for order in orders:
+            if order.get('client_id'):
+                order_ids_by_client.setdefault(str(order['client_id']), []).append(order.get('id'))
+        return order_ids_by_client
+
+
+def client_stop(client_id: str, client: Optional[Dict[str, Any]], order_ids: List[Any]) -> Dict[str, Any]:
+    client = client or {}
+    return {
+        'client_id': client_id,
+        'name': client.get('name'),
+        'email': client.get('email'),
+        'phone': client.get('phone'),
+        'address': client.get('address'),
+        'latitude': client.get('latitude'),
+        'longitude': client.get('longitude'),
+        'order_ids': [order_id for order_id in order_ids if order_id is not None]
+    }
+
 
+def sequence_stats_from(result: Dict[str, Any], incremental_updates: int) -> Dict[str, Any]:
+    return {
+        'distance_km': result['distance_km'],
+        'baseline_distance_km': result['baseline_distance_km'],
+        'baseline_stops': result['baseline_stops'],
+        'incremental_updates': incremental_updates
+    }
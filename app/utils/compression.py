@@ -0,0 +1,107 @@
+import gzip
+import zlib
+from typing import Iterable, Iterator, Optional
+from flask import Flask, Response, request
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+GZIP = 'gzip'
+BROTLI = 'br'
+
+SKIPPED_STATUSES = (204, 206, 304)
+
+
+def supported_encodings() -> tuple:
+    return (BROTLI, GZIP) if brotli is not None else (GZIP,)
+
+
+def negotiate_encoding(accept_encoding) -> Optional[str]:
+    best, best_quality = None, 0
+    for encoding in supported_encodings():
+        quality = accept_encoding.quality(encoding)
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def compress_body(data: bytes, encoding: str, level: int, brotli_quality: int) -> bytes:
+    if encoding == BROTLI:
+        return brotli.compress(data, quality=brotli_quality)
+    return gzip.compress(data, compresslevel=level, mtime=0)
+
+
+def compress_stream(chunks: Iterable[bytes], encoding: str, level: int, brotli_quality: int) -> Iterator[bytes]:
+    if encoding == BROTLI:
+        compressor = brotli.Compressor(quality=brotli_quality)
+        compress, flush, finish = compressor.process, compressor.flush, compressor.finish
+    else:
+        compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        compress = compressor.compress
+        flush = lambda: compressor.flush(zlib.Z_SYNC_FLUSH)
+        finish = compressor.flush
+
+    try:
+        for chunk in chunks:
+            if not chunk:
+                continue
+            if isinstance(chunk, str):
+                chunk = chunk.encode('utf-8')
+            data = compress(chunk) + flush()
+            if data:
+                yield data
+        yield finish()
+    finally:
+        if hasattr(chunks, 'close'):
+            chunks.close()
+
+
+def encoded_etag(etag: str, encoding: str) -> str:
+    weak = etag.startswith('W/')
+    tag = etag[2:] if weak else etag
+    tag = f'"{tag.strip(chr(34))}-{encoding}"'
+    return f'W/{tag}' if weak else tag
+
+
+def configure_compression(app: Flask, config) -> None:
+    if not config.COMPRESSION_ENABLED:
+        return
+
+    mimetypes = set(config.COMPRESSION_MIMETYPES)
+    min_size = config.COMPRESSION_MIN_SIZE
+    level = config.COMPRESSION_LEVEL
+    brotli_quality = config.COMPRESSION_BROTLI_QUALITY
+
+    @app.after_request
+    def compress_response(response: Response) -> Response:
+        if response.mimetype not in mimetypes:
+            return response
+        response.vary.add('Accept-Encoding')
+
+        if (
+            response.status_code < 200
+            or response.status_code in SKIPPED_STATUSES
+            or 'Content-Encoding' in response.headers
+            or request.method == 'HEAD'
+        ):
+            return response
+
+        encoding = negotiate_encoding(request.accept_encodings)
+        if encoding is None:
+            return response
+
+        if response.is_streamed:
+            response.response = compress_stream(response.response, encoding, level, brotli_quality)
+            response.headers.pop('Content-Length', None)
+        else:
+            data = response.get_data()
+            if len(data) < min_size:
+                return response
+            response.set_data(compress_body(data, encoding, level, brotli_quality))
+
+        response.headers['Content-Encoding'] = encoding
+        if 'ETag' in response.headers:
+            response.headers['ETag'] = encoded_etag(response.headers['ETag'], encoding)
+        return response
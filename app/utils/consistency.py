@@ -0,0 +1,19 @@
+from typing import Dict
+from flask import request
+from werkzeug.http import dump_cookie
+
+READ_YOUR_WRITES_COOKIE = 'logistics_read_primary'
+
+
+def read_your_writes_active() -> bool:
+    return READ_YOUR_WRITES_COOKIE in request.cookies
+
+
+def read_your_writes_headers(enabled: bool, seconds: int) -> Dict[str, str]:
+    if not enabled or seconds <= 0:
+        return {}
+    return {
+        'Set-Cookie': dump_cookie(
+            READ_YOUR_WRITES_COOKIE, '1', max_age=seconds, path='/logistics', httponly=True, samesite='Lax'
+        )
+    }
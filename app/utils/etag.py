@@ -0,0 +1,28 @@
+import hashlib
+from typing import Any, Iterable, Optional
+from flask import request
+
+ENCODING_SUFFIXES = ('gzip', 'br')
+
+
+def compute_etag(*parts: Any) -> str:
+    digest = hashlib.sha1('|'.join('' if part is None else str(part) for part in parts).encode('utf-8'))
+    return f'"{digest.hexdigest()}"'
+
+
+def orders_fingerprint(orders: Iterable[dict]) -> str:
+    keys = sorted(f"{order.get('id')}:{order.get('client_id')}" for order in orders)
+    return hashlib.sha1(','.join(keys).encode('utf-8')).hexdigest()
+
+
+def etag_matches(etag: Optional[str]) -> bool:
+    if not etag:
+        return False
+    if_none_match = request.if_none_match
+    if not if_none_match:
+        return False
+    tag = etag.strip('"')
+    return any(
+        if_none_match.contains_weak(candidate)
+        for candidate in (tag, *(f"{tag}-{suffix}" for suffix in ENCODING_SUFFIXES))
+    )
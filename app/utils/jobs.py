@@ -0,0 +1,186 @@
+import logging
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, Optional
+from ..repositories.job_repository import JobRepository
+
+logger = logging.getLogger(__name__)
+
+JOB_PENDING = 'pending'
+JOB_RUNNING = 'running'
+JOB_COMPLETED = 'completed'
+JOB_FAILED = 'failed'
+
+BACKEND_THREAD = 'thread'
+BACKEND_INLINE = 'inline'
+JOB_BACKENDS = (BACKEND_THREAD, BACKEND_INLINE)
+
+
+class JobQueueFullError(Exception):
+    pass
+
+
+class Job:
+    def __init__(self, kind: str):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.status = JOB_PENDING
+        self.progress: Dict[str, Any] = {}
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self.created_at = datetime.utcnow()
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+        self._on_progress: Optional[Callable[['Job'], None]] = None
+
+    @classmethod
+    def restore(cls, data: Dict[str, Any]) -> 'Job':
+        job = cls(data['kind'])
+        job.id = data['id']
+        job.status = data['status']
+        job.progress = data['progress'] or {}
+        job.result = data['result']
+        job.error = data['error']
+        job.created_at = data['created_at']
+        job.started_at = data['started_at']
+        job.finished_at = data['finished_at']
+        if job.status in (JOB_COMPLETED, JOB_FAILED):
+            job._done.set()
+        return job
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        return self._done.wait(timeout)
+
+    def update_progress(self, **progress) -> None:
+        with self._lock:
+            self.progress.update(progress)
+        if self._on_progress is not None:
+            self._on_progress(self)
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'id': self.id,
+                'kind': self.kind,
+                'status': self.status,
+                'progress': dict(self.progress),
+                'result': self.result,
+                'error': self.error,
+                'created_at': self.created_at.isoformat(),
+                'started_at': self.started_at.isoformat() if self.started_at else None,
+                'finished_at': self.finished_at.isoformat() if self.finished_at else None
+            }
+
+
+class JobManager:
+    def __init__(
+        self,
+        max_workers: int = 1,
+        max_retained_jobs: int = 100,
+        max_queue_depth: Optional[int] = None,
+        backend: str = BACKEND_THREAD,
+        session_factory: Optional[Callable[[], Any]] = None
+    ):
+        if backend not in JOB_BACKENDS:
+            raise ValueError(f"Backend de tareas no soportado: {backend}. Backends permitidos: {', '.join(JOB_BACKENDS)}")
+        self.max_workers = max_workers
+        self.max_retained_jobs = max_retained_jobs
+        self.max_queue_depth = max_queue_depth
+        self.backend = backend
+        self._jobs: 'OrderedDict[str, Job]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._session_factory = session_factory
+
+    def submit(self, kind: str, func: Callable[..., Any], *args, **kwargs) -> Job:
+        job = Job(kind)
+        with self._lock:
+            if self.max_queue_depth is not None and self._active_count() >= self.max_queue_depth:
+                raise JobQueueFullError(f"La cola de tareas {kind} está llena ({self.max_queue_depth} en curso)")
+            self._jobs[job.id] = job
+            self._evict_finished()
+        if self._session_factory is not None:
+            try:
+                with self._repository() as repository:
+                    repository.create(job.id, job.kind, job.status, job.created_at)
+                    repository.prune(kind, self.max_retained_jobs, (JOB_COMPLETED, JOB_FAILED))
+            except Exception:
+                with self._lock:
+                    self._jobs.pop(job.id, None)
+                raise
+            job._on_progress = lambda changed: self._persist(changed, progress=changed.to_dict()['progress'])
+
+        if self.backend == BACKEND_INLINE:
+            self._run(job, func, args, kwargs)
+            return job
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='logistics-job')
+            self._executor.submit(self._run, job, func, args, kwargs)
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is not None or self._session_factory is None:
+            return job
+        with self._repository() as repository:
+            data = repository.get(job_id)
+        return Job.restore(data) if data else None
+
+    def _run(self, job: Job, func: Callable[..., Any], args, kwargs) -> None:
+        job.status = JOB_RUNNING
+        job.started_at = datetime.utcnow()
+        self._persist(job, status=job.status, started_at=job.started_at)
+        try:
+            job.result = func(job, *args, **kwargs)
+            job.status = JOB_COMPLETED
+        except Exception as e:
+            logger.error(f"Error en tarea {job.kind} {job.id}: {str(e)}")
+            job.error = str(e)
+            job.status = JOB_FAILED
+        finally:
+            job.finished_at = datetime.utcnow()
+            data = job.to_dict()
+            self._persist(
+                job,
+                status=job.status,
+                progress=data['progress'],
+                result=job.result,
+                error=job.error,
+                finished_at=job.finished_at
+            )
+            job._done.set()
+
+    def _persist(self, job: Job, **fields) -> None:
+        if self._session_factory is None:
+            return
+        try:
+            with self._repository() as repository:
+                repository.update(job.id, **fields)
+        except Exception as e:
+            logger.error(f"Error al guardar el estado de la tarea {job.kind} {job.id}: {str(e)}")
+
+    @contextmanager
+    def _repository(self) -> Iterator[JobRepository]:
+        session = self._session_factory()
+        try:
+            yield JobRepository(session)
+        finally:
+            session.close()
+
+    def _active_count(self) -> int:
+        return sum(1 for job in self._jobs.values() if job.status in (JOB_PENDING, JOB_RUNNING))
+
+    def _evict_finished(self) -> None:
+        excess = len(self._jobs) - self.max_retained_jobs
+        if excess <= 0:
+            return
+        for job_id in [job_id for job_id, job in self._jobs.items() if job.status in (JOB_COMPLETED, JOB_FAILED)][:excess]:
+            del self._jobs[job_id]
@@ -0,0 +1,35 @@
+import threading
+from typing import Callable, Dict
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._counters: Dict[str, int] = {}
+        self._gauges: Dict[str, Callable[[], float]] = {}
+        self._lock = threading.Lock()
+    
+    def increment(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + amount
+    
+    def register_gauge(self, name: str, read: Callable[[], float]) -> None:
+        with self._lock:
+            self._gauges[name] = read
+    
+    def snapshot(self) -> Dict[str, float]:
+        with self._lock:
+            values = dict(self._counters)
+            gauges = dict(self._gauges)
+        for name, read in gauges.items():
+            try:
+                values[name] = read()
+            except Exception:
+                values[name] = None
+        return dict(sorted(values.items()))
+    
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+
+
+metrics = MetricsRegistry()
@@ -0,0 +1,46 @@
+import csv
+import io
+import json
+import logging
+from typing import Iterable, Iterator, List, Tuple
+from .route_serializer import ROUTE_FIELDS, serialize_row, row_to_dict
+
+logger = logging.getLogger(__name__)
+
+EXPORT_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv'
+}
+
+
+def ndjson_chunks(partitions: Iterable[List[Tuple]]) -> Iterator[str]:
+    dumps = json.dumps
+    for partition in partitions:
+        yield ''.join(dumps(row_to_dict(row), ensure_ascii=False) + '\n' for row in partition)
+
+
+def csv_chunks(partitions: Iterable[List[Tuple]]) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(ROUTE_FIELDS)
+    yield buffer.getvalue()
+
+    for partition in partitions:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(serialize_row(row) for row in partition)
+        yield buffer.getvalue()
+
+
+def export_chunks(partitions: Iterable[List[Tuple]], export_format: str, on_close=None) -> Iterator[bytes]:
+    chunks = ndjson_chunks(partitions) if export_format == 'ndjson' else csv_chunks(partitions)
+    try:
+        for chunk in chunks:
+            if chunk:
+                yield chunk.encode('utf-8')
+    except Exception as e:
+        logger.error(f"Error durante la exportación de rutas: {str(e)}")
+        raise
+    finally:
+        if on_close:
+            on_close()
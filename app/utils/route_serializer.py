@@ -0,0 +1,40 @@
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, List, Tuple
+
+ROUTE_FIELDS = ('id', 'route_code', 'assigned_truck', 'delivery_date', 'orders_count', 'created_at', 'updated_at')
+
+
+def _iso(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+
+def serialize_row(row: Tuple) -> Tuple:
+    route_id, route_code, assigned_truck, delivery_date, orders_count, created_at, updated_at = row
+    return (
+        route_id,
+        route_code,
+        assigned_truck,
+        _iso(delivery_date),
+        orders_count,
+        _iso(created_at),
+        _iso(updated_at)
+    )
+
+
+def row_to_dict(row: Tuple) -> Dict[str, Any]:
+    route_id, route_code, assigned_truck, delivery_date, orders_count, created_at, updated_at = row
+    return {
+        'id': route_id,
+        'route_code': route_code,
+        'assigned_truck': assigned_truck,
+        'delivery_date': _iso(delivery_date),
+        'orders_count': orders_count,
+        'created_at': created_at.isoformat() if created_at else None,
+        'updated_at': updated_at.isoformat() if updated_at else None
+    }
+
+
+def rows_to_dicts(rows: Iterable[Tuple]) -> List[Dict[str, Any]]:
+    return [row_to_dict(row) for row in rows]
@@ -0,0 +1,375 @@
+import argparse
+import itertools
+import json
+import os
+import platform
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import requests
+
+from .simulator import Simulator, SimulatorServer, load_document
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+VALID_TRUCKS = ["CAM-001", "CAM-002", "CAM-003", "CAM-004", "CAM-005"]
+
+SCENARIOS = ['create', 'list', 'detail']
+
+METRICS_LOWER_IS_BETTER = ['p50_ms', 'p95_ms', 'p99_ms']
+METRICS_HIGHER_IS_BETTER = ['throughput_rps']
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(round(pct / 100.0 * len(sorted_values) + 0.5)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def summarize(latencies_ms: List[float], errors: int, elapsed: float) -> Dict[str, Any]:
+    ordered = sorted(latencies_ms)
+    total = len(ordered)
+    return {
+        'requests': total,
+        'errors': errors,
+        'error_rate': round(errors / total, 4) if total else 0.0,
+        'elapsed_s': round(elapsed, 3),
+        'throughput_rps': round(total / elapsed, 2) if elapsed > 0 else 0.0,
+        'mean_ms': round(sum(ordered) / total, 3) if total else 0.0,
+        'p50_ms': round(percentile(ordered, 50), 3),
+        'p95_ms': round(percentile(ordered, 95), 3),
+        'p99_ms': round(percentile(ordered, 99), 3),
+        'max_ms': round(ordered[-1], 3) if ordered else 0.0
+    }
+
+
+def drive(request_fn: Callable[[requests.Session, int], requests.Response], total: int, concurrency: int) -> Dict[str, Any]:
+    latencies_ms: List[float] = []
+    errors = 0
+    lock = threading.Lock()
+    counter = itertools.count()
+
+    def worker():
+        nonlocal errors
+        session = requests.Session()
+        local_latencies = []
+        local_errors = 0
+        while True:
+            index = next(counter)
+            if index >= total:
+                break
+            started = time.perf_counter()
+            try:
+                response = request_fn(session, index)
+                failed = response.status_code >= 400
+            except requests.exceptions.RequestException:
+                failed = True
+            local_latencies.append((time.perf_counter() - started) * 1000.0)
+            local_errors += int(failed)
+        session.close()
+        with lock:
+            latencies_ms.extend(local_latencies)
+            errors += local_errors
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for _ in range(concurrency):
+            executor.submit(worker)
+    elapsed = time.perf_counter() - started
+
+    return summarize(latencies_ms, errors, elapsed)
+
+
+class RouteWorkload:
+    def __init__(self, base_url: str, start_date: date):
+        self.base_url = base_url.rstrip('/')
+        self.start_date = start_date
+        self.created_ids: List[int] = []
+        self._slots = itertools.count()
+        self._lock = threading.Lock()
+
+    def create(self, session: requests.Session, index: int) -> requests.Response:
+        with self._lock:
+            slot = next(self._slots)
+        payload = {
+            'assigned_truck': VALID_TRUCKS[slot % len(VALID_TRUCKS)],
+            'delivery_date': (self.start_date + timedelta(days=slot // len(VALID_TRUCKS))).isoformat()
+        }
+        response = session.post(f"{self.base_url}/logistics/routes", json=payload, timeout=30)
+        if response.status_code == 201:
+            with self._lock:
+                self.created_ids.append(response.json()['data']['id'])
+        return response
+
+    def list(self, session: requests.Session, index: int) -> requests.Response:
+        params = {
+            'page': 1 + index % 3,
+            'per_page': 20,
+            'assigned_truck': VALID_TRUCKS[index % len(VALID_TRUCKS)]
+        }
+        if index % 4 == 0:
+            params['delivery_date'] = (self.start_date + timedelta(days=index % 10)).isoformat()
+        return session.get(f"{self.base_url}/logistics/routes", params=params, timeout=30)
+
+    def detail(self, session: requests.Session, index: int) -> requests.Response:
+        route_id = self.created_ids[index % len(self.created_ids)]
+        return session.get(f"{self.base_url}/logistics/routes/{route_id}", timeout=30)
+
+    def discover_route_ids(self) -> None:
+        if self.created_ids:
+            return
+        response = requests.get(f"{self.base_url}/logistics/routes", params={'per_page': 100}, timeout=30)
+        if response.status_code == 200:
+            self.created_ids = [route['id'] for route in response.json()['data']['routes']]
+
+
+def free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def wait_until_ready(base_url: str, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if requests.get(f"{base_url}/logistics/ping", timeout=1).status_code == 200:
+                return
+        except requests.exceptions.RequestException:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"La aplicación no respondió en {base_url} tras {timeout} segundos")
+
+
+def start_app(database_url: str, orders_url: str, auth_url: str) -> Tuple[subprocess.Popen, str]:
+    port = free_port()
+    env = dict(os.environ)
+    env.update({
+        'DATABASE_URL': database_url,
+        'ORDERS_SERVICE_URL': orders_url,
+        'AUTH_SERVICE_URL': auth_url,
+        'HOST': '127.0.0.1',
+        'PORT': str(port),
+        'DEBUG': 'False',
+        'FLASK_ENV': 'production'
+    })
+    process = subprocess.Popen(
+        [sys.executable, 'app.py'],
+        cwd=PROJECT_ROOT,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        wait_until_ready(base_url)
+    except RuntimeError:
+        process.terminate()
+        raise
+    return process, base_url
+
+
+def build_scenario(args: argparse.Namespace) -> Dict[str, Any]:
+    if args.scenario:
+        return load_document(args.scenario)
+
+    def latency(base_ms: float) -> Dict[str, Any]:
+        if args.jitter_ms:
+            return {'distribution': 'uniform', 'min_ms': base_ms, 'max_ms': base_ms + args.jitter_ms}
+        return {'distribution': 'constant', 'ms': base_ms}
+
+    return {
+        'seed': args.seed,
+        'orders': {
+            'latency': latency(args.orders_latency_ms),
+            'payload': {'orders_min': args.orders_per_route, 'orders_max': args.orders_per_route}
+        },
+        'auth': {'latency': latency(args.auth_latency_ms)}
+    }
+
+
+def run_benchmark(args: argparse.Namespace) -> Dict[str, Any]:
+    servers = []
+    process = None
+    workdir = None
+
+    try:
+        if args.target_url:
+            base_url = args.target_url
+        else:
+            fixtures = load_document(args.fixtures) if args.fixtures else None
+            simulator = Simulator(build_scenario(args), fixtures=fixtures)
+            server = SimulatorServer(simulator).start()
+            servers = [server]
+
+            database_url = args.database_url
+            if not database_url:
+                workdir = tempfile.TemporaryDirectory(prefix='logistics-bench-')
+                database_url = f"sqlite:///{os.path.join(workdir.name, 'bench.db')}"
+
+            process, base_url = start_app(database_url, server.url, server.url)
+
+        workload = RouteWorkload(base_url, date.today() + timedelta(days=args.start_offset_days))
+        results: Dict[str, Any] = {}
+
+        for scenario in args.scenarios:
+            if scenario == 'detail':
+                workload.discover_route_ids()
+                if not workload.created_ids:
+                    print("Sin rutas disponibles para el escenario 'detail', se omite", file=sys.stderr)
+                    continue
+
+            request_fn = getattr(workload, scenario)
+            for concurrency in args.concurrency:
+                if args.warmup:
+                    drive(request_fn, args.warmup, concurrency)
+                summary = drive(request_fn, args.requests, concurrency)
+                summary['scenario'] = scenario
+                summary['concurrency'] = concurrency
+                results[f"{scenario}@{concurrency}"] = summary
+                print(
+                    f"{scenario:<8} c={concurrency:<4} {summary['throughput_rps']:>9.1f} req/s  "
+                    f"p50={summary['p50_ms']:.1f}ms p95={summary['p95_ms']:.1f}ms p99={summary['p99_ms']:.1f}ms  "
+                    f"errores={summary['errors']}"
+                )
+
+        return {
+            'metadata': {
+                'generated_at': datetime.utcnow().isoformat(),
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'target_url': args.target_url,
+                'database_url': args.database_url or 'sqlite (temporal)',
+                'requests_per_level': args.requests,
+                'downstream_scenario': args.scenario or build_scenario(args)
+            },
+            'results': results
+        }
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait(timeout=10)
+        for server in servers:
+            server.stop()
+        if workdir is not None:
+            workdir.cleanup()
+
+
+def compare_results(
+    baseline: Dict[str, Any],
+    current: Dict[str, Any],
+    threshold: float,
+    error_tolerance: float = 0.01
+) -> List[Dict[str, Any]]:
+    regressions = []
+    for key, current_summary in current.get('results', {}).items():
+        baseline_summary = baseline.get('results', {}).get(key)
+        if not baseline_summary:
+            continue
+
+        for metric in METRICS_LOWER_IS_BETTER:
+            before, after = baseline_summary.get(metric, 0), current_summary.get(metric, 0)
+            if after > before * (1 + threshold):
+                regressions.append({'case': key, 'metric': metric, 'baseline': before, 'current': after})
+
+        for metric in METRICS_HIGHER_IS_BETTER:
+            before, after = baseline_summary.get(metric, 0), current_summary.get(metric, 0)
+            if after < before * (1 - threshold):
+                regressions.append({'case': key, 'metric': metric, 'baseline': before, 'current': after})
+
+        before, after = baseline_summary.get('error_rate', 0), current_summary.get('error_rate', 0)
+        if after > before + error_tolerance:
+            regressions.append({'case': key, 'metric': 'error_rate', 'baseline': before, 'current': after})
+
+    return regressions
+
+
+def report_regressions(regressions: List[Dict[str, Any]], threshold: float) -> int:
+    if not regressions:
+        print(f"Sin regresiones (umbral {threshold:.0%})")
+        return 0
+
+    print(f"Regresiones detectadas (umbral {threshold:.0%}):")
+    for regression in regressions:
+        print(f"  {regression['case']:<14} {regression['metric']:<15} {regression['baseline']} -> {regression['current']}")
+    return 1
+
+
+def load_json(path: str) -> Dict[str, Any]:
+    with open(path, encoding='utf-8') as handle:
+        return json.load(handle)
+
+
+def parse_int_list(value: str) -> List[int]:
+    return [int(item) for item in value.split(',') if item.strip()]
+
+
+def parse_scenarios(value: str) -> List[str]:
+    scenarios = [item.strip() for item in value.split(',') if item.strip()]
+    invalid = [scenario for scenario in scenarios if scenario not in SCENARIOS]
+    if invalid:
+        raise argparse.ArgumentTypeError(f"Escenarios no válidos: {', '.join(invalid)}")
+    return scenarios
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Benchmark de la API de logística")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = subparsers.add_parser('run', help="Ejecuta el benchmark y guarda los resultados en JSON")
+    run_parser.add_argument('--output', default='benchmark-results.json')
+    run_parser.add_argument('--database-url', default=None, help="Por defecto usa un SQLite temporal")
+    run_parser.add_argument('--target-url', default=None, help="Usa una instancia ya levantada en lugar de iniciar la app")
+    run_parser.add_argument('--scenarios', type=parse_scenarios, default=list(SCENARIOS))
+    run_parser.add_argument('--concurrency', type=parse_int_list, default=[1, 8, 32])
+    run_parser.add_argument('--requests', type=int, default=200, help="Peticiones por escenario y nivel de concurrencia")
+    run_parser.add_argument('--warmup', type=int, default=0)
+    run_parser.add_argument('--scenario', default=None, help="Escenario del simulador (JSON/YAML); ignora las opciones de latencia")
+    run_parser.add_argument('--seed', type=int, default=0)
+    run_parser.add_argument('--orders-latency-ms', type=float, default=20.0)
+    run_parser.add_argument('--auth-latency-ms', type=float, default=10.0)
+    run_parser.add_argument('--jitter-ms', type=float, default=0.0)
+    run_parser.add_argument('--orders-per-route', type=int, default=8)
+    run_parser.add_argument('--fixtures', default=None, help="Pedidos y clientes generados por benchmarks.seed")
+    run_parser.add_argument('--start-offset-days', type=int, default=1)
+    run_parser.add_argument('--baseline', default=None, help="Compara contra esta línea base al terminar")
+    run_parser.add_argument('--threshold', type=float, default=0.10)
+    run_parser.add_argument('--error-tolerance', type=float, default=0.01)
+
+    compare_parser = subparsers.add_parser('compare', help="Compara resultados contra una línea base")
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('current')
+    compare_parser.add_argument('--threshold', type=float, default=0.10)
+    compare_parser.add_argument('--error-tolerance', type=float, default=0.01)
+
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+
+    if args.command == 'compare':
+        regressions = compare_results(load_json(args.baseline), load_json(args.current), args.threshold, args.error_tolerance)
+        return report_regressions(regressions, args.threshold)
+
+    report = run_benchmark(args)
+    with open(args.output, 'w', encoding='utf-8') as handle:
+        json.dump(report, handle, indent=2)
+    print(f"Resultados guardados en {args.output}")
+
+    if args.baseline:
+        regressions = compare_results(load_json(args.baseline), report, args.threshold, args.error_tolerance)
+        return report_regressions(regressions, args.threshold)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
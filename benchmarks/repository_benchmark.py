@@ -0,0 +1,147 @@
+import argparse
+import json
+import statistics
+import sys
+import time
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy import and_, desc, func
+from sqlalchemy.orm import sessionmaker
+
+from app.config.engines import create_database_engine
+from app.config.statement_cache import track_statement_cache
+from app.models.db_models import Base, RouteDB
+from app.repositories.route_repository import RouteRepository
+from app.utils.metrics import MetricsRegistry
+
+VALID_TRUCKS = ["CAM-001", "CAM-002", "CAM-003", "CAM-004", "CAM-005"]
+
+
+class LegacyRouteRepository(RouteRepository):
+    def get_by_id(self, route_id: int):
+        db_route = self.session.query(RouteDB).filter(RouteDB.id == route_id).first()
+        return self._db_to_model(db_route) if db_route else None
+
+    def get_routes_paginated(self, limit, offset, route_code=None, assigned_truck=None, delivery_date=None):
+        query = self._legacy_filters(self.session.query(RouteDB), route_code, assigned_truck, delivery_date)
+        query = query.order_by(desc(RouteDB.delivery_date)).limit(limit).offset(offset)
+        return [self._db_to_model(db_route) for db_route in query.all()]
+
+    def count_routes(self, route_code=None, assigned_truck=None, delivery_date=None):
+        query = self._legacy_filters(self.session.query(func.count(RouteDB.id)), route_code, assigned_truck, delivery_date)
+        return query.scalar() or 0
+
+    def get_route_by_truck_and_date(self, truck, delivery_date):
+        db_route = self.session.query(RouteDB).filter(
+            and_(RouteDB.assigned_truck == truck, RouteDB.delivery_date == delivery_date)
+        ).first()
+        return self._db_to_model(db_route) if db_route else None
+
+    def _legacy_filters(self, query, route_code, assigned_truck, delivery_date):
+        if route_code:
+            query = query.filter(RouteDB.route_code.ilike(f"%{route_code}%"))
+        if assigned_truck:
+            query = query.filter(RouteDB.assigned_truck.ilike(f"%{assigned_truck}%"))
+        if delivery_date:
+            query = query.filter(RouteDB.delivery_date == delivery_date)
+        return query
+
+
+def build_database(rows: int):
+    engine = create_database_engine('sqlite://')
+    Base.metadata.create_all(bind=engine)
+    start = date(2024, 1, 1)
+    now = datetime(2024, 1, 1, 8, 0, 0)
+    with engine.begin() as connection:
+        connection.execute(RouteDB.__table__.insert(), [
+            {
+                'id': index + 1,
+                'route_code': f"ROU-{index + 1:04d}",
+                'assigned_truck': VALID_TRUCKS[index % len(VALID_TRUCKS)],
+                'delivery_date': start + timedelta(days=index // len(VALID_TRUCKS)),
+                'orders_count': index % 25,
+                'created_at': now,
+                'updated_at': now
+            }
+            for index in range(rows)
+        ])
+    return engine
+
+
+def operations(rows: int) -> Dict[str, Callable]:
+    days = max(rows // len(VALID_TRUCKS), 1)
+    return {
+        'get_by_id': lambda repo, i: repo.get_by_id(i % rows + 1),
+        'get_route_by_truck_and_date': lambda repo, i: repo.get_route_by_truck_and_date(
+            VALID_TRUCKS[i % len(VALID_TRUCKS)], date(2024, 1, 1) + timedelta(days=i % days)
+        ),
+        'get_routes_paginated': lambda repo, i: repo.get_routes_paginated(
+            limit=10, offset=(i % 5) * 10, assigned_truck=VALID_TRUCKS[i % len(VALID_TRUCKS)]
+        ),
+        'count_routes': lambda repo, i: repo.count_routes(route_code=f"ROU-{i % 9}"),
+    }
+
+
+def measure(session_factory, repository_class, operation: Callable, calls: int, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        session = session_factory()
+        repository = repository_class(session)
+        started = time.perf_counter()
+        for index in range(calls):
+            operation(repository, index)
+        timings.append((time.perf_counter() - started) * 1e6 / calls)
+        session.close()
+    return round(statistics.median(timings), 1)
+
+
+def run(rows: int, calls: int, repeat: int) -> Dict[str, Dict[str, object]]:
+    engine = build_database(rows)
+    registry = MetricsRegistry()
+    track_statement_cache(engine, registry, name='bench')
+    session_factory = sessionmaker(bind=engine)
+
+    results = {}
+    for name, operation in operations(rows).items():
+        measure(session_factory, LegacyRouteRepository, operation, calls, 1)
+        measure(session_factory, RouteRepository, operation, calls, 1)
+
+        legacy = measure(session_factory, LegacyRouteRepository, operation, calls, repeat)
+        registry.reset()
+        current = measure(session_factory, RouteRepository, operation, calls, repeat)
+        stats = registry.snapshot()
+        results[name] = {
+            'legacy_query_us': legacy,
+            'lambda_select_us': current,
+            'speedup': round(legacy / current, 2) if current else None,
+            'cache_hits': stats.get('sql_statement_cache.bench.cache_hit', 0),
+            'cache_misses': stats.get('sql_statement_cache.bench.cache_miss', 0)
+        }
+    engine.dispose()
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Costo Python por llamada de RouteRepository: session.query() contra lambda_stmt")
+    parser.add_argument('--rows', type=int, default=200, help="Tabla pequeña para que domine el costo Python y no el de SQLite")
+    parser.add_argument('--calls', type=int, default=2000)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--output', default=None)
+    args = parser.parse_args(argv)
+
+    results = run(args.rows, args.calls, args.repeat)
+    for name, result in results.items():
+        print(
+            f"{name:<28} query()={result['legacy_query_us']:>8.1f}us  lambda={result['lambda_select_us']:>8.1f}us  "
+            f"x{result['speedup']}  hits={result['cache_hits']} misses={result['cache_misses']}"
+        )
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as handle:
+            json.dump(results, handle, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
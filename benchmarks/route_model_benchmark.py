@@ -0,0 +1,110 @@
+import argparse
+import gc
+import json
+import sys
+import time
+import tracemalloc
+from datetime import date, datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from app.models.route import Route
+
+
+class LegacyRoute:
+    def __init__(self, route_code, assigned_truck, delivery_date, orders_count=0, id=None, created_at=None, updated_at=None):
+        self.id = id
+        self.route_code = route_code
+        self.assigned_truck = assigned_truck
+        self.delivery_date = delivery_date
+        self.orders_count = orders_count
+        self.created_at = created_at or datetime.utcnow()
+        self.updated_at = updated_at or datetime.utcnow()
+
+
+def build_rows(count: int) -> List[tuple]:
+    created_at = datetime(2025, 1, 1, 8, 0, 0)
+    return [
+        (index, f"ROU-{index:04d}", "CAM-001", date(2025, 12, 26), index % 25, created_at, created_at)
+        for index in range(count)
+    ]
+
+
+def legacy_from_db(row):
+    return LegacyRoute(
+        id=row[0], route_code=row[1], assigned_truck=row[2], delivery_date=row[3],
+        orders_count=row[4], created_at=row[5], updated_at=row[6]
+    )
+
+
+def slotted_init(row):
+    return Route(
+        id=row[0], route_code=row[1], assigned_truck=row[2], delivery_date=row[3],
+        orders_count=row[4], created_at=row[5], updated_at=row[6]
+    )
+
+
+def legacy_new(row):
+    return LegacyRoute(route_code=row[1], assigned_truck=row[2], delivery_date=row[3])
+
+
+def slotted_new(row):
+    return Route(route_code=row[1], assigned_truck=row[2], delivery_date=row[3])
+
+
+CASES = {
+    'legacy_dict_init': legacy_from_db,
+    'slots_init': slotted_init,
+    'slots_from_row': Route.from_row,
+    'legacy_dict_new_route': legacy_new,
+    'slots_new_route': slotted_new
+}
+
+
+def measure(factory: Callable[[tuple], Any], rows: List[tuple], repeat: int) -> Dict[str, float]:
+    gc.collect()
+    tracemalloc.start()
+    objects = [factory(row) for row in rows]
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del objects
+
+    timings = []
+    for _ in range(repeat):
+        gc.collect()
+        started = time.perf_counter()
+        objects = [factory(row) for row in rows]
+        timings.append(time.perf_counter() - started)
+        del objects
+
+    best = min(timings)
+    return {
+        'bytes_per_instance': round(allocated / len(rows), 1),
+        'total_mb': round(allocated / 1e6, 2),
+        'construct_ms': round(best * 1000.0, 2),
+        'ns_per_instance': round(best * 1e9 / len(rows), 1)
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Memoria y velocidad de construcción del modelo Route")
+    parser.add_argument('--rows', type=int, default=200_000)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--output', default=None)
+    args = parser.parse_args(argv)
+
+    rows = build_rows(args.rows)
+    results = {name: measure(factory, rows, args.repeat) for name, factory in CASES.items()}
+    for name, result in results.items():
+        print(
+            f"{name:<22} {result['bytes_per_instance']:>8.1f} B/inst  {result['total_mb']:>8.2f} MB  "
+            f"{result['construct_ms']:>9.2f} ms  {result['ns_per_instance']:>7.1f} ns/inst"
+        )
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as handle:
+            json.dump(results, handle, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
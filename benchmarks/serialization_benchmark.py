@@ -0,0 +1,107 @@
+import argparse
+import json
+import statistics
+import sys
+import time
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy.orm import sessionmaker
+
+from app.config.engines import create_database_engine
+from app.models.db_models import Base, RouteDB
+from app.repositories.route_repository import RouteRepository
+from app.utils.route_serializer import rows_to_dicts
+
+VALID_TRUCKS = ["CAM-001", "CAM-002", "CAM-003", "CAM-004", "CAM-005"]
+
+
+def build_database(rows: int):
+    engine = create_database_engine('sqlite://')
+    Base.metadata.create_all(bind=engine)
+    start = date(2024, 1, 1)
+    now = datetime(2024, 1, 1, 8, 0, 0)
+    with engine.begin() as connection:
+        connection.execute(RouteDB.__table__.insert(), [
+            {
+                'id': index + 1,
+                'route_code': f"ROU-{index + 1:04d}",
+                'assigned_truck': VALID_TRUCKS[index % len(VALID_TRUCKS)],
+                'delivery_date': start + timedelta(days=index // len(VALID_TRUCKS)),
+                'orders_count': index % 25,
+                'created_at': now,
+                'updated_at': now
+            }
+            for index in range(rows)
+        ])
+    return engine
+
+
+def orm_path(session, rows: int) -> List[dict]:
+    routes = RouteRepository(session).get_routes_paginated(limit=rows, offset=0)
+    return [route.to_dict() for route in routes]
+
+
+def row_path(session, rows: int) -> List[dict]:
+    return rows_to_dicts(RouteRepository(session).get_route_rows_paginated(limit=rows, offset=0))
+
+
+def measure(session_factory, func: Callable, rows: int, repeat: int, encode: bool) -> Dict[str, float]:
+    timings = []
+    for _ in range(repeat):
+        session = session_factory()
+        started = time.perf_counter()
+        payload = func(session, rows)
+        if encode:
+            json.dumps(payload)
+        timings.append((time.perf_counter() - started) * 1000.0)
+        session.close()
+    return {
+        'median_ms': round(statistics.median(timings), 3),
+        'min_ms': round(min(timings), 3),
+        'per_row_us': round(statistics.median(timings) * 1000.0 / rows, 3)
+    }
+
+
+def run(sizes: List[int], repeat: int, encode: bool) -> Dict[str, Dict[str, Dict[str, float]]]:
+    results = {}
+    for rows in sizes:
+        engine = build_database(rows)
+        session_factory = sessionmaker(bind=engine)
+        measure(session_factory, orm_path, rows, 2, encode)
+        measure(session_factory, row_path, rows, 2, encode)
+
+        orm = measure(session_factory, orm_path, rows, repeat, encode)
+        projected = measure(session_factory, row_path, rows, repeat, encode)
+        results[str(rows)] = {
+            'orm_model_to_dict': orm,
+            'column_rows_to_dict': projected,
+            'speedup': round(orm['median_ms'] / projected['median_ms'], 2) if projected['median_ms'] else None
+        }
+        engine.dispose()
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Micro-benchmark de serialización del listado de rutas")
+    parser.add_argument('--sizes', default='100,10000')
+    parser.add_argument('--repeat', type=int, default=30)
+    parser.add_argument('--encode', action='store_true', help="Incluye json.dumps del resultado")
+    parser.add_argument('--output', default=None)
+    args = parser.parse_args(argv)
+
+    results = run([int(size) for size in args.sizes.split(',')], args.repeat, args.encode)
+    for rows, result in results.items():
+        print(
+            f"{rows:>6} filas  ORM+Route+to_dict={result['orm_model_to_dict']['median_ms']:.2f}ms  "
+            f"columnas={result['column_rows_to_dict']['median_ms']:.2f}ms  x{result['speedup']}"
+        )
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as handle:
+            json.dump(results, handle, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
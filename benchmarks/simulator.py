@@ -0,0 +1,454 @@
+import argparse
+import json
+import math
+import random
+import socket
+import struct
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from unittest.mock import patch
+from urllib.parse import urlparse, parse_qs, urlencode
+
+ORDERS_CONTRACT = 'orders'
+AUTH_CONTRACT = 'auth'
+
+ORDERS_BY_TRUCK_PATH = '/orders/by-truck'
+ORDERS_BY_DATE_PATH = '/orders/by-date'
+AUTH_USER_PREFIX = '/auth/user/'
+
+OUTCOME_OK = 'ok'
+OUTCOME_ERROR = 'error'
+OUTCOME_TIMEOUT = 'timeout'
+OUTCOME_RESET = 'reset'
+OUTCOME_SLOW_LORIS = 'slow_loris'
+
+SIMULATED_FLEET = ("CAM-001", "CAM-002", "CAM-003", "CAM-004", "CAM-005")
+
+
+class LatencyModel:
+    DISTRIBUTIONS = ('constant', 'uniform', 'normal', 'lognormal', 'exponential', 'pareto', 'sequence', 'mixture')
+
+    def __init__(self, spec: Optional[Dict[str, Any]] = None):
+        spec = dict(spec or {'distribution': 'constant', 'ms': 0})
+        self.distribution = spec.get('distribution', 'constant')
+        if self.distribution not in self.DISTRIBUTIONS:
+            raise ValueError(f"Distribución de latencia no soportada: {self.distribution}")
+        self.spec = spec
+        self.components: List[Tuple[float, 'LatencyModel']] = []
+        if self.distribution == 'mixture':
+            total = sum(component.get('weight', 1.0) for component in spec['components'])
+            self.components = [
+                (component.get('weight', 1.0) / total, LatencyModel(component))
+                for component in spec['components']
+            ]
+
+    def sample(self, rng: random.Random, call_index: int = 0) -> float:
+        spec = self.spec
+        distribution = self.distribution
+
+        if distribution == 'constant':
+            value = spec.get('ms', 0.0)
+        elif distribution == 'uniform':
+            value = rng.uniform(spec['min_ms'], spec['max_ms'])
+        elif distribution == 'normal':
+            value = rng.gauss(spec['mean_ms'], spec.get('stddev_ms', 0.0))
+        elif distribution == 'lognormal':
+            value = rng.lognormvariate(math.log(spec['median_ms']), spec.get('sigma', 0.5))
+        elif distribution == 'exponential':
+            value = rng.expovariate(1.0 / spec['mean_ms'])
+        elif distribution == 'pareto':
+            value = spec['scale_ms'] * rng.paretovariate(spec.get('alpha', 1.5))
+        elif distribution == 'sequence':
+            values = spec['values_ms']
+            value = values[call_index % len(values)] if spec.get('repeat', True) else values[min(call_index, len(values) - 1)]
+        else:
+            draw = rng.random()
+            cumulative = 0.0
+            value = 0.0
+            for weight, component in self.components:
+                cumulative += weight
+                if draw <= cumulative:
+                    value = component.sample(rng, call_index)
+                    break
+            else:
+                value = self.components[-1][1].sample(rng, call_index)
+
+        if 'max_ms' in spec and distribution != 'uniform':
+            value = min(value, spec['max_ms'])
+        return max(0.0, float(value))
+
+
+class FaultModel:
+    def __init__(self, spec: Optional[Dict[str, Any]] = None):
+        spec = spec or {}
+        self.error_rate = spec.get('error_rate', 0.0)
+        self.error_statuses = spec.get('error_statuses', [500])
+        self.timeout_rate = spec.get('timeout_rate', 0.0)
+        self.timeout_ms = spec.get('timeout_ms', 30_000.0)
+        self.reset_rate = spec.get('reset_rate', 0.0)
+        self.slow_loris_rate = spec.get('slow_loris_rate', 0.0)
+        self.slow_loris_chunk_bytes = spec.get('slow_loris_chunk_bytes', 64)
+        self.slow_loris_chunk_delay_ms = spec.get('slow_loris_chunk_delay_ms', 250.0)
+
+    def pick(self, rng: random.Random) -> Tuple[str, Optional[int]]:
+        draw = rng.random()
+        thresholds = (
+            (self.reset_rate, OUTCOME_RESET),
+            (self.timeout_rate, OUTCOME_TIMEOUT),
+            (self.error_rate, OUTCOME_ERROR),
+            (self.slow_loris_rate, OUTCOME_SLOW_LORIS)
+        )
+        cumulative = 0.0
+        for rate, outcome in thresholds:
+            cumulative += rate
+            if draw < cumulative:
+                status = rng.choice(self.error_statuses) if outcome == OUTCOME_ERROR else None
+                return outcome, status
+        return OUTCOME_OK, None
+
+
+class PayloadModel:
+    def __init__(self, spec: Optional[Dict[str, Any]] = None):
+        spec = spec or {}
+        self.orders_min = spec.get('orders_min', 8)
+        self.orders_max = spec.get('orders_max', self.orders_min)
+        self.padding_bytes = spec.get('padding_bytes', 0)
+        self.clients_pool = spec.get('clients_pool', 200)
+
+
+class EndpointProfile:
+    def __init__(self, spec: Optional[Dict[str, Any]] = None):
+        spec = spec or {}
+        self.latency = LatencyModel(spec.get('latency'))
+        self.faults = FaultModel(spec.get('faults'))
+        self.payload = PayloadModel(spec.get('payload'))
+
+
+class Decision:
+    def __init__(self, contract: str, outcome: str, status: int, latency_ms: float, body: Optional[Dict[str, Any]]):
+        self.contract = contract
+        self.outcome = outcome
+        self.status = status
+        self.latency_ms = latency_ms
+        self.body = body
+
+    def encoded_body(self) -> bytes:
+        return json.dumps(self.body).encode('utf-8') if self.body is not None else b''
+
+
+class Simulator:
+    def __init__(
+        self,
+        scenario: Optional[Dict[str, Any]] = None,
+        fixtures: Optional[Dict[str, Any]] = None,
+        sleep: Callable[[float], None] = time.sleep
+    ):
+        scenario = scenario or {}
+        self.seed = scenario.get('seed', 0)
+        self.profiles = {
+            ORDERS_CONTRACT: EndpointProfile(scenario.get(ORDERS_CONTRACT)),
+            AUTH_CONTRACT: EndpointProfile(scenario.get(AUTH_CONTRACT))
+        }
+        self.fixture_orders = (fixtures or {}).get('orders', {})
+        self.fixture_clients = (fixtures or {}).get('clients', {})
+        self.by_date_enabled = scenario.get('orders_by_date', True)
+        self.sleep = sleep
+        self._lock = threading.Lock()
+        self._key_calls: Dict[str, int] = {}
+        self._contract_calls: Dict[str, int] = {}
+        self._outcomes: Dict[str, Dict[str, int]] = {}
+        self._client_ids = list(self.fixture_clients) or [
+            str(uuid.UUID(int=index + 1))
+            for index in range(self.profiles[ORDERS_CONTRACT].payload.clients_pool)
+        ]
+
+    @classmethod
+    def from_file(cls, path: str, fixtures: Optional[Dict[str, Any]] = None, **kwargs) -> 'Simulator':
+        return cls(load_document(path), fixtures=fixtures, **kwargs)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._key_calls.clear()
+            self._contract_calls.clear()
+            self._outcomes.clear()
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            return {contract: dict(outcomes) for contract, outcomes in self._outcomes.items()}
+
+    def route(self, path: str, params: Dict[str, str]) -> Tuple[Optional[str], Optional[str]]:
+        if path == ORDERS_BY_TRUCK_PATH:
+            return ORDERS_CONTRACT, f"{params.get('assigned_truck', '')}|{params.get('scheduled_delivery_date', '')}"
+        if path == ORDERS_BY_DATE_PATH and self.by_date_enabled:
+            return ORDERS_CONTRACT, f"*|{params.get('scheduled_delivery_date', '')}"
+        if path.startswith(AUTH_USER_PREFIX):
+            return AUTH_CONTRACT, path[len(AUTH_USER_PREFIX):]
+        return None, None
+
+    def decide(self, path: str, params: Optional[Dict[str, str]] = None) -> Decision:
+        params = params or {}
+        contract, key = self.route(path, params)
+        if contract is None:
+            return Decision('unknown', OUTCOME_OK, 404, 0.0, None)
+
+        with self._lock:
+            occurrence = self._key_calls.get(f"{contract}|{key}", 0)
+            self._key_calls[f"{contract}|{key}"] = occurrence + 1
+            call_index = self._contract_calls.get(contract, 0)
+            self._contract_calls[contract] = call_index + 1
+
+        profile = self.profiles[contract]
+        rng = random.Random(f"{self.seed}|{contract}|{key}|{occurrence}")
+        latency_ms = profile.latency.sample(rng, call_index)
+        outcome, status = profile.faults.pick(rng)
+
+        if outcome == OUTCOME_TIMEOUT:
+            latency_ms = max(latency_ms, profile.faults.timeout_ms)
+            decision = Decision(contract, outcome, 504, latency_ms, None)
+        elif outcome == OUTCOME_RESET:
+            decision = Decision(contract, outcome, 0, latency_ms, None)
+        elif outcome == OUTCOME_ERROR:
+            decision = Decision(contract, outcome, status, latency_ms, {'success': False, 'error': 'Error simulado'})
+        else:
+            status, body = self._build_body(contract, key, params)
+            decision = Decision(contract, outcome, status, latency_ms, body)
+
+        with self._lock:
+            outcomes = self._outcomes.setdefault(contract, {})
+            outcomes[outcome] = outcomes.get(outcome, 0) + 1
+        return decision
+
+    def slow_loris_duration_ms(self, decision: Decision) -> float:
+        faults = self.profiles[decision.contract].faults
+        chunks = math.ceil(len(decision.encoded_body()) / max(1, faults.slow_loris_chunk_bytes))
+        return chunks * faults.slow_loris_chunk_delay_ms
+
+    def _build_body(self, contract: str, key: str, params: Dict[str, str]) -> Tuple[int, Dict[str, Any]]:
+        if contract == ORDERS_CONTRACT:
+            truck, delivery_date = key.split('|', 1)
+            if truck == '*':
+                return 200, {'success': True, 'data': self._orders_for_date(delivery_date)}
+            return 200, {'success': True, 'data': self._orders_for(key, params)}
+
+        user = self._user_for(key)
+        if user is None:
+            return 404, {'success': False, 'error': 'Usuario no encontrado'}
+        return 200, {'success': True, 'data': user}
+
+    def _orders_for(self, key: str, params: Dict[str, str]) -> List[Dict[str, Any]]:
+        if key in self.fixture_orders:
+            return self.fixture_orders[key]
+
+        payload = self.profiles[ORDERS_CONTRACT].payload
+        rng = random.Random(f"{self.seed}|payload|{key}")
+        padding = 'x' * payload.padding_bytes
+        orders = []
+        for _ in range(rng.randint(payload.orders_min, payload.orders_max)):
+            order = {
+                'id': rng.randint(1, 10_000_000),
+                'client_id': rng.choice(self._client_ids),
+                'assigned_truck': params.get('assigned_truck'),
+                'scheduled_delivery_date': params.get('scheduled_delivery_date')
+            }
+            if padding:
+                order['notes'] = padding
+            orders.append(order)
+        return orders
+
+    def _orders_for_date(self, delivery_date: str) -> List[Dict[str, Any]]:
+        suffix = f"|{delivery_date}"
+        trucks = [key[:-len(suffix)] for key in self.fixture_orders if key.endswith(suffix)]
+        if not self.fixture_orders:
+            trucks = list(SIMULATED_FLEET)
+
+        orders = []
+        for truck in trucks:
+            params = {'assigned_truck': truck, 'scheduled_delivery_date': delivery_date}
+            for order in self._orders_for(f"{truck}{suffix}", params):
+                orders.append({'assigned_truck': truck, **order})
+        return orders
+
+    def _user_for(self, user_id: str) -> Optional[Dict[str, Any]]:
+        if self.fixture_clients:
+            return self.fixture_clients.get(user_id)
+
+        rng = random.Random(f"{self.seed}|user|{user_id}")
+        padding = self.profiles[AUTH_CONTRACT].payload.padding_bytes
+        user = {
+            'id': user_id,
+            'name': f"Cliente {user_id[-4:]}",
+            'email': f"cliente-{user_id[-4:]}@medisupply.test",
+            'address': f"Calle {rng.randint(1, 200)} # {rng.randint(1, 100)}-{rng.randint(1, 99)}",
+            'phone': f"3{rng.randint(100000000, 199999999)}",
+            'latitude': round(4.60 + rng.uniform(-0.15, 0.15), 6),
+            'longitude': round(-74.08 + rng.uniform(-0.10, 0.10), 6)
+        }
+        if padding:
+            user['notes'] = 'x' * padding
+        return user
+
+    def requests_get(self, url: str, params: Optional[Dict[str, Any]] = None, timeout: Optional[float] = None, **kwargs) -> 'SimulatedResponse':
+        parsed = urlparse(url)
+        query = {key: values[0] for key, values in parse_qs(parsed.query).items()}
+        query.update({key: str(value) for key, value in (params or {}).items()})
+        decision = self.decide(parsed.path, query)
+
+        timeout_s = timeout[1] if isinstance(timeout, tuple) else timeout
+        if decision.outcome == OUTCOME_RESET:
+            self.sleep(decision.latency_ms / 1000.0)
+            raise _requests_exception('ConnectionError')(f"Conexión reiniciada por el simulador: {url}")
+        if timeout_s is not None and decision.latency_ms / 1000.0 > timeout_s:
+            self.sleep(timeout_s)
+            raise _requests_exception('ReadTimeout')(f"Tiempo de espera agotado ({timeout_s}s): {url}")
+
+        total_ms = decision.latency_ms
+        if decision.outcome == OUTCOME_SLOW_LORIS:
+            total_ms += self.slow_loris_duration_ms(decision)
+        self.sleep(total_ms / 1000.0)
+        return SimulatedResponse(decision, f"{url}?{urlencode(query)}" if query else url)
+
+    @contextmanager
+    def patch_requests(self):
+        import requests
+
+        with patch.object(requests, 'get', self.requests_get):
+            yield self
+
+
+class SimulatedResponse:
+    def __init__(self, decision: Decision, url: str):
+        self.status_code = decision.status
+        self.url = url
+        self.content = decision.encoded_body()
+        self.headers = {'Content-Type': 'application/json', 'Content-Length': str(len(self.content))}
+        self.elapsed_ms = decision.latency_ms
+
+    @property
+    def text(self) -> str:
+        return self.content.decode('utf-8')
+
+    def json(self) -> Any:
+        return json.loads(self.content)
+
+
+def _requests_exception(name: str) -> type:
+    try:
+        import requests
+        exception = getattr(requests.exceptions, name)
+        if isinstance(exception, type) and issubclass(exception, BaseException):
+            return exception
+    except ImportError:
+        pass
+    return SimulatedNetworkError
+
+
+class SimulatedNetworkError(IOError):
+    pass
+
+
+class _SimulatorHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+
+class SimulatorServer:
+    def __init__(self, simulator: Simulator, host: str = '127.0.0.1', port: int = 0):
+        self.simulator = simulator
+        self._httpd = _SimulatorHTTPServer((host, port), self._build_request_handler())
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> 'SimulatorServer':
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self) -> None:
+        self._httpd.serve_forever()
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def _build_request_handler(self):
+        simulator = self.simulator
+
+        class RequestHandler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                parsed = urlparse(self.path)
+                params = {key: values[0] for key, values in parse_qs(parsed.query).items()}
+                decision = simulator.decide(parsed.path, params)
+                simulator.sleep(decision.latency_ms / 1000.0)
+
+                if decision.outcome == OUTCOME_RESET:
+                    self.connection.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack('ii', 1, 0))
+                    self.close_connection = True
+                    return
+
+                payload = decision.encoded_body()
+                self.send_response(decision.status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+
+                if decision.outcome == OUTCOME_SLOW_LORIS:
+                    faults = simulator.profiles[decision.contract].faults
+                    chunk_size = max(1, faults.slow_loris_chunk_bytes)
+                    for start in range(0, len(payload), chunk_size):
+                        self.wfile.write(payload[start:start + chunk_size])
+                        self.wfile.flush()
+                        simulator.sleep(faults.slow_loris_chunk_delay_ms / 1000.0)
+                else:
+                    self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                pass
+
+        return RequestHandler
+
+
+def load_document(path: str) -> Dict[str, Any]:
+    with open(path, encoding='utf-8') as handle:
+        if path.endswith(('.yaml', '.yml')):
+            import yaml
+            return yaml.safe_load(handle) or {}
+        return json.load(handle)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Simulador de los servicios de pedidos y autenticador")
+    parser.add_argument('--scenario', default=None, help="Escenario JSON o YAML con latencias, fallos y payloads")
+    parser.add_argument('--fixtures', default=None, help="Pedidos y clientes generados por benchmarks.seed")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8090)
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    scenario = load_document(args.scenario) if args.scenario else {}
+    fixtures = load_document(args.fixtures) if args.fixtures else None
+    server = SimulatorServer(Simulator(scenario, fixtures=fixtures), host=args.host, port=args.port)
+    print(f"Simulador escuchando en {server.url}", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
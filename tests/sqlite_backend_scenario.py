@@ -0,0 +1,222 @@
+"""
+Escenario del repositorio de rutas contra SQLite real.
+
+Se ejecuta en un proceso aparte porque conftest.py reemplaza sqlalchemy por mocks.
+"""
+import json
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from sqlalchemy import text
+from sqlalchemy.orm import sessionmaker
+from app.config.engines import create_database_engine
+from app.models.db_models import Base
+from app.models.route import Route
+from app.exceptions.custom_exceptions import LogisticsConflictError
+from app.repositories.route_repository import RouteRepository
+from app.repositories.idempotency_repository import IdempotencyRepository
+from app.integrations.event_publisher import InMemoryPublisher
+from app.services.outbox_relay import OutboxRelay
+from app.utils.jobs import BACKEND_INLINE, JobManager
+
+
+def run(url: str) -> dict:
+    engine = create_database_engine(url)
+    Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    repository = RouteRepository(session_factory())
+
+    for code, truck, delivery_date in [
+        ("ROU-0001", "CAM-001", date(2025, 12, 1)),
+        ("ROU-0002", "CAM-002", date(2026, 1, 15)),
+        ("ROU-0003", "CAM-001", date(2025, 2, 3)),
+        ("ROU-0004", "CAM-003", date(2025, 11, 30)),
+    ]:
+        repository.create(Route(route_code=code, assigned_truck=truck, delivery_date=delivery_date))
+
+    with engine.connect() as connection:
+        pragmas = {
+            name: connection.execute(text(f"PRAGMA {name}")).scalar()
+            for name in ('journal_mode', 'foreign_keys', 'busy_timeout', 'synchronous')
+        }
+
+    seen_from_thread = []
+    worker = threading.Thread(target=lambda: seen_from_thread.append(RouteRepository(session_factory()).count_routes()))
+    worker.start()
+    worker.join()
+
+    stats = {'distance_km': 12.5, 'baseline_distance_km': 12.0, 'baseline_stops': 2, 'incremental_updates': 1}
+    repository.replace_route_stops(2, [
+        {'client_id': 'c-9', 'sequence': None, 'latitude': None, 'longitude': None},
+        {'client_id': 'c-2', 'sequence': 2, 'latitude': 4.7, 'longitude': -74.0},
+        {'client_id': 'c-1', 'sequence': 1, 'latitude': 4.6, 'longitude': -74.1}
+    ], stats, orders_count=3)
+    repository.replace_route_stops(2, [
+        {'client_id': 'c-2', 'sequence': 1, 'latitude': 4.7, 'longitude': -74.0},
+        {'client_id': 'c-1', 'sequence': 2, 'latitude': 4.6, 'longitude': -74.1},
+        {'client_id': 'c-9', 'sequence': None, 'latitude': None, 'longitude': None}
+    ], dict(stats, incremental_updates=2), orders_count=4)
+    stops, sequence_stats = repository.get_route_stops(2)
+    with_stops = repository.get_route_with_stops(2)
+
+    total, last_updated = repository.get_routes_version(assigned_truck="cam-001")
+    route = repository.get_by_id(1)
+    route.orders_count = 7
+    repository.update(route)
+
+    result = {
+        'pragmas': pragmas,
+        'ordered_codes': [r.route_code for r in repository.get_routes_paginated(limit=10, offset=0)],
+        'second_page': [r.route_code for r in repository.get_routes_paginated(limit=2, offset=2)],
+        'ilike_code': [r.route_code for r in repository.get_routes_paginated(limit=10, offset=0, route_code="rou-000")],
+        'ilike_truck': repository.count_routes(assigned_truck="cam-001"),
+        'by_date': repository.count_routes(delivery_date=date(2025, 11, 30)),
+        'version': [total, last_updated is not None],
+        'rows': [list(row[1:4]) for row in repository.get_route_rows_paginated(limit=1, offset=0)],
+        'stream': [len(partition) for partition in repository.stream_routes(chunk_size=3)],
+        'truck_and_date': repository.get_route_by_truck_and_date("CAM-002", date(2026, 1, 15)).route_code,
+        'next_sequence': repository.get_next_sequence_number(),
+        'updated_orders': repository.get_by_id(1).orders_count,
+        'deleted_before': repository.delete_batch(10, before=date(2025, 12, 1)),
+        'remaining': repository.count_routes(),
+        'seen_from_thread': seen_from_thread,
+        'stops': [[stop['client_id'], stop['sequence']] for stop in stops],
+        'with_stops': [with_stops[0].route_code, [stop['client_id'] for stop in with_stops[1]], with_stops[2]],
+        'without_stops': [list(repository.get_route_with_stops(1)[1:]), repository.get_route_with_stops(999)],
+        'sequence_stats': sequence_stats,
+        'stops_orders_count': repository.get_by_id(2).orders_count,
+        'stops_after_delete': [repository.delete(2), len(repository.get_route_stops(2)[0]), repository.get_route_stops(2)[1]],
+    }
+
+    created = repository.create(
+        Route(route_code="ROU-0005", assigned_truck="CAM-004", delivery_date=date(2026, 2, 1), orders_count=2),
+        stops=[{'client_id': 'c-7', 'sequence': 1, 'address': 'Calle 7', 'latitude': 4.6, 'longitude': -74.1, 'order_ids': [70, 71]}],
+        sequence_stats={'distance_km': 3.0, 'baseline_distance_km': 3.0, 'baseline_stops': 1, 'incremental_updates': 0}
+    )
+    try:
+        repository.create(Route(route_code="ROU-0005", assigned_truck="CAM-005", delivery_date=date(2026, 2, 1)))
+        result['duplicate_code'] = None
+    except LogisticsConflictError as e:
+        result['duplicate_code'] = [type(e).__name__, repository.count_routes(assigned_truck="CAM-005")]
+    with engine.connect() as connection:
+        route_orders = connection.execute(text(
+            f"SELECT order_id, client_id FROM route_orders WHERE route_id = {created.id} ORDER BY order_id"
+        )).all()
+    result['created_with_stops'] = [
+        [stop['address'] for stop in repository.get_route_with_stops(created.id)[1]],
+        [list(row) for row in route_orders]
+    ]
+    order_row = repository.get_route_by_order('71', date_from=date(2026, 1, 1))
+    with engine.connect() as connection:
+        plans = [
+            ' '.join(str(row[-1]) for row in connection.execute(text(f"EXPLAIN QUERY PLAN {query}")))
+            for query in (
+                "SELECT route_id FROM route_stops WHERE client_id = 'c-7'",
+                "SELECT route_id FROM route_orders WHERE order_id = '71'"
+            )
+        ]
+    result['reverse_index'] = {
+        'client': [[row[1], row[-1]] for row in repository.get_routes_by_client('c-7')],
+        'client_out_of_range': len(repository.get_routes_by_client('c-7', date_to=date(2026, 1, 31))),
+        'order': [order_row[1], order_row[-2], order_row[-1]],
+        'order_missing': repository.get_route_by_order('999'),
+        'plans': plans
+    }
+
+    with engine.connect() as connection:
+        events = [list(row) for row in connection.execute(text("SELECT event_type, route_id FROM route_outbox ORDER BY id"))]
+    failing = InMemoryPublisher(fail_after=3)
+    partial = OutboxRelay(session_factory, failing, batch_size=5).relay_once()
+    publisher = InMemoryPublisher()
+    relay = OutboxRelay(session_factory, publisher, batch_size=5)
+    batches = [relay.relay_once(), relay.relay_once(), relay.relay_once()]
+    result['outbox'] = {
+        'events': events,
+        'partial': partial,
+        'batches': batches,
+        'published': [message['message_id'] for message in failing.messages + publisher.messages],
+        'deleted_payload': next(message['body']['data'] for message in publisher.messages if message['routing_key'] == 'route.deleted'),
+        'lag_seconds': relay.lag_seconds
+    }
+
+    keys = IdempotencyRepository(session_factory())
+    claimed_at = datetime(2026, 1, 10, 8, 0, 0)
+    claims = [
+        keys.claim('key-1', 'hash-1', claimed_at, claimed_at + timedelta(days=1)),
+        keys.claim('key-1', 'hash-2', claimed_at, claimed_at + timedelta(days=1)),
+        keys.claim('key-2', 'hash-2', claimed_at, claimed_at + timedelta(seconds=1))
+    ]
+    keys.complete('key-1', 201, '{"success": true}', '{"Location": "/logistics/routes/jobs/1"}')
+    stored = keys.get('key-1')
+    keys.release('key-2', created_at=claimed_at - timedelta(seconds=1))
+    kept_after_stale_release = keys.get('key-2') is not None
+    result['idempotency'] = {
+        'claims': claims,
+        'stored': [
+            stored['request_hash'], stored['status_code'], stored['response_body'],
+            stored['response_headers'], stored['expires_at'] > claimed_at
+        ],
+        'kept_after_stale_release': kept_after_stale_release,
+        'expired': keys.delete_expired(claimed_at + timedelta(hours=1)),
+        'remaining': [keys.get('key-1') is not None, keys.get('key-2')]
+    }
+
+    jobs = JobManager(max_retained_jobs=2, backend=BACKEND_INLINE, session_factory=session_factory)
+    pruned = jobs.submit('purge_routes', lambda job: {'deleted': 1})
+    failed = jobs.submit('purge_routes', lambda job: int('x'))
+    completed = jobs.submit('purge_routes', lambda job: job.update_progress(batches=2) or {'deleted': 3, 'before': date(2026, 1, 10)})
+    other_worker = JobManager(session_factory=session_factory)
+    completed_row, failed_row = other_worker.get(completed.id).to_dict(), other_worker.get(failed.id).to_dict()
+    result['jobs'] = {
+        'completed': [completed_row[field] for field in ('status', 'progress', 'result')] + [completed_row['finished_at'] is not None],
+        'failed': [failed_row['status'], failed_row['error']],
+        'pruned': other_worker.get(pruned.id),
+        'missing': other_worker.get('no-existe')
+    }
+
+    unroutable = repository.create(Route(route_code="ROU-0009", assigned_truck="CAM-009", delivery_date=date(2026, 2, 1)))
+    remaining = repository.count_routes()
+    purged = repository.delete_all()
+    rejecting = InMemoryPublisher(unroutable=('route.created',))
+    retrying = OutboxRelay(session_factory, rejecting, batch_size=5, max_attempts=2)
+    retries = [retrying.relay_once(), retrying.relay_once()]
+    with engine.connect() as connection:
+        dead_letters = [list(row) for row in connection.execute(text("SELECT event_type, route_id, attempts FROM route_outbox_dead_letters"))]
+        pending = connection.execute(text("SELECT COUNT(*) FROM route_outbox")).scalar()
+    result['purge'] = {
+        'deleted': [remaining, purged],
+        'event': [rejecting.messages[-1]['routing_key'], rejecting.messages[-1]['body']['route_id'], rejecting.messages[-1]['body']['data']],
+        'retries': retries,
+        'dead_letters': [dead_letters, unroutable.id, pending]
+    }
+    return result
+
+
+def run_app() -> dict:
+    from app import create_app
+    from app.config.database import SessionLocal, engine
+
+    client = create_app().test_client()
+    repository = RouteRepository(SessionLocal())
+    route = repository.create(
+        Route(route_code="ROU-0001", assigned_truck="CAM-001", delivery_date=date(2026, 2, 1), orders_count=1),
+        stops=[{'client_id': 'c-1', 'sequence': 1, 'latitude': 4.6, 'longitude': -74.1, 'order_ids': [1]}],
+        sequence_stats={'distance_km': 1.0, 'baseline_distance_km': 1.0, 'baseline_stops': 1, 'incremental_updates': 0}
+    )
+    repository.session.close()
+
+    paths = ['/logistics/routes', f"/logistics/routes/{route.id}", '/logistics/routes/999'] * 8
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        statuses = list(executor.map(lambda path: client.get(path).status_code, paths))
+    return {
+        'requests': len(paths),
+        'pool_size': engine.pool.size(),
+        'statuses': sorted(set(statuses)),
+        'checked_out': engine.pool.checkedout()
+    }
+
+
+if __name__ == '__main__':
+    result = run_app() if sys.argv[1] == 'app' else run(sys.argv[1])
+    print(json.dumps(result, default=str))
@@ -0,0 +1,193 @@
+"""
+Tests para la compresión de respuestas
+"""
+import gzip
+import zlib
+import pytest
+from types import SimpleNamespace
+from flask import Flask, Response, jsonify
+from app.utils import compression
+from app.utils.compression import (
+    configure_compression,
+    compress_stream,
+    encoded_etag,
+    negotiate_encoding
+)
+from werkzeug.datastructures import Accept
+from werkzeug.http import parse_accept_header
+
+
+def build_config(**overrides):
+    values = {
+        'COMPRESSION_ENABLED': True,
+        'COMPRESSION_MIN_SIZE': 100,
+        'COMPRESSION_LEVEL': 6,
+        'COMPRESSION_BROTLI_QUALITY': 4,
+        'COMPRESSION_MIMETYPES': ('application/json', 'application/x-ndjson', 'text/csv')
+    }
+    values.update(overrides)
+    return SimpleNamespace(**values)
+
+
+def build_app(**overrides):
+    app = Flask(__name__)
+
+    @app.route('/large')
+    def large():
+        response = jsonify({'routes': [{'route_code': f"ROU-{i:04d}"} for i in range(100)]})
+        response.headers['ETag'] = '"abc"'
+        return response
+
+    @app.route('/small')
+    def small():
+        return jsonify({'ok': True})
+
+    @app.route('/stream')
+    def stream():
+        return Response((f'{{"id": {i}}}\n' for i in range(500)), mimetype='application/x-ndjson')
+
+    @app.route('/text')
+    def text():
+        return Response('x' * 5000, mimetype='text/plain')
+
+    configure_compression(app, build_config(**overrides))
+    return app
+
+
+class TestNegotiateEncoding:
+    """Tests para negotiate_encoding"""
+
+    def test_prefers_brotli_when_available(self):
+        """Test: Se prefiere brotli cuando el cliente lo acepta"""
+        pytest.importorskip('brotli')
+
+        assert negotiate_encoding(parse_accept_header('gzip, br', Accept)) == 'br'
+
+    def test_respects_quality(self):
+        """Test: La calidad del cliente define la codificación"""
+        assert negotiate_encoding(parse_accept_header('gzip;q=1.0, br;q=0.1', Accept)) == 'gzip'
+
+    def test_identity_only(self):
+        """Test: Sin codificaciones soportadas no se comprime"""
+        assert negotiate_encoding(parse_accept_header('identity', Accept)) is None
+
+    def test_gzip_without_brotli(self):
+        """Test: Sin el paquete brotli se negocia gzip"""
+        original = compression.brotli
+        compression.brotli = None
+        try:
+            assert negotiate_encoding(parse_accept_header('br, gzip', Accept)) == 'gzip'
+        finally:
+            compression.brotli = original
+
+
+class TestCompressionMiddleware:
+    """Tests para configure_compression"""
+
+    def test_compresses_large_json_with_gzip(self):
+        """Test: Respuestas JSON grandes se comprimen con gzip"""
+        client = build_app().test_client()
+
+        response = client.get('/large', headers={'Accept-Encoding': 'gzip'})
+
+        assert response.headers['Content-Encoding'] == 'gzip'
+        assert 'Accept-Encoding' in response.headers['Vary']
+        assert int(response.headers['Content-Length']) == len(response.data)
+        assert b'ROU-0099' in gzip.decompress(response.data)
+        assert response.headers['ETag'] == '"abc-gzip"'
+
+    def test_compresses_with_brotli(self):
+        """Test: Respuestas JSON grandes se comprimen con brotli"""
+        brotli = pytest.importorskip('brotli')
+        client = build_app().test_client()
+
+        response = client.get('/large', headers={'Accept-Encoding': 'br'})
+
+        assert response.headers['Content-Encoding'] == 'br'
+        assert b'ROU-0099' in brotli.decompress(response.data)
+
+    def test_small_responses_are_not_compressed(self):
+        """Test: Respuestas bajo el umbral se envían sin comprimir"""
+        client = build_app().test_client()
+
+        response = client.get('/small', headers={'Accept-Encoding': 'gzip'})
+
+        assert 'Content-Encoding' not in response.headers
+        assert response.get_json() == {'ok': True}
+
+    def test_other_mimetypes_are_not_compressed(self):
+        """Test: Solo se comprimen los tipos configurados"""
+        client = build_app().test_client()
+
+        response = client.get('/text', headers={'Accept-Encoding': 'gzip'})
+
+        assert 'Content-Encoding' not in response.headers
+
+    def test_without_accept_encoding(self):
+        """Test: Sin Accept-Encoding la respuesta no se comprime"""
+        client = build_app().test_client()
+
+        response = client.get('/large', headers={'Accept-Encoding': ''})
+
+        assert 'Content-Encoding' not in response.headers
+        assert response.headers['ETag'] == '"abc"'
+
+    def test_streamed_response_is_compressed_incrementally(self):
+        """Test: Las exportaciones en streaming se comprimen por bloques"""
+        client = build_app().test_client()
+
+        response = client.get('/stream', headers={'Accept-Encoding': 'gzip'})
+
+        assert response.headers['Content-Encoding'] == 'gzip'
+        assert 'Content-Length' not in response.headers
+        lines = gzip.decompress(response.data).decode('utf-8').splitlines()
+        assert len(lines) == 500
+
+    def test_disabled(self):
+        """Test: COMPRESSION_ENABLED=False no registra el hook"""
+        client = build_app(COMPRESSION_ENABLED=False).test_client()
+
+        response = client.get('/large', headers={'Accept-Encoding': 'gzip'})
+
+        assert 'Content-Encoding' not in response.headers
+
+
+class TestCompressStream:
+    """Tests para compress_stream"""
+
+    def test_each_chunk_is_flushed(self):
+        """Test: Cada bloque se puede descomprimir apenas llega"""
+        decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        stream = compress_stream(iter([b'primero\n', b'segundo\n']), 'gzip', 6, 4)
+
+        assert decompressor.decompress(next(stream)) == b'primero\n'
+        assert decompressor.decompress(next(stream)) == b'segundo\n'
+
+    def test_closes_source(self):
+        """Test: Cerrar el stream comprimido cierra el iterador original"""
+        closed = []
+
+        def source():
+            try:
+                yield b'a' * 10
+                yield b'b' * 10
+            finally:
+                closed.append(True)
+
+        stream = compress_stream(source(), 'gzip', 6, 4)
+        next(stream)
+        stream.close()
+
+        assert closed == [True]
+
+
+class TestEncodedEtag:
+    """Tests para encoded_etag"""
+
+    def test_strong(self):
+        """Test: ETag fuerte con sufijo de codificación"""
+        assert encoded_etag('"abc"', 'br') == '"abc-br"'
+
+    def test_weak(self):
+        """Test: ETag débil conserva el prefijo"""
+        assert encoded_etag('W/"abc"', 'gzip') == 'W/"abc-gzip"'
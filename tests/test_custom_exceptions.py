@@ -6,7 +6,8 @@ from app.exceptions.custom_exceptions import (
     LogisticsException,
     LogisticsNotFoundError,
     LogisticsValidationError,
-    LogisticsBusinessLogicError
+    LogisticsBusinessLogicError,
+    LogisticsConflictError
 )
 
 
@@ -52,4 +53,10 @@ class TestCustomExceptions:
         assert issubclass(LogisticsValidationError, LogisticsException)
         assert issubclass(LogisticsBusinessLogicError, LogisticsException)
         assert issubclass(LogisticsException, Exception)
-
+    
+    def test_logistics_conflict_error(self):
+        """Test: LogisticsConflictError hereda de LogisticsException"""
+        with pytest.raises(LogisticsConflictError):
+            raise LogisticsConflictError("Conflict error")
+        
+        assert issubclass(LogisticsConflictError, LogisticsException)
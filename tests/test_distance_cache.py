@@ -0,0 +1,141 @@
+"""
+Tests para la caché de distancias en archivos mapeados en memoria
+"""
+import os
+import pickle
+import random
+import numpy as np
+import pytest
+from unittest.mock import patch
+from app.optimization.distance import haversine_matrix
+from app.optimization.distance_cache import DistanceCache, open_distance_cache
+from app.optimization.stop_sequence import sequence_clients
+from app.utils.metrics import metrics
+
+
+def random_clients(count, prefix='c', seed=1):
+    rng = random.Random(seed)
+    return [(f"{prefix}-{index}", 4.60 + rng.uniform(-0.15, 0.15), -74.08 + rng.uniform(-0.10, 0.10)) for index in range(count)]
+
+
+def expected(clients):
+    return haversine_matrix([(latitude, longitude) for _, latitude, longitude in clients])
+
+
+class FakeDays:
+    """Reloj que avanza por días"""
+    
+    def __init__(self):
+        self.day = 0
+    
+    def __call__(self):
+        return self.day * 86400.0
+
+
+class TestDistanceCache:
+    """Tests para DistanceCache"""
+    
+    def test_matrix_matches_haversine_across_blocks(self, tmp_path):
+        """Test: La matriz de la caché coincide con haversine aunque abarque varios bloques"""
+        cache = DistanceCache(str(tmp_path), block_size=16)
+        clients = random_clients(50)
+        
+        matrix = cache.matrix(clients)
+        
+        assert matrix.shape == (50, 50)
+        assert np.abs(matrix - expected(clients)).max() < 1e-3
+        assert cache.stats() == {'clients': 50, 'capacity': 64, 'free_slots': 0}
+        assert sorted(os.listdir(tmp_path)) == sorted(
+            ['index.json', 'index.lock'] + [f"tile-{row}-{column}.f32" for column in range(4) for row in range(column + 1)]
+        )
+    
+    def test_only_new_clients_are_computed(self, tmp_path):
+        """Test: Los clientes conocidos no se recalculan"""
+        cache = DistanceCache(str(tmp_path), block_size=16)
+        known = random_clients(20)
+        cache.matrix(known)
+        new = random_clients(3, prefix='n', seed=2)
+        
+        with patch('app.optimization.distance_cache.haversine_matrix', wraps=haversine_matrix) as spy:
+            matrix = cache.matrix(new + known[::2])
+            cache.matrix(known)
+        
+        assert spy.call_count == 1
+        assert spy.call_args.args[0] == [(latitude, longitude) for _, latitude, longitude in new]
+        assert np.abs(matrix - expected(new + known[::2])).max() < 1e-3
+    
+    def test_shared_between_instances(self, tmp_path):
+        """Test: Otra instancia (otro worker) lee las mismas distancias sin recalcular"""
+        clients = random_clients(30)
+        first = DistanceCache(str(tmp_path), block_size=16).matrix(clients)
+        other = DistanceCache(str(tmp_path), block_size=16)
+        metrics.reset()
+        
+        second = other.matrix(clients)
+        
+        assert np.array_equal(first, second)
+        assert metrics.snapshot()['distance_cache.hit'] == 30
+    
+    def test_moved_client_is_recomputed(self, tmp_path):
+        """Test: Un cliente con nuevas coordenadas se recalcula en su misma posición"""
+        cache = DistanceCache(str(tmp_path), block_size=16)
+        clients = random_clients(10)
+        cache.matrix(clients)
+        moved = [(clients[0][0], 4.9, -74.3)] + clients[1:]
+        
+        matrix = cache.matrix(moved)
+        
+        assert np.abs(matrix - expected(moved)).max() < 1e-3
+        assert cache.stats()['clients'] == 10
+    
+    def test_idle_clients_are_evicted_and_slots_reused(self, tmp_path):
+        """Test: Los clientes sin uso se desalojan y su posición se reutiliza"""
+        days = FakeDays()
+        cache = DistanceCache(str(tmp_path), block_size=16, max_idle_days=30, clock=days)
+        old = random_clients(16)
+        cache.matrix(old)
+        days.day = 20
+        cache.matrix(old[:4])
+        days.day = 40
+        
+        assert cache.evict() == 12
+        assert cache.stats() == {'clients': 4, 'capacity': 16, 'free_slots': 12}
+        
+        new = random_clients(10, prefix='n', seed=3)
+        matrix = cache.matrix(old[:4] + new)
+        
+        assert cache.stats() == {'clients': 14, 'capacity': 16, 'free_slots': 2}
+        assert np.abs(matrix - expected(old[:4] + new)).max() < 1e-3
+    
+    def test_pickles_as_configuration(self, tmp_path):
+        """Test: Al enviarse a otro proceso viaja solo la configuración"""
+        cache = DistanceCache(str(tmp_path), block_size=16, max_idle_days=7)
+        cache.matrix(random_clients(5))
+        
+        copy = pickle.loads(pickle.dumps(cache))
+        
+        assert (copy.directory, copy.block_size, copy.max_idle_days) == (str(tmp_path), 16, 7)
+        assert copy.stats()['clients'] == 5
+    
+    def test_block_size_mismatch(self, tmp_path):
+        """Test: No se abre una caché existente con otro tamaño de bloque"""
+        DistanceCache(str(tmp_path), block_size=16).matrix(random_clients(2))
+        
+        with pytest.raises(ValueError):
+            DistanceCache(str(tmp_path), block_size=32).matrix(random_clients(2))
+    
+    def test_open_distance_cache(self, tmp_path):
+        """Test: Instancia compartida por proceso y deshabilitada sin directorio"""
+        assert open_distance_cache('') is None
+        assert open_distance_cache(str(tmp_path)) is open_distance_cache(str(tmp_path))
+    
+    def test_sequence_clients_with_cache(self, tmp_path):
+        """Test: La secuencia de paradas es la misma con y sin caché"""
+        cache = DistanceCache(str(tmp_path), block_size=16)
+        clients = [{'id': client_id, 'latitude': lat, 'longitude': lon} for client_id, lat, lon in random_clients(25)]
+        
+        _, cached_total = sequence_clients(clients, depot=(4.65, -74.1), distance_cache=cache)
+        _, plain_total = sequence_clients(clients, depot=(4.65, -74.1))
+        
+        assert cached_total == pytest.approx(plain_total, abs=0.01)
+        assert cache.stats()['clients'] == 25
@@ -0,0 +1,113 @@
+"""
+Tests para la planificación de rutas de la flota
+"""
+import random
+import pytest
+from app.optimization.fleet_planner import plan_fleet
+from app.optimization.planner_pool import PlannerPool
+
+TRUCKS = ["CAM-001", "CAM-002", "CAM-003", "CAM-004", "CAM-005"]
+DEPOT = (4.65, -74.10)
+
+
+def random_stops(count, seed=1):
+    rng = random.Random(seed)
+    return [
+        {
+            'client_id': f"c-{index}",
+            'latitude': 4.60 + rng.uniform(-0.15, 0.15),
+            'longitude': -74.08 + rng.uniform(-0.10, 0.10),
+            'orders': list(range(rng.randint(1, 4)))
+        }
+        for index in range(count)
+    ]
+
+
+class TestPlanFleet:
+    """Tests para plan_fleet"""
+    
+    def test_every_stop_is_assigned_once_with_balanced_loads(self):
+        """Test: Cada parada queda en una sola ruta y las cargas se balancean"""
+        stops = random_stops(200)
+        
+        plan = plan_fleet(stops, TRUCKS, DEPOT, balance_tolerance=0.15)
+        
+        assigned = [stop['client_id'] for route in plan['routes'] for stop in route['stops']]
+        assert sorted(assigned) == sorted(stop['client_id'] for stop in stops)
+        assert [route['assigned_truck'] for route in plan['routes']] == TRUCKS
+        
+        total_orders = sum(len(stop['orders']) for stop in stops)
+        for route in plan['routes']:
+            assert route['orders_count'] <= total_orders / len(TRUCKS) * 1.15 + 1
+            assert [stop['sequence'] for stop in route['stops']] == list(range(1, route['stops_count'] + 1))
+        assert plan['metrics']['load_imbalance'] <= 1.15
+    
+    def test_local_search_does_not_worsen_sweep(self):
+        """Test: La búsqueda local no empeora la solución inicial del barrido"""
+        plan = plan_fleet(random_stops(150, seed=4), TRUCKS, DEPOT)
+        metrics = plan['metrics']
+        
+        assert metrics['total_distance_km'] <= metrics['initial_distance_km'] + 1e-6
+        assert metrics['improvement_percent'] >= 0
+        assert metrics['total_distance_km'] == pytest.approx(sum(route['distance_km'] for route in plan['routes']), abs=0.01)
+        assert metrics['time_limit_reached'] is False
+    
+    def test_routes_are_geographically_compact(self):
+        """Test: Con clientes en zonas separadas cada camión atiende una zona"""
+        rng = random.Random(2)
+        centers = [(4.50, -74.20), (4.80, -74.20), (4.50, -73.95), (4.80, -73.95)]
+        stops = [
+            {
+                'client_id': f"z{zone}-{index}",
+                'latitude': lat + rng.uniform(-0.01, 0.01),
+                'longitude': lon + rng.uniform(-0.01, 0.01),
+                'orders': [index]
+            }
+            for zone, (lat, lon) in enumerate(centers)
+            for index in range(10)
+        ]
+        
+        plan = plan_fleet(stops, TRUCKS[:4], depot=(4.65, -74.075))
+        
+        for route in plan['routes']:
+            assert len({stop['client_id'].split('-')[0] for stop in route['stops']}) == 1
+    
+    def test_time_limit_is_respected(self):
+        """Test: El plan se entrega al agotar el tiempo límite"""
+        plan = plan_fleet(random_stops(600, seed=7), TRUCKS, DEPOT, time_limit_ms=30)
+        
+        assert plan['metrics']['time_limit_reached'] is True
+        assert sum(route['stops_count'] for route in plan['routes']) == 600
+    
+    def test_unassigned_stops(self):
+        """Test: Paradas sin coordenadas o sin camiones quedan sin asignar"""
+        stops = random_stops(3) + [{'client_id': None, 'latitude': None, 'longitude': None, 'orders': [9]}]
+        
+        plan = plan_fleet(stops, TRUCKS)
+        no_trucks = plan_fleet(stops, [])
+        
+        assert [stop['client_id'] for stop in plan['unassigned']] == [None]
+        assert plan['unassigned'][0]['reason'] == 'Cliente sin coordenadas válidas'
+        assert len(no_trucks['unassigned']) == 4
+        assert no_trucks['routes'] == []
+    
+    def test_empty_day(self):
+        """Test: Sin paradas cada camión recibe una ruta vacía"""
+        plan = plan_fleet([], TRUCKS)
+        
+        assert [route['stops_count'] for route in plan['routes']] == [0] * 5
+        assert plan['metrics']['total_distance_km'] == 0
+
+
+class TestPlannerPool:
+    """Tests para PlannerPool"""
+    
+    def test_runs_plan_in_separate_process(self):
+        """Test: El plan se calcula en un proceso del pool"""
+        pool = PlannerPool(max_workers=1)
+        try:
+            plan = pool.run(plan_fleet, random_stops(30), TRUCKS[:2], DEPOT, timeout=60)
+        finally:
+            pool.shutdown()
+        
+        assert sum(route['stops_count'] for route in plan['routes']) == 30
@@ -0,0 +1,237 @@
+"""
+Tests para las claves de idempotencia de la creación de rutas
+"""
+import threading
+import time
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock, patch
+import pytest
+from app.repositories.idempotency_repository import IdempotencyRepository
+from app.services.idempotency_service import (
+    REPLAYED_HEADER,
+    IdempotencyInProgressError,
+    IdempotencyKeyReuseError,
+    IdempotencyService,
+    request_fingerprint
+)
+from app.utils.metrics import metrics
+
+NOW = datetime(2026, 1, 10, 8, 0, 0)
+
+
+class FakeIdempotencyRepository:
+    """Tabla idempotency_keys compartida entre instancias, como entre procesos"""
+    
+    rows = {}
+    
+    def __init__(self, session):
+        self.session = session
+    
+    def claim(self, key, request_hash, created_at, expires_at):
+        if key in self.rows:
+            return False
+        self.rows[key] = {
+            'key': key, 'request_hash': request_hash, 'status_code': None, 'response_body': None,
+            'response_headers': None, 'created_at': created_at, 'expires_at': expires_at
+        }
+        return True
+    
+    def get(self, key):
+        row = self.rows.get(key)
+        return dict(row) if row else None
+    
+    def complete(self, key, status_code, response_body, response_headers=None):
+        self.rows[key].update(status_code=status_code, response_body=response_body, response_headers=response_headers)
+    
+    def release(self, key, created_at=None):
+        if key in self.rows and (created_at is None or self.rows[key]['created_at'] == created_at):
+            del self.rows[key]
+    
+    def delete_expired(self, now):
+        return 0
+
+
+class TestIdempotencyRepository:
+    """Tests para IdempotencyRepository"""
+    
+    def setup_method(self):
+        """Configuración inicial para cada test"""
+        self.session = MagicMock()
+        self.patcher = patch('app.repositories.idempotency_repository.IdempotencyKeyDB')
+        model = self.patcher.start()
+        model.expires_at.__le__ = MagicMock(return_value=MagicMock())
+        self.repository = IdempotencyRepository(self.session)
+    
+    def teardown_method(self):
+        """Limpieza después de cada test"""
+        self.patcher.stop()
+    
+    def test_claim(self):
+        """Test: La clave se registra una vez; la inserción duplicada se revierte"""
+        assert self.repository.claim('key-1', 'hash', NOW, NOW + timedelta(days=1)) is True
+        self.session.commit.assert_called_once()
+        
+        self.session.execute.side_effect = Exception("duplicate key")
+        assert self.repository.claim('key-1', 'hash', NOW, NOW + timedelta(days=1)) is False
+        self.session.rollback.assert_called_once()
+    
+    def test_get(self):
+        """Test: Retorna la fila como diccionario o None si no existe"""
+        row = ('key-1', 'hash', 201, '{}', None, NOW, NOW + timedelta(days=1))
+        self.session.execute.return_value.first.side_effect = [row, None]
+        
+        assert self.repository.get('key-1') == {
+            'key': 'key-1', 'request_hash': 'hash', 'status_code': 201, 'response_body': '{}',
+            'response_headers': None, 'created_at': NOW, 'expires_at': NOW + timedelta(days=1)
+        }
+        assert self.repository.get('key-2') is None
+    
+    def test_complete_release_and_delete_expired(self):
+        """Test: Guardar, liberar y purgar confirman la transacción"""
+        self.session.execute.return_value.rowcount = 3
+        
+        self.repository.complete('key-1', 201, '{}', '{"Location": "/x"}')
+        self.repository.release('key-1')
+        self.repository.release('key-1', created_at=NOW)
+        
+        assert self.repository.delete_expired(NOW) == 3
+        assert self.session.execute.call_count == 4
+        assert self.session.commit.call_count == 4
+    
+    @pytest.mark.parametrize('call, message', [
+        (lambda repository: repository.get('key-1'), "Error al obtener la clave de idempotencia"),
+        (lambda repository: repository.complete('key-1', 201, '{}'), "Error al guardar la respuesta idempotente"),
+        (lambda repository: repository.release('key-1'), "Error al liberar la clave de idempotencia"),
+        (lambda repository: repository.delete_expired(NOW), "Error al eliminar claves de idempotencia vencidas")
+    ])
+    def test_database_errors_roll_back(self, call, message):
+        """Test: Los errores de base de datos revierten la transacción"""
+        self.session.execute.side_effect = Exception("connection reset")
+        
+        with pytest.raises(Exception, match=message):
+            call(self.repository)
+        
+        self.session.rollback.assert_called_once()
+
+
+class TestIdempotencyService:
+    """Tests para IdempotencyService"""
+    
+    def setup_method(self):
+        """Configuración inicial para cada test"""
+        metrics.reset()
+        FakeIdempotencyRepository.rows = {}
+        self.patcher = patch('app.services.idempotency_service.IdempotencyRepository', FakeIdempotencyRepository)
+        self.patcher.start()
+    
+    def teardown_method(self):
+        """Limpieza después de cada test"""
+        self.patcher.stop()
+    
+    def service(self, **options):
+        return IdempotencyService(MagicMock, clock=lambda: NOW, poll_interval_seconds=0.01, **options)
+    
+    def test_replay_returns_stored_response_without_running_handler(self):
+        """Test: La repetición retorna la respuesta original, también desde otro proceso"""
+        handler = MagicMock(return_value=({'data': {'id': 7}}, 201, {'Set-Cookie': 'x'}))
+        fingerprint = request_fingerprint({'assigned_truck': 'CAM-001'})
+        service = self.service()
+        
+        first = service.execute('key-1', fingerprint, handler)
+        replay = service.execute('key-1', fingerprint, handler)
+        other_process = self.service().execute('key-1', fingerprint, handler)
+        
+        assert first == ({'data': {'id': 7}}, 201, {'Set-Cookie': 'x'})
+        assert replay == ({'data': {'id': 7}}, 201, {REPLAYED_HEADER: 'true'})
+        assert other_process == replay
+        handler.assert_called_once()
+        assert metrics.snapshot()['idempotency.replayed'] == 2
+    
+    def test_replay_keeps_async_location(self):
+        """Test: La repetición de una creación asíncrona conserva Location y Preference-Applied"""
+        headers = {'Location': '/logistics/routes/jobs/job-1', 'Preference-Applied': 'respond-async', 'X-Read-Primary': '1'}
+        handler = MagicMock(return_value=({'data': {'id': 'job-1'}}, 202, headers))
+        
+        self.service().execute('key-1', 'hash', handler)
+        replay = self.service().execute('key-1', 'hash', handler)
+        
+        assert replay == ({'data': {'id': 'job-1'}}, 202, {
+            'Location': '/logistics/routes/jobs/job-1',
+            'Preference-Applied': 'respond-async',
+            REPLAYED_HEADER: 'true'
+        })
+        handler.assert_called_once()
+    
+    def test_key_reused_with_other_body(self):
+        """Test: La misma clave con otro cuerpo se rechaza"""
+        service = self.service()
+        service.execute('key-1', request_fingerprint({'assigned_truck': 'CAM-001'}), lambda: ({}, 201))
+        
+        with pytest.raises(IdempotencyKeyReuseError):
+            service.execute('key-1', request_fingerprint({'assigned_truck': 'CAM-002'}), lambda: ({}, 201))
+    
+    def test_server_errors_release_key(self):
+        """Test: Un 5xx o una excepción no se guardan y el reintento vuelve a ejecutarse"""
+        service = self.service()
+        
+        assert service.execute('key-1', 'hash', lambda: ({'error': 'caído'}, 503))[1] == 503
+        with pytest.raises(RuntimeError):
+            service.execute('key-1', 'hash', MagicMock(side_effect=RuntimeError("sin conexión")))
+        assert service.execute('key-1', 'hash', lambda: ({'ok': True}, 201)) == ({'ok': True}, 201)
+    
+    def test_concurrent_duplicates_wait_for_first(self):
+        """Test: Las peticiones concurrentes con la misma clave esperan el resultado de la primera"""
+        service = self.service()
+        started, release = threading.Event(), threading.Event()
+        calls = []
+        
+        def handler():
+            calls.append(1)
+            started.set()
+            release.wait(5)
+            return {'data': {'id': 9}}, 201
+        
+        results = []
+        first = threading.Thread(target=lambda: results.append(service.execute('key-1', 'hash', handler)))
+        first.start()
+        started.wait(5)
+        duplicates = [threading.Thread(target=lambda: results.append(service.execute('key-1', 'hash', handler))) for _ in range(3)]
+        for thread in duplicates:
+            thread.start()
+        while metrics.snapshot().get('idempotency.waited', 0) < 3:
+            time.sleep(0.01)
+        release.set()
+        for thread in [first] + duplicates:
+            thread.join(5)
+        
+        assert len(calls) == 1
+        assert sorted(result[0]['data']['id'] for result in results) == [9, 9, 9, 9]
+        assert metrics.snapshot()['idempotency.waited'] == 3
+    
+    def test_in_progress_in_other_process(self):
+        """Test: Una clave en curso en otro proceso se espera y luego se considera abandonada"""
+        FakeIdempotencyRepository.rows['key-1'] = {
+            'key': 'key-1', 'request_hash': 'hash', 'status_code': None, 'response_body': None,
+            'created_at': NOW - timedelta(seconds=5), 'expires_at': NOW + timedelta(days=1)
+        }
+        handler = MagicMock(return_value=({}, 201))
+        
+        with pytest.raises(IdempotencyInProgressError):
+            self.service(wait_seconds=0.05).execute('key-1', 'hash', handler)
+        result = self.service(lock_seconds=1).execute('key-1', 'hash', handler)
+        
+        assert result == ({}, 201)
+        handler.assert_called_once()
+        assert FakeIdempotencyRepository.rows['key-1']['status_code'] == 201
+    
+    def test_expired_response_runs_again(self):
+        """Test: Vencido el TTL la clave se vuelve a ejecutar"""
+        clock = [NOW]
+        service = IdempotencyService(MagicMock, ttl_seconds=60, clock=lambda: clock[0])
+        handler = MagicMock(return_value=({}, 201))
+        
+        service.execute('key-1', 'hash', handler)
+        clock[0] = NOW + timedelta(seconds=61)
+        service.execute('key-1', 'hash', handler)
+        
+        assert handler.call_count == 2
@@ -0,0 +1,256 @@
+"""
+Tests para el gestor de tareas en segundo plano
+"""
+import threading
+from datetime import datetime
+from unittest.mock import MagicMock, patch
+import pytest
+from app.repositories.job_repository import JobRepository
+from app.utils.jobs import BACKEND_INLINE, JobManager, JobQueueFullError, JOB_COMPLETED, JOB_FAILED, JOB_PENDING, JOB_RUNNING
+
+NOW = datetime(2026, 1, 10, 8, 0, 0)
+
+
+class FakeJobRepository:
+    """JobRepository en memoria; las instancias comparten las filas como la tabla route_jobs"""
+    
+    def __init__(self, rows, fail_on=()):
+        self.rows = rows
+        self.fail_on = fail_on
+    
+    def create(self, job_id, kind, status, created_at):
+        if 'create' in self.fail_on:
+            raise Exception("Error al registrar la tarea: sin conexión")
+        self.rows[job_id] = {
+            'id': job_id, 'kind': kind, 'status': status, 'progress': {}, 'result': None, 'error': None,
+            'created_at': created_at, 'started_at': None, 'finished_at': None
+        }
+    
+    def update(self, job_id, **fields):
+        if 'update' in self.fail_on:
+            raise Exception("Error al actualizar la tarea: sin conexión")
+        self.rows[job_id].update(fields)
+    
+    def get(self, job_id):
+        return dict(self.rows[job_id]) if job_id in self.rows else None
+    
+    def prune(self, kind, keep, finished_statuses):
+        self.rows['pruned'] = (kind, keep, finished_statuses)
+
+
+class TestJobManager:
+    """Tests para JobManager"""
+    
+    def test_submit_runs_job_and_stores_result(self):
+        """Test: La tarea se ejecuta y guarda su resultado"""
+        manager = JobManager()
+        
+        job = manager.submit('demo', lambda job, value: value * 2, 21)
+        
+        assert job.wait(5)
+        assert job.status == JOB_COMPLETED
+        assert job.result == 42
+        assert manager.get(job.id) is job
+    
+    def test_progress_is_reported(self):
+        """Test: La tarea reporta progreso"""
+        manager = JobManager()
+        
+        def work(job):
+            job.update_progress(done=1, total=2)
+            job.update_progress(done=2)
+            return 'ok'
+        
+        job = manager.submit('demo', work)
+        job.wait(5)
+        
+        data = job.to_dict()
+        assert data['progress'] == {'done': 2, 'total': 2}
+        assert data['started_at'] is not None
+        assert data['finished_at'] is not None
+    
+    def test_failed_job_stores_error(self):
+        """Test: Una tarea con error queda en estado failed"""
+        manager = JobManager()
+        
+        def work(job):
+            raise RuntimeError("sin conexión")
+        
+        job = manager.submit('demo', work)
+        job.wait(5)
+        
+        assert job.status == JOB_FAILED
+        assert job.error == "sin conexión"
+    
+    def test_get_unknown_job(self):
+        """Test: Tarea inexistente"""
+        assert JobManager().get('no-existe') is None
+    
+    def test_finished_jobs_are_evicted(self):
+        """Test: Solo se retienen las últimas tareas terminadas"""
+        manager = JobManager(max_retained_jobs=2)
+        
+        jobs = []
+        for value in range(4):
+            job = manager.submit('demo', lambda job, v: v, value)
+            job.wait(5)
+            jobs.append(job)
+        
+        assert manager.get(jobs[0].id) is None
+        assert manager.get(jobs[-1].id) is jobs[-1]
+    
+    def test_new_job_is_pending(self):
+        """Test: Una tarea nueva inicia pendiente"""
+        from app.utils.jobs import Job
+        
+        assert Job('demo').to_dict()['status'] == JOB_PENDING
+    
+    def test_queue_depth_rejects_new_jobs(self):
+        """Test: Con la cola llena se rechazan tareas hasta que alguna termine"""
+        manager = JobManager(max_queue_depth=1)
+        release = threading.Event()
+        
+        first = manager.submit('demo', lambda job: release.wait(5))
+        with pytest.raises(JobQueueFullError):
+            manager.submit('demo', lambda job: None)
+        release.set()
+        first.wait(5)
+        
+        assert manager.submit('demo', lambda job: 'ok').wait(5)
+    
+    def test_inline_backend_runs_in_caller(self):
+        """Test: El backend inline ejecuta la tarea antes de retornar"""
+        manager = JobManager(backend=BACKEND_INLINE)
+        
+        job = manager.submit('demo', lambda job: threading.current_thread().name)
+        
+        assert job.status == JOB_COMPLETED
+        assert job.result == threading.current_thread().name
+    
+    def test_unknown_backend(self):
+        """Test: Backend no soportado"""
+        with pytest.raises(ValueError):
+            JobManager(backend='celery')
+
+
+class TestJobManagerDatabase:
+    """Tests para JobManager con el estado de las tareas en base de datos"""
+    
+    def setup_method(self):
+        """Configuración inicial para cada test"""
+        self.rows = {}
+        self.fail_on = ()
+        self.session_factory = MagicMock()
+        self.patcher = patch('app.utils.jobs.JobRepository', side_effect=lambda session: FakeJobRepository(self.rows, self.fail_on))
+        self.patcher.start()
+    
+    def teardown_method(self):
+        """Limpieza después de cada test"""
+        self.patcher.stop()
+    
+    def test_state_is_shared_with_other_workers(self):
+        """Test: Otro proceso obtiene el estado, el progreso y el resultado de la tarea desde la base de datos"""
+        manager = JobManager(max_retained_jobs=5, backend=BACKEND_INLINE, session_factory=self.session_factory)
+        seen = []
+        
+        def work(job):
+            seen.append(self.rows[job.id]['status'])
+            job.update_progress(done=1)
+            seen.append(self.rows[job.id]['progress'])
+            return {'deleted': 3}
+        
+        job = manager.submit('purge_routes', work)
+        restored = JobManager(session_factory=self.session_factory).get(job.id)
+        
+        assert seen == [JOB_RUNNING, {'done': 1}]
+        assert restored is not job
+        assert restored.to_dict() == job.to_dict()
+        assert restored.wait(0)
+        assert JobManager(session_factory=self.session_factory).get('no-existe') is None
+        assert self.rows['pruned'] == ('purge_routes', 5, (JOB_COMPLETED, JOB_FAILED))
+        assert self.session_factory.return_value.close.call_count == self.session_factory.call_count
+    
+    def test_failed_job_is_stored(self):
+        """Test: El error de la tarea queda guardado para los demás procesos"""
+        manager = JobManager(backend=BACKEND_INLINE, session_factory=self.session_factory)
+        
+        job = manager.submit('demo', lambda job: int('x'))
+        
+        assert self.rows[job.id]['status'] == JOB_FAILED
+        assert self.rows[job.id]['error'] == job.error
+        assert self.rows[job.id]['finished_at'] == job.finished_at
+    
+    def test_store_failure_rejects_job(self):
+        """Test: Si no se puede registrar la tarea no se ejecuta ni queda en memoria"""
+        self.fail_on = ('create',)
+        manager = JobManager(backend=BACKEND_INLINE, session_factory=self.session_factory)
+        calls = []
+        
+        with pytest.raises(Exception, match="Error al registrar la tarea"):
+            manager.submit('demo', lambda job: calls.append(1))
+        
+        assert calls == []
+        assert manager._jobs == {}
+    
+    def test_update_failure_keeps_job_running(self):
+        """Test: Un error al guardar el estado no interrumpe la tarea"""
+        manager = JobManager(backend=BACKEND_INLINE, session_factory=self.session_factory)
+        self.fail_on = ('update',)
+        
+        job = manager.submit('demo', lambda job: job.update_progress(done=1) or 'ok')
+        
+        assert job.status == JOB_COMPLETED
+        assert job.result == 'ok'
+        assert manager.get(job.id) is job
+
+
+class TestJobRepository:
+    """Tests para JobRepository"""
+    
+    def setup_method(self):
+        """Configuración inicial para cada test"""
+        self.session = MagicMock()
+        self.patcher = patch('app.repositories.job_repository.RouteJobDB')
+        self.patcher.start()
+        self.repository = JobRepository(self.session)
+    
+    def teardown_method(self):
+        """Limpieza después de cada test"""
+        self.patcher.stop()
+    
+    def test_create_update_and_prune_commit(self):
+        """Test: Registrar, actualizar y depurar confirman la transacción"""
+        with patch('app.repositories.job_repository.update') as mock_update:
+            self.repository.create('job-1', 'demo', JOB_PENDING, NOW)
+            self.repository.update('job-1', status=JOB_COMPLETED, progress={'done': 1}, result={'on': NOW.date()})
+            self.repository.prune('demo', 10, (JOB_COMPLETED, JOB_FAILED))
+        
+        values = mock_update.return_value.where.return_value.values.call_args.kwargs
+        assert values == {'status': JOB_COMPLETED, 'progress': '{"done": 1}', 'result': '{"on": "2026-01-10"}'}
+        assert self.session.commit.call_count == 3
+    
+    def test_get(self):
+        """Test: Retorna la tarea con progreso y resultado decodificados o None si no existe"""
+        row = ('job-1', 'demo', JOB_COMPLETED, '{"done": 1}', '{"deleted": 3}', None, NOW, NOW, NOW)
+        self.session.execute.return_value.first.side_effect = [row, None]
+        
+        assert self.repository.get('job-1') == {
+            'id': 'job-1', 'kind': 'demo', 'status': JOB_COMPLETED, 'progress': {'done': 1}, 'result': {'deleted': 3},
+            'error': None, 'created_at': NOW, 'started_at': NOW, 'finished_at': NOW
+        }
+        assert self.repository.get('job-2') is None
+    
+    def test_errors_roll_back(self):
+        """Test: Los errores de base de datos revierten la transacción"""
+        self.session.execute.side_effect = Exception("timeout")
+        
+        with pytest.raises(Exception, match="Error al registrar la tarea"):
+            self.repository.create('job-1', 'demo', JOB_PENDING, NOW)
+        with pytest.raises(Exception, match="Error al actualizar la tarea"):
+            self.repository.update('job-1', status=JOB_RUNNING)
+        with pytest.raises(Exception, match="Error al obtener la tarea"):
+            self.repository.get('job-1')
+        with pytest.raises(Exception, match="Error al depurar tareas terminadas"):
+            self.repository.prune('demo', 10, (JOB_COMPLETED, JOB_FAILED))
+        
+        assert self.session.rollback.call_count == 4
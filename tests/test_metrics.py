@@ -0,0 +1,101 @@
+"""
+Tests para el registro de métricas y las estadísticas de caché de sentencias
+"""
+from enum import Enum
+from types import SimpleNamespace
+from unittest.mock import patch
+from flask import Flask
+from app.utils.metrics import MetricsRegistry
+from app.config.statement_cache import track_statement_cache
+from app.controllers.metrics_controller import MetricsController
+
+
+class CacheStats(Enum):
+    CACHE_HIT = 0
+    CACHE_MISS = 1
+
+
+class TestMetricsRegistry:
+    """Tests para MetricsRegistry"""
+    
+    def test_increment_and_snapshot(self):
+        """Test: Los contadores se acumulan"""
+        registry = MetricsRegistry()
+        
+        registry.increment('a')
+        registry.increment('a', 2)
+        registry.increment('b')
+        
+        assert registry.snapshot() == {'a': 3, 'b': 1}
+    
+    def test_gauges_are_read_on_snapshot(self):
+        """Test: Los indicadores se leen al tomar la instantánea"""
+        registry = MetricsRegistry()
+        values = [1]
+        registry.register_gauge('size', lambda: len(values))
+        values.append(2)
+        
+        assert registry.snapshot() == {'size': 2}
+    
+    def test_failing_gauge(self):
+        """Test: Un indicador con error no rompe la instantánea"""
+        registry = MetricsRegistry()
+        registry.register_gauge('broken', lambda: 1 / 0)
+        
+        assert registry.snapshot() == {'broken': None}
+    
+    def test_reset(self):
+        """Test: reset limpia los contadores"""
+        registry = MetricsRegistry()
+        registry.increment('a')
+        
+        registry.reset()
+        
+        assert registry.snapshot() == {}
+
+
+class TestTrackStatementCache:
+    """Tests para track_statement_cache"""
+    
+    def test_counts_cache_outcomes(self):
+        """Test: Cada ejecución suma su resultado de caché"""
+        registry = MetricsRegistry()
+        listeners = {}
+        engine = SimpleNamespace(_compiled_cache={'k1': 1, 'k2': 2})
+        
+        def listens_for(target, identifier):
+            def decorator(func):
+                listeners[identifier] = func
+                return func
+            return decorator
+        
+        with patch('app.config.statement_cache.event') as mock_event:
+            mock_event.listens_for.side_effect = listens_for
+            track_statement_cache(engine, registry)
+        
+        listener = listeners['after_cursor_execute']
+        listener(None, None, 'SELECT 1', {}, SimpleNamespace(cache_hit=CacheStats.CACHE_MISS), False)
+        listener(None, None, 'SELECT 1', {}, SimpleNamespace(cache_hit=CacheStats.CACHE_HIT), False)
+        listener(None, None, 'SELECT 1', {}, SimpleNamespace(cache_hit=CacheStats.CACHE_HIT), False)
+        listener(None, None, 'PRAGMA', {}, SimpleNamespace(), False)
+        
+        assert registry.snapshot() == {
+            'sql_statement_cache.primary.cache_hit': 2,
+            'sql_statement_cache.primary.cache_miss': 1,
+            'sql_statement_cache.primary.size': 2
+        }
+
+
+class TestMetricsController:
+    """Tests para MetricsController"""
+    
+    def test_get(self):
+        """Test: El endpoint retorna la instantánea de métricas"""
+        app = Flask(__name__)
+        with patch('app.controllers.metrics_controller.metrics') as mock_metrics:
+            mock_metrics.snapshot.return_value = {'sql_statement_cache.primary.cache_hit': 10}
+            with app.test_request_context('/logistics/metrics'):
+                response = MetricsController().get()
+        
+        assert response[1] == 200
+        assert response[0]['data'] == {'sql_statement_cache.primary.cache_hit': 10}
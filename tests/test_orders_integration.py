@@ -1,10 +1,13 @@
 """
 Tests para OrdersIntegration
 """
+import threading
+import time
 import pytest
 from unittest.mock import patch, MagicMock
 from datetime import date
 from app.integrations.orders_integration import OrdersIntegration
+from app.utils.metrics import metrics
 import requests
 
 
@@ -14,7 +17,9 @@ class TestOrdersIntegration:
     @pytest.fixture
     def orders_integration(self):
         """Instancia de OrdersIntegration"""
-        return OrdersIntegration()
+        OrdersIntegration._by_date_unsupported_until.clear()
+        yield OrdersIntegration()
+        OrdersIntegration._by_date_unsupported_until.clear()
     
     @patch('app.integrations.orders_integration.requests.get')
     def test_get_orders_by_truck_and_date_success(self, mock_get, orders_integration):
@@ -166,4 +171,128 @@ class TestOrdersIntegration:
         
         with pytest.raises(Exception, match="Error al consultar servicio de pedidos"):
             orders_integration.get_orders_by_truck_and_date('CAM-001', date(2025, 12, 26))
-
+    
+    def _response(self, status_code, body=None):
+        response = MagicMock()
+        response.status_code = status_code
+        response.json.return_value = body
+        return response
+    
+    @patch('app.integrations.orders_integration.requests.get')
+    def test_get_orders_by_date_groups_by_truck(self, mock_get, orders_integration):
+        """Test: Una sola llamada por fecha agrupada por camión"""
+        mock_get.return_value = self._response(200, {
+            'success': True,
+            'data': [
+                {'id': 1, 'assigned_truck': 'CAM-001'},
+                {'id': 2, 'assigned_truck': 'CAM-002'},
+                {'id': 3, 'assigned_truck': 'CAM-001'},
+                {'id': 4, 'assigned_truck': 'CAM-009'}
+            ]
+        })
+        
+        result = orders_integration.get_orders_by_date(date(2025, 12, 26), ['CAM-001', 'CAM-002', 'CAM-003'])
+        
+        assert [order['id'] for order in result['CAM-001']] == [1, 3]
+        assert [order['id'] for order in result['CAM-002']] == [2]
+        assert result['CAM-003'] == []
+        mock_get.assert_called_once()
+        assert mock_get.call_args.args[0].endswith('/orders/by-date')
+        assert mock_get.call_args.kwargs['params'] == {'scheduled_delivery_date': '2025-12-26'}
+    
+    @patch('app.integrations.orders_integration.requests.get')
+    def test_get_orders_by_date_falls_back_per_truck(self, mock_get, orders_integration):
+        """Test: Sin endpoint por fecha se consulta por camión y se recuerda"""
+        def get(url, params=None, timeout=None):
+            if url.endswith('/orders/by-date'):
+                response = self._response(404)
+                response.json.side_effect = ValueError("Expecting value")
+                return response
+            return self._response(200, {'success': True, 'data': [{'id': params['assigned_truck']}]})
+        mock_get.side_effect = get
+        
+        first = orders_integration.get_orders_by_date(date(2025, 12, 26), ['CAM-001', 'CAM-002'])
+        second = OrdersIntegration().get_orders_by_date(date(2025, 12, 27), ['CAM-003'])
+        
+        assert first == {'CAM-001': [{'id': 'CAM-001'}], 'CAM-002': [{'id': 'CAM-002'}]}
+        assert second == {'CAM-003': [{'id': 'CAM-003'}]}
+        by_date_calls = [call for call in mock_get.call_args_list if call.args[0].endswith('/orders/by-date')]
+        assert len(by_date_calls) == 1
+    
+    @patch('app.integrations.orders_integration.requests.get')
+    def test_get_orders_by_date_not_found_is_empty(self, mock_get, orders_integration):
+        """Test: Un 404 del servicio de pedidos con cuerpo JSON es un resultado vacío y no desactiva la consulta por fecha"""
+        mock_get.return_value = self._response(404, {'success': False, 'error': 'No se encontraron pedidos'})
+        
+        first = orders_integration.get_orders_by_date(date(2025, 12, 26), ['CAM-001', 'CAM-002'])
+        second = orders_integration.get_orders_by_date(date(2025, 12, 27), ['CAM-001'])
+        
+        assert first == {'CAM-001': [], 'CAM-002': []}
+        assert second == {'CAM-001': []}
+        assert all(call.args[0].endswith('/orders/by-date') for call in mock_get.call_args_list)
+        assert OrdersIntegration._by_date_unsupported_until == {}
+    
+    @patch('app.integrations.orders_integration.requests.get')
+    def test_get_orders_by_date_connection_error(self, mock_get, orders_integration):
+        """Test: Error de conexión con la misma semántica que por camión"""
+        mock_get.side_effect = requests.exceptions.RequestException("Connection refused")
+        
+        with pytest.raises(Exception, match="Error al consultar servicio de pedidos"):
+            orders_integration.get_orders_by_date(date(2025, 12, 26), ['CAM-001'])
+        
+        result = orders_integration.get_orders_by_date(date(2025, 12, 26), ['CAM-001', 'CAM-002'], return_exceptions=True)
+        
+        assert all('Connection refused' in str(error) for error in result.values())
+        assert set(result) == {'CAM-001', 'CAM-002'}
+    
+    @patch('app.integrations.orders_integration.requests.get')
+    def test_get_orders_by_date_fallback_errors_per_truck(self, mock_get, orders_integration):
+        """Test: En modo por camión los errores se reportan por camión"""
+        def get(url, params=None, timeout=None):
+            if url.endswith('/orders/by-date'):
+                return self._response(501)
+            if params['assigned_truck'] == 'CAM-002':
+                raise requests.exceptions.RequestException("timeout")
+            return self._response(200, {'success': True, 'data': [{'id': 1}]})
+        mock_get.side_effect = get
+        
+        result = orders_integration.get_orders_by_date(date(2025, 12, 26), ['CAM-001', 'CAM-002'], return_exceptions=True)
+        
+        assert result['CAM-001'] == [{'id': 1}]
+        assert isinstance(result['CAM-002'], Exception)
+        with pytest.raises(Exception, match="timeout"):
+            orders_integration.get_orders_by_date(date(2025, 12, 26), ['CAM-002'])
+    
+    def test_get_orders_by_date_without_trucks(self, orders_integration):
+        """Test: Sin camiones no se consulta el servicio"""
+        assert orders_integration.get_orders_by_date(date(2025, 12, 26), []) == {}
+    
+    @patch('app.integrations.orders_integration.requests.get')
+    def test_get_orders_by_truck_and_date_coalesces_concurrent_calls(self, mock_get, orders_integration):
+        """Test: Las consultas concurrentes del mismo camión y fecha comparten una sola petición"""
+        metrics.reset()
+        release = threading.Event()
+        
+        def slow_get(*args, **kwargs):
+            release.wait(5)
+            return MagicMock(status_code=200, json=MagicMock(return_value={'success': True, 'data': [{'id': 1}]}))
+        
+        mock_get.side_effect = slow_get
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(
+                OrdersIntegration().get_orders_by_truck_and_date('CAM-001', date(2025, 12, 26))
+            ))
+            for _ in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        while metrics.snapshot().get('singleflight.orders_by_truck.suppressed', 0) < 3:
+            time.sleep(0.01)
+        release.set()
+        for thread in threads:
+            thread.join(5)
+        
+        assert results == [[{'id': 1}]] * 4
+        mock_get.assert_called_once()
+        assert metrics.snapshot()['singleflight.orders_by_truck.calls'] == 1
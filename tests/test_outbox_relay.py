@@ -0,0 +1,386 @@
+"""
+Tests para el outbox de eventos de rutas y su relay
+"""
+import json
+from datetime import datetime
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+import pika
+import pytest
+from pika.exceptions import AMQPConnectionError
+from app.integrations.event_publisher import InMemoryPublisher, RabbitMQPublisher, create_event_publisher
+from app.repositories.outbox_repository import ROUTE_CREATED, ROUTE_DELETED, OutboxRepository, outbox_rows
+from app.services.outbox_relay import OutboxRelay, start_outbox_relay
+from app.utils.metrics import MetricsRegistry, metrics
+
+NOW = datetime(2026, 1, 10, 8, 0, 30)
+
+
+class FakeIOLoop:
+    """Ejecuta en ``start`` los callbacks pendientes; sin más callbacks equivale a vencer el timeout"""
+    
+    def __init__(self):
+        self.callbacks = []
+        self.running = False
+    
+    def call_later(self, delay, callback):
+        return callback
+    
+    def remove_timeout(self, timer):
+        pass
+    
+    def start(self):
+        self.running = True
+        while self.running and self.callbacks:
+            self.callbacks.pop(0)()
+        self.running = False
+    
+    def stop(self):
+        self.running = False
+
+
+class FakeBroker:
+    """Stand-in de pika.SelectConnection con confirmaciones, devoluciones y rechazos configurables"""
+    
+    def __init__(self, returned=(), nacked=(), unconfirmed=(), multiple=False, refuse=False):
+        self.returned, self.nacked, self.unconfirmed = set(returned), set(nacked), set(unconfirmed)
+        self.multiple = multiple
+        self.refuse = refuse
+        self.connections = []
+        self.published = []
+        self.declared = []
+    
+    def __call__(self, parameters, on_open_callback, on_open_error_callback, on_close_callback):
+        connection = SimpleNamespace(ioloop=FakeIOLoop(), is_open=not self.refuse, is_closed=self.refuse)
+        channel = SimpleNamespace(is_open=True)
+        published = []
+        
+        def basic_publish(exchange, routing_key, body, properties, mandatory):
+            published.append(properties.message_id)
+            self.published.append({'routing_key': routing_key, 'properties': properties, 'mandatory': mandatory, 'body': body})
+            connection.ioloop.callbacks.append(lambda tag=len(published): confirm(tag))
+        
+        def confirm(tag):
+            message_id = published[tag - 1]
+            if message_id in self.returned:
+                channel.on_return(channel, SimpleNamespace(routing_key='route.created'), SimpleNamespace(message_id=message_id), b'')
+            if message_id in self.unconfirmed or (self.multiple and tag < len(published)):
+                return
+            method_class = pika.spec.Basic.Nack if message_id in self.nacked else pika.spec.Basic.Ack
+            channel.on_confirm(SimpleNamespace(method=method_class(delivery_tag=tag, multiple=self.multiple)))
+        
+        def close():
+            connection.is_open, connection.is_closed, channel.is_open = False, True, False
+            connection.ioloop.callbacks.append(lambda: on_close_callback(connection, 'closed'))
+        
+        channel.add_on_close_callback = lambda callback: None
+        channel.add_on_return_callback = lambda callback: setattr(channel, 'on_return', callback)
+        channel.exchange_declare = lambda callback, **kwargs: (
+            self.declared.append(kwargs), connection.ioloop.callbacks.append(lambda: callback(None))
+        )
+        channel.confirm_delivery = lambda ack_nack_callback, callback: (
+            setattr(channel, 'on_confirm', ack_nack_callback), connection.ioloop.callbacks.append(lambda: callback(None))
+        )
+        channel.basic_publish = basic_publish
+        connection.channel = lambda on_open_callback: connection.ioloop.callbacks.append(lambda: on_open_callback(channel))
+        connection.close = close
+        if self.refuse:
+            connection.ioloop.callbacks.append(lambda: on_open_error_callback(connection, ConnectionRefusedError("refused")))
+        else:
+            connection.ioloop.callbacks.append(lambda: on_open_callback(connection))
+        self.connections.append(connection)
+        return connection
+
+
+def outbox_event(event_id, event_type=ROUTE_CREATED):
+    return {
+        'id': event_id,
+        'event_type': event_type,
+        'route_id': 100 + event_id,
+        'payload': json.dumps({'id': 100 + event_id, 'route_code': f"ROU-{event_id:04d}"}),
+        'created_at': datetime(2026, 1, 10, 8, 0, 0)
+    }
+
+
+class TestOutboxRows:
+    """Tests para outbox_rows"""
+    
+    def test_rows_serialize_payload(self):
+        """Test: Cada evento guarda su tipo, la ruta y el payload en JSON"""
+        rows = outbox_rows(ROUTE_DELETED, [{'id': 7, 'delivery_date': datetime(2026, 1, 10).date()}])
+        
+        assert rows[0]['event_type'] == ROUTE_DELETED
+        assert rows[0]['route_id'] == 7
+        assert json.loads(rows[0]['payload']) == {'id': 7, 'delivery_date': '2026-01-10'}
+        assert isinstance(rows[0]['created_at'], datetime)
+
+
+class TestOutboxRepository:
+    """Tests para OutboxRepository"""
+    
+    def test_complete_batch_commits_even_without_events(self):
+        """Test: Sin eventos confirmados ni rechazados solo se libera el bloqueo del lote"""
+        session = MagicMock()
+        
+        with patch('app.repositories.outbox_repository.RouteOutboxDB'):
+            assert OutboxRepository(session).complete_batch([], [], 5) == 0
+            assert OutboxRepository(session).complete_batch([1, 2], [], 5) == 0
+        
+        assert session.execute.call_count == 1
+        assert session.commit.call_count == 2
+    
+    def test_complete_batch_counts_rejections(self):
+        """Test: Los rechazados suman un intento y los que agotan los intentos pasan a la tabla de eventos fallidos"""
+        session = MagicMock()
+        session.execute.return_value.all.side_effect = [[], [tuple(outbox_event(2).values()) + (5,)]]
+        
+        with patch('app.repositories.outbox_repository.RouteOutboxDB') as model, \
+                patch('app.repositories.outbox_repository.RouteOutboxDeadLetterDB'), \
+                patch('app.repositories.outbox_repository.insert') as mock_insert:
+            model.attempts.__ge__ = MagicMock(return_value=True)
+            assert OutboxRepository(session).complete_batch([1], [2], 5) == 0
+            assert OutboxRepository(session).complete_batch([], [2], 5) == 1
+        
+        dead_letters = session.execute.call_args_list[-2].args[1]
+        assert dead_letters[0]['id'] == 2
+        assert dead_letters[0]['attempts'] == 5
+        assert isinstance(dead_letters[0]['failed_at'], datetime)
+        assert mock_insert.call_count == 1
+        assert session.commit.call_count == 2
+    
+    def test_lock_pending_returns_events(self):
+        """Test: Los eventos pendientes se leen como diccionarios en orden de inserción"""
+        session = MagicMock()
+        event = outbox_event(1)
+        session.execute.return_value = [tuple(event.values())]
+        
+        with patch('app.repositories.outbox_repository.RouteOutboxDB'):
+            events = OutboxRepository(session).lock_pending(10)
+        
+        assert events == [event]
+    
+    def test_lock_pending_rolls_back(self):
+        """Test: Un error al bloquear el lote revierte la transacción"""
+        session = MagicMock()
+        session.execute.side_effect = Exception("deadlock")
+        
+        with patch('app.repositories.outbox_repository.RouteOutboxDB'):
+            with pytest.raises(Exception, match="Error al leer eventos pendientes"):
+                OutboxRepository(session).lock_pending(10)
+        
+        session.rollback.assert_called_once()
+    
+    def test_oldest_pending_created_at(self):
+        """Test: Retorna la fecha del evento pendiente más antiguo"""
+        session = MagicMock()
+        session.execute.return_value.scalar.return_value = NOW
+        
+        with patch('app.repositories.outbox_repository.RouteOutboxDB'):
+            assert OutboxRepository(session).oldest_pending_created_at() == NOW
+            session.execute.side_effect = Exception("timeout")
+            with pytest.raises(Exception, match="Error al medir el retraso de eventos"):
+                OutboxRepository(session).oldest_pending_created_at()
+    
+    def test_complete_batch_rolls_back(self):
+        """Test: Un error al borrar revierte la transacción"""
+        session = MagicMock()
+        session.execute.side_effect = Exception("lock timeout")
+        
+        with patch('app.repositories.outbox_repository.RouteOutboxDB'):
+            with pytest.raises(Exception, match="Error al confirmar eventos publicados"):
+                OutboxRepository(session).complete_batch([1], [], 5)
+        
+        session.rollback.assert_called_once()
+
+
+class TestOutboxRelay:
+    """Tests para OutboxRelay"""
+    
+    def setup_method(self):
+        """Configuración inicial para cada test"""
+        metrics.reset()
+        self.session = MagicMock()
+    
+    def relay(self, publisher, events, oldest=None):
+        repository = MagicMock()
+        repository.lock_pending.return_value = events
+        repository.complete_batch.return_value = 0
+        repository.oldest_pending_created_at.return_value = oldest
+        relay = OutboxRelay(lambda: self.session, publisher, batch_size=10, clock=lambda: NOW)
+        return relay, repository
+    
+    def test_publishes_batch_and_deletes_confirmed(self):
+        """Test: Los eventos confirmados se borran en el mismo ciclo y se cuentan"""
+        publisher = InMemoryPublisher()
+        relay, repository = self.relay(publisher, [outbox_event(1), outbox_event(2, ROUTE_DELETED)])
+        
+        with patch('app.services.outbox_relay.OutboxRepository', return_value=repository):
+            published = relay.relay_once()
+        
+        assert published == 2
+        assert [message['routing_key'] for message in publisher.messages] == [ROUTE_CREATED, ROUTE_DELETED]
+        assert publisher.messages[0]['message_id'] == '1'
+        assert publisher.messages[0]['body']['data']['route_code'] == 'ROU-0001'
+        repository.lock_pending.assert_called_once_with(10)
+        repository.complete_batch.assert_called_once_with([1, 2], [], 5)
+        assert metrics.snapshot()['outbox.published'] == 2
+        assert relay.lag_seconds == 0.0
+        self.session.close.assert_called_once()
+    
+    def test_unconfirmed_events_stay_pending(self):
+        """Test: Solo se borran los eventos confirmados y los demás quedan pendientes sin sumar intentos"""
+        publisher = InMemoryPublisher(fail_after=1)
+        relay, repository = self.relay(publisher, [outbox_event(1), outbox_event(2), outbox_event(3)], oldest=datetime(2026, 1, 10, 8, 0, 0))
+        
+        with patch('app.services.outbox_relay.OutboxRepository', return_value=repository):
+            published = relay.relay_once()
+        
+        assert published == 1
+        repository.complete_batch.assert_called_once_with([1], [], 5)
+        assert metrics.snapshot()['outbox.publish_failed'] == 1
+        assert relay.lag_seconds == 30.0
+    
+    def test_rejected_event_does_not_block_batch(self):
+        """Test: Un evento devuelto no impide borrar los siguientes y se registra su intento"""
+        publisher = InMemoryPublisher(unroutable=(ROUTE_DELETED,))
+        relay, repository = self.relay(publisher, [outbox_event(1), outbox_event(2, ROUTE_DELETED), outbox_event(3)])
+        repository.complete_batch.return_value = 1
+        
+        with patch('app.services.outbox_relay.OutboxRepository', return_value=repository):
+            published = relay.relay_once()
+        
+        assert published == 2
+        assert [message['message_id'] for message in publisher.messages] == ['1', '3']
+        repository.complete_batch.assert_called_once_with([1, 3], [2], 5)
+        assert metrics.snapshot()['outbox.publish_failed'] == 1
+        assert metrics.snapshot()['outbox.dead_lettered'] == 1
+    
+    def test_publisher_error_keeps_batch(self):
+        """Test: Si el broker no responde no se borra ningún evento y el bloqueo se libera"""
+        publisher = MagicMock()
+        publisher.publish_batch.side_effect = AMQPConnectionError("refused")
+        relay, repository = self.relay(publisher, [outbox_event(1)])
+        
+        with patch('app.services.outbox_relay.OutboxRepository', return_value=repository):
+            assert relay.relay_once() == 0
+        
+        repository.complete_batch.assert_called_once_with([], [], 5)
+        assert metrics.snapshot()['outbox.publish_failed'] == 1
+    
+    def test_empty_outbox_skips_publisher(self):
+        """Test: Sin eventos pendientes no se contacta al broker"""
+        publisher = MagicMock()
+        relay, repository = self.relay(publisher, [])
+        
+        with patch('app.services.outbox_relay.OutboxRepository', return_value=repository):
+            assert relay.relay_once() == 0
+        
+        publisher.publish_batch.assert_not_called()
+        assert 'outbox.publish_failed' not in metrics.snapshot()
+    
+    def test_run_polls_until_stopped(self):
+        """Test: El hilo sigue tras un error y espera el intervalo cuando el lote no se llena"""
+        relay = OutboxRelay(MagicMock, InMemoryPublisher(), batch_size=10, poll_interval_seconds=0.01)
+        cycles = []
+        
+        def relay_once():
+            cycles.append(1)
+            if len(cycles) == 1:
+                raise Exception("conexión perdida")
+            if len(cycles) == 3:
+                relay._stop.set()
+            return 0
+        
+        with patch.object(relay, 'relay_once', side_effect=relay_once):
+            relay.start()
+            relay._thread.join(5)
+            relay.stop()
+        
+        assert len(cycles) == 3
+        assert not relay._thread.is_alive()
+    
+    def test_start_enabled_once_per_process(self):
+        """Test: Con OUTBOX_RELAY_ENABLED se inicia un único relay y se publica su retraso"""
+        config = MagicMock(
+            OUTBOX_RELAY_ENABLED=True,
+            OUTBOX_BROKER_URL='memory://',
+            OUTBOX_EXCHANGE='logistics.routes',
+            OUTBOX_BATCH_SIZE=10,
+            OUTBOX_POLL_INTERVAL_SECONDS=0.01,
+            OUTBOX_MAX_ATTEMPTS=3
+        )
+        
+        registry = MetricsRegistry()
+        
+        with patch('app.services.outbox_relay._relay', None), patch('app.services.outbox_relay.metrics', registry), \
+                patch.object(OutboxRelay, 'start') as mock_start:
+            relay = start_outbox_relay(config, MagicMock())
+            
+            assert start_outbox_relay(config, MagicMock()) is relay
+            assert isinstance(relay.publisher, InMemoryPublisher)
+            assert relay.batch_size == 10
+            assert relay.max_attempts == 3
+            mock_start.assert_called_once()
+            relay.lag_seconds = 4.0
+            assert registry.snapshot() == {'outbox.lag_seconds': 4.0}
+    
+    def test_start_disabled(self):
+        """Test: Sin OUTBOX_RELAY_ENABLED no se inicia el relay"""
+        config = MagicMock(OUTBOX_RELAY_ENABLED=False)
+        
+        assert start_outbox_relay(config, MagicMock()) is None
+
+
+class TestRabbitMQPublisher:
+    """Tests para RabbitMQPublisher"""
+    
+    def publisher(self, broker):
+        return RabbitMQPublisher('amqp://localhost', 'logistics.routes', connection_factory=broker)
+    
+    def test_publish_batch_with_confirms(self):
+        """Test: El lote se publica persistente y mandatory, y las confirmaciones se esperan una vez"""
+        broker = FakeBroker()
+        publisher = self.publisher(broker)
+        
+        assert publisher.publish_batch([outbox_event(1), outbox_event(2, ROUTE_DELETED)]) == ([1, 2], [])
+        assert publisher.publish_batch([outbox_event(3)]) == ([3], [])
+        
+        assert len(broker.connections) == 1
+        assert broker.declared == [{'exchange': 'logistics.routes', 'exchange_type': 'topic', 'durable': True}]
+        last = broker.published[1]
+        assert last['routing_key'] == ROUTE_DELETED
+        assert last['mandatory'] is True
+        assert last['properties'].message_id == '2'
+        assert last['properties'].delivery_mode == 2
+        assert json.loads(last['body'])['route_id'] == 102
+    
+    def test_multiple_ack_confirms_whole_batch(self):
+        """Test: Una confirmación múltiple confirma todos los eventos anteriores"""
+        assert self.publisher(FakeBroker(multiple=True)).publish_batch([outbox_event(1), outbox_event(2), outbox_event(3)]) == ([1, 2, 3], [])
+    
+    def test_returned_or_nacked_events_are_reported(self):
+        """Test: Un evento devuelto sin cola destino o rechazado se informa aparte sin afectar a los demás"""
+        events = [outbox_event(1), outbox_event(2), outbox_event(3)]
+        
+        assert self.publisher(FakeBroker(returned={'2'})).publish_batch(events) == ([1, 3], [2])
+        assert self.publisher(FakeBroker(nacked={'1'})).publish_batch(events) == ([2, 3], [1])
+    
+    def test_unconfirmed_batch_reconnects(self):
+        """Test: Sin confirmación a tiempo la conexión se descarta y el siguiente lote abre otra"""
+        broker = FakeBroker(unconfirmed={'2'})
+        publisher = self.publisher(broker)
+        
+        assert publisher.publish_batch([outbox_event(1), outbox_event(2), outbox_event(3)]) == ([1, 3], [])
+        assert broker.connections[0].is_closed
+        assert publisher.publish_batch([outbox_event(4)]) == ([4], [])
+        assert len(broker.connections) == 2
+    
+    def test_connection_refused(self):
+        """Test: Si no se puede abrir el canal se lanza AMQPConnectionError"""
+        with pytest.raises(AMQPConnectionError):
+            self.publisher(FakeBroker(refuse=True)).publish_batch([outbox_event(1)])
+    
+    def test_memory_url_uses_local_broker(self):
+        """Test: memory:// usa el broker en memoria"""
+        assert isinstance(create_event_publisher('memory://', 'logistics.routes'), InMemoryPublisher)
+        assert isinstance(create_event_publisher('amqp://localhost', 'logistics.routes'), RabbitMQPublisher)
@@ -0,0 +1,118 @@
+"""
+Tests para la reoptimización incremental de secuencias
+"""
+import random
+import numpy as np
+from app.optimization.reoptimization import (
+    MODE_FULL,
+    MODE_INCREMENTAL,
+    cheapest_insertion,
+    sequence_degradation,
+    update_stop_sequence
+)
+from app.optimization.stop_sequence import build_tour_matrix
+
+DEPOT = (4.65, -74.10)
+
+
+def random_stop(rng, client_id):
+    return {
+        'client_id': client_id,
+        'latitude': 4.60 + rng.uniform(-0.15, 0.15),
+        'longitude': -74.08 + rng.uniform(-0.10, 0.10)
+    }
+
+
+def solved_route(count, seed=1):
+    rng = random.Random(seed)
+    stops = [random_stop(rng, f"c-{index}") for index in range(count)]
+    result = update_stop_sequence([], stops, [], None, DEPOT)
+    stored = sorted(result['stops'], key=lambda stop: stop['sequence'])
+    return stored, (result['baseline_distance_km'], result['baseline_stops']), rng
+
+
+class TestCheapestInsertion:
+    """Tests para cheapest_insertion"""
+    
+    def test_inserts_between_closest_neighbours(self):
+        """Test: La parada nueva queda entre las dos paradas que menos alarga"""
+        coordinates = [(4.60, -74.10), (4.70, -74.10), (4.65, -74.10)]
+        distances = build_tour_matrix(coordinates)
+        
+        tour = cheapest_insertion(np.array([0, 1, 2]), 3, distances)
+        
+        assert list(tour) == [0, 1, 3, 2]
+
+
+class TestSequenceDegradation:
+    """Tests para sequence_degradation"""
+    
+    def test_scales_with_square_root_of_stops(self):
+        """Test: Con el cuádruple de paradas se espera el doble de distancia"""
+        assert sequence_degradation(200.0, 40, 100.0, 10) == 0.0
+        assert round(sequence_degradation(120.0, 10, 100.0, 10), 6) == 0.2
+        assert sequence_degradation(50.0, 10, 0.0, 0) == 0.0
+
+
+class TestUpdateStopSequence:
+    """Tests para update_stop_sequence"""
+    
+    def test_without_baseline_solves_from_scratch(self):
+        """Test: Sin secuencia previa se resuelve completa y se fija la referencia"""
+        stored, baseline, _ = solved_route(30)
+        
+        assert [stop['sequence'] for stop in stored] == list(range(1, 31))
+        assert baseline[1] == 30
+        assert baseline[0] > 0
+    
+    def test_incremental_keeps_driver_order(self):
+        """Test: Agregar y quitar paradas conserva el orden relativo del resto"""
+        stored, baseline, rng = solved_route(80)
+        removed = {stored[10]['client_id'], stored[40]['client_id']}
+        added = [random_stop(rng, 'nuevo-1'), random_stop(rng, 'nuevo-2')]
+        
+        result = update_stop_sequence(stored, added, removed, baseline, DEPOT)
+        
+        remaining = [stop['client_id'] for stop in stored if stop['client_id'] not in removed]
+        visited = [stop['client_id'] for stop in result['stops'] if stop['client_id'] in set(remaining)]
+        assert result['mode'] == MODE_INCREMENTAL
+        assert (result['inserted'], result['removed']) == (2, 2)
+        assert len(result['stops']) == 80
+        assert sum(a == b for a, b in zip(remaining, visited)) >= 0.9 * len(remaining)
+        assert result['baseline_stops'] == baseline[1]
+    
+    def test_incremental_close_to_full_solve(self):
+        """Test: La ruta reparada queda cerca de resolverla desde cero"""
+        stored, baseline, rng = solved_route(60, seed=4)
+        added = [random_stop(rng, f"nuevo-{index}") for index in range(5)]
+        
+        incremental = update_stop_sequence(stored, added, [], baseline, DEPOT)
+        full = update_stop_sequence([], incremental['stops'], [], None, DEPOT)
+        
+        assert incremental['distance_km'] <= full['distance_km'] * 1.05
+        assert incremental['degradation'] < 0.2
+    
+    def test_full_solve_when_quality_drops(self):
+        """Test: Superado el umbral de degradación se resuelve de nuevo y se reinicia la referencia"""
+        stored, baseline, rng = solved_route(40, seed=2)
+        stale_baseline = (baseline[0] * 0.5, baseline[1])
+        
+        result = update_stop_sequence(stored, [random_stop(rng, 'nuevo')], [], stale_baseline, DEPOT, max_degradation=0.2)
+        
+        assert result['mode'] == MODE_FULL
+        assert result['degradation'] > 0.2
+        assert result['baseline_stops'] == 41
+        assert result['baseline_distance_km'] == result['distance_km']
+    
+    def test_unlocated_and_empty(self):
+        """Test: Paradas sin coordenadas quedan al final y una ruta vacía mide cero"""
+        stored, baseline, _ = solved_route(5)
+        
+        result = update_stop_sequence(stored, [{'client_id': 'sin-gps'}], [], baseline, DEPOT)
+        empty = update_stop_sequence(stored, [], [stop['client_id'] for stop in stored], baseline, DEPOT)
+        
+        assert result['stops'][-1] == {'client_id': 'sin-gps', 'sequence': None}
+        assert result['inserted'] == 0
+        assert empty['stops'] == []
+        assert empty['distance_km'] == 0.0
+        assert empty['removed'] == 5
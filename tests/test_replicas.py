@@ -0,0 +1,97 @@
+"""
+Tests para el enrutamiento de lecturas a réplicas
+"""
+import pytest
+from unittest.mock import MagicMock
+from app.config.replicas import ReplicaRouter
+
+
+class FakeClock:
+    """Reloj controlado manualmente"""
+    
+    def __init__(self):
+        self.now = 100.0
+    
+    def __call__(self):
+        return self.now
+
+
+def build_engine(dialect='postgresql', lag=0.0, error=None):
+    engine = MagicMock()
+    engine.dialect.name = dialect
+    connection = engine.connect.return_value.__enter__.return_value
+    if error:
+        connection.execute.side_effect = error
+    else:
+        connection.execute.return_value.scalar.return_value = lag
+    return engine
+
+
+class TestReplicaRouter:
+    """Tests para ReplicaRouter"""
+    
+    def test_disabled_without_replicas(self):
+        """Test: Sin réplicas se lee del primario"""
+        router = ReplicaRouter([])
+        
+        assert router.enabled is False
+        assert router.pick() is None
+    
+    def test_round_robin_between_fresh_replicas(self):
+        """Test: Las lecturas se reparten entre réplicas al día"""
+        first, second = build_engine(), build_engine()
+        router = ReplicaRouter([first, second])
+        
+        assert [router.pick() for _ in range(4)] == [first, second, first, second]
+    
+    def test_lagging_replica_is_skipped(self):
+        """Test: Una réplica con retraso mayor al permitido no recibe lecturas"""
+        lagging, fresh = build_engine(lag=30), build_engine(lag=1)
+        router = ReplicaRouter([lagging, fresh], max_lag_seconds=5)
+        
+        assert [router.pick() for _ in range(3)] == [fresh, fresh, fresh]
+    
+    def test_all_lagging_falls_back_to_primary(self):
+        """Test: Si todas las réplicas están atrasadas se usa el primario"""
+        router = ReplicaRouter([build_engine(lag=30)], max_lag_seconds=5)
+        
+        assert router.pick() is None
+    
+    def test_unreachable_replica_is_skipped(self):
+        """Test: Un error al medir el retraso descarta la réplica"""
+        router = ReplicaRouter([build_engine(error=Exception("connection refused"))])
+        
+        assert router.pick() is None
+    
+    def test_lag_is_cached_for_check_interval(self):
+        """Test: El retraso se mide como máximo una vez por intervalo"""
+        clock = FakeClock()
+        replica = build_engine(lag=0)
+        router = ReplicaRouter([replica], check_interval_seconds=2, clock=clock)
+        
+        router.pick()
+        router.pick()
+        clock.now += 2
+        router.pick()
+        
+        assert replica.connect.call_count == 2
+    
+    def test_replica_recovers_after_catching_up(self):
+        """Test: La réplica vuelve a recibir lecturas cuando se pone al día"""
+        clock = FakeClock()
+        replica = build_engine(lag=30)
+        router = ReplicaRouter([replica], max_lag_seconds=5, check_interval_seconds=2, clock=clock)
+        
+        assert router.pick() is None
+        replica.connect.return_value.__enter__.return_value.execute.return_value.scalar.return_value = 0.5
+        clock.now += 2
+        
+        assert router.pick() is replica
+    
+    def test_non_postgres_replica_has_no_lag(self):
+        """Test: Dialectos sin función de retraso se consideran al día"""
+        replica = build_engine(dialect='sqlite')
+        router = ReplicaRouter([replica])
+        
+        assert router.pick() is replica
+        replica.connect.assert_not_called()
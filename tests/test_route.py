@@ -190,3 +190,37 @@ class TestRoute:
         
         assert route.orders_count == 0
 
+    
+    def test_route_has_no_instance_dict(self):
+        """Test: Route usa __slots__ y no crea __dict__ por instancia"""
+        route = Route(route_code="ROU-0001", assigned_truck="CAM-001", delivery_date=date(2025, 12, 26))
+        
+        assert not hasattr(route, '__dict__')
+        with pytest.raises(AttributeError):
+            route.extra = 1
+    
+    def test_route_new_uses_same_timestamp(self):
+        """Test: created_at y updated_at comparten el mismo instante al crear"""
+        route = Route(route_code="ROU-0001", assigned_truck="CAM-001", delivery_date=date(2025, 12, 26))
+        
+        assert route.created_at == route.updated_at
+    
+    def test_route_from_row(self):
+        """Test: Construcción desde una fila ya cargada"""
+        created_at = datetime(2025, 1, 1, 10, 0, 0)
+        updated_at = datetime(2025, 1, 1, 11, 0, 0)
+        
+        route = Route.from_row((5, "ROU-0005", "CAM-002", date(2025, 12, 26), 3, created_at, updated_at))
+        
+        assert route.id == 5
+        assert route.route_code == "ROU-0005"
+        assert route.orders_count == 3
+        assert route.created_at == created_at
+        assert route.to_dict()['updated_at'] == updated_at.isoformat()
+        route.validate()
+    
+    def test_route_from_row_keeps_missing_timestamps(self):
+        """Test: from_row no inventa timestamps"""
+        route = Route.from_row((5, "ROU-0005", "CAM-002", date(2025, 12, 26), 3, None, None))
+        
+        assert route.to_dict()['created_at'] is None
@@ -6,13 +6,70 @@ from unittest.mock import Mock, patch, MagicMock
 from flask import Flask
 from app.controllers.route_controller import (
     RouteCreateController,
+    RouteCreateJobController,
+    RouteBulkCreateController,
     RouteListController,
     RouteDetailController,
-    RouteDeleteAllController
+    RouteDeleteAllController,
+    RouteExportController,
+    RoutePurgeJobController,
+    RoutePlanController,
+    RoutePlanJobController,
+    RouteReoptimizeController,
+    RouteRefreshController,
+    ClientRoutesController,
+    OrderRouteController,
+    run_create_route_job,
+    run_purge_job,
+    run_plan_job,
+    build_read_repository
 )
-from app.exceptions.custom_exceptions import LogisticsValidationError, LogisticsBusinessLogicError
+from app.exceptions.custom_exceptions import LogisticsValidationError, LogisticsBusinessLogicError, LogisticsNotFoundError
+from app.services.idempotency_service import IdempotencyInProgressError, IdempotencyKeyReuseError, request_fingerprint
+from app.utils.jobs import BACKEND_INLINE, JOB_COMPLETED, JOB_FAILED, JobManager, JobQueueFullError
 from app.models.route import Route
-from datetime import date, timedelta
+from datetime import date, datetime, timedelta
+
+
+class TestBuildReadRepository:
+    """Tests para build_read_repository"""
+    
+    def setup_method(self):
+        """Configuración inicial para cada test"""
+        self.app = Flask(__name__)
+    
+    def test_uses_replica_session(self):
+        """Test: Con réplicas disponibles las lecturas usan una sesión de réplica"""
+        replica_session = MagicMock()
+        with patch('app.controllers.route_controller.SessionLocal'), \
+                patch('app.controllers.route_controller.replica_router') as mock_router, \
+                patch('app.controllers.route_controller.open_read_session', return_value=replica_session):
+            mock_router.enabled = True
+            with self.app.test_request_context('/logistics/routes'):
+                repository = build_read_repository()
+        
+        assert repository.read_session is replica_session
+    
+    def test_sticky_cookie_reads_from_primary(self):
+        """Test: Tras una escritura la cookie mantiene las lecturas en el primario"""
+        with patch('app.controllers.route_controller.SessionLocal') as mock_session_local, \
+                patch('app.controllers.route_controller.replica_router') as mock_router, \
+                patch('app.controllers.route_controller.open_read_session') as mock_open_read_session:
+            mock_router.enabled = True
+            with self.app.test_request_context('/logistics/routes', headers={'Cookie': 'logistics_read_primary=1'}):
+                repository = build_read_repository()
+        
+        mock_open_read_session.assert_not_called()
+        assert repository.read_session is mock_session_local.return_value
+    
+    def test_without_replicas(self):
+        """Test: Sin réplicas no se consulta el enrutador"""
+        with patch('app.controllers.route_controller.SessionLocal') as mock_session_local, \
+                patch('app.controllers.route_controller.open_read_session') as mock_open_read_session:
+            repository = build_read_repository()
+        
+        mock_open_read_session.assert_not_called()
+        assert repository.read_session is mock_session_local.return_value
 
 
 class TestRouteCreateController:
@@ -56,6 +113,34 @@ class TestRouteCreateController:
         assert 'data' in response[0]
         self.controller.route_service.create_route.assert_called_once()
     
+    def test_post_sets_read_your_writes_cookie_with_replicas(self):
+        """Test: Con réplicas la creación fija la cookie de lectura en primario"""
+        tomorrow = date.today() + timedelta(days=1)
+        self.controller.route_service.create_route.return_value = Route(
+            route_code="ROU-0001", assigned_truck="CAM-001", delivery_date=tomorrow
+        )
+        
+        with patch('app.controllers.route_controller.replica_router') as mock_router:
+            mock_router.enabled = True
+            with self.app.test_request_context(json={'assigned_truck': 'CAM-001', 'delivery_date': tomorrow.isoformat()}):
+                response = self.controller.post()
+        
+        assert response[1] == 201
+        assert 'logistics_read_primary=1' in response[2]['Set-Cookie']
+        assert 'Max-Age=5' in response[2]['Set-Cookie']
+    
+    def test_post_without_replicas_sets_no_cookie(self):
+        """Test: Sin réplicas no se fija la cookie"""
+        tomorrow = date.today() + timedelta(days=1)
+        self.controller.route_service.create_route.return_value = Route(
+            route_code="ROU-0001", assigned_truck="CAM-001", delivery_date=tomorrow
+        )
+        
+        with self.app.test_request_context(json={'assigned_truck': 'CAM-001', 'delivery_date': tomorrow.isoformat()}):
+            response = self.controller.post()
+        
+        assert len(response) == 2
+    
     def test_post_empty_json(self):
         """Test: Error cuando el JSON está vacío"""
         from flask import request
@@ -119,6 +204,233 @@ class TestRouteCreateController:
         assert response[0]['success'] is False
 
 
+class TestRouteCreateAsync:
+    """Tests para la creación asíncrona de rutas"""
+    
+    def setup_method(self):
+        """Configuración inicial para cada test"""
+        self.app = Flask(__name__)
+        self.app.config['TESTING'] = True
+        self.route_data = {
+            'assigned_truck': 'CAM-001',
+            'delivery_date': (date.today() + timedelta(days=1)).isoformat()
+        }
+        
+        with patch('app.controllers.route_controller.SessionLocal') as mock_session_local:
+            mock_session_local.return_value = MagicMock()
+            
+            self.controller = RouteCreateController()
+            self.controller.route_service = Mock()
+    
+    def test_post_accepted(self):
+        """Test: Con Prefer: respond-async se valida, se encola y retorna 202"""
+        with patch('app.controllers.route_controller.create_job_manager') as mock_manager:
+            mock_manager.submit.return_value.id = 'job-1'
+            mock_manager.submit.return_value.to_dict.return_value = {'id': 'job-1', 'status': 'pending'}
+            
+            with self.app.test_request_context(json=self.route_data, headers={'Prefer': 'respond-async'}):
+                response = self.controller.post()
+        
+        assert response[1] == 202
+        assert response[2]['Location'] == '/logistics/routes/jobs/job-1'
+        assert response[2]['Preference-Applied'] == 'respond-async'
+        self.controller.route_service.validate_route_request.assert_called_once_with(self.route_data)
+        self.controller.route_service.create_route.assert_not_called()
+        assert mock_manager.submit.call_args.args[1:] == (run_create_route_job, self.route_data)
+    
+    def test_post_validation_error_is_synchronous(self):
+        """Test: Los errores de validación se reportan sin encolar"""
+        self.controller.route_service.validate_route_request.side_effect = LogisticsBusinessLogicError("ya tiene una ruta asignada")
+        
+        with patch('app.controllers.route_controller.create_job_manager') as mock_manager:
+            with self.app.test_request_context(json=self.route_data, headers={'Prefer': 'respond-async'}):
+                response = self.controller.post()
+        
+        assert response[1] == 422
+        mock_manager.submit.assert_not_called()
+    
+    def test_post_queue_full(self):
+        """Test: Con la cola llena se responde 503 con Retry-After"""
+        with patch('app.controllers.route_controller.create_job_manager') as mock_manager:
+            mock_manager.submit.side_effect = JobQueueFullError("La cola de tareas create_route está llena")
+            
+            with self.app.test_request_context(json=self.route_data, headers={'Prefer': 'respond-async'}):
+                response = self.controller.post()
+        
+        assert response[1] == 503
+        assert response[2]['Retry-After'] == '5'
+    
+    def test_inline_backend_runs_job_and_reports_status(self):
+        """Test: Con el backend inline la tarea termina antes de responder y su estado queda consultable"""
+        manager = JobManager(backend=BACKEND_INLINE)
+        created = Route(route_code="ROU-0001", assigned_truck="CAM-001", delivery_date=date.today() + timedelta(days=1), orders_count=3)
+        
+        with patch('app.controllers.route_controller.create_job_manager', manager), \
+                patch('app.controllers.route_controller.SessionLocal') as mock_session_local, \
+                patch('app.controllers.route_controller.RouteService') as mock_service_class, \
+                patch('app.controllers.route_controller.stop_sequence_options', return_value={}):
+            mock_service_class.return_value.create_route.return_value = created
+            
+            with self.app.test_request_context(json=self.route_data, headers={'Prefer': 'respond-async'}):
+                accepted = self.controller.post()
+            job_id = accepted[0]['data']['id']
+            with self.app.test_request_context():
+                status = RouteCreateJobController().get(job_id)
+                missing = RouteCreateJobController().get('nope')
+        
+        assert accepted[1] == 202
+        assert status[1] == 200
+        assert status[0]['data']['status'] == JOB_COMPLETED
+        assert status[0]['data']['result']['route_code'] == 'ROU-0001'
+        assert missing[1] == 404
+        mock_session_local.return_value.close.assert_called_once()
+    
+    def test_failed_job_reports_error(self):
+        """Test: Un error de negocio al crear queda registrado en la tarea"""
+        manager = JobManager(backend=BACKEND_INLINE)
+        
+        with patch('app.controllers.route_controller.SessionLocal'), \
+                patch('app.controllers.route_controller.RouteService') as mock_service_class, \
+                patch('app.controllers.route_controller.stop_sequence_options', return_value={}):
+            mock_service_class.return_value.create_route.side_effect = LogisticsBusinessLogicError("no tiene pedidos asignados")
+            
+            job = manager.submit('create_route', run_create_route_job, self.route_data)
+        
+        assert job.status == JOB_FAILED
+        assert job.error == "no tiene pedidos asignados"
+
+
+class TestRouteCreateIdempotency:
+    """Tests para la creación de rutas con Idempotency-Key"""
+    
+    def setup_method(self):
+        """Configuración inicial para cada test"""
+        self.app = Flask(__name__)
+        self.app.config['TESTING'] = True
+        self.route_data = {
+            'assigned_truck': 'CAM-001',
+            'delivery_date': (date.today() + timedelta(days=1)).isoformat()
+        }
+        
+        with patch('app.controllers.route_controller.SessionLocal') as mock_session_local:
+            mock_session_local.return_value = MagicMock()
+            
+            self.controller = RouteCreateController()
+            self.controller.route_service = Mock()
+    
+    def test_post_with_key_goes_through_idempotency(self):
+        """Test: Con Idempotency-Key la creación se ejecuta a través del servicio de idempotencia"""
+        with patch('app.controllers.route_controller.idempotency_service') as mock_idempotency:
+            mock_idempotency.execute.side_effect = lambda key, fingerprint, handler: handler()
+            self.controller.route_service.create_route.return_value = Route(
+                route_code="ROU-0001", assigned_truck="CAM-001", delivery_date=date.today() + timedelta(days=1)
+            )
+            
+            with self.app.test_request_context(json=self.route_data, headers={'Idempotency-Key': ' abc-123 '}):
+                response = self.controller.post()
+        
+        assert response[1] == 201
+        key, fingerprint, _ = mock_idempotency.execute.call_args.args
+        assert key == 'abc-123'
+        assert fingerprint == request_fingerprint(self.route_data)
+    
+    def test_post_replay(self):
+        """Test: Una repetición retorna la respuesta guardada sin crear la ruta"""
+        with patch('app.controllers.route_controller.idempotency_service') as mock_idempotency:
+            mock_idempotency.execute.return_value = ({'success': True}, 201, {'Idempotent-Replayed': 'true'})
+            
+            with self.app.test_request_context(json=self.route_data, headers={'Idempotency-Key': 'abc-123'}):
+                response = self.controller.post()
+        
+        assert response == ({'success': True}, 201, {'Idempotent-Replayed': 'true'})
+        self.controller.route_service.create_route.assert_not_called()
+    
+    def test_post_key_errors(self):
+        """Test: Clave inválida, reutilizada con otro cuerpo o aún en curso"""
+        with patch('app.controllers.route_controller.idempotency_service') as mock_idempotency:
+            with self.app.test_request_context(json=self.route_data, headers={'Idempotency-Key': 'x' * 256}):
+                invalid = self.controller.post()
+            mock_idempotency.execute.side_effect = IdempotencyKeyReuseError("La clave abc ya se usó con otro cuerpo de petición")
+            with self.app.test_request_context(json=self.route_data, headers={'Idempotency-Key': 'abc'}):
+                reused = self.controller.post()
+            mock_idempotency.execute.side_effect = IdempotencyInProgressError("La petición con clave abc sigue en curso")
+            with self.app.test_request_context(json=self.route_data, headers={'Idempotency-Key': 'abc'}):
+                in_progress = self.controller.post()
+        
+        assert invalid[1] == 400
+        assert reused[1] == 422
+        assert in_progress[1] == 409
+        assert in_progress[2]['Retry-After'] == '1'
+
+
+class TestRouteBulkCreateController:
+    """Tests para RouteBulkCreateController"""
+    
+    def setup_method(self):
+        """Configuración inicial para cada test"""
+        self.app = Flask(__name__)
+        self.app.config['TESTING'] = True
+        
+        with patch('app.controllers.route_controller.SessionLocal') as mock_session_local:
+            mock_session_local.return_value = MagicMock()
+            
+            self.controller = RouteBulkCreateController()
+            self.controller.route_service = Mock()
+    
+    def test_post_created(self):
+        """Test: Retorna 201 con resultados por camión"""
+        self.controller.route_service.create_routes_bulk.return_value = [
+            {'assigned_truck': 'CAM-001', 'success': True, 'route': {'route_code': 'ROU-0001'}},
+            {'assigned_truck': 'CAM-002', 'success': False, 'error': 'sin pedidos'}
+        ]
+        
+        with self.app.test_request_context(json={'delivery_date': '2099-01-01'}):
+            response = self.controller.post()
+        
+        assert response[1] == 201
+        assert response[0]['data']['created_count'] == 1
+        assert response[0]['data']['failed_count'] == 1
+        assert len(response[0]['data']['results']) == 2
+    
+    def test_post_nothing_created(self):
+        """Test: Retorna 200 si ningún camión fue elegible"""
+        self.controller.route_service.create_routes_bulk.return_value = [
+            {'assigned_truck': 'CAM-001', 'success': False, 'error': 'ya existe'}
+        ]
+        
+        with self.app.test_request_context(json={'delivery_date': '2099-01-01'}):
+            response = self.controller.post()
+        
+        assert response[1] == 200
+        assert response[0]['data']['created_count'] == 0
+    
+    def test_post_empty_body(self):
+        """Test: Cuerpo vacío"""
+        with self.app.test_request_context(json={}):
+            response = self.controller.post()
+        
+        assert response[1] == 400
+    
+    def test_post_validation_error(self):
+        """Test: Error de validación"""
+        self.controller.route_service.create_routes_bulk.side_effect = LogisticsValidationError("Fecha inválida")
+        
+        with self.app.test_request_context(json={'delivery_date': 'x'}):
+            response = self.controller.post()
+        
+        assert response[1] == 400
+        assert response[0]['success'] is False
+    
+    def test_post_unexpected_error(self):
+        """Test: Error interno"""
+        self.controller.route_service.create_routes_bulk.side_effect = Exception("boom")
+        
+        with self.app.test_request_context(json={'delivery_date': '2099-01-01'}):
+            response = self.controller.post()
+        
+        assert response[1] == 500
+
+
 class TestRouteListController:
     """Tests para RouteListController"""
     
@@ -133,6 +445,7 @@ class TestRouteListController:
             
             self.controller = RouteListController()
             self.controller.route_service = Mock()
+            self.controller.route_service.get_routes_version.return_value = (0, None)
     
     def test_get_success(self):
         """Test: Obtener lista de rutas exitosamente"""
@@ -142,8 +455,8 @@ class TestRouteListController:
             delivery_date=date(2025, 12, 26),
             orders_count=5
         )
-        self.controller.route_service.get_routes_paginated.return_value = [mock_route]
-        self.controller.route_service.count_routes.return_value = 1
+        self.controller.route_service.get_route_summaries_paginated.return_value = [mock_route.to_dict()]
+        self.controller.route_service.get_routes_version.return_value = (1, datetime(2025, 12, 20, 8, 0, 0))
         
         with self.app.test_request_context('/?page=1&per_page=10'):
             response = self.controller.get()
@@ -162,8 +475,8 @@ class TestRouteListController:
             delivery_date=date(2025, 12, 26),
             orders_count=5
         )
-        self.controller.route_service.get_routes_paginated.return_value = [mock_route]
-        self.controller.route_service.count_routes.return_value = 1
+        self.controller.route_service.get_route_summaries_paginated.return_value = [mock_route.to_dict()]
+        self.controller.route_service.get_routes_version.return_value = (1, datetime(2025, 12, 20, 8, 0, 0))
         
         with self.app.test_request_context('/?page=1&per_page=10&route_code=ROU-0001&assigned_truck=CAM-001&delivery_date=2025-12-26'):
             response = self.controller.get()
@@ -197,7 +510,7 @@ class TestRouteListController:
     
     def test_get_validation_error(self):
         """Test: Error de validación"""
-        self.controller.route_service.get_routes_paginated.side_effect = LogisticsValidationError("Fecha inválida")
+        self.controller.route_service.get_routes_version.side_effect = LogisticsValidationError("Fecha inválida")
         
         with self.app.test_request_context('/?page=1&per_page=10&delivery_date=invalid'):
             response = self.controller.get()
@@ -207,7 +520,7 @@ class TestRouteListController:
     
     def test_get_business_logic_error(self):
         """Test: Error de lógica de negocio"""
-        self.controller.route_service.get_routes_paginated.side_effect = LogisticsBusinessLogicError("Error de BD")
+        self.controller.route_service.get_route_summaries_paginated.side_effect = LogisticsBusinessLogicError("Error de BD")
         
         with self.app.test_request_context('/?page=1&per_page=10'):
             response = self.controller.get()
@@ -217,7 +530,7 @@ class TestRouteListController:
     
     def test_get_exception_handling(self):
         """Test: Manejo de excepciones generales"""
-        self.controller.route_service.get_routes_paginated.side_effect = Exception("Unexpected error")
+        self.controller.route_service.get_route_summaries_paginated.side_effect = Exception("Unexpected error")
         
         with self.app.test_request_context('/?page=1&per_page=10'):
             response = self.controller.get()
@@ -228,11 +541,11 @@ class TestRouteListController:
     def test_get_pagination_info(self):
         """Test: Verificar información de paginación"""
         mock_routes = [
-            Route(route_code=f"ROU-{i:04d}", assigned_truck="CAM-001", delivery_date=date(2025, 12, 26), orders_count=5)
+            Route(route_code=f"ROU-{i:04d}", assigned_truck="CAM-001", delivery_date=date(2025, 12, 26), orders_count=5).to_dict()
             for i in range(1, 11)
         ]
-        self.controller.route_service.get_routes_paginated.return_value = mock_routes
-        self.controller.route_service.count_routes.return_value = 25
+        self.controller.route_service.get_route_summaries_paginated.return_value = mock_routes
+        self.controller.route_service.get_routes_version.return_value = (25, datetime(2025, 12, 20, 8, 0, 0))
         
         with self.app.test_request_context('/?page=1&per_page=10'):
             response = self.controller.get()
@@ -244,6 +557,51 @@ class TestRouteListController:
         assert pagination['total_pages'] == 3
         assert pagination['has_next'] is True
         assert pagination['has_prev'] is False
+    
+    def test_get_returns_etag(self):
+        """Test: La respuesta incluye un ETag estable para el mismo estado"""
+        self.controller.route_service.get_route_summaries_paginated.return_value = []
+        self.controller.route_service.get_routes_version.return_value = (3, datetime(2025, 12, 20, 8, 0, 0))
+        
+        with self.app.test_request_context('/?page=1&per_page=10'):
+            first = self.controller.get()
+        with self.app.test_request_context('/?page=1&per_page=10'):
+            second = self.controller.get()
+        with self.app.test_request_context('/?page=2&per_page=10'):
+            other_page = self.controller.get()
+        
+        assert first[2]['ETag'] == second[2]['ETag']
+        assert first[2]['ETag'] != other_page[2]['ETag']
+        assert first[2]['Cache-Control'] == 'no-cache'
+    
+    def test_get_not_modified_skips_page_query(self):
+        """Test: If-None-Match coincidente retorna 304 sin consultar la página"""
+        self.controller.route_service.get_routes_version.return_value = (3, datetime(2025, 12, 20, 8, 0, 0))
+        self.controller.route_service.get_route_summaries_paginated.return_value = []
+        with self.app.test_request_context('/?page=1&per_page=10'):
+            etag = self.controller.get()[2]['ETag']
+        self.controller.route_service.get_route_summaries_paginated.reset_mock()
+        
+        with self.app.test_request_context('/?page=1&per_page=10', headers={'If-None-Match': etag}):
+            response = self.controller.get()
+        
+        assert response[1] == 304
+        assert response[2]['ETag'] == etag
+        self.controller.route_service.get_route_summaries_paginated.assert_not_called()
+    
+    def test_get_etag_changes_with_version(self):
+        """Test: Un cambio en updated_at invalida el ETag"""
+        self.controller.route_service.get_route_summaries_paginated.return_value = []
+        self.controller.route_service.get_routes_version.return_value = (3, datetime(2025, 12, 20, 8, 0, 0))
+        with self.app.test_request_context('/?page=1&per_page=10'):
+            etag = self.controller.get()[2]['ETag']
+        self.controller.route_service.get_routes_version.return_value = (3, datetime(2025, 12, 20, 9, 0, 0))
+        
+        with self.app.test_request_context('/?page=1&per_page=10', headers={'If-None-Match': etag}):
+            response = self.controller.get()
+        
+        assert response[1] == 200
+        assert response[2]['ETag'] != etag
 
 
 class TestRouteDetailController:
@@ -260,6 +618,17 @@ class TestRouteDetailController:
             
             self.controller = RouteDetailController()
             self.controller.route_service = Mock()
+        
+        self.route = Route(
+            id=1,
+            route_code="ROU-0001",
+            assigned_truck="CAM-001",
+            delivery_date=date(2025, 12, 26),
+            orders_count=2,
+            updated_at=datetime(2025, 12, 20, 8, 0, 0)
+        )
+        self.orders = [{'id': 1, 'client_id': 'client-1'}, {'id': 2, 'client_id': 'client-1'}]
+        self.controller.route_service.load_stored_route.return_value = (self.route, None)
     
     def test_get_success(self):
         """Test: Obtener detalle de ruta exitosamente"""
@@ -282,7 +651,8 @@ class TestRouteDetailController:
             ]
         }
         
-        self.controller.route_service.get_route_with_clients.return_value = route_data
+        self.controller.route_service.load_route_orders.return_value = self.orders
+        self.controller.route_service.build_route_with_clients.return_value = route_data
         
         with self.app.test_request_context('/routes/1'):
             response = self.controller.get(1)
@@ -292,10 +662,74 @@ class TestRouteDetailController:
         assert 'data' in response[0]
         assert 'route' in response[0]['data']
         assert 'clients' in response[0]['data']
+        assert response[2]['ETag'].startswith('"')
+    
+    @patch('app.controllers.route_controller.get_config')
+    def test_get_passes_depot_from_config(self, mock_get_config, tmp_path):
+        """Test: El depósito y la caché de distancias configurados se usan para ordenar las paradas"""
+        mock_get_config.return_value = MagicMock(
+            ROUTE_DEPOT_LATITUDE=4.65,
+            ROUTE_DEPOT_LONGITUDE=-74.1,
+            ROUTE_RETURN_TO_DEPOT=False,
+            STOP_SEQUENCE_TIME_LIMIT_MS=20.0,
+            DISTANCE_CACHE_DIR=str(tmp_path),
+            DISTANCE_CACHE_BLOCK_SIZE=16,
+            DISTANCE_CACHE_MAX_IDLE_DAYS=7
+        )
+        self.controller.route_service.load_route_orders.return_value = self.orders
+        self.controller.route_service.build_route_with_clients.return_value = {}
+        
+        with self.app.test_request_context('/routes/1'):
+            self.controller.get(1)
+        
+        kwargs = self.controller.route_service.build_route_with_clients.call_args.kwargs
+        assert (kwargs['depot'], kwargs['return_to_depot'], kwargs['time_limit_ms']) == ((4.65, -74.1), False, 20.0)
+        assert kwargs['distance_cache'].directory == str(tmp_path)
+        assert (kwargs['distance_cache'].block_size, kwargs['distance_cache'].max_idle_days) == (16, 7)
+    
+    def test_get_not_modified_skips_client_lookup(self):
+        """Test: If-None-Match coincidente retorna 304 sin consultar clientes"""
+        self.controller.route_service.load_route_orders.return_value = self.orders
+        self.controller.route_service.build_route_with_clients.return_value = {}
+        with self.app.test_request_context('/routes/1'):
+            etag = self.controller.get(1)[2]['ETag']
+        self.controller.route_service.build_route_with_clients.reset_mock()
+        
+        with self.app.test_request_context('/routes/1', headers={'If-None-Match': f'W/{etag}'}):
+            response = self.controller.get(1)
+        
+        assert response[1] == 304
+        self.controller.route_service.build_route_with_clients.assert_not_called()
+    
+    def test_get_not_modified_with_compressed_etag(self):
+        """Test: El ETag con sufijo de compresión también revalida"""
+        self.controller.route_service.load_route_orders.return_value = self.orders
+        self.controller.route_service.build_route_with_clients.return_value = {}
+        with self.app.test_request_context('/routes/1'):
+            etag = self.controller.get(1)[2]['ETag']
+        
+        with self.app.test_request_context('/routes/1', headers={'If-None-Match': f'"{etag.strip(chr(34))}-gzip"'}):
+            response = self.controller.get(1)
+        
+        assert response[1] == 304
+    
+    def test_get_etag_changes_with_orders(self):
+        """Test: Un cambio en los pedidos invalida el ETag"""
+        self.controller.route_service.build_route_with_clients.return_value = {}
+        self.controller.route_service.load_route_orders.return_value = self.orders
+        with self.app.test_request_context('/routes/1'):
+            etag = self.controller.get(1)[2]['ETag']
+        self.controller.route_service.load_route_orders.return_value = self.orders + [{'id': 3, 'client_id': 'client-2'}]
+        
+        with self.app.test_request_context('/routes/1', headers={'If-None-Match': etag}):
+            response = self.controller.get(1)
+        
+        assert response[1] == 200
+        assert response[2]['ETag'] != etag
     
     def test_get_not_found(self):
         """Test: Error cuando la ruta no existe"""
-        self.controller.route_service.get_route_with_clients.side_effect = LogisticsBusinessLogicError("Ruta no encontrada")
+        self.controller.route_service.load_stored_route.side_effect = LogisticsBusinessLogicError("Ruta no encontrada")
         
         with self.app.test_request_context('/routes/999'):
             response = self.controller.get(999)
@@ -304,9 +738,26 @@ class TestRouteDetailController:
         assert response[0]['success'] is False
         assert 'Error de lógica de negocio' in response[0]['error']
     
+    def test_get_from_stored_stops(self):
+        """Test: Con paradas guardadas el detalle no consulta pedidos ni clientes"""
+        route_data = {'route': self.route.to_dict(), 'clients': [{'id': 'client-1', 'sequence': 1}], 'total_distance_km': 3.2}
+        self.controller.route_service.load_stored_route.return_value = (self.route, route_data)
+        
+        with self.app.test_request_context('/routes/1'):
+            response = self.controller.get(1)
+        etag = response[2]['ETag']
+        with self.app.test_request_context('/routes/1', headers={'If-None-Match': etag}):
+            revalidated = self.controller.get(1)
+        
+        assert response[1] == 200
+        assert response[0]['data'] == route_data
+        assert revalidated[1] == 304
+        self.controller.route_service.load_route_orders.assert_not_called()
+        self.controller.route_service.build_route_with_clients.assert_not_called()
+    
     def test_get_internal_error(self):
         """Test: Error interno del servidor"""
-        self.controller.route_service.get_route_with_clients.side_effect = Exception("Unexpected error")
+        self.controller.route_service.load_stored_route.side_effect = Exception("Unexpected error")
         
         with self.app.test_request_context('/routes/1'):
             response = self.controller.get(1)
@@ -361,4 +812,412 @@ class TestRouteDeleteAllController:
         
         assert response[1] == 500
         assert response[0]['success'] is False
+    
+    def test_delete_with_cutoff(self):
+        """Test: Eliminar solo rutas anteriores a una fecha"""
+        self.controller.route_repository.delete_all.return_value = 3
+        
+        with self.app.test_request_context('/?before=2025-01-01'):
+            response = self.controller.delete()
+        
+        assert response[1] == 200
+        self.controller.route_repository.delete_all.assert_called_once_with(before=date(2025, 1, 1))
+    
+    def test_delete_invalid_cutoff(self):
+        """Test: Error cuando la fecha de corte es inválida"""
+        with self.app.test_request_context('/?before=01-01-2025'):
+            response = self.controller.delete()
+        
+        assert response[1] == 400
+        self.controller.route_repository.delete_all.assert_not_called()
+    
+    def test_delete_invalid_mode(self):
+        """Test: Error cuando el modo no es soportado"""
+        with self.app.test_request_context('/?mode=async'):
+            response = self.controller.delete()
+        
+        assert response[1] == 400
+    
+    def test_delete_invalid_batch_size(self):
+        """Test: Error cuando batch_size está fuera de rango"""
+        with self.app.test_request_context('/?mode=chunked&batch_size=0'):
+            response = self.controller.delete()
+        
+        assert response[1] == 400
+    
+    def test_delete_chunked_starts_background_job(self):
+        """Test: El modo por lotes inicia una tarea en segundo plano"""
+        with patch('app.controllers.route_controller.purge_job_manager') as mock_manager:
+            mock_job = MagicMock()
+            mock_job.id = 'abc'
+            mock_job.to_dict.return_value = {'id': 'abc', 'status': 'pending'}
+            mock_manager.submit.return_value = mock_job
+            
+            with self.app.test_request_context('/?mode=chunked&batch_size=500&before=2025-01-01'):
+                response = self.controller.delete()
+        
+        assert response[1] == 202
+        assert response[2]['Location'] == '/logistics/routes/purge-jobs/abc'
+        assert response[0]['data']['id'] == 'abc'
+        args = mock_manager.submit.call_args.args
+        assert args[0] == 'purge_routes'
+        assert args[2] == date(2025, 1, 1)
+        assert args[3] == 500
+        self.controller.route_repository.delete_all.assert_not_called()
+
+
+class TestRoutePurgeJobController:
+    """Tests para RoutePurgeJobController"""
+    
+    def setup_method(self):
+        """Configuración inicial para cada test"""
+        self.app = Flask(__name__)
+        self.controller = RoutePurgeJobController()
+    
+    def test_get_job_status(self):
+        """Test: Obtener el estado de una purga"""
+        with patch('app.controllers.route_controller.purge_job_manager') as mock_manager:
+            mock_manager.get.return_value.to_dict.return_value = {'id': 'abc', 'status': 'running'}
+            
+            with self.app.test_request_context():
+                response = self.controller.get('abc')
+        
+        assert response[1] == 200
+        assert response[0]['data']['status'] == 'running'
+    
+    def test_get_job_not_found(self):
+        """Test: Purga inexistente"""
+        with patch('app.controllers.route_controller.purge_job_manager') as mock_manager:
+            mock_manager.get.return_value = None
+            
+            with self.app.test_request_context():
+                response = self.controller.get('nope')
+        
+        assert response[1] == 404
+
+
+class TestRunPurgeJob:
+    """Tests para run_purge_job"""
+    
+    def test_run_purge_job_reports_progress_and_closes_session(self):
+        """Test: La tarea de purga reporta progreso y cierra su sesión"""
+        job = MagicMock()
+        
+        with patch('app.controllers.route_controller.SessionLocal') as mock_session_local, \
+                patch('app.controllers.route_controller.RouteService') as mock_service_class:
+            def purge(batch_size, before, on_progress, pause_seconds):
+                on_progress(0, 4)
+                on_progress(4, 4)
+                return 4
+            mock_service_class.return_value.purge_routes.side_effect = purge
+            
+            result = run_purge_job(job, None, 2, 0)
+        
+        assert result == {'deleted_count': 4}
+        job.update_progress.assert_called_with(deleted=4, total=4, percent=100.0)
+        mock_session_local.return_value.close.assert_called_once()
+    
+    def test_run_purge_job_empty_table(self):
+        """Test: Progreso del 100% cuando no hay rutas"""
+        job = MagicMock()
+        
+        with patch('app.controllers.route_controller.SessionLocal'), \
+                patch('app.controllers.route_controller.RouteService') as mock_service_class:
+            mock_service_class.return_value.purge_routes.side_effect = lambda b, bf, on_progress, pause_seconds: on_progress(0, 0) or 0
+            
+            run_purge_job(job, None, 2, 0)
+        
+        job.update_progress.assert_called_with(deleted=0, total=0, percent=100.0)
+
+
+
+class TestRoutePlanController:
+    """Tests para RoutePlanController"""
+    
+    def setup_method(self):
+        """Configuración inicial para cada test"""
+        self.app = Flask(__name__)
+        self.app.config['TESTING'] = True
+        
+        with patch('app.controllers.route_controller.SessionLocal') as mock_session_local:
+            mock_session_local.return_value = MagicMock()
+            
+            self.controller = RoutePlanController()
+            self.controller.route_service = Mock()
+    
+    def test_post_accepted(self):
+        """Test: La planificación se encola y retorna 202 con la ubicación de la tarea"""
+        delivery_date = date.today() + timedelta(days=2)
+        self.controller.route_service.validate_plan_request.return_value = (delivery_date, ['CAM-001'])
+        
+        with patch('app.controllers.route_controller.plan_job_manager') as mock_manager:
+            mock_manager.submit.return_value.id = 'job-1'
+            mock_manager.submit.return_value.to_dict.return_value = {'id': 'job-1', 'status': 'pending'}
+            
+            with self.app.test_request_context(json={'delivery_date': delivery_date.isoformat()}):
+                response = self.controller.post()
+        
+        assert response[1] == 202
+        assert response[2]['Location'] == '/logistics/routes/plan-jobs/job-1'
+        assert mock_manager.submit.call_args.args[2:] == (delivery_date, ['CAM-001'])
+    
+    def test_post_validation_error(self):
+        """Test: Errores de validación se reportan sin encolar"""
+        self.controller.route_service.validate_plan_request.side_effect = LogisticsValidationError("Fecha inválida")
+        
+        with patch('app.controllers.route_controller.plan_job_manager') as mock_manager:
+            with self.app.test_request_context(json={'delivery_date': 'ayer'}):
+                response = self.controller.post()
+        
+        assert response[1] == 400
+        mock_manager.submit.assert_not_called()
+    
+    def test_post_empty_body(self):
+        """Test: Cuerpo vacío"""
+        with self.app.test_request_context(json={}):
+            response = self.controller.post()
+        
+        assert response[1] == 400
+
+
+class TestRoutePlanJobController:
+    """Tests para RoutePlanJobController"""
+    
+    def test_get_job_status_and_not_found(self):
+        """Test: Estado de una planificación existente e inexistente"""
+        app = Flask(__name__)
+        controller = RoutePlanJobController()
+        
+        with patch('app.controllers.route_controller.plan_job_manager') as mock_manager:
+            mock_manager.get.return_value.to_dict.return_value = {'id': 'abc', 'status': 'completed'}
+            with app.test_request_context():
+                found = controller.get('abc')
+            mock_manager.get.return_value = None
+            with app.test_request_context():
+                missing = controller.get('nope')
+        
+        assert found[1] == 200
+        assert found[0]['data']['status'] == 'completed'
+        assert missing[1] == 404
+
+
+class TestRunPlanJob:
+    """Tests para run_plan_job"""
+    
+    def test_run_plan_job_uses_planner_pool(self):
+        """Test: La tarea calcula el plan en el pool de procesos y cierra su sesión"""
+        job = MagicMock()
+        delivery_date = date.today() + timedelta(days=2)
+        
+        with patch('app.controllers.route_controller.SessionLocal') as mock_session_local, \
+                patch('app.controllers.route_controller.RouteService') as mock_service_class, \
+                patch('app.controllers.route_controller.planner_pool') as mock_pool:
+            def plan(plan_date, trucks, planner, max_workers, on_progress):
+                on_progress('planning')
+                return planner([{'client_id': 'c-1'}], trucks)
+            mock_service_class.return_value.plan_delivery_date.side_effect = plan
+            mock_pool.run.return_value = {'routes': []}
+            
+            result = run_plan_job(job, delivery_date, ['CAM-001'])
+        
+        assert result == {'routes': []}
+        assert mock_pool.run.call_args.args[1:] == ([{'client_id': 'c-1'}], ['CAM-001'])
+        assert 'time_limit_ms' in mock_pool.run.call_args.kwargs
+        job.update_progress.assert_called_with(stage='planning')
+        mock_session_local.return_value.close.assert_called_once()
 
+
+class TestRouteReoptimizeController:
+    """Tests para RouteReoptimizeController"""
+    
+    def setup_method(self):
+        """Configuración inicial para cada test"""
+        self.app = Flask(__name__)
+        self.app.config['TESTING'] = True
+        
+        with patch('app.controllers.route_controller.SessionLocal') as mock_session_local:
+            mock_session_local.return_value = MagicMock()
+            
+            self.controller = RouteReoptimizeController()
+            self.controller.route_service = Mock()
+    
+    def test_post_success(self):
+        """Test: Reoptimización con el umbral y las opciones de secuencia configuradas"""
+        self.controller.route_service.reoptimize_route.return_value = {'mode': 'incremental', 'stops': []}
+        
+        with patch('app.controllers.route_controller.stop_sequence_options', return_value={'depot': None}):
+            with self.app.test_request_context(method='POST'):
+                response = self.controller.post(1)
+        
+        assert response[1] == 200
+        assert response[0]['data']['mode'] == 'incremental'
+        kwargs = self.controller.route_service.reoptimize_route.call_args.kwargs
+        assert kwargs['depot'] is None
+        assert kwargs['refresh_clients'] is False
+        assert 'max_degradation' in kwargs
+    
+    def test_refresh_reloads_clients(self):
+        """Test: La actualización explícita vuelve a consultar todos los clientes"""
+        with patch('app.controllers.route_controller.SessionLocal'):
+            controller = RouteRefreshController()
+        controller.route_service = Mock()
+        controller.route_service.reoptimize_route.return_value = {'mode': 'incremental'}
+        
+        with patch('app.controllers.route_controller.stop_sequence_options', return_value={}):
+            with self.app.test_request_context(method='POST'):
+                response = controller.post(1)
+        
+        assert response[1] == 200
+        assert response[0]['message'] == "Ruta actualizada exitosamente"
+        assert controller.route_service.reoptimize_route.call_args.kwargs['refresh_clients'] is True
+    
+    def test_post_errors(self):
+        """Test: El código depende del tipo de excepción: ruta inexistente 404 y errores de negocio 422"""
+        self.controller.route_service.reoptimize_route.side_effect = LogisticsNotFoundError("Ruta no encontrada")
+        with patch('app.controllers.route_controller.stop_sequence_options', return_value={}):
+            with self.app.test_request_context(method='POST'):
+                missing = self.controller.post(99)
+            self.controller.route_service.reoptimize_route.side_effect = LogisticsBusinessLogicError("Ruta no encontrada")
+            with self.app.test_request_context(method='POST'):
+                failed = self.controller.post(1)
+        
+        assert missing[1] == 404
+        assert missing[0]['error'] == "Recurso no encontrado"
+        assert failed[1] == 422
+
+
+class TestReverseLookupControllers:
+    """Tests para ClientRoutesController y OrderRouteController"""
+    
+    def setup_method(self):
+        """Configuración inicial para cada test"""
+        self.app = Flask(__name__)
+        self.app.config['TESTING'] = True
+        
+        with patch('app.controllers.route_controller.SessionLocal'):
+            self.client_controller = ClientRoutesController()
+            self.order_controller = OrderRouteController()
+        self.client_controller.route_service = Mock()
+        self.order_controller.route_service = Mock()
+    
+    def test_client_routes(self):
+        """Test: Rutas del cliente con filtros de fecha y límite"""
+        self.client_controller.route_service.get_client_routes.return_value = [{'id': 3, 'sequence': 2}]
+        
+        with self.app.test_request_context('/logistics/clients/c-1/routes?delivery_date_from=2025-12-01&limit=5'):
+            response = self.client_controller.get('c-1')
+        
+        assert response[1] == 200
+        assert response[0]['data'] == {'client_id': 'c-1', 'routes': [{'id': 3, 'sequence': 2}]}
+        self.client_controller.route_service.get_client_routes.assert_called_once_with(
+            'c-1', delivery_date_from='2025-12-01', delivery_date_to=None, limit=5
+        )
+    
+    def test_client_routes_invalid_params(self):
+        """Test: Límite fuera de rango y fechas inválidas retornan 400"""
+        self.client_controller.route_service.get_client_routes.side_effect = LogisticsValidationError("Fecha inválida")
+        
+        with self.app.test_request_context('/logistics/clients/c-1/routes?limit=500'):
+            invalid_limit = self.client_controller.get('c-1')
+        with self.app.test_request_context('/logistics/clients/c-1/routes?delivery_date_to=ayer'):
+            invalid_date = self.client_controller.get('c-1')
+        
+        assert invalid_limit[1] == 400
+        assert invalid_date[1] == 400
+    
+    def test_order_route_found_and_missing(self):
+        """Test: Ruta del pedido o 404 si no está asignado"""
+        self.order_controller.route_service.get_order_route.side_effect = [{'id': 3, 'client_id': 'c-1'}, None]
+        
+        with self.app.test_request_context('/logistics/orders/77/route'):
+            found = self.order_controller.get('77')
+        with self.app.test_request_context('/logistics/orders/78/route'):
+            missing = self.order_controller.get('78')
+        
+        assert found[1] == 200
+        assert found[0]['data'] == {'order_id': '77', 'route': {'id': 3, 'client_id': 'c-1'}}
+        assert missing[1] == 404
+
+
+class TestRouteExportController:
+    """Tests para RouteExportController"""
+    
+    def setup_method(self):
+        """Configuración inicial para cada test"""
+        self.app = Flask(__name__)
+        self.app.config['TESTING'] = True
+        
+        with patch('app.controllers.route_controller.SessionLocal') as mock_session_local:
+            mock_session = MagicMock()
+            mock_session_local.return_value = mock_session
+            
+            self.controller = RouteExportController()
+            self.controller.route_service = Mock()
+        
+        self.row = (1, "ROU-0001", "CAM-001", date(2025, 12, 26), 5, datetime(2025, 1, 1, 10, 0), datetime(2025, 1, 1, 11, 0))
+    
+    def test_get_ndjson_by_default(self):
+        """Test: Exportación NDJSON por defecto"""
+        self.controller.route_service.export_routes.return_value = iter([[self.row], [self.row]])
+        
+        with self.app.test_request_context('/logistics/routes/export'):
+            response = self.controller.get()
+            body = b''.join(response.response).decode('utf-8')
+        
+        lines = body.strip().split('\n')
+        assert response.status_code == 200
+        assert response.mimetype == 'application/x-ndjson'
+        assert len(lines) == 2
+        assert '"route_code": "ROU-0001"' in lines[0]
+        assert '"delivery_date": "2025-12-26"' in lines[0]
+        self.controller.route_repository.session.close.assert_called_once()
+    
+    def test_get_csv(self):
+        """Test: Exportación CSV con encabezado"""
+        self.controller.route_service.export_routes.return_value = iter([[self.row]])
+        
+        with self.app.test_request_context('/logistics/routes/export?format=csv&assigned_truck=CAM-001'):
+            response = self.controller.get()
+            body = b''.join(response.response).decode('utf-8')
+        
+        lines = body.strip().split('\r\n')
+        assert response.mimetype == 'text/csv'
+        assert 'attachment; filename=routes.csv' in response.headers['Content-Disposition']
+        assert lines[0] == 'id,route_code,assigned_truck,delivery_date,orders_count,created_at,updated_at'
+        assert lines[1] == '1,ROU-0001,CAM-001,2025-12-26,5,2025-01-01T10:00:00,2025-01-01T11:00:00'
+        assert self.controller.route_service.export_routes.call_args.kwargs['assigned_truck'] == 'CAM-001'
+    
+    def test_get_invalid_format(self):
+        """Test: Error cuando el formato no es soportado"""
+        with self.app.test_request_context('/logistics/routes/export?format=xml'):
+            response = self.controller.get()
+        
+        assert response[1] == 400
+        assert response[0]['success'] is False
+        self.controller.route_repository.session.close.assert_called_once()
+    
+    def test_get_invalid_chunk_size(self):
+        """Test: Error cuando chunk_size está fuera de rango"""
+        with self.app.test_request_context('/logistics/routes/export?chunk_size=0'):
+            response = self.controller.get()
+        
+        assert response[1] == 400
+    
+    def test_get_validation_error(self):
+        """Test: Error de validación de filtros"""
+        self.controller.route_service.export_routes.side_effect = LogisticsValidationError("Fecha inválida")
+        
+        with self.app.test_request_context('/logistics/routes/export?delivery_date=bad'):
+            response = self.controller.get()
+        
+        assert response[1] == 400
+        self.controller.route_repository.session.close.assert_called_once()
+    
+    def test_get_internal_error(self):
+        """Test: Error interno del servidor"""
+        self.controller.route_service.export_routes.side_effect = Exception("Unexpected error")
+        
+        with self.app.test_request_context('/logistics/routes/export'):
+            response = self.controller.get()
+        
+        assert response[1] == 500
@@ -0,0 +1,53 @@
+"""
+Tests para la serialización de exportación de rutas
+"""
+import json
+import pytest
+from datetime import date, datetime
+from app.utils.route_export import ndjson_chunks, csv_chunks, export_chunks
+
+
+class TestRouteExport:
+    """Tests para route_export"""
+    
+    @pytest.fixture
+    def row(self):
+        """Fila de columnas de ruta"""
+        return (7, "ROU-0007", "CAM-003", date(2025, 12, 26), 4, datetime(2025, 1, 1, 8, 30), None)
+    
+    def test_ndjson_chunks_one_chunk_per_partition(self, row):
+        """Test: Un bloque NDJSON por partición"""
+        chunks = list(ndjson_chunks([[row, row], [row]]))
+        
+        assert len(chunks) == 2
+        assert chunks[0].count('\n') == 2
+        assert json.loads(chunks[1])['route_code'] == "ROU-0007"
+    
+    def test_csv_chunks_header_first(self, row):
+        """Test: El CSV inicia con el encabezado"""
+        chunks = list(csv_chunks([[row]]))
+        
+        assert chunks[0].startswith('id,route_code')
+        assert chunks[1] == '7,ROU-0007,CAM-003,2025-12-26,4,2025-01-01T08:30:00,\r\n'
+    
+    def test_export_chunks_encodes_and_closes(self, row):
+        """Test: Los bloques se codifican y se invoca el cierre"""
+        closed = []
+        
+        chunks = list(export_chunks([[row]], 'ndjson', on_close=lambda: closed.append(True)))
+        
+        assert all(isinstance(chunk, bytes) for chunk in chunks)
+        assert closed == [True]
+    
+    def test_export_chunks_closes_on_error(self):
+        """Test: Se invoca el cierre aunque falle la lectura"""
+        closed = []
+        
+        def failing_partitions():
+            raise RuntimeError("cursor cerrado")
+            yield
+        
+        with pytest.raises(RuntimeError):
+            list(export_chunks(failing_partitions(), 'csv', on_close=lambda: closed.append(True)))
+        
+        assert closed == [True]
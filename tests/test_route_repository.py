@@ -1,13 +1,16 @@
 """
 Tests para RouteRepository
 """
+import json
 import pytest
 from unittest.mock import MagicMock, patch
 from datetime import date, datetime
 from sqlalchemy.exc import SQLAlchemyError
 from app.repositories.route_repository import RouteRepository
 from app.models.route import Route
+from app.exceptions.custom_exceptions import LogisticsConflictError
 from app.models.db_models import RouteDB
+from app.repositories.outbox_repository import ROUTES_PURGED
 
 
 class TestRouteRepository:
@@ -82,6 +85,82 @@ class TestRouteRepository:
             
             mock_create.assert_called_once_with(route)
     
+    def test_create_returns_generated_columns_without_refresh(self, route_repository, mock_session):
+        """Test: create usa INSERT ... RETURNING y no vuelve a leer la fila"""
+        created_at = datetime(2025, 12, 20, 8, 0, 0)
+        mock_session.execute.return_value.one.return_value = (
+            42, "ROU-0042", "CAM-001", date(2025, 12, 26), 5, created_at, created_at
+        )
+        route = Route(route_code="ROU-0042", assigned_truck="CAM-001", delivery_date=date(2025, 12, 26), orders_count=5)
+        
+        with patch('app.repositories.route_repository.RouteDB'):
+            result = route_repository.create(route)
+        
+        assert result.id == 42
+        assert result.created_at == created_at
+        assert result.updated_at == created_at
+        assert mock_session.execute.call_count == 2
+        mock_session.commit.assert_called_once()
+        mock_session.add.assert_not_called()
+        mock_session.refresh.assert_not_called()
+    
+    def test_create_rolls_back_on_error(self, route_repository, mock_session):
+        """Test: Un código duplicado en el INSERT revierte la transacción y se informa como conflicto"""
+        mock_session.execute.side_effect = Exception("duplicate key")
+        route = Route(route_code="ROU-0042", assigned_truck="CAM-001", delivery_date=date(2025, 12, 26))
+        
+        with patch('app.repositories.route_repository.RouteDB'):
+            with pytest.raises(LogisticsConflictError, match="Error al crear ruta: duplicate key"):
+                route_repository.create(route)
+        
+        mock_session.rollback.assert_called_once()
+    
+    def test_create_many_single_statement(self, route_repository, mock_session):
+        """Test: create_many inserta todas las rutas en una sentencia y respeta el orden de entrada"""
+        created_at = datetime(2025, 12, 20, 8, 0, 0)
+        mock_session.execute.return_value = [
+            (8, "ROU-0008", "CAM-002", date(2025, 12, 26), 1, created_at, created_at),
+            (7, "ROU-0007", "CAM-001", date(2025, 12, 26), 3, created_at, created_at)
+        ]
+        routes = [
+            Route(route_code="ROU-0007", assigned_truck="CAM-001", delivery_date=date(2025, 12, 26), orders_count=3),
+            Route(route_code="ROU-0008", assigned_truck="CAM-002", delivery_date=date(2025, 12, 26), orders_count=1)
+        ]
+        
+        with patch('app.repositories.route_repository.RouteDB'):
+            result = route_repository.create_many(routes)
+        
+        assert [route.id for route in result] == [7, 8]
+        assert mock_session.execute.call_count == 2
+        assert [event['route_id'] for event in mock_session.execute.call_args.args[1]] == [7, 8]
+        mock_session.commit.assert_called_once()
+    
+    def test_create_many_empty(self, route_repository, mock_session):
+        """Test: Sin rutas no se ejecuta nada"""
+        assert route_repository.create_many([]) == []
+        mock_session.execute.assert_not_called()
+    
+    def test_create_many_rolls_back(self, route_repository, mock_session):
+        """Test: Un error revierte el INSERT en bloque"""
+        mock_session.execute.side_effect = Exception("duplicate key")
+        routes = [Route(route_code="ROU-0007", assigned_truck="CAM-001", delivery_date=date(2025, 12, 26))]
+        
+        with patch('app.repositories.route_repository.RouteDB'):
+            with pytest.raises(Exception, match="Error al crear rutas"):
+                route_repository.create_many(routes)
+        
+        mock_session.rollback.assert_called_once()
+    
+    def test_get_trucks_with_routes(self, route_repository, mock_session):
+        """Test: Camiones con ruta en la fecha en una sola consulta"""
+        mock_session.execute.return_value.scalars.return_value = iter(["CAM-002"])
+        
+        with patch('app.repositories.route_repository.RouteDB'):
+            result = route_repository.get_trucks_with_routes(date(2025, 12, 26), ["CAM-001", "CAM-002"])
+        
+        assert result == ["CAM-002"]
+        assert route_repository.get_trucks_with_routes(date(2025, 12, 26), []) == []
+    
     def test_get_by_id_success(self, route_repository, mock_session, sample_route_db):
         """Test: Obtener ruta por ID exitosamente"""
         route = Route(
@@ -436,3 +515,292 @@ class TestRouteRepository:
                 route_repository.delete_all()
             
             mock_delete_all.assert_called_once()
+    
+    def test_stream_routes_yields_partitions(self, route_repository, mock_session):
+        """Test: Exportar rutas por particiones"""
+        row = (1, "ROU-0001", "CAM-001", date(2025, 12, 26), 5, datetime(2025, 1, 1), datetime(2025, 1, 1))
+        mock_session.execute.return_value.partitions.return_value = iter([[row], [row, row]])
+        
+        with patch('app.repositories.route_repository.RouteDB'):
+            result = list(route_repository.stream_routes(chunk_size=2))
+        
+        assert result == [[row], [row, row]]
+        mock_session.execute.assert_called_once()
+    
+    def test_stream_routes_database_error(self, route_repository, mock_session):
+        """Test: Error de base de datos en stream_routes"""
+        mock_session.execute.side_effect = Exception("Database error")
+        
+        with patch('app.repositories.route_repository.RouteDB'):
+            with pytest.raises(Exception, match="Error al exportar rutas: Database error"):
+                list(route_repository.stream_routes())
+    
+    def test_delete_all_single_statement(self, route_repository, mock_session):
+        """Test: delete_all usa una sola sentencia y registra un único evento de purga"""
+        mock_session.execute.return_value.rowcount = 7
+        
+        with patch('app.repositories.route_repository.RouteDB') as mock_route_db:
+            mock_route_db.delivery_date.__lt__ = MagicMock(return_value=MagicMock())
+            result = route_repository.delete_all(before=date(2025, 1, 1))
+        
+        assert result == 7
+        assert mock_session.execute.call_count == 2
+        event = mock_session.execute.call_args.args[1][0]
+        assert event['event_type'] == ROUTES_PURGED
+        assert event['route_id'] is None
+        assert json.loads(event['payload']) == {'deleted_count': 7, 'before': '2025-01-01'}
+        mock_session.commit.assert_called_once()
+    
+    def test_delete_all_without_routes_skips_event(self, route_repository, mock_session):
+        """Test: Sin rutas eliminadas no se registra evento"""
+        mock_session.execute.return_value.rowcount = 0
+        
+        with patch('app.repositories.route_repository.RouteDB'):
+            assert route_repository.delete_all() == 0
+        
+        mock_session.execute.assert_called_once()
+    
+    def test_delete_batch(self, route_repository, mock_session):
+        """Test: delete_batch confirma cada lote"""
+        mock_session.execute.return_value.all.return_value = [
+            (index, f"ROU-000{index}", "CAM-001", date(2024, 12, index)) for index in range(1, 4)
+        ]
+        
+        with patch('app.repositories.route_repository.RouteDB'):
+            result = route_repository.delete_batch(3)
+        
+        assert result == 3
+        mock_session.commit.assert_called_once()
+    
+    def test_count_routes_before(self, route_repository, mock_session):
+        """Test: Conteo de rutas a purgar"""
+        mock_session.execute.return_value.scalar.return_value = 12
+        
+        with patch('app.repositories.route_repository.RouteDB') as mock_route_db:
+            mock_route_db.delivery_date.__lt__ = MagicMock(return_value=MagicMock())
+            result = route_repository.count_routes_before(date(2025, 1, 1))
+        
+        assert result == 12
+    
+    def test_get_routes_version(self, route_repository, mock_session):
+        """Test: La versión del listado es conteo y último updated_at en una consulta"""
+        last_updated = datetime(2025, 12, 20, 8, 0, 0)
+        mock_session.execute.return_value.one.return_value = (7, last_updated)
+        
+        with patch('app.repositories.route_repository.RouteDB'):
+            result = route_repository.get_routes_version(assigned_truck="CAM-001")
+        
+        assert result == (7, last_updated)
+        mock_session.execute.assert_called_once()
+    
+    def test_get_routes_version_empty(self, route_repository, mock_session):
+        """Test: Sin rutas la versión es (0, None)"""
+        mock_session.execute.return_value.one.return_value = (None, None)
+        
+        with patch('app.repositories.route_repository.RouteDB'):
+            result = route_repository.get_routes_version()
+        
+        assert result == (0, None)
+    
+    def test_reads_use_read_session(self, mock_session):
+        """Test: Las lecturas van a la réplica y las escrituras al primario"""
+        read_session = MagicMock()
+        read_session.execute.return_value.one.return_value = (1, None)
+        repository = RouteRepository(mock_session, read_session=read_session)
+        
+        with patch('app.repositories.route_repository.RouteDB'):
+            repository.get_by_id(1)
+            repository.get_all()
+            repository.get_routes_paginated(limit=10, offset=0)
+            repository.count_routes()
+            repository.get_routes_version()
+            repository.get_route_by_truck_and_date("CAM-001", date(2025, 12, 26))
+        
+        assert read_session.execute.call_count == 5
+        mock_session.execute.assert_called_once()
+    
+    def test_get_by_id_uses_cached_statement(self, route_repository, mock_session, sample_route_db):
+        """Test: get_by_id ejecuta una sentencia lambda sin construir Query"""
+        mock_session.execute.return_value.scalars.return_value.first.return_value = sample_route_db
+        
+        with patch('app.repositories.route_repository.lambda_stmt') as mock_lambda_stmt:
+            result = route_repository.get_by_id(1)
+        
+        assert result.route_code == "ROU-0001"
+        mock_lambda_stmt.assert_called_once()
+        mock_session.execute.assert_called_once_with(mock_lambda_stmt.return_value)
+        mock_session.query.assert_not_called()
+    
+    def test_get_next_sequence_number_reads_only_id(self, route_repository, mock_session):
+        """Test: La secuencia se calcula desde el último id"""
+        mock_session.execute.return_value.scalar.return_value = 41
+        
+        assert route_repository.get_next_sequence_number() == 42
+    
+    def test_get_next_sequence_number_empty_table(self, route_repository, mock_session):
+        """Test: Sin rutas la secuencia inicia en 1"""
+        mock_session.execute.return_value.scalar.return_value = None
+        
+        assert route_repository.get_next_sequence_number() == 1
+    
+    def test_delete_uses_identity_lookup(self, route_repository, mock_session, sample_route_db):
+        """Test: delete obtiene la ruta por clave primaria con session.get"""
+        mock_session.get.return_value = sample_route_db
+        
+        assert route_repository.delete(1) is True
+        mock_session.delete.assert_called_once_with(sample_route_db)
+        mock_session.query.assert_not_called()
+    
+    def test_read_session_defaults_to_primary(self, route_repository, mock_session):
+        """Test: Sin réplica las lecturas usan la sesión principal"""
+        assert route_repository.read_session is mock_session
+        
+        route_repository.close_read_session()
+        
+        mock_session.close.assert_not_called()
+    
+    def test_close_read_session(self, mock_session):
+        """Test: close_read_session cierra solo la sesión de réplica"""
+        read_session = MagicMock()
+        repository = RouteRepository(mock_session, read_session=read_session)
+        
+        repository.close_read_session()
+        
+        read_session.close.assert_called_once()
+        mock_session.close.assert_not_called()
+    
+    def test_get_route_rows_paginated(self, route_repository, mock_session):
+        """Test: El listado por columnas retorna tuplas sin hidratar ORM"""
+        row = (1, "ROU-0001", "CAM-001", date(2025, 12, 26), 5, None, None)
+        mock_session.execute.return_value.all.return_value = [row]
+        
+        with patch('app.repositories.route_repository.RouteDB'):
+            result = route_repository.get_route_rows_paginated(limit=10, offset=0, assigned_truck="CAM")
+        
+        assert result == [row]
+        mock_session.query.assert_not_called()
+    
+    def test_get_route_stops(self, route_repository, mock_session):
+        """Test: Paradas guardadas y estadísticas de la secuencia"""
+        mock_session.execute.return_value = [
+            ('c-1', 1, 'Droguería', None, None, 'Calle 1', 4.6, -74.1),
+            ('c-2', None, None, None, None, None, None, None)
+        ]
+        mock_session.get.return_value = MagicMock(
+            distance_km=10.0, baseline_distance_km=9.5, baseline_stops=1, incremental_updates=3
+        )
+        
+        with patch('app.repositories.route_repository.RouteStopDB'), \
+                patch('app.repositories.route_repository.RouteSequenceDB'):
+            stops, sequence_stats = route_repository.get_route_stops(1)
+        
+        assert stops[0] == {
+            'client_id': 'c-1', 'sequence': 1, 'name': 'Droguería', 'email': None, 'phone': None,
+            'address': 'Calle 1', 'latitude': 4.6, 'longitude': -74.1
+        }
+        assert stops[1]['sequence'] is None
+        assert sequence_stats['incremental_updates'] == 3
+    
+    def test_replace_route_stops_single_commit(self, route_repository, mock_session):
+        """Test: Paradas, estadísticas y pedidos de la ruta se guardan en una sola transacción"""
+        with patch('app.repositories.route_repository.RouteDB'), \
+                patch('app.repositories.route_repository.RouteStopDB'), \
+                patch('app.repositories.route_repository.RouteOrderDB'), \
+                patch('app.repositories.route_repository.RouteSequenceDB'):
+            route_repository.replace_route_stops(
+                1, [{'client_id': 'c-1', 'sequence': 1, 'order_ids': [7, 8]}], {'distance_km': 1.0}, orders_count=2
+            )
+        
+        assert mock_session.execute.call_count == 5
+        orders = mock_session.execute.call_args_list[3].args[1]
+        assert orders == [
+            {'route_id': 1, 'order_id': '7', 'client_id': 'c-1'},
+            {'route_id': 1, 'order_id': '8', 'client_id': 'c-1'}
+        ]
+        mock_session.merge.assert_called_once()
+        mock_session.commit.assert_called_once()
+    
+    def test_replace_route_stops_rolls_back(self, route_repository, mock_session):
+        """Test: Un error revierte el reemplazo de paradas"""
+        mock_session.execute.side_effect = Exception("deadlock")
+        
+        with patch('app.repositories.route_repository.RouteStopDB'):
+            with pytest.raises(Exception, match="Error al guardar paradas de la ruta"):
+                route_repository.replace_route_stops(1, [], {}, orders_count=0)
+        
+        mock_session.rollback.assert_called_once()
+    
+    def test_get_route_with_stops_single_query(self, route_repository, mock_session):
+        """Test: Ruta, distancia y paradas se leen en una sola consulta"""
+        route_row = (1, "ROU-0001", "CAM-001", date(2025, 12, 26), 2, None, None)
+        mock_session.execute.return_value.all.return_value = [
+            route_row + (8.5, 'c-1', 1, 'Droguería', None, None, 'Calle 1', 4.6, -74.1),
+            route_row + (8.5, 'c-2', 2, 'Clínica', None, None, 'Calle 2', 4.7, -74.0)
+        ]
+        
+        with patch('app.repositories.route_repository.RouteDB'), \
+                patch('app.repositories.route_repository.RouteStopDB'), \
+                patch('app.repositories.route_repository.RouteSequenceDB'):
+            route, stops, distance_km = route_repository.get_route_with_stops(1)
+        
+        assert route.route_code == "ROU-0001"
+        assert [stop['client_id'] for stop in stops] == ['c-1', 'c-2']
+        assert stops[1]['address'] == 'Calle 2'
+        assert distance_km == 8.5
+        mock_session.execute.assert_called_once()
+    
+    def test_get_route_with_stops_without_stops_or_route(self, route_repository, mock_session):
+        """Test: Ruta sin paradas guardadas y ruta inexistente"""
+        route_row = (1, "ROU-0001", "CAM-001", date(2025, 12, 26), 2, None, None)
+        mock_session.execute.return_value.all.side_effect = [
+            [route_row + (None,) * 9],
+            []
+        ]
+        
+        with patch('app.repositories.route_repository.RouteDB'), \
+                patch('app.repositories.route_repository.RouteStopDB'), \
+                patch('app.repositories.route_repository.RouteSequenceDB'):
+            route, stops, distance_km = route_repository.get_route_with_stops(1)
+            missing = route_repository.get_route_with_stops(2)
+        
+        assert route.id == 1
+        assert stops == []
+        assert distance_km is None
+        assert missing is None
+    
+    def test_create_with_stops_single_transaction(self, route_repository, mock_session):
+        """Test: La ruta y sus paradas se insertan antes del único commit"""
+        created_at = datetime(2025, 12, 20, 8, 0, 0)
+        mock_session.execute.return_value.one.return_value = (5, "ROU-0005", "CAM-001", date(2025, 12, 26), 1, created_at, created_at)
+        route = Route(route_code="ROU-0005", assigned_truck="CAM-001", delivery_date=date(2025, 12, 26), orders_count=1)
+        
+        with patch('app.repositories.route_repository.RouteDB'), \
+                patch('app.repositories.route_repository.RouteStopDB'), \
+                patch('app.repositories.route_repository.RouteOrderDB'), \
+                patch('app.repositories.route_repository.RouteSequenceDB') as mock_sequence:
+            result = route_repository.create(
+                route, stops=[{'client_id': 'c-1', 'sequence': 1, 'order_ids': [1]}], sequence_stats={'distance_km': 2.0}
+            )
+        
+        assert result.id == 5
+        assert mock_session.execute.call_count == 4
+        assert mock_session.execute.call_args_list[1].args[1][0]['route_id'] == 5
+        mock_sequence.assert_called_once_with(route_id=5, distance_km=2.0)
+        mock_session.commit.assert_called_once()
+    
+    def test_get_routes_by_client_uses_read_session(self, mock_session):
+        """Test: Las búsquedas inversas se leen de la sesión de lectura"""
+        read_session = MagicMock()
+        read_session.execute.return_value.all.return_value = [("row",)]
+        read_session.execute.return_value.first.return_value = None
+        repository = RouteRepository(mock_session, read_session=read_session)
+        
+        with patch('app.repositories.route_repository.RouteDB'), \
+                patch('app.repositories.route_repository.RouteStopDB'), \
+                patch('app.repositories.route_repository.RouteOrderDB'):
+            rows = repository.get_routes_by_client('c-1', date(2025, 12, 1), date(2025, 12, 31))
+            order_row = repository.get_route_by_order('77')
+        
+        assert rows == [("row",)]
+        assert order_row is None
+        mock_session.execute.assert_not_called()
@@ -0,0 +1,46 @@
+"""
+Tests para la serialización de filas de rutas
+"""
+from datetime import date, datetime
+from app.models.route import Route
+from app.utils.route_serializer import serialize_row, row_to_dict, rows_to_dicts
+
+
+class TestRouteSerializer:
+    """Tests para route_serializer"""
+    
+    def test_serialize_row(self):
+        """Test: Las fechas se serializan en ISO 8601"""
+        row = (7, "ROU-0007", "CAM-003", date(2025, 12, 26), 4, datetime(2025, 1, 1, 8, 30), None)
+        
+        assert serialize_row(row) == (7, "ROU-0007", "CAM-003", "2025-12-26", 4, "2025-01-01T08:30:00", None)
+    
+    def test_row_to_dict_matches_route_to_dict(self):
+        """Test: La ruta rápida produce el mismo resultado que Route.to_dict"""
+        created_at = datetime(2025, 1, 1, 10, 0, 0)
+        updated_at = datetime(2025, 1, 2, 11, 0, 0)
+        route = Route(
+            id=3,
+            route_code="ROU-0003",
+            assigned_truck="CAM-002",
+            delivery_date=date(2025, 12, 26),
+            orders_count=9,
+            created_at=created_at,
+            updated_at=updated_at
+        )
+        row = (3, "ROU-0003", "CAM-002", date(2025, 12, 26), 9, created_at, updated_at)
+        
+        assert row_to_dict(row) == route.to_dict()
+    
+    def test_rows_to_dicts(self):
+        """Test: Serialización de varias filas"""
+        rows = [
+            (1, "ROU-0001", "CAM-001", date(2025, 12, 26), 1, None, None),
+            (2, "ROU-0002", "CAM-002", date(2025, 12, 27), 2, None, None)
+        ]
+        
+        result = rows_to_dicts(rows)
+        
+        assert [item['id'] for item in result] == [1, 2]
+        assert result[1]['delivery_date'] == "2025-12-27"
+        assert result[0]['created_at'] is None
@@ -6,7 +6,7 @@ from unittest.mock import MagicMock, Mock, patch
 from datetime import datetime, date, timedelta
 from app.services.route_service import RouteService
 from app.repositories.route_repository import RouteRepository
-from app.exceptions.custom_exceptions import LogisticsValidationError, LogisticsBusinessLogicError
+from app.exceptions.custom_exceptions import LogisticsValidationError, LogisticsBusinessLogicError, LogisticsConflictError, LogisticsNotFoundError
 from app.models.route import Route
 from app.integrations.orders_integration import OrdersIntegration
 from app.integrations.auth_integration import AuthIntegration
@@ -174,6 +174,17 @@ class TestRouteService:
         with pytest.raises(LogisticsBusinessLogicError, match="no tiene pedidos asignados"):
             route_service.create_route(valid_route_data)
     
+    def test_validate_route_request_without_downstream_calls(self, route_service, mock_route_repository, mock_orders_integration, valid_route_data):
+        """Test: La validación síncrona no consulta el servicio de pedidos"""
+        mock_route_repository.get_route_by_truck_and_date.return_value = None
+        
+        assigned_truck, delivery_date = route_service.validate_route_request(valid_route_data)
+        
+        assert assigned_truck == 'CAM-001'
+        assert delivery_date == date.today() + timedelta(days=1)
+        mock_orders_integration.has_orders_for_truck_and_date.assert_not_called()
+        mock_route_repository.create.assert_not_called()
+    
     def test_get_routes_paginated_success(self, route_service, mock_route_repository):
         """Test: Obtener rutas paginadas exitosamente"""
         mock_route = Route(
@@ -248,7 +259,7 @@ class TestRouteService:
             orders_count=2
         )
         
-        mock_route_repository.get_by_id.return_value = route
+        mock_route_repository.get_route_with_stops.return_value = (route, [], None)
         
         mock_orders = [
             {'id': 1, 'client_id': 'client-1'},
@@ -281,10 +292,28 @@ class TestRouteService:
         assert 'clients' in result
         assert len(result['clients']) == 2
         assert result['route']['route_code'] == "ROU-0001"
+        assert sorted(client['sequence'] for client in result['clients']) == [1, 2]
+        assert result['total_distance_km'] > 0
+    
+    def test_build_route_with_clients_sequences_from_depot(self, route_service, mock_auth_integration):
+        """Test: Los clientes se ordenan por secuencia de visita desde el depósito"""
+        route = Route(id=1, route_code="ROU-0001", assigned_truck="CAM-001", delivery_date=date(2025, 12, 26), orders_count=3)
+        mock_auth_integration.get_users_by_ids.return_value = {
+            'far': {'id': 'far', 'latitude': 4.03, 'longitude': -74.0},
+            'near': {'id': 'near', 'latitude': 4.01, 'longitude': -74.0},
+            'mid': {'id': 'mid', 'latitude': 4.02, 'longitude': -74.0}
+        }
+        orders = [{'id': 1, 'client_id': 'far'}, {'id': 2, 'client_id': 'near'}, {'id': 3, 'client_id': 'mid'}]
+        
+        result = route_service.build_route_with_clients(route, orders, depot=(4.0, -74.0), return_to_depot=False)
+        
+        assert [client['id'] for client in result['clients']] == ['near', 'mid', 'far']
+        assert [client['sequence'] for client in result['clients']] == [1, 2, 3]
+        assert result['total_distance_km'] == pytest.approx(3.336, abs=0.001)
     
     def test_get_route_with_clients_not_found(self, route_service, mock_route_repository):
         """Test: Error cuando la ruta no existe"""
-        mock_route_repository.get_by_id.return_value = None
+        mock_route_repository.get_route_with_stops.return_value = None
         
         with pytest.raises(LogisticsBusinessLogicError, match="Ruta no encontrada"):
             route_service.get_route_with_clients(999)
@@ -299,7 +328,7 @@ class TestRouteService:
             orders_count=2
         )
         
-        mock_route_repository.get_by_id.return_value = route
+        mock_route_repository.get_route_with_stops.return_value = (route, [], None)
         mock_orders_integration.get_orders_by_truck_and_date.return_value = [
             {'id': 1, 'client_id': None},
             {'id': 2}
@@ -310,6 +339,46 @@ class TestRouteService:
         
         assert len(result['clients']) == 0
     
+    def test_create_route_reads_sequence_after_snapshot(self, route_service, mock_route_repository, mock_orders_integration, valid_route_data):
+        """Test: El número de secuencia se lee después de armar las paradas y se reintenta si el código ya existe"""
+        mock_route_repository.get_route_by_truck_and_date.return_value = None
+        mock_orders_integration.has_orders_for_truck_and_date.return_value = True
+        mock_orders_integration.get_orders_by_truck_and_date.return_value = [{'id': 1}]
+        mock_route_repository.get_next_sequence_number.side_effect = [7, 8]
+        calls = []
+        
+        def create(route, stops=None, sequence_stats=None):
+            calls.append(route.route_code)
+            if len(calls) == 1:
+                raise LogisticsConflictError("Error al crear ruta: duplicate key")
+            return route
+        
+        mock_route_repository.create.side_effect = create
+        
+        def snapshot(orders, **kwargs):
+            mock_route_repository.get_next_sequence_number.assert_not_called()
+            return [], {}
+        
+        with patch.object(route_service, 'snapshot_route_stops', side_effect=snapshot) as mock_snapshot:
+            result = route_service.create_route(valid_route_data)
+        
+        assert calls == ['ROU-0007', 'ROU-0008']
+        assert result.route_code == 'ROU-0008'
+        mock_snapshot.assert_called_once()
+    
+    def test_create_route_conflict_retries_exhausted(self, route_service, mock_route_repository, mock_orders_integration, valid_route_data):
+        """Test: Tras agotar los reintentos por código duplicado se informa el error"""
+        mock_route_repository.get_route_by_truck_and_date.return_value = None
+        mock_orders_integration.has_orders_for_truck_and_date.return_value = True
+        mock_orders_integration.get_orders_by_truck_and_date.return_value = [{'id': 1}]
+        mock_route_repository.get_next_sequence_number.return_value = 7
+        mock_route_repository.create.side_effect = LogisticsConflictError("duplicate key")
+        
+        with pytest.raises(LogisticsBusinessLogicError, match="duplicate key"):
+            route_service.create_route(valid_route_data)
+        
+        assert mock_route_repository.create.call_count == 3
+    
     def test_create_route_exception_handling(self, route_service, mock_route_repository, mock_orders_integration, valid_route_data):
         """Test: Manejo de excepciones inesperadas al crear ruta"""
         delivery_date = date.today() + timedelta(days=1)
@@ -345,7 +414,7 @@ class TestRouteService:
             orders_count=2
         )
         
-        mock_route_repository.get_by_id.return_value = route
+        mock_route_repository.get_route_with_stops.return_value = (route, [], None)
         mock_orders_integration.get_orders_by_truck_and_date.side_effect = Exception("Integration error")
         
         with pytest.raises(LogisticsBusinessLogicError):
@@ -365,3 +434,446 @@ class TestRouteService:
         with pytest.raises(LogisticsValidationError):
             route_service.count_routes(delivery_date="not-a-date")
 
+    
+    def test_get_routes_version_parses_date(self, route_service, mock_route_repository):
+        """Test: La versión del listado delega con la fecha parseada"""
+        mock_route_repository.get_routes_version.return_value = (4, None)
+        
+        result = route_service.get_routes_version(assigned_truck="CAM-001", delivery_date="2025-12-26")
+        
+        assert result == (4, None)
+        mock_route_repository.get_routes_version.assert_called_once_with(
+            route_code=None,
+            assigned_truck="CAM-001",
+            delivery_date=date(2025, 12, 26)
+        )
+    
+    def test_get_routes_version_exception(self, route_service, mock_route_repository):
+        """Test: Errores del repositorio se convierten en error de negocio"""
+        mock_route_repository.get_routes_version.side_effect = Exception("Database error")
+        
+        with pytest.raises(LogisticsBusinessLogicError):
+            route_service.get_routes_version()
+    
+    def test_export_routes_success(self, route_service, mock_route_repository):
+        """Test: Exportar rutas delega en el repositorio con la fecha parseada"""
+        partitions = iter([[(1, "ROU-0001")]])
+        mock_route_repository.stream_routes.return_value = partitions
+        
+        result = route_service.export_routes(assigned_truck="CAM-001", delivery_date="2025-12-26", chunk_size=500)
+        
+        assert result is partitions
+        mock_route_repository.stream_routes.assert_called_once_with(
+            chunk_size=500,
+            route_code=None,
+            assigned_truck="CAM-001",
+            delivery_date=date(2025, 12, 26)
+        )
+    
+    def test_export_routes_invalid_date(self, route_service, mock_route_repository):
+        """Test: Error de validación al exportar con fecha inválida"""
+        with pytest.raises(LogisticsValidationError):
+            route_service.export_routes(delivery_date="26/12/2025")
+        
+        mock_route_repository.stream_routes.assert_not_called()
+    
+    def test_purge_routes_in_batches(self, route_service, mock_route_repository):
+        """Test: La purga elimina por lotes y reporta progreso"""
+        mock_route_repository.count_routes_before.return_value = 25
+        mock_route_repository.delete_batch.side_effect = [10, 10, 5]
+        progress = []
+        
+        result = route_service.purge_routes(10, date(2025, 1, 1), on_progress=lambda d, t: progress.append((d, t)))
+        
+        assert result == 25
+        assert progress == [(0, 25), (10, 25), (20, 25), (25, 25)]
+        assert mock_route_repository.delete_batch.call_count == 3
+        mock_route_repository.delete_batch.assert_called_with(10, date(2025, 1, 1))
+    
+    def test_purge_routes_exact_multiple_stops_on_empty_batch(self, route_service, mock_route_repository):
+        """Test: La purga termina con un lote vacío"""
+        mock_route_repository.count_routes_before.return_value = 20
+        mock_route_repository.delete_batch.side_effect = [10, 10, 0]
+        
+        with patch('app.services.route_service.time.sleep') as mock_sleep:
+            result = route_service.purge_routes(10, pause_seconds=0.5)
+        
+        assert result == 20
+        assert mock_sleep.call_count == 2
+    
+    def test_get_route_summaries_paginated(self, route_service, mock_route_repository):
+        """Test: El listado serializa directamente las filas de columnas"""
+        mock_route_repository.get_route_rows_paginated.return_value = [
+            (1, "ROU-0001", "CAM-001", date(2025, 12, 26), 5, datetime(2025, 1, 1, 10, 0), datetime(2025, 1, 1, 11, 0))
+        ]
+        
+        result = route_service.get_route_summaries_paginated(page=2, per_page=10, delivery_date="2025-12-26")
+        
+        assert result == [{
+            'id': 1,
+            'route_code': "ROU-0001",
+            'assigned_truck': "CAM-001",
+            'delivery_date': "2025-12-26",
+            'orders_count': 5,
+            'created_at': "2025-01-01T10:00:00",
+            'updated_at': "2025-01-01T11:00:00"
+        }]
+        mock_route_repository.get_route_rows_paginated.assert_called_once_with(
+            limit=10,
+            offset=10,
+            route_code=None,
+            assigned_truck=None,
+            delivery_date=date(2025, 12, 26)
+        )
+    
+    def test_get_route_summaries_paginated_invalid_date(self, route_service):
+        """Test: Error de validación con fecha inválida"""
+        with pytest.raises(LogisticsValidationError):
+            route_service.get_route_summaries_paginated(page=1, per_page=10, delivery_date="invalid")
+    
+    def test_get_route_summaries_paginated_exception(self, route_service, mock_route_repository):
+        """Test: Error inesperado al listar rutas"""
+        mock_route_repository.get_route_rows_paginated.side_effect = Exception("Database error")
+        
+        with pytest.raises(LogisticsBusinessLogicError, match="Error al obtener rutas"):
+            route_service.get_route_summaries_paginated(page=1, per_page=10)
+    
+    def _bulk_orders(self, orders_by_truck):
+        def get_orders(delivery_date, trucks, max_workers=5, return_exceptions=False):
+            return {truck: orders_by_truck[truck] for truck in trucks}
+        return get_orders
+    
+    def test_create_routes_bulk_mixed_results(self, route_service, mock_route_repository, mock_orders_integration):
+        """Test: Creación en bloque reporta éxito o fallo por camión"""
+        delivery_date = date.today() + timedelta(days=2)
+        mock_route_repository.get_trucks_with_routes.return_value = ['CAM-002']
+        mock_orders_integration.get_orders_by_date.side_effect = self._bulk_orders({
+            'CAM-001': [{'id': 1}, {'id': 2}],
+            'CAM-003': [],
+            'CAM-004': Exception("Error al consultar servicio de pedidos: timeout"),
+            'CAM-005': [{'id': 3}]
+        })
+        mock_route_repository.get_next_sequence_number.return_value = 10
+        mock_route_repository.create_many.side_effect = lambda routes, snapshots=None: routes
+        
+        results = route_service.create_routes_bulk({'delivery_date': delivery_date.isoformat()})
+        
+        by_truck = {result['assigned_truck']: result for result in results}
+        assert [result['assigned_truck'] for result in results] == ['CAM-001', 'CAM-002', 'CAM-003', 'CAM-004', 'CAM-005']
+        assert by_truck['CAM-001']['route']['route_code'] == 'ROU-0010'
+        assert by_truck['CAM-001']['route']['orders_count'] == 2
+        assert by_truck['CAM-005']['route']['route_code'] == 'ROU-0011'
+        assert 'ya tiene una ruta' in by_truck['CAM-002']['error']
+        assert 'no tiene pedidos' in by_truck['CAM-003']['error']
+        assert 'timeout' in by_truck['CAM-004']['error']
+        mock_route_repository.create_many.assert_called_once()
+        mock_orders_integration.get_orders_by_date.assert_called_once_with(
+            delivery_date, ['CAM-001', 'CAM-003', 'CAM-004', 'CAM-005'], max_workers=5, return_exceptions=True
+        )
+        mock_orders_integration.has_orders_for_truck_and_date.assert_not_called()
+    
+    def test_create_routes_bulk_invalid_truck(self, route_service, mock_route_repository, mock_orders_integration):
+        """Test: Camiones inválidos fallan sin consultar pedidos"""
+        delivery_date = date.today() + timedelta(days=2)
+        mock_route_repository.get_trucks_with_routes.return_value = []
+        mock_orders_integration.get_orders_by_date.side_effect = self._bulk_orders({'CAM-001': [{'id': 1}]})
+        mock_route_repository.get_next_sequence_number.return_value = 1
+        mock_route_repository.create_many.side_effect = lambda routes, snapshots=None: routes
+        
+        results = route_service.create_routes_bulk({
+            'delivery_date': delivery_date.isoformat(),
+            'trucks': ['CAM-999', 'CAM-001', 'CAM-001']
+        })
+        
+        assert [result['assigned_truck'] for result in results] == ['CAM-999', 'CAM-001']
+        assert results[0]['success'] is False
+        assert results[1]['success'] is True
+        assert mock_orders_integration.get_orders_by_date.call_args.args == (delivery_date, ['CAM-001'])
+    
+    def test_create_routes_bulk_snapshots_stops(self, route_service, mock_route_repository, mock_orders_integration, mock_auth_integration):
+        """Test: Las paradas de todas las rutas se arman con una sola consulta de clientes"""
+        delivery_date = date.today() + timedelta(days=2)
+        mock_route_repository.get_trucks_with_routes.return_value = []
+        mock_orders_integration.get_orders_by_date.side_effect = self._bulk_orders({
+            'CAM-001': [{'id': 1, 'client_id': 'c-1'}, {'id': 2, 'client_id': 'c-1'}],
+            'CAM-002': [{'id': 3, 'client_id': 'c-2'}]
+        })
+        mock_auth_integration.get_users_by_ids.return_value = {
+            'c-1': {'id': 'c-1', 'address': 'Calle 1', 'latitude': 4.6, 'longitude': -74.1},
+            'c-2': {'id': 'c-2', 'address': 'Calle 2', 'latitude': 4.7, 'longitude': -74.0}
+        }
+        mock_route_repository.get_next_sequence_number.return_value = 1
+        mock_route_repository.create_many.side_effect = lambda routes, snapshots=None: routes
+        
+        route_service.create_routes_bulk({'delivery_date': delivery_date.isoformat(), 'trucks': ['CAM-001', 'CAM-002']})
+        
+        mock_auth_integration.get_users_by_ids.assert_called_once()
+        snapshots = mock_route_repository.create_many.call_args.kwargs['snapshots']
+        (first_stops, first_stats), (second_stops, _) = snapshots
+        assert first_stops == [{
+            'client_id': 'c-1', 'name': None, 'email': None, 'phone': None, 'address': 'Calle 1',
+            'latitude': 4.6, 'longitude': -74.1, 'order_ids': [1, 2], 'sequence': 1
+        }]
+        assert first_stats['baseline_stops'] == 1
+        assert second_stops[0]['address'] == 'Calle 2'
+    
+    def test_create_routes_bulk_insert_failure(self, route_service, mock_route_repository, mock_orders_integration):
+        """Test: Si falla el INSERT en bloque todas las rutas elegibles fallan"""
+        delivery_date = date.today() + timedelta(days=2)
+        mock_route_repository.get_trucks_with_routes.return_value = []
+        mock_orders_integration.get_orders_by_date.side_effect = self._bulk_orders({'CAM-001': [{'id': 1}], 'CAM-002': [{'id': 2}]})
+        mock_route_repository.get_next_sequence_number.return_value = 1
+        mock_route_repository.create_many.side_effect = Exception("duplicate key")
+        
+        results = route_service.create_routes_bulk({'delivery_date': delivery_date.isoformat(), 'trucks': ['CAM-001', 'CAM-002']})
+        
+        assert all(result['success'] is False for result in results)
+        assert all('duplicate key' in result['error'] for result in results)
+    
+    def test_create_routes_bulk_retries_route_codes(self, route_service, mock_route_repository, mock_orders_integration):
+        """Test: Si un código ya existe el bloque se reintenta con un número de secuencia nuevo"""
+        delivery_date = date.today() + timedelta(days=2)
+        mock_route_repository.get_trucks_with_routes.return_value = []
+        mock_orders_integration.get_orders_by_date.side_effect = self._bulk_orders({'CAM-001': [{'id': 1}], 'CAM-002': [{'id': 2}]})
+        mock_route_repository.get_next_sequence_number.side_effect = [1, 3]
+        
+        def create_many(routes, snapshots=None):
+            if routes[0].route_code == 'ROU-0001':
+                raise LogisticsConflictError("duplicate key")
+            return routes
+        
+        mock_route_repository.create_many.side_effect = create_many
+        
+        results = route_service.create_routes_bulk({'delivery_date': delivery_date.isoformat(), 'trucks': ['CAM-001', 'CAM-002']})
+        
+        assert [result['route']['route_code'] for result in results] == ['ROU-0003', 'ROU-0004']
+        assert mock_route_repository.create_many.call_count == 2
+    
+    def test_create_routes_bulk_nothing_eligible(self, route_service, mock_route_repository, mock_orders_integration):
+        """Test: Sin camiones elegibles no se inserta nada"""
+        delivery_date = date.today() + timedelta(days=2)
+        mock_route_repository.get_trucks_with_routes.return_value = ['CAM-001']
+        
+        results = route_service.create_routes_bulk({'delivery_date': delivery_date.isoformat(), 'trucks': ['CAM-001']})
+        
+        assert results[0]['success'] is False
+        mock_route_repository.get_next_sequence_number.assert_not_called()
+        mock_route_repository.create_many.assert_not_called()
+    
+    def test_create_routes_bulk_validation(self, route_service):
+        """Test: Validación de fecha y lista de camiones"""
+        tomorrow = (date.today() + timedelta(days=1)).isoformat()
+        
+        with pytest.raises(LogisticsValidationError):
+            route_service.create_routes_bulk({})
+        with pytest.raises(LogisticsValidationError):
+            route_service.create_routes_bulk({'delivery_date': date.today().isoformat()})
+        with pytest.raises(LogisticsValidationError):
+            route_service.create_routes_bulk({'delivery_date': 'mañana'})
+        with pytest.raises(LogisticsValidationError):
+            route_service.create_routes_bulk({'delivery_date': tomorrow, 'trucks': 'CAM-001'})
+    
+    def test_validate_plan_request(self, route_service):
+        """Test: Validación de la solicitud de planificación"""
+        delivery_date = date.today() + timedelta(days=2)
+        
+        assert route_service.validate_plan_request({'delivery_date': delivery_date.isoformat()}) == (
+            delivery_date, ['CAM-001', 'CAM-002', 'CAM-003', 'CAM-004', 'CAM-005']
+        )
+        assert route_service.validate_plan_request({
+            'delivery_date': delivery_date.isoformat(), 'trucks': ['CAM-002', 'CAM-002']
+        }) == (delivery_date, ['CAM-002'])
+        with pytest.raises(LogisticsValidationError):
+            route_service.validate_plan_request({})
+        with pytest.raises(LogisticsValidationError, match="CAM-999"):
+            route_service.validate_plan_request({'delivery_date': delivery_date.isoformat(), 'trucks': ['CAM-999']})
+    
+    def test_plan_delivery_date_groups_orders_by_client(self, route_service, mock_orders_integration, mock_auth_integration):
+        """Test: Las paradas agrupan los pedidos de la fecha por cliente"""
+        delivery_date = date.today() + timedelta(days=2)
+        mock_orders_integration.get_orders_by_date.return_value = {
+            'CAM-001': [{'id': 1, 'client_id': 'c-1'}, {'id': 2, 'client_id': 'c-2'}],
+            'CAM-002': [{'id': 3, 'client_id': 'c-1'}, {'id': 4}]
+        }
+        mock_auth_integration.get_users_by_ids.return_value = {
+            'c-1': {'id': 'c-1', 'name': 'Droguería', 'latitude': 4.6, 'longitude': -74.1},
+            'c-2': {'id': 'c-2', 'name': 'Clínica', 'latitude': 4.7, 'longitude': -74.0}
+        }
+        planner = MagicMock(return_value={'routes': [], 'unassigned': [], 'metrics': {'total_distance_km': 0}})
+        stages = []
+        
+        result = route_service.plan_delivery_date(delivery_date, ['CAM-001'], planner, on_progress=stages.append)
+        
+        stops, trucks = planner.call_args.args
+        assert trucks == ['CAM-001']
+        assert {stop['client_id']: stop['orders'] for stop in stops} == {'c-1': [1, 3], 'c-2': [2], None: [4]}
+        assert stops[0]['name'] == 'Droguería'
+        assert result['delivery_date'] == delivery_date.isoformat()
+        assert stages == ['fetching_orders', 'planning']
+        assert sorted(mock_auth_integration.get_users_by_ids.call_args.args[0]) == ['c-1', 'c-2']
+    
+    def test_plan_delivery_date_error(self, route_service, mock_orders_integration):
+        """Test: Un error del servicio de pedidos se reporta como error de negocio"""
+        mock_orders_integration.get_orders_by_date.side_effect = Exception("timeout")
+        
+        with pytest.raises(LogisticsBusinessLogicError, match="Error al planificar rutas"):
+            route_service.plan_delivery_date(date.today() + timedelta(days=2), ['CAM-001'], MagicMock())
+    
+    def test_reoptimize_route_inserts_new_clients(self, route_service, mock_route_repository, mock_orders_integration, mock_auth_integration):
+        """Test: Solo se consultan los clientes nuevos y la secuencia guardada se actualiza"""
+        route = Route(id=1, route_code="ROU-0001", assigned_truck="CAM-001", delivery_date=date(2025, 12, 26), orders_count=2)
+        mock_route_repository.get_by_id.return_value = route
+        mock_orders_integration.get_orders_by_truck_and_date.return_value = [
+            {'id': 1, 'client_id': 'c-1'}, {'id': 2, 'client_id': 'c-2'}, {'id': 3, 'client_id': 'c-3'}
+        ]
+        mock_route_repository.get_route_stops.return_value = (
+            [
+                {'client_id': 'c-1', 'sequence': 1, 'latitude': 4.60, 'longitude': -74.10},
+                {'client_id': 'c-2', 'sequence': 2, 'latitude': 4.70, 'longitude': -74.10},
+                {'client_id': 'c-9', 'sequence': 3, 'latitude': 4.80, 'longitude': -74.00}
+            ],
+            {'distance_km': 30.0, 'baseline_distance_km': 30.0, 'baseline_stops': 3, 'incremental_updates': 2}
+        )
+        mock_auth_integration.get_users_by_ids.return_value = {'c-3': {'id': 'c-3', 'latitude': 4.65, 'longitude': -74.10}}
+        
+        result = route_service.reoptimize_route(1, max_degradation=10.0)
+        
+        mock_auth_integration.get_users_by_ids.assert_called_once_with(['c-3'])
+        stops, stats = mock_route_repository.replace_route_stops.call_args.args[1:]
+        assert [stop['client_id'] for stop in stops] == ['c-1', 'c-3', 'c-2']
+        assert stats['incremental_updates'] == 3
+        assert mock_route_repository.replace_route_stops.call_args.kwargs['orders_count'] == 3
+        assert result['mode'] == 'incremental'
+        assert (result['inserted'], result['removed']) == (1, 1)
+        assert result['route']['orders_count'] == 3
+    
+    def test_reoptimize_route_without_stored_sequence(self, route_service, mock_route_repository, mock_orders_integration, mock_auth_integration):
+        """Test: Sin secuencia guardada se resuelve completa y se reinician las actualizaciones"""
+        mock_route_repository.get_by_id.return_value = Route(
+            id=1, route_code="ROU-0001", assigned_truck="CAM-001", delivery_date=date(2025, 12, 26)
+        )
+        mock_orders_integration.get_orders_by_truck_and_date.return_value = [{'id': 1, 'client_id': 'c-1'}]
+        mock_route_repository.get_route_stops.return_value = ([], None)
+        mock_auth_integration.get_users_by_ids.return_value = {'c-1': {'id': 'c-1', 'latitude': 4.6, 'longitude': -74.1}}
+        
+        result = route_service.reoptimize_route(1)
+        
+        assert result['mode'] == 'full'
+        assert result['incremental_updates'] == 0
+        assert mock_route_repository.replace_route_stops.call_args.args[2]['baseline_stops'] == 1
+    
+    def test_reoptimize_route_not_found(self, route_service, mock_route_repository):
+        """Test: Reoptimizar una ruta inexistente"""
+        mock_route_repository.get_by_id.return_value = None
+        
+        with pytest.raises(LogisticsNotFoundError, match="Ruta no encontrada"):
+            route_service.reoptimize_route(99)
+        mock_route_repository.replace_route_stops.assert_not_called()
+    
+    def test_create_route_persists_stop_snapshot(self, route_service, mock_route_repository, mock_orders_integration, mock_auth_integration, valid_route_data):
+        """Test: La ruta se crea con las paradas secuenciadas y el snapshot de clientes"""
+        mock_route_repository.get_route_by_truck_and_date.return_value = None
+        mock_orders_integration.has_orders_for_truck_and_date.return_value = True
+        mock_orders_integration.get_orders_by_truck_and_date.return_value = [
+            {'id': 1, 'client_id': 'far'}, {'id': 2, 'client_id': 'near'}, {'id': 3, 'client_id': 'near'}, {'id': 4}
+        ]
+        mock_auth_integration.get_users_by_ids.return_value = {
+            'far': {'id': 'far', 'address': 'Lejos', 'latitude': 4.03, 'longitude': -74.0},
+            'near': {'id': 'near', 'address': 'Cerca', 'latitude': 4.01, 'longitude': -74.0}
+        }
+        mock_route_repository.get_next_sequence_number.return_value = 1
+        mock_route_repository.create.side_effect = lambda route, stops, sequence_stats: route
+        
+        route = route_service.create_route(valid_route_data, depot=(4.0, -74.0), return_to_depot=False)
+        
+        kwargs = mock_route_repository.create.call_args.kwargs
+        assert route.orders_count == 4
+        assert [(stop['client_id'], stop['sequence'], stop['order_ids']) for stop in kwargs['stops']] == [
+            ('near', 1, [2, 3]), ('far', 2, [1])
+        ]
+        assert kwargs['stops'][0]['address'] == 'Cerca'
+        assert kwargs['sequence_stats']['distance_km'] == pytest.approx(3.336, abs=0.001)
+    
+    def test_get_route_with_clients_from_stored_stops(self, route_service, mock_route_repository, mock_orders_integration, mock_auth_integration):
+        """Test: Con paradas guardadas no se llama a pedidos ni al autenticador"""
+        route = Route(id=1, route_code="ROU-0001", assigned_truck="CAM-001", delivery_date=date(2025, 12, 26), orders_count=2)
+        mock_route_repository.get_route_with_stops.return_value = (route, [
+            {'client_id': 'c-1', 'sequence': 1, 'name': 'Droguería', 'email': None, 'phone': None,
+             'address': 'Calle 1', 'latitude': 4.6, 'longitude': -74.1}
+        ], 4.2)
+        
+        result = route_service.get_route_with_clients(1)
+        
+        assert result['clients'] == [{
+            'id': 'c-1', 'name': 'Droguería', 'email': None, 'address': 'Calle 1',
+            'phone': None, 'latitude': 4.6, 'longitude': -74.1, 'sequence': 1
+        }]
+        assert result['total_distance_km'] == 4.2
+        mock_orders_integration.get_orders_by_truck_and_date.assert_not_called()
+        mock_auth_integration.get_users_by_ids.assert_not_called()
+    
+    def test_refresh_route_updates_snapshot_and_moved_clients(self, route_service, mock_route_repository, mock_orders_integration, mock_auth_integration):
+        """Test: Refrescar vuelve a consultar todos los clientes y reubica los que cambiaron de dirección"""
+        mock_route_repository.get_by_id.return_value = Route(
+            id=1, route_code="ROU-0001", assigned_truck="CAM-001", delivery_date=date(2025, 12, 26), orders_count=2
+        )
+        mock_orders_integration.get_orders_by_truck_and_date.return_value = [
+            {'id': 1, 'client_id': 'c-1'}, {'id': 2, 'client_id': 'c-2'}
+        ]
+        mock_route_repository.get_route_stops.return_value = (
+            [
+                {'client_id': 'c-1', 'sequence': 1, 'address': 'Vieja', 'latitude': 4.60, 'longitude': -74.10},
+                {'client_id': 'c-2', 'sequence': 2, 'address': 'Calle 2', 'latitude': 4.70, 'longitude': -74.10}
+            ],
+            {'distance_km': 11.1, 'baseline_distance_km': 11.1, 'baseline_stops': 2, 'incremental_updates': 0}
+        )
+        mock_auth_integration.get_users_by_ids.return_value = {
+            'c-1': {'id': 'c-1', 'address': 'Nueva', 'latitude': 4.60, 'longitude': -74.10},
+            'c-2': {'id': 'c-2', 'address': 'Mudanza', 'latitude': 4.80, 'longitude': -74.10}
+        }
+        
+        result = route_service.refresh_route(1, max_degradation=10.0)
+        
+        assert sorted(mock_auth_integration.get_users_by_ids.call_args.args[0]) == ['c-1', 'c-2']
+        stops = {stop['client_id']: stop for stop in mock_route_repository.replace_route_stops.call_args.args[1]}
+        assert stops['c-1']['address'] == 'Nueva'
+        assert stops['c-2']['latitude'] == 4.80
+        assert stops['c-2']['order_ids'] == [2]
+        assert (result['inserted'], result['removed']) == (1, 1)
+    
+    def test_get_client_routes(self, route_service, mock_route_repository):
+        """Test: Rutas del cliente con su secuencia y rango de fechas parseado"""
+        mock_route_repository.get_routes_by_client.return_value = [
+            (3, "ROU-0003", "CAM-002", date(2025, 12, 27), 4, None, None, 2)
+        ]
+        
+        result = route_service.get_client_routes('c-1', '2025-12-01', '2025-12-31', limit=5)
+        
+        assert result == [{
+            'id': 3, 'route_code': "ROU-0003", 'assigned_truck': "CAM-002", 'delivery_date': '2025-12-27',
+            'orders_count': 4, 'created_at': None, 'updated_at': None, 'sequence': 2
+        }]
+        mock_route_repository.get_routes_by_client.assert_called_once_with('c-1', date(2025, 12, 1), date(2025, 12, 31), 5)
+    
+    def test_get_order_route(self, route_service, mock_route_repository):
+        """Test: Ruta del pedido con el cliente y su secuencia, o None si no está asignado"""
+        mock_route_repository.get_route_by_order.side_effect = [
+            (3, "ROU-0003", "CAM-002", date(2025, 12, 27), 4, None, None, 'c-1', 2),
+            None
+        ]
+        
+        result = route_service.get_order_route('77')
+        
+        assert result['route_code'] == "ROU-0003"
+        assert (result['client_id'], result['sequence']) == ('c-1', 2)
+        assert route_service.get_order_route('78') is None
+    
+    def test_reverse_lookup_date_range_validation(self, route_service, mock_route_repository):
+        """Test: Fechas inválidas o rango invertido son errores de validación"""
+        with pytest.raises(LogisticsValidationError, match="delivery_date_from"):
+            route_service.get_client_routes('c-1', 'ayer')
+        with pytest.raises(LogisticsValidationError, match="posterior"):
+            route_service.get_order_route('77', '2025-12-31', '2025-12-01')
+        mock_route_repository.get_routes_by_client.side_effect = Exception("Database error")
+        with pytest.raises(LogisticsBusinessLogicError, match="Error al obtener rutas del cliente"):
+            route_service.get_client_routes('c-1')
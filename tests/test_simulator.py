@@ -0,0 +1,261 @@
+"""
+Tests para el simulador de servicios externos
+"""
+import json
+import pytest
+from datetime import date
+from urllib.request import urlopen
+from benchmarks.simulator import (
+    Simulator,
+    SimulatorServer,
+    LatencyModel,
+    OUTCOME_OK,
+    OUTCOME_ERROR,
+    OUTCOME_TIMEOUT,
+    OUTCOME_RESET,
+    OUTCOME_SLOW_LORIS
+)
+from app.integrations.orders_integration import OrdersIntegration
+from app.integrations.auth_integration import AuthIntegration
+
+
+class FakeClock:
+    """Reloj que acumula las esperas sin dormir"""
+
+    def __init__(self):
+        self.slept = []
+
+    def __call__(self, seconds):
+        self.slept.append(seconds)
+
+
+class TestSimulator:
+    """Tests para Simulator"""
+
+    def _run(self, simulator, calls=200):
+        return [
+            simulator.decide('/orders/by-truck', {'assigned_truck': 'CAM-001', 'scheduled_delivery_date': f"2025-12-{(i % 28) + 1:02d}"})
+            for i in range(calls)
+        ]
+
+    def test_decisions_are_deterministic(self):
+        """Test: Misma semilla y secuencia producen las mismas decisiones"""
+        scenario = {
+            'seed': 11,
+            'orders': {
+                'latency': {'distribution': 'lognormal', 'median_ms': 40, 'sigma': 0.8},
+                'faults': {'error_rate': 0.1, 'timeout_rate': 0.05}
+            }
+        }
+        first = [(d.outcome, d.status, d.latency_ms) for d in self._run(Simulator(scenario))]
+        second = [(d.outcome, d.status, d.latency_ms) for d in self._run(Simulator(scenario))]
+
+        assert first == second
+
+    def test_different_seed_changes_decisions(self):
+        """Test: Otra semilla produce otra secuencia"""
+        base = {'orders': {'latency': {'distribution': 'uniform', 'min_ms': 1, 'max_ms': 100}}}
+        first = [d.latency_ms for d in self._run(Simulator(dict(base, seed=1)))]
+        second = [d.latency_ms for d in self._run(Simulator(dict(base, seed=2)))]
+
+        assert first != second
+
+    def test_fault_rates_are_respected(self):
+        """Test: Las tasas de fallo se aproximan a las configuradas"""
+        simulator = Simulator({
+            'seed': 3,
+            'orders': {'faults': {'error_rate': 0.2, 'error_statuses': [503], 'reset_rate': 0.1}}
+        })
+        decisions = self._run(simulator, calls=2000)
+        errors = [d for d in decisions if d.outcome == OUTCOME_ERROR]
+        resets = [d for d in decisions if d.outcome == OUTCOME_RESET]
+
+        assert 0.15 < len(errors) / 2000 < 0.25
+        assert 0.06 < len(resets) / 2000 < 0.14
+        assert all(d.status == 503 for d in errors)
+        assert simulator.stats()['orders'][OUTCOME_ERROR] == len(errors)
+
+    def test_payload_is_stable_per_key(self):
+        """Test: El mismo camión y fecha retorna siempre los mismos pedidos"""
+        simulator = Simulator({'orders': {'payload': {'orders_min': 3, 'orders_max': 9}}})
+        params = {'assigned_truck': 'CAM-002', 'scheduled_delivery_date': '2025-12-26'}
+
+        first = simulator.decide('/orders/by-truck', params).body
+        second = simulator.decide('/orders/by-truck', params).body
+
+        assert first == second
+        assert 3 <= len(first['data']) <= 9
+
+    def test_padding_increases_payload_size(self):
+        """Test: padding_bytes agranda el payload"""
+        params = {'assigned_truck': 'CAM-002', 'scheduled_delivery_date': '2025-12-26'}
+        small = Simulator().decide('/orders/by-truck', params)
+        large = Simulator({'orders': {'payload': {'padding_bytes': 1000}}}).decide('/orders/by-truck', params)
+
+        assert len(large.encoded_body()) > len(small.encoded_body()) + 1000 * len(small.body['data']) - 1
+
+    def test_fixtures_are_served(self):
+        """Test: Los fixtures tienen prioridad sobre los datos generados"""
+        fixtures = {
+            'orders': {'CAM-001|2025-12-26': [{'id': 7, 'client_id': 'c-1'}]},
+            'clients': {'c-1': {'id': 'c-1', 'name': 'Droguería Central'}}
+        }
+        simulator = Simulator(fixtures=fixtures)
+
+        orders = simulator.decide('/orders/by-truck', {'assigned_truck': 'CAM-001', 'scheduled_delivery_date': '2025-12-26'})
+        user = simulator.decide('/auth/user/c-1')
+        missing = simulator.decide('/auth/user/c-2')
+
+        assert orders.body['data'] == [{'id': 7, 'client_id': 'c-1'}]
+        assert user.body['data']['name'] == 'Droguería Central'
+        assert missing.status == 404
+
+    def test_unknown_path(self):
+        """Test: Rutas desconocidas retornan 404 sin cuerpo JSON, como un endpoint inexistente"""
+        decision = Simulator().decide('/otra/ruta')
+
+        assert decision.status == 404
+        assert decision.encoded_body() == b''
+
+
+class TestLatencyModel:
+    """Tests para LatencyModel"""
+
+    def test_sequence_is_scripted_by_call_index(self):
+        """Test: La distribución sequence sigue el guion"""
+        clock = FakeClock()
+        simulator = Simulator({'auth': {'latency': {'distribution': 'sequence', 'values_ms': [5, 50, 500]}}}, sleep=clock)
+
+        latencies = [simulator.decide(f"/auth/user/u-{i}").latency_ms for i in range(4)]
+
+        assert latencies == [5, 50, 500, 5]
+
+    def test_mixture_produces_tail(self):
+        """Test: Una mezcla genera una cola de latencia"""
+        import random
+        model = LatencyModel({
+            'distribution': 'mixture',
+            'components': [
+                {'weight': 0.9, 'distribution': 'constant', 'ms': 10},
+                {'weight': 0.1, 'distribution': 'constant', 'ms': 1000}
+            ]
+        })
+        rng = random.Random(5)
+        samples = [model.sample(rng) for _ in range(1000)]
+
+        assert set(samples) == {10, 1000}
+        assert 50 < samples.count(1000) < 150
+
+    def test_max_ms_caps_latency(self):
+        """Test: max_ms limita la latencia"""
+        import random
+        model = LatencyModel({'distribution': 'pareto', 'scale_ms': 10, 'alpha': 0.5, 'max_ms': 200})
+        rng = random.Random(1)
+
+        assert max(model.sample(rng) for _ in range(500)) <= 200
+
+    def test_invalid_distribution(self):
+        """Test: Distribución no soportada"""
+        with pytest.raises(ValueError):
+            LatencyModel({'distribution': 'bimodal'})
+
+
+class TestSimulatorInProcess:
+    """Tests del simulador en proceso contra las integraciones"""
+
+    def test_orders_integration_receives_simulated_orders(self):
+        """Test: OrdersIntegration consume el simulador en proceso"""
+        clock = FakeClock()
+        simulator = Simulator({'orders': {'latency': {'distribution': 'constant', 'ms': 120}}}, sleep=clock)
+
+        with simulator.patch_requests():
+            orders = OrdersIntegration().get_orders_by_truck_and_date('CAM-001', date(2025, 12, 26))
+
+        assert len(orders) == 8
+        assert clock.slept == [0.12]
+
+    def test_timeout_is_raised_when_latency_exceeds_client_timeout(self):
+        """Test: Una latencia mayor al timeout del cliente produce error"""
+        clock = FakeClock()
+        simulator = Simulator({'orders': {'faults': {'timeout_rate': 1.0, 'timeout_ms': 30000}}}, sleep=clock)
+
+        with simulator.patch_requests():
+            with pytest.raises(Exception, match="Error al consultar servicio de pedidos"):
+                OrdersIntegration().get_orders_by_truck_and_date('CAM-001', date(2025, 12, 26))
+
+        assert clock.slept == [10]
+        assert simulator.stats()['orders'] == {OUTCOME_TIMEOUT: 1}
+
+    def test_orders_by_date_matches_per_truck_orders(self):
+        """Test: La consulta por fecha agrupa los mismos pedidos que la consulta por camión"""
+        OrdersIntegration._by_date_unsupported_until.clear()
+        trucks = ['CAM-001', 'CAM-003']
+        simulator = Simulator({'seed': 2}, sleep=FakeClock())
+        fallback = Simulator({'seed': 2, 'orders_by_date': False}, sleep=FakeClock())
+
+        with simulator.patch_requests():
+            grouped = OrdersIntegration().get_orders_by_date(date(2025, 12, 26), trucks)
+        with fallback.patch_requests():
+            per_truck = OrdersIntegration().get_orders_by_date(date(2025, 12, 26), trucks)
+        OrdersIntegration._by_date_unsupported_until.clear()
+
+        assert sum(simulator.stats()['orders'].values()) == 1
+        assert sum(fallback.stats()['orders'].values()) == 2
+        for truck in trucks:
+            assert [order['id'] for order in grouped[truck]] == [order['id'] for order in per_truck[truck]]
+
+    def test_auth_errors_are_skipped_by_bulk_lookup(self):
+        """Test: get_users_by_ids ignora usuarios con error simulado"""
+        simulator = Simulator({'seed': 4, 'auth': {'faults': {'error_rate': 1.0}}}, sleep=FakeClock())
+
+        with simulator.patch_requests():
+            users = AuthIntegration().get_users_by_ids(['u-1', 'u-2'])
+
+        assert users == {}
+
+    def test_slow_loris_adds_transfer_time(self):
+        """Test: slow loris suma el tiempo de transferencia por bloques"""
+        clock = FakeClock()
+        simulator = Simulator({
+            'auth': {'faults': {'slow_loris_rate': 1.0, 'slow_loris_chunk_bytes': 100, 'slow_loris_chunk_delay_ms': 1000}}
+        }, sleep=clock)
+
+        with simulator.patch_requests():
+            user = AuthIntegration().get_user_by_id('u-1')
+
+        assert user['id'] == 'u-1'
+        assert clock.slept[0] >= 2.0
+
+
+class TestSimulatorServer:
+    """Tests del simulador como servidor HTTP"""
+
+    def test_serves_contracts_over_http(self):
+        """Test: El servidor responde los contratos de pedidos y autenticador"""
+        server = SimulatorServer(Simulator({'seed': 1})).start()
+        try:
+            with urlopen(f"{server.url}/orders/by-truck?assigned_truck=CAM-001&scheduled_delivery_date=2025-12-26") as response:
+                orders = json.loads(response.read())
+            with urlopen(f"{server.url}/auth/user/u-1") as response:
+                user = json.loads(response.read())
+        finally:
+            server.stop()
+
+        assert orders['success'] is True
+        assert len(orders['data']) == 8
+        assert user['data']['id'] == 'u-1'
+
+    def test_slow_loris_over_http_delivers_full_body(self):
+        """Test: El cuerpo llega completo aunque se envíe por bloques"""
+        simulator = Simulator({
+            'auth': {'faults': {'slow_loris_rate': 1.0, 'slow_loris_chunk_bytes': 16, 'slow_loris_chunk_delay_ms': 1}}
+        })
+        server = SimulatorServer(simulator).start()
+        try:
+            with urlopen(f"{server.url}/auth/user/u-9") as response:
+                user = json.loads(response.read())
+        finally:
+            server.stop()
+
+        assert user['data']['id'] == 'u-9'
+        assert simulator.stats()['auth'] == {OUTCOME_SLOW_LORIS: 1}
@@ -0,0 +1,90 @@
+"""
+Tests para SingleFlight
+"""
+import threading
+import time
+import pytest
+from app.utils.metrics import metrics
+from app.utils.singleflight import SingleFlight
+
+
+def wait_for_metric(name, value):
+    deadline = time.monotonic() + 5
+    while metrics.snapshot().get(name, 0) < value and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+class TestSingleFlight:
+    """Tests para SingleFlight"""
+    
+    def setup_method(self):
+        """Configuración inicial para cada test"""
+        metrics.reset()
+        self.flight = SingleFlight('test')
+    
+    def run_concurrently(self, key, func, followers=3):
+        started, release = threading.Event(), threading.Event()
+        results, errors = [], []
+        
+        def leader_func():
+            started.set()
+            release.wait(5)
+            return func()
+        
+        def call(target):
+            try:
+                results.append(self.flight.do(key, target))
+            except Exception as e:
+                errors.append(e)
+        
+        threads = [threading.Thread(target=call, args=(leader_func,))]
+        threads[0].start()
+        started.wait(5)
+        threads += [threading.Thread(target=call, args=(leader_func,)) for _ in range(followers)]
+        for thread in threads[1:]:
+            thread.start()
+        wait_for_metric('singleflight.test.suppressed', followers)
+        release.set()
+        for thread in threads:
+            thread.join(5)
+        return results, errors
+    
+    def test_concurrent_calls_share_result(self):
+        """Test: Las llamadas concurrentes con la misma clave ejecutan la función una sola vez"""
+        calls = []
+        
+        results, errors = self.run_concurrently('CAM-001', lambda: calls.append(1) or ['pedido'])
+        
+        assert len(calls) == 1
+        assert results == [['pedido']] * 4
+        assert errors == []
+        assert metrics.snapshot()['singleflight.test.calls'] == 1
+        assert metrics.snapshot()['singleflight.test.suppressed'] == 3
+    
+    def test_concurrent_calls_share_error(self):
+        """Test: La excepción de la llamada en curso se propaga a todos los que esperaban"""
+        def fail():
+            raise ConnectionError("servicio caído")
+        
+        results, errors = self.run_concurrently('CAM-001', fail)
+        
+        assert results == []
+        assert len(errors) == 4
+        assert all(str(error) == "servicio caído" for error in errors)
+    
+    def test_key_released_after_call(self):
+        """Test: No es una caché, la siguiente llamada vuelve a ejecutarse"""
+        assert self.flight.do('CAM-001', lambda: 1) == 1
+        with pytest.raises(ValueError):
+            self.flight.do('CAM-001', lambda: int('x'))
+        assert self.flight.do('CAM-001', lambda: 2) == 2
+        
+        assert metrics.snapshot()['singleflight.test.calls'] == 3
+        assert 'singleflight.test.suppressed' not in metrics.snapshot()
+    
+    def test_distinct_keys_run_separately(self):
+        """Test: Claves distintas no se agrupan"""
+        assert self.flight.do('CAM-001', lambda value: value, 'a') == 'a'
+        assert self.flight.do('CAM-002', lambda value: value, 'b') == 'b'
+        
+        assert metrics.snapshot()['singleflight.test.calls'] == 2
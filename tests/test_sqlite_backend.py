@@ -0,0 +1,239 @@
+"""
+Tests del modo SQLite embebido contra el repositorio real
+"""
+import json
+import os
+import subprocess
+import sys
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+import pytest
+from app.config.engines import apply_sqlite_pragmas, create_database_engine
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def parsed_url(url):
+    backend, _, rest = url.partition('://')
+    database, _, query = rest.lstrip('/').partition('?')
+    return SimpleNamespace(
+        get_backend_name=lambda: backend.split('+')[0],
+        database=database,
+        query=dict(item.split('=') for item in query.split('&') if item)
+    )
+
+
+def run_scenario(url, **env):
+    completed = subprocess.run(
+        [sys.executable, '-m', 'tests.sqlite_backend_scenario', url],
+        cwd=ROOT,
+        env=dict(os.environ, PYTHONPATH=ROOT, **env),
+        capture_output=True,
+        text=True,
+        timeout=60
+    )
+    assert completed.returncode == 0, completed.stderr
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+class TestCreateDatabaseEngine:
+    """Tests para las opciones de create_database_engine"""
+    
+    def create(self, url):
+        with patch('app.config.engines.make_url', side_effect=parsed_url), \
+                patch('app.config.engines.create_engine') as mock_create_engine, \
+                patch('app.config.engines.event') as mock_event:
+            create_database_engine(url, pool_size=4, max_overflow=2, pool_timeout=5)
+        return mock_create_engine.call_args.kwargs, mock_event
+    
+    def test_postgresql_uses_pool_and_utc(self):
+        """Test: PostgreSQL usa el pool configurado y la zona horaria UTC"""
+        options, mock_event = self.create('postgresql+psycopg2://user@localhost/db')
+        
+        assert (options['pool_size'], options['max_overflow'], options['pool_timeout']) == (4, 2, 5)
+        assert options['connect_args'] == {'options': '-c timezone=utc'}
+        mock_event.listen.assert_not_called()
+    
+    def test_sqlite_file_uses_pool_and_pragmas(self):
+        """Test: SQLite en archivo usa el pool configurado y aplica los pragmas al conectar"""
+        options, mock_event = self.create('sqlite:///routes.db')
+        
+        assert (options['pool_size'], options['max_overflow'], options['pool_timeout']) == (4, 2, 5)
+        assert options['connect_args'] == {'check_same_thread': False}
+        assert 'poolclass' not in options
+        mock_event.listen.assert_called_once()
+    
+    def test_sqlite_memory_shares_one_connection(self):
+        """Test: SQLite en memoria usa StaticPool sin opciones de tamaño"""
+        for url in ('sqlite://', 'sqlite:///file:routes?mode=memory'):
+            options, _ = self.create(url)
+            
+            assert 'poolclass' in options
+            assert 'pool_size' not in options
+    
+    def test_apply_sqlite_pragmas(self):
+        """Test: Los pragmas se ejecutan en cada conexión nueva"""
+        connection = MagicMock()
+        
+        apply_sqlite_pragmas(connection, None)
+        
+        statements = [call.args[0] for call in connection.cursor.return_value.execute.call_args_list]
+        assert statements[0] == "PRAGMA journal_mode=WAL"
+        assert "PRAGMA foreign_keys=ON" in statements
+        connection.cursor.return_value.close.assert_called_once()
+
+
+class TestSQLiteBackend:
+    """Tests para RouteRepository sobre SQLite en archivo y en memoria"""
+    
+    @pytest.fixture(scope='class', params=['memory', 'file'])
+    def result(self, request, tmp_path_factory):
+        url = 'sqlite://' if request.param == 'memory' else f"sqlite:///{tmp_path_factory.mktemp('sqlite') / 'routes.db'}"
+        return request.param, run_scenario(url)
+    
+    def test_pragmas(self, result):
+        """Test: Se aplican WAL y los pragmas de rendimiento"""
+        mode, data = result
+        
+        assert data['pragmas']['journal_mode'] == ('memory' if mode == 'memory' else 'wal')
+        assert data['pragmas']['foreign_keys'] == 1
+        assert data['pragmas']['busy_timeout'] == 5000
+        assert data['pragmas']['synchronous'] == 1
+    
+    def test_delivery_date_ordering_and_pagination(self, result):
+        """Test: Las fechas se ordenan cronológicamente entre meses y años"""
+        _, data = result
+        
+        assert data['ordered_codes'] == ["ROU-0002", "ROU-0001", "ROU-0004", "ROU-0003"]
+        assert data['second_page'] == ["ROU-0004", "ROU-0003"]
+        assert data['rows'] == [["ROU-0002", "CAM-002", "2026-01-15"]]
+    
+    def test_ilike_filters_are_case_insensitive(self, result):
+        """Test: Los filtros ilike ignoran mayúsculas como en PostgreSQL"""
+        _, data = result
+        
+        assert len(data['ilike_code']) == 4
+        assert data['ilike_truck'] == 2
+        assert data['version'] == [2, True]
+    
+    def test_reads_and_writes(self, result):
+        """Test: Búsquedas, streaming, actualización y borrado por lotes"""
+        _, data = result
+        
+        assert data['by_date'] == 1
+        assert data['stream'] == [3, 1]
+        assert data['truck_and_date'] == "ROU-0002"
+        assert data['next_sequence'] == 5
+        assert data['duplicate_code'] == ['LogisticsConflictError', 0]
+        assert data['updated_orders'] == 7
+        assert data['deleted_before'] == 2
+        assert data['remaining'] == 2
+    
+    def test_shared_across_threads(self, result):
+        """Test: Otras hebras ven los mismos datos, también en memoria"""
+        _, data = result
+        
+        assert data['seen_from_thread'] == [4]
+    
+    def test_route_stops_round_trip(self, result):
+        """Test: Reemplazar paradas las guarda en orden y se borran en cascada con la ruta"""
+        _, data = result
+        
+        assert data['stops'] == [['c-2', 1], ['c-1', 2], ['c-9', None]]
+        assert data['sequence_stats']['incremental_updates'] == 2
+        assert data['sequence_stats']['baseline_stops'] == 2
+        assert data['stops_orders_count'] == 4
+        assert data['stops_after_delete'] == [True, 0, None]
+    
+    def test_route_with_stops_join(self, result):
+        """Test: Detalle en una consulta con paradas en orden, y creación con paradas y pedidos"""
+        _, data = result
+        
+        assert data['with_stops'] == ["ROU-0002", ['c-2', 'c-1', 'c-9'], 12.5]
+        assert data['created_with_stops'] == [['Calle 7'], [['70', 'c-7'], ['71', 'c-7']]]
+        assert data['without_stops'] == [[[], None], None]
+    
+    def test_reverse_index_lookups(self, result):
+        """Test: Búsquedas de rutas por cliente y por pedido usan sus índices"""
+        _, data = result
+        reverse_index = data['reverse_index']
+        
+        assert reverse_index['client'] == [["ROU-0005", 1]]
+        assert reverse_index['client_out_of_range'] == 0
+        assert reverse_index['order'] == ["ROU-0005", 'c-7', 1]
+        assert reverse_index['order_missing'] is None
+        assert 'ix_route_stops_client_route' in reverse_index['plans'][0]
+        assert 'ix_route_orders_order_id' in reverse_index['plans'][1]
+    
+    def test_outbox_events(self, result):
+        """Test: Crear y eliminar rutas escribe eventos que el relay publica en orden y borra al confirmar"""
+        _, data = result
+        outbox = data['outbox']
+        
+        assert outbox['events'] == [
+            ['route.created', 1], ['route.created', 2], ['route.created', 3], ['route.created', 4],
+            ['route.deleted', 3], ['route.deleted', 4], ['route.deleted', 2], ['route.created', 2]
+        ]
+        assert outbox['partial'] == 3
+        assert outbox['batches'] == [5, 0, 0]
+        assert outbox['published'] == [str(event_id) for event_id in range(1, 9)]
+        assert outbox['deleted_payload'] == {'id': 3, 'route_code': 'ROU-0003', 'assigned_truck': 'CAM-001', 'delivery_date': '2025-02-03'}
+        assert outbox['lag_seconds'] == 0.0
+    
+    def test_delete_all_writes_one_purge_event(self, result):
+        """Test: Eliminar todas las rutas registra un solo evento routes.purged"""
+        _, data = result
+        remaining, purged = data['purge']['deleted']
+        
+        assert purged == remaining > 0
+        assert data['purge']['event'] == ['routes.purged', None, {'deleted_count': purged, 'before': None}]
+    
+    def test_rejected_event_moves_to_dead_letters(self, result):
+        """Test: Un evento sin cola destino no bloquea a los siguientes y tras agotar los intentos pasa a la tabla de fallidos"""
+        _, data = result
+        dead_letters, route_id, pending = data['purge']['dead_letters']
+        
+        assert data['purge']['retries'] == [1, 0]
+        assert dead_letters == [['route.created', route_id, 2]]
+        assert pending == 0
+    
+    def test_idempotency_keys(self, result):
+        """Test: La clave se registra una sola vez, guarda la respuesta y vence por TTL"""
+        _, data = result
+        idempotency = data['idempotency']
+        
+        assert idempotency['claims'] == [True, False, True]
+        assert idempotency['stored'] == ['hash-1', 201, '{"success": true}', '{"Location": "/logistics/routes/jobs/1"}', True]
+        assert idempotency['kept_after_stale_release'] is True
+        assert idempotency['expired'] == 1
+        assert idempotency['remaining'] == [True, None]
+    
+    def test_jobs_shared_through_database(self, result):
+        """Test: Otro proceso lee el estado, progreso y resultado de las tareas y solo se retienen las más recientes"""
+        _, data = result
+        jobs = data['jobs']
+        
+        assert jobs['completed'] == ['completed', {'batches': 2}, {'deleted': 3, 'before': '2026-01-10'}, True]
+        assert jobs['failed'] == ['failed', "invalid literal for int() with base 10: 'x'"]
+        assert jobs['pruned'] is None
+        assert jobs['missing'] is None
+
+
+class TestSQLiteApp:
+    """Tests para la aplicación completa sobre SQLite en archivo"""
+    
+    def test_concurrent_requests_return_connections(self, tmp_path):
+        """Test: Más peticiones concurrentes que conexiones en el pool no lo agotan"""
+        data = run_scenario(
+            'app',
+            DATABASE_URL=f"sqlite:///{tmp_path / 'routes.db'}",
+            DATABASE_POOL_SIZE='2',
+            DATABASE_MAX_OVERFLOW='0',
+            DATABASE_POOL_TIMEOUT_SECONDS='2',
+            DEBUG='False'
+        )
+        
+        assert data['pool_size'] == 2
+        assert data['requests'] > data['pool_size']
+        assert data['statuses'] == [200, 404]
+        assert data['checked_out'] == 0
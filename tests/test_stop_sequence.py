@@ -0,0 +1,133 @@
+"""
+Tests para la optimización de secuencia de paradas
+"""
+import itertools
+import random
+import time
+import numpy as np
+import pytest
+from app.optimization.distance import haversine_matrix
+from app.optimization.stop_sequence import (
+    optimize_stop_sequence,
+    sequence_clients,
+    build_tour_matrix,
+    tour_length
+)
+
+DEPOT = (4.65, -74.10)
+
+
+def random_stops(count, seed=1):
+    rng = random.Random(seed)
+    return [(4.60 + rng.uniform(-0.15, 0.15), -74.08 + rng.uniform(-0.10, 0.10)) for _ in range(count)]
+
+
+def brute_force_length(coordinates, depot, return_to_depot):
+    distances = build_tour_matrix(coordinates, depot, return_to_depot)
+    return min(
+        tour_length(np.array((0,) + permutation), distances)
+        for permutation in itertools.permutations(range(1, len(coordinates) + 1))
+    )
+
+
+class TestHaversineMatrix:
+    """Tests para haversine_matrix"""
+    
+    def test_known_distance(self):
+        """Test: Distancia Bogotá - Medellín en kilómetros"""
+        distances = haversine_matrix([(4.6097, -74.0817), (6.2442, -75.5812)])
+        
+        assert distances.shape == (2, 2)
+        assert distances[0, 0] == 0
+        assert distances[0, 1] == pytest.approx(246.1, abs=0.5)
+        assert distances[0, 1] == distances[1, 0]
+    
+    def test_rectangular_matrix(self):
+        """Test: Distancias entre dos conjuntos de puntos"""
+        distances = haversine_matrix([(0.0, 0.0)], [(0.0, 1.0), (1.0, 0.0)])
+        
+        assert distances.shape == (1, 2)
+        assert distances[0, 0] == pytest.approx(111.2, abs=0.1)
+
+
+class TestOptimizeStopSequence:
+    """Tests para optimize_stop_sequence"""
+    
+    def test_empty_and_single_stop(self):
+        """Test: Sin paradas o con una sola parada"""
+        assert optimize_stop_sequence([]) == ([], 0.0)
+        assert optimize_stop_sequence([(4.6, -74.1)]) == ([0], 0.0)
+    
+    def test_collinear_stops_are_visited_in_order(self):
+        """Test: Paradas sobre una línea se recorren en orden desde el depósito"""
+        stops = [(4.0 + 0.01 * i, -74.0) for i in (3, 0, 4, 1, 2)]
+        
+        order, total = optimize_stop_sequence(stops, depot=(3.99, -74.0), return_to_depot=False)
+        
+        assert order == [1, 3, 4, 0, 2]
+        assert total == pytest.approx(haversine_matrix([(3.99, -74.0), (4.04, -74.0)])[0, 1])
+    
+    @pytest.mark.parametrize('depot,return_to_depot', [(None, True), (DEPOT, True), (DEPOT, False)])
+    def test_small_instances_are_near_optimal(self, depot, return_to_depot):
+        """Test: En instancias pequeñas la solución queda cerca del óptimo exacto"""
+        ratios = []
+        for seed in range(8):
+            stops = random_stops(6, seed)
+            
+            order, total = optimize_stop_sequence(stops, depot, return_to_depot)
+            
+            assert sorted(order) == list(range(6))
+            ratios.append(total / brute_force_length(stops, depot, return_to_depot))
+        
+        assert max(ratios) < 1.15
+        assert sum(ratios) / len(ratios) < 1.03
+    
+    def test_reported_distance_matches_order(self):
+        """Test: La distancia total corresponde al orden retornado"""
+        stops = random_stops(40)
+        
+        order, total = optimize_stop_sequence(stops, DEPOT)
+        
+        distances = build_tour_matrix(stops, DEPOT)
+        assert total == pytest.approx(tour_length(np.array([0] + [index + 1 for index in order]), distances))
+    
+    def test_two_hundred_stops_within_budget(self):
+        """Test: 200 paradas se optimizan en menos de 100 ms"""
+        stops = random_stops(200)
+        optimize_stop_sequence(stops[:20], DEPOT)
+        
+        started = time.perf_counter()
+        order, total = optimize_stop_sequence(stops, DEPOT, time_limit_ms=50)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        
+        assert sorted(order) == list(range(200))
+        assert elapsed_ms < 100
+    
+    def test_improves_nearest_neighbour(self):
+        """Test: 2-opt y Or-opt mejoran la construcción inicial"""
+        stops = random_stops(120)
+        
+        _, baseline = optimize_stop_sequence(stops, DEPOT, time_limit_ms=0)
+        _, improved = optimize_stop_sequence(stops, DEPOT)
+        
+        assert improved < baseline * 0.95
+
+
+class TestSequenceClients:
+    """Tests para sequence_clients"""
+    
+    def test_assigns_sequence_and_keeps_unlocated_last(self):
+        """Test: Clientes sin coordenadas quedan al final sin secuencia"""
+        clients = [
+            {'id': 'c-3', 'latitude': 4.02, 'longitude': -74.0},
+            {'id': 'c-1', 'latitude': None, 'longitude': None},
+            {'id': 'c-2', 'latitude': '4.01', 'longitude': '-74.0'},
+            {'id': 'c-4', 'latitude': 400, 'longitude': -74.0}
+        ]
+        
+        sequenced, total = sequence_clients(clients, depot=(4.0, -74.0), return_to_depot=False)
+        
+        assert [client['id'] for client in sequenced] == ['c-2', 'c-3', 'c-1', 'c-4']
+        assert [client['sequence'] for client in sequenced] == [1, 2, None, None]
+        assert total == pytest.approx(2.224, abs=0.001)
+        assert 'sequence' not in clients[0]